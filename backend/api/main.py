@@ -2,13 +2,36 @@
 API REST para detección de hate speech en comentarios de YouTube.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from backend.models.model_loader import HateSpeechDetector, DistilBERTDetector
+from backend.models.onnx_detector import ONNXDistilBERTDetector
+from backend.models.cascade import CascadeDetector, DEFAULT_BAND
+from backend.models.batching import MicroBatcher
+from backend.models.reloader import ModelReloader, ReloadInProgress
+from backend.preprocessing.parallel import ParallelPreprocessor
 from datetime import datetime
 from backend.utils.youtube_scraper import YouTubeCommentFetcher
+from backend.utils.youtube_async import AsyncYouTubeCommentFetcher, QuotaBucket, QuotaExceeded
+from backend.utils.prediction_cache import PredictionCache
+from backend.utils.executors import BoundedExecutor, ExecutorSaturated
+from backend.utils.load_shedding import LoadShedder, Overloaded
+from backend.utils.ndjson import iter_ndjson_batches
+from backend.utils.toxicity_aggregate import ToxicityAggregate
+from backend.utils.model_agreement import compare_predictions
+from backend.utils.comment_store import CommentStore, model_fingerprint
+from backend.utils.metrics import NULL_METRICS, MetricsMiddleware, MetricsRegistry, prometheus_metric
+from backend.utils.profiling import ProfileStore, ProfilingMiddleware, current_profile
+import asyncio
+import functools
+import hmac
+import json
 import logging
+import os
+import time
+from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -34,25 +57,441 @@ app.add_middleware(
 detector = None
 bert_detector = None
 youtube_fetcher = None
+preprocess_pool = None
+cascade_detector = None
+bert_batcher = None
+model_executor = None
+io_executor = None
+lr_executor = None
+comment_store = None
+bert_store_version = None
+lr_reloader = None
+bert_reloader = None
+reload_tasks = set()  # recargas lanzadas sin wait (referencia para que no las recoja el gc)
+
+# Preprocesamiento paralelo (opt-in) para lotes grandes del modelo LR
+PARALLEL_PREPROCESSING = os.getenv("PARALLEL_PREPROCESSING", "false").lower() in ("1", "true", "yes")
+PREPROCESS_WORKERS = int(os.getenv("PREPROCESS_WORKERS", "0")) or None
+PREPROCESS_CHUNK_SIZE = int(os.getenv("PREPROCESS_CHUNK_SIZE", "1000"))
+PREPROCESS_PARALLEL_THRESHOLD = int(os.getenv("PREPROCESS_PARALLEL_THRESHOLD", "2000"))
+
+# Cache de predicciones compartida por todos los endpoints (0 = desactivada)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL)
+
+# Métricas por endpoint y por etapa (/metrics); METRICS_ENABLED=false las desactiva
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+metrics = MetricsRegistry(enabled=METRICS_ENABLED)
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Profiling por petición (cabecera X-Profile: timings | cprofile); desactivado por defecto
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = os.getenv("PROFILE_DIR") or None  # vacío = informes solo en memoria
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fracción perfilada sin cabecera
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+PROFILED_PATHS = (
+    "/predict", "/predict/batch", "/predict/transformer", "/predict/compare", "/predict/compare/batch",
+    "/predict/cascade", "/analyze/video"
+)
+profile_store = ProfileStore(max_entries=PROFILE_KEEP, directory=PROFILE_DIR)
+app.add_middleware(
+    ProfilingMiddleware, store=profile_store, paths=PROFILED_PATHS,
+    enabled=PROFILING_ENABLED, sample_rate=PROFILE_SAMPLE_RATE
+)
+
+# Predicciones servidas por modelo (/stats y /metrics)
+stats = {
+    "lr_predictions": 0,
+    "bert_predictions": 0,
+    "comparisons": 0
+}
+
+LR_MODEL_ID = "logistic_regression"
+BERT_MODEL_ID = "distilbert"
+
+# Banda de incertidumbre de la probabilidad LR que se escala a DistilBERT
+CASCADE_BAND_LOWER = float(os.getenv("CASCADE_BAND_LOWER", str(DEFAULT_BAND[0])))
+CASCADE_BAND_UPPER = float(os.getenv("CASCADE_BAND_UPPER", str(DEFAULT_BAND[1])))
+
+# Micro-batching de peticiones individuales a DistilBERT
+BERT_MICROBATCHING = os.getenv("BERT_MICROBATCHING", "true").lower() in ("1", "true", "yes")
+BERT_MAX_BATCH_SIZE = int(os.getenv("BERT_MAX_BATCH_SIZE", "32"))
+BERT_MAX_WAIT_MS = float(os.getenv("BERT_MAX_WAIT_MS", "5"))
+# Tokens máximos (textos x longitud con padding) por forward en predict_batch
+BERT_MAX_TOKENS_PER_BATCH = int(os.getenv("BERT_MAX_TOKENS_PER_BATCH", "2048"))
+# Backend de inferencia de DistilBERT: "torch" (eager) u "onnx" (ONNX Runtime, sin importar torch)
+BERT_BACKEND = os.getenv("BERT_BACKEND", "torch").lower()
+BERT_ONNX_PATH = os.getenv("BERT_ONNX_PATH") or None
+
+# Executors acotados: inferencia (CPU) y llamadas a YouTube (red) fuera del event loop.
+# Con max_pending tareas admitidas, las siguientes peticiones reciben 429
+MODEL_EXECUTOR_WORKERS = int(os.getenv("MODEL_EXECUTOR_WORKERS", "2"))
+MODEL_EXECUTOR_MAX_PENDING = int(os.getenv("MODEL_EXECUTOR_MAX_PENDING", "64"))
+IO_EXECUTOR_WORKERS = int(os.getenv("IO_EXECUTOR_WORKERS", "8"))
+IO_EXECUTOR_MAX_PENDING = int(os.getenv("IO_EXECUTOR_MAX_PENDING", "32"))
+# Executor propio de LR para la mitad LR de /predict/compare/batch y el fallback
+# por saturación: no espera detrás de los lotes DistilBERT del executor de modelo
+LR_EXECUTOR_WORKERS = int(os.getenv("LR_EXECUTOR_WORKERS", "1"))
+LR_EXECUTOR_MAX_PENDING = int(os.getenv("LR_EXECUTOR_MAX_PENDING", "64"))
+# Textos máximos por petición a /predict/compare/batch
+COMPARE_BATCH_MAX_TEXTS = int(os.getenv("COMPARE_BATCH_MAX_TEXTS", "5000"))
+
+# Control de admisión de DistilBERT (/predict/transformer y /analyze/video): por encima de
+# BERT_SHED_MAX_QUEUE textos en cola o BERT_SHED_MAX_WAIT_MS de espera estimada,
+# "fallback" puntúa con LR, "reject" responde 503 y "off" lo desactiva
+BERT_SHED_POLICY = os.getenv("BERT_SHED_POLICY", "fallback").lower()
+BERT_SHED_MAX_QUEUE = int(os.getenv("BERT_SHED_MAX_QUEUE", "256"))
+BERT_SHED_MAX_WAIT_MS = float(os.getenv("BERT_SHED_MAX_WAIT_MS", "1000"))
+load_shedder = LoadShedder(policy=BERT_SHED_POLICY, max_queue=BERT_SHED_MAX_QUEUE, max_wait_ms=BERT_SHED_MAX_WAIT_MS)
+
+# Scoring masivo en streaming (/predict/stream): textos por lote y longitud máxima de línea
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "256"))
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(64 * 1024)))
+
+# Cliente de YouTube: "discovery" (googleapiclient en el executor de I/O) o "async"
+# (httpx con pool de conexiones, reintentos con backoff y límite de cuota diaria)
+YOUTUBE_CLIENT = os.getenv("YOUTUBE_CLIENT", "discovery").lower()
+YOUTUBE_MAX_CONNECTIONS = int(os.getenv("YOUTUBE_MAX_CONNECTIONS", "20"))
+YOUTUBE_MAX_RETRIES = int(os.getenv("YOUTUBE_MAX_RETRIES", "3"))
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+
+# Respuestas de los hilos (include_replies): peticiones comments.list simultáneas
+# por página de hilos y respuestas máximas por hilo
+REPLY_FETCH_CONCURRENCY = int(os.getenv("REPLY_FETCH_CONCURRENCY", "8"))
+REPLY_MAX_PER_THREAD = int(os.getenv("REPLY_MAX_PER_THREAD", "100"))
+
+# Almacén SQLite de comentarios ya puntuados para /analyze/video/incremental ('' = desactivado)
+COMMENT_STORE_PATH = os.getenv("COMMENT_STORE_PATH", "data/comment_store.sqlite3")
+
+# Recarga de modelos en caliente: POST /admin/reload (cabecera X-Admin-Token; sin
+# ADMIN_TOKEN los endpoints de administración están desactivados) y, con
+# MODEL_WATCH, al cambiar los ficheros del modelo
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+MODEL_WATCH = os.getenv("MODEL_WATCH", "false").lower() in ("1", "true", "yes")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "5"))
+# Segundos que se espera a que las peticiones en curso suelten el modelo reemplazado
+MODEL_RELEASE_TIMEOUT = float(os.getenv("MODEL_RELEASE_TIMEOUT", "300"))
+RELOAD_WARMUP_TEXTS = ["I love this video!", "You are an idiot", "Thanks for sharing, great content"]
 
 @app.on_event("startup")
 async def load_model():
     """Carga los modelos al iniciar la aplicación."""
-    global detector, bert_detector, youtube_fetcher
+    global detector, bert_detector, youtube_fetcher, preprocess_pool, cascade_detector, bert_batcher
+    global model_executor, io_executor, lr_executor, comment_store, bert_store_version, lr_reloader, bert_reloader
     try:
-        detector = HateSpeechDetector()
+        model_executor = BoundedExecutor("model", MODEL_EXECUTOR_WORKERS, MODEL_EXECUTOR_MAX_PENDING)
+        io_executor = BoundedExecutor("io", IO_EXECUTOR_WORKERS, IO_EXECUTOR_MAX_PENDING)
+        lr_executor = BoundedExecutor("lr", LR_EXECUTOR_WORKERS, LR_EXECUTOR_MAX_PENDING)
+        logger.info(
+            f"✅ Executors activos (modelo: {MODEL_EXECUTOR_WORKERS} hilos/{MODEL_EXECUTOR_MAX_PENDING} tareas, "
+            f"red: {IO_EXECUTOR_WORKERS} hilos/{IO_EXECUTOR_MAX_PENDING} tareas, "
+            f"LR (comparación y fallback): {LR_EXECUTOR_WORKERS} hilos/{LR_EXECUTOR_MAX_PENDING} tareas)"
+        )
+        
+        if PARALLEL_PREPROCESSING:
+            preprocess_pool = ParallelPreprocessor(
+                workers=PREPROCESS_WORKERS,
+                chunk_size=PREPROCESS_CHUNK_SIZE,
+                threshold=PREPROCESS_PARALLEL_THRESHOLD
+            )
+            preprocess_pool.start()
+            logger.info(f"✅ Preprocesamiento paralelo activo ({preprocess_pool.workers} procesos)")
+        
+        detector = build_lr_detector()
         logger.info("✅ Modelo Logistic Regression cargado exitosamente")
         
-        bert_detector = DistilBERTDetector()
-        logger.info("✅ Modelo DistilBERT cargado exitosamente")
+        bert_detector = build_bert_detector()
+        logger.info(f"✅ Modelo DistilBERT cargado exitosamente (backend {BERT_BACKEND})")
+        
+        # La cascada usa los mismos helpers cacheados que el resto de endpoints
+        cascade_detector = CascadeDetector(
+            lr_predict_batch, bert_predict_batch,
+            lower=CASCADE_BAND_LOWER, upper=CASCADE_BAND_UPPER
+        )
+        logger.info(f"✅ Cascada LR -> DistilBERT activa (banda [{CASCADE_BAND_LOWER}, {CASCADE_BAND_UPPER}])")
         
-        youtube_fetcher = YouTubeCommentFetcher()
-        logger.info("✅ YouTube Comment Fetcher inicializado")
+        if BERT_MICROBATCHING:
+            bert_batcher = MicroBatcher(
+                bert_forward_items,
+                max_batch_size=BERT_MAX_BATCH_SIZE,
+                max_wait_ms=BERT_MAX_WAIT_MS,
+                executor=model_executor.executor
+            )
+            await bert_batcher.start()
+            logger.info(f"✅ Micro-batching DistilBERT activo (max {BERT_MAX_BATCH_SIZE} textos, {BERT_MAX_WAIT_MS} ms)")
+        
+        if YOUTUBE_CLIENT == "async":
+            youtube_fetcher = AsyncYouTubeCommentFetcher(
+                max_connections=YOUTUBE_MAX_CONNECTIONS,
+                max_retries=YOUTUBE_MAX_RETRIES,
+                quota=QuotaBucket(per_day=YOUTUBE_DAILY_QUOTA)
+            )
+        else:
+            youtube_fetcher = YouTubeCommentFetcher()
+        logger.info(f"✅ YouTube Comment Fetcher inicializado (cliente {YOUTUBE_CLIENT})")
+        
+        if COMMENT_STORE_PATH:
+            comment_store = CommentStore(COMMENT_STORE_PATH)
+            bert_store_version = stored_model_version(bert_detector)
+            logger.info(f"✅ Almacén de comentarios en {COMMENT_STORE_PATH} (modelo {bert_store_version})")
+        
+        lr_reloader = ModelReloader(
+            "logistic_regression", build_lr_detector, swap_lr_detector, warmup=warm_up_detector,
+            watch_paths=[detector.model_path, detector.vectorizer_path, detector.artifact_path],
+            release_timeout=MODEL_RELEASE_TIMEOUT
+        )
+        bert_reloader = ModelReloader(
+            "distilbert", build_bert_detector, swap_bert_detector, warmup=warm_up_detector,
+            watch_paths=[getattr(bert_detector, 'onnx_path', None) or bert_detector.model_path],
+            release_timeout=MODEL_RELEASE_TIMEOUT
+        )
+        if MODEL_WATCH:
+            for reloader in (lr_reloader, bert_reloader):
+                reloader.start_watching(MODEL_WATCH_INTERVAL)
+            logger.info(f"✅ Vigilando los ficheros de los modelos cada {MODEL_WATCH_INTERVAL} s")
     except Exception as e:
         logger.error(f"❌ Error cargando modelos: {e}")
         raise
 
 
+def build_lr_detector():
+    """Crea el detector LR con la configuración del servidor (arranque y recargas)."""
+    return HateSpeechDetector(parallel_preprocessor=preprocess_pool, metrics=metrics)
+
+
+def build_bert_detector():
+    """Crea el detector DistilBERT del backend configurado (arranque y recargas)."""
+    if BERT_BACKEND == "onnx":
+        return ONNXDistilBERTDetector(
+            onnx_path=BERT_ONNX_PATH,
+            max_batch_size=BERT_MAX_BATCH_SIZE,
+            max_tokens_per_batch=BERT_MAX_TOKENS_PER_BATCH,
+            metrics=metrics
+        )
+    return DistilBERTDetector(
+        max_batch_size=BERT_MAX_BATCH_SIZE,
+        max_tokens_per_batch=BERT_MAX_TOKENS_PER_BATCH,
+        metrics=metrics
+    )
+
+
+def warm_up_detector(instance):
+    """Primeras predicciones de una instancia recién cargada, fuera de las métricas."""
+    registry, instance.metrics = instance.metrics, NULL_METRICS
+    try:
+        instance.predict_batch(RELOAD_WARMUP_TEXTS)
+        instance.predict(RELOAD_WARMUP_TEXTS[0])
+    finally:
+        instance.metrics = registry
+
+
+def swap_lr_detector(new):
+    """Sustituye el detector LR global y su versión en la cache; retorna el anterior."""
+    global detector
+    old, detector = detector, new
+    prediction_cache.invalidate(LR_MODEL_ID, new.model_version)
+    return old
+
+
+def swap_bert_detector(new):
+    """Sustituye el detector DistilBERT global (y su versión en la cache y el almacén); retorna el anterior."""
+    global bert_detector, bert_store_version
+    old, bert_detector = bert_detector, new
+    prediction_cache.invalidate(BERT_MODEL_ID, new.model_version)
+    if comment_store is not None:
+        bert_store_version = stored_model_version(new)
+    return old
+
+
+# Los helpers leen el detector global una sola vez: si una recarga lo sustituye
+# a mitad de petición, la versión de cache y el modelo siguen siendo los mismos
+def lr_predict(text):
+    """Predicción LR individual a través de la cache."""
+    model = detector
+    return prediction_cache.get_or_compute(LR_MODEL_ID, model.model_version, text, model.predict)
+
+
+def lr_predict_batch(texts):
+    """Predicción LR por lotes: solo los misses de cache llegan al modelo."""
+    model = detector
+    return prediction_cache.get_or_compute_batch(LR_MODEL_ID, model.model_version, texts, model.predict_batch)
+
+
+def bert_forward(model, text):
+    """Forward de DistilBERT de un texto (sin micro-batching); alimenta la espera estimada."""
+    start = time.perf_counter()
+    result = model.predict(text)
+    load_shedder.observe_service(time.perf_counter() - start, 1)
+    return result
+
+
+def bert_predict(text):
+    """Predicción DistilBERT individual a través de la cache."""
+    model = bert_detector
+    return prediction_cache.get_or_compute(
+        BERT_MODEL_ID, model.model_version, text, functools.partial(bert_forward, model)
+    )
+
+
+async def bert_predict_async(text):
+    """Predicción DistilBERT individual: cache y, en caso de miss, micro-batching."""
+    if bert_batcher is None:
+        return await run_in_pool(model_executor, bert_predict, text)
+    model = bert_detector
+    
+    def submit(text):
+        return bert_batcher.submit((model, text))
+    
+    try:
+        # Los lotes del batcher corren en el pool de modelo: cada texto ocupa un hueco.
+        # bert_tokenize/bert_forward se miden por lote compartido; esta etapa es lo
+        # que espera cada petición (cola + forward del lote en que entra)
+        with model_executor.slot(), metrics.stage('bert_microbatch'):
+            return await prediction_cache.get_or_compute_async(BERT_MODEL_ID, model.model_version, text, submit)
+    except ExecutorSaturated as e:
+        raise saturated_error(e)
+
+
+def bert_forward_batch(model, texts):
+    """Forward de DistilBERT sobre los textos que no estaban en cache; alimenta la espera estimada."""
+    start = time.perf_counter()
+    results = model.predict_batch(texts)
+    load_shedder.observe_service(time.perf_counter() - start, len(texts))
+    return results
+
+
+def bert_forward_items(items):
+    """
+    Lote del micro-batcher: pares (detector, texto) con el detector que leyó cada petición.
+    
+    Justo después de una recarga un lote puede mezclar la instancia vieja y
+    la nueva; cada grupo se ejecuta con la suya.
+    """
+    groups = {}
+    for index, (model, _) in enumerate(items):
+        groups.setdefault(id(model), (model, []))[1].append(index)
+    results = [None] * len(items)
+    for model, indices in groups.values():
+        for index, result in zip(indices, bert_forward_batch(model, [items[i][1] for i in indices])):
+            results[index] = result
+    return results
+
+
+def bert_predict_batch(texts):
+    """Predicción DistilBERT por lotes: solo los misses de cache llegan al modelo."""
+    model = bert_detector
+    return prediction_cache.get_or_compute_batch(
+        BERT_MODEL_ID, model.model_version, texts, functools.partial(bert_forward_batch, model)
+    )
+
+
+def format_bert_prediction(result):
+    """Adapta una predicción de DistilBERT al formato de PredictionOutput."""
+    return {
+        "text": result['text'],
+        "prediction": result['prediction'],
+        "confidence": result['confidence'],
+        "is_toxic": result['label'] == 1,
+        "threshold_used": 0.5,      # DistilBERT usa softmax, threshold implicito 0.5
+        "model": "distilbert-base-uncased-finetuned"
+    }
+
+
+def stored_model_version(bert):
+    """
+    Versión de DistilBERT para el almacén de comentarios.
+    
+    A diferencia de model_version (nueva en cada carga), se mantiene entre
+    reinicios mientras no cambien el backend ni los ficheros de pesos.
+    """
+    onnx_path = getattr(bert, 'onnx_path', None)
+    if onnx_path is not None:
+        return f"onnx-{model_fingerprint(onnx_path)}"
+    model_path = getattr(bert, 'model_path', None)
+    weights = [Path(model_path) / name for name in ("config.json", "model.safetensors", "pytorch_model.bin")] \
+        if model_path else []
+    variant = "torch-int8" if getattr(bert, 'quantize', False) else "torch"
+    return f"{variant}-{model_fingerprint(*weights)}"
+
+
+def quota_error(e):
+    """HTTPException 429 para la cuota de YouTube agotada."""
+    logger.warning(f"⚠️ {e}")
+    headers = {"Retry-After": str(int(e.retry_after) + 1)} if e.retry_after is not None else None
+    return HTTPException(status_code=429, detail=str(e), headers=headers)
+
+
+def overloaded_error(e):
+    """HTTPException 503 para DistilBERT saturado con BERT_SHED_POLICY=reject."""
+    logger.warning(f"⚠️ {e}")
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def saturated_error(e):
+    """HTTPException 429 para un executor saturado."""
+    logger.warning(f"⚠️ {e}")
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+
+def executor_pools():
+    """Executors por nombre (None antes del startup o tras el shutdown)."""
+    return [("model", model_executor), ("io", io_executor), ("lr", lr_executor)]
+
+
+def timed(fn, *args, **kwargs):
+    """Ejecuta fn y retorna (resultado, segundos); se usa dentro del hilo del executor."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+async def run_in_pool(pool, fn, *args, **kwargs):
+    """
+    Ejecuta una llamada bloqueante en un executor acotado.
+    
+    Si la petición se está perfilando con cProfile, fn se ejecuta bajo su
+    profiler (en el hilo del pool, que es donde está el trabajo).
+    
+    Raises:
+        HTTPException 429: Si el executor ya tiene max_pending tareas
+    """
+    profile = current_profile.get()
+    if profile is not None and profile.profiler is not None:
+        fn, args = profile.run_profiled, (fn, *args)
+    try:
+        return await pool.run(fn, *args, **kwargs)
+    except ExecutorSaturated as e:
+        raise saturated_error(e)
+
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    """Libera los procesos worker al apagar la aplicación."""
+    global preprocess_pool, bert_batcher, model_executor, io_executor, lr_executor, comment_store, youtube_fetcher
+    global lr_reloader, bert_reloader
+    for reloader in (lr_reloader, bert_reloader):
+        if reloader is not None:
+            await reloader.stop()
+    lr_reloader = bert_reloader = None
+    if bert_batcher is not None:
+        await bert_batcher.stop()
+        bert_batcher = None
+    for _, pool in executor_pools():
+        if pool is not None:
+            pool.shutdown(wait=False)
+    model_executor = io_executor = lr_executor = None
+    if comment_store is not None:
+        comment_store.close()
+        comment_store = None
+    if isinstance(youtube_fetcher, AsyncYouTubeCommentFetcher):
+        await youtube_fetcher.aclose()
+        youtube_fetcher = None
+    if preprocess_pool is not None:
+        preprocess_pool.shutdown()
+        preprocess_pool = None
+
+
 # === MODELOS PYDANTIC ===
 
 class TextInput(BaseModel):
@@ -88,6 +527,7 @@ class PredictionOutput(BaseModel):
     is_toxic: bool
     threshold_used: float
     model: Optional[str] = None
+    degraded: bool = False
 
 class BatchPredictionOutput(BaseModel):
     """Modelo para output de predicción por lotes."""
@@ -95,6 +535,56 @@ class BatchPredictionOutput(BaseModel):
     total: int
 
 
+class CascadeInput(BaseModel):
+    """Modelo para input de predicción en cascada."""
+    texts: List[str] = Field(..., min_items=1, max_items=100, description="Lista de comentarios a analizar")
+    band_lower: Optional[float] = Field(None, ge=0, le=1, description="Límite inferior de la banda (default: servidor)")
+    band_upper: Optional[float] = Field(None, ge=0, le=1, description="Límite superior de la banda (default: servidor)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": [
+                    "I love this video!",
+                    "You're an idiot!"
+                ],
+                "band_lower": 0.2,
+                "band_upper": 0.6
+            }
+        }
+
+class CascadePredictionOutput(PredictionOutput):
+    """Predicción de la cascada con el modelo que decidió."""
+    escalated: bool
+    lr_probability: float
+
+class CascadeOutput(BaseModel):
+    """Modelo para output de predicción en cascada."""
+    results: List[CascadePredictionOutput]
+    total: int
+    escalated: int
+    escalation_rate: float
+    band: dict
+
+
+class CompareBatchInput(BaseModel):
+    """Modelo para input de comparación por lotes (evaluación de modelos)."""
+    texts: List[str] = Field(
+        ..., min_items=1, max_items=COMPARE_BATCH_MAX_TEXTS, description="Lista de comentarios a comparar"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": [
+                    "I love this video!",
+                    "You're an idiot!",
+                    "Nobody asked for your opinion"
+                ]
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     """Modelo para health check."""
     status: str
@@ -126,12 +616,23 @@ class YouTubeURLInput(BaseModel):
         le=200,
         description="Número máximo de comentarios a analizar"
     )
+    mode: Optional[str] = Field(
+        "distilbert",
+        pattern=r"^(distilbert|cascade)$",
+        description="'distilbert' analiza todo con DistilBERT; 'cascade' escala solo los inciertos de LR"
+    )
+    include_replies: bool = Field(
+        False,
+        description="Analizar también las respuestas de cada hilo (max_comments cuenta solo hilos)"
+    )
     
     class Config:
         json_schema_extra = {
             "example": {
                 "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
-                "max_comments": 100
+                "max_comments": 100,
+                "mode": "distilbert",
+                "include_replies": False
             }
         }
 
@@ -144,6 +645,14 @@ class CommentAnalysis(BaseModel):
     confidence: float
     is_toxic: bool
     published_at: str
+    is_reply: bool = False
+    parent_id: Optional[str] = None
+
+class ToxicityBreakdown(BaseModel):
+    """Toxicidad de un subconjunto de comentarios."""
+    total: int
+    toxic_count: int
+    toxicity_percentage: float
 
 class YouTubeAnalysisOutput(BaseModel):
     """Resultado completo del análisis de video."""
@@ -158,6 +667,19 @@ class YouTubeAnalysisOutput(BaseModel):
         description="Top 10 comentarios mas toxicos ordenados por confidence"
     )
     analysis_timestamp: str
+    mode: str = "distilbert"
+    escalation_rate: Optional[float] = None
+    include_replies: bool = False
+    model_used: Optional[str] = Field(
+        None,
+        description="Modelo que puntuó los comentarios: el del modo, 'logistic_regression' o 'mixed' si "
+                    "DistilBERT estaba saturado (ver degraded_comments)"
+    )
+    degraded_comments: int = 0
+    breakdown: Optional[Dict[str, ToxicityBreakdown]] = Field(
+        None,
+        description="Toxicidad por separado de comentarios principales ('top_level') y respuestas ('replies')"
+    )
     
     class Config:
         json_schema_extra = {
@@ -174,6 +696,22 @@ class YouTubeAnalysisOutput(BaseModel):
         }
 
 
+class IncrementalAnalysisInput(BaseModel):
+    """Modelo para input del análisis incremental de Youtube."""
+    url: str = Field(
+        ...,
+        description="URL del video de Youtube",
+        pattern=r"^(https?://)?(www\.)?(youtube\.com/watch\?v=|youtu\.be/)[a-zA-Z0-9_-]{11}"
+    )
+    top_n: int = Field(10, ge=1, le=100, description="Comentarios tóxicos a devolver")
+
+class IncrementalAnalysisOutput(YouTubeAnalysisOutput):
+    """Análisis sobre todos los comentarios almacenados del video."""
+    new_comments: int = Field(..., description="Comentarios nuevos descargados y puntuados")
+    rescored_comments: int = Field(..., description="Comentarios re-puntuados por cambio de modelo")
+    previous_sync: Optional[str] = None
+
+
 # === ENDPOINTS ===    
 
 @app.get("/", tags=["General"])
@@ -192,7 +730,10 @@ async def root():
             "predict": "/predict (LR)",
             "predict_transformer": "/predict/transformer (DistilBERT)",
             "predict_compare": "/predict/compare (LR vs BERT)",
+            "predict_compare_batch": "/predict/compare/batch (LR vs BERT, métricas de acuerdo)",
             "predict_batch": "/predict/batch",
+            "predict_cascade": "/predict/cascade (LR -> BERT)",
+            "predict_stream": "/predict/stream (NDJSON, sin límite de textos)",
             "model_info": "/model/info"
         }
     }
@@ -205,8 +746,9 @@ async def health_check():
     Returns:
         HealthResponse: Estado de salud del servicio
     """
-    lr_loaded = detector is not None and detector.model is not None
-    bert_loaded = bert_detector is not None and bert_detector.model is not None
+    lr, bert = detector, bert_detector
+    lr_loaded = lr is not None and lr.model is not None
+    bert_loaded = bert is not None and bert.model is not None
     
     return HealthResponse(
         status="healthy" if (lr_loaded and bert_loaded) else "degraded",
@@ -215,12 +757,16 @@ async def health_check():
             "logistic_regression": {
                 "loaded": lr_loaded,
                 "type": "Logistic Regression",
-                "threshold": 0.3
+                "threshold": 0.3,
+                "version": lr.model_version if lr_loaded else None,
+                "reloading": lr_reloader is not None and lr_reloader.reloading
             },
             "distilbert": {
                 "loaded": bert_loaded,
                 "type": "DistilBERT-base-uncased",
-                "parameters": "66M"
+                "parameters": "66M",
+                "version": bert.model_version if bert_loaded else None,
+                "reloading": bert_reloader is not None and bert_reloader.reloading
             }
         }
     )
@@ -243,9 +789,12 @@ async def predict(input_data: TextInput):
         raise HTTPException(status_code=503, detail="Modelo no disponible")
     
     try:
-        result = detector.predict(input_data.text)
+        result = await run_in_pool(model_executor, lr_predict, input_data.text)
+        stats["lr_predictions"] += 1
         return PredictionOutput(**result)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error en predicción: {e}")
         raise HTTPException(status_code=500, detail=f"Error en predicción: {str(e)}")
@@ -269,12 +818,15 @@ async def predict_batch(input_data: BatchTextInput):
         raise HTTPException(status_code=503, detail="Modelo no disponible")
     
     try:
-        results = detector.predict_batch(input_data.texts)
+        results = await run_in_pool(model_executor, lr_predict_batch, input_data.texts)
+        stats["lr_predictions"] += len(results)
         return BatchPredictionOutput(
             results=[PredictionOutput(**r) for r in results],
             total=len(results)
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error en predicción batch: {e}")
         raise HTTPException(status_code=500, detail=f"Error en predicción: {str(e)}")
@@ -312,6 +864,10 @@ async def predict_transformer(input_data: TextInput):
     - Mejor F1-score (87% vs 66%)
     - Menor overfitting (3.3% vs 23%)
     
+    Si DistilBERT está saturado (ver BERT_SHED_POLICY), el texto se puntúa
+    con Logistic Regression y la respuesta lleva degraded=true y el modelo
+    LR en `model`; con la política reject se responde 503.
+    
     Args:
         input_data: Objeto con el texto a analizar
         
@@ -321,18 +877,23 @@ async def predict_transformer(input_data: TextInput):
     if bert_detector is None:
         raise HTTPException(status_code=503, detail="Modelo DistilBERT no disponible")    
     try: 
-        result = bert_detector.predict(input_data.text)
-        
-        # Adaptar formato para PredictionOutput
-        return {
-            "text": result['text'],
-            "prediction": result['prediction'],
-            "confidence": result['confidence'],
-            "is_toxic": result['label'] == 1, 
-            "threshold_used": 0.5,      # DistilBERT usa softmax, threshold implicito 0.5
-            "model": "distilbert-base-uncased-finetuned"
-        }
+        try:
+            load_shedder.acquire()
+        except Overloaded as e:
+            if load_shedder.policy == "reject":
+                raise overloaded_error(e)
+            result = await run_in_pool(lr_executor, lr_predict, input_data.text)
+            stats["lr_predictions"] += 1
+            return PredictionOutput(**result, degraded=True)
+        try:
+            result = await bert_predict_async(input_data.text)
+        finally:
+            load_shedder.release()
+        stats["bert_predictions"] += 1
+        return format_bert_prediction(result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error en prediccion DistilBERT: {e}")
         raise HTTPException(status_code=500, detail=f"Error en prediccion: {str(e)}")
@@ -358,8 +919,9 @@ async def predict_compare(input_data: TextInput):
     
     try:
         # Predicciones de ambos modelos
-        lr_result = detector.predict(input_data.text)
-        bert_result = bert_detector.predict(input_data.text)
+        lr_result = await run_in_pool(model_executor, lr_predict, input_data.text)
+        bert_result = await bert_predict_async(input_data.text)
+        stats["comparisons"] += 1
         
         # Formatear respuesta comparativa
         return {
@@ -383,33 +945,415 @@ async def predict_compare(input_data: TextInput):
             }
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error en comparación: {e}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@app.post("/predict/compare/batch", tags=["Predictions"])
+async def predict_compare_batch(input_data: CompareBatchInput):
+    """
+    Compara Logistic Regression y DistilBERT sobre un lote (hasta COMPARE_BATCH_MAX_TEXTS textos).
+    
+    Los dos predict_batch corren a la vez: LR en su propio executor y
+    DistilBERT en el de modelo. El solapamiento real depende de que cada
+    modelo suelte el GIL (el forward de torch y el producto disperso lo
+    hacen; el preprocesamiento de LR, no), así que la respuesta incluye el
+    tiempo total frente a la suma de los dos modelos.
+    
+    Args:
+        input_data: Objeto con la lista de textos
+        
+    Returns:
+        dict: Resultados por texto (como /predict/compare), resumen de acuerdo
+              (tasa, matriz de confusión, kappa, distribución de la diferencia
+              de confianza, índices en desacuerdo) y tiempos
+    """
+    if detector is None or bert_detector is None:
+        raise HTTPException(status_code=503, detail="Modelos no disponibles")
+    
+    try:
+        start = time.perf_counter()
+        (lr_results, lr_seconds), (bert_results, bert_seconds) = await asyncio.gather(
+            run_in_pool(lr_executor, timed, lr_predict_batch, input_data.texts),
+            run_in_pool(model_executor, timed, bert_predict_batch, input_data.texts)
+        )
+        wall_seconds = time.perf_counter() - start
+        results, summary = compare_predictions(lr_results, bert_results)
+        stats["comparisons"] += len(results)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error en comparación por lotes: {e}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    
+    sum_seconds = lr_seconds + bert_seconds
+    return {
+        "results": results,
+        "total": len(results),
+        "summary": summary,
+        "timing": {
+            "wall_ms": round(wall_seconds * 1000, 2),
+            "lr_ms": round(lr_seconds * 1000, 2),
+            "bert_ms": round(bert_seconds * 1000, 2),
+            "sum_ms": round(sum_seconds * 1000, 2),
+            "speedup": round(sum_seconds / wall_seconds, 2) if wall_seconds > 0 else None
+        }
+    }
+
+
+@app.post("/predict/cascade", response_model=CascadeOutput, tags=["Predictions"])
+async def predict_cascade(input_data: CascadeInput):
+    """
+    Predice en cascada: LR puntúa todo y solo los textos inciertos pasan a DistilBERT.
+    
+    Un texto se escala si su probabilidad LR cae dentro de [band_lower, band_upper].
+    
+    Args:
+        input_data: Textos y, opcionalmente, la banda de incertidumbre
+        
+    Returns:
+        CascadeOutput: Predicciones, modelo usado por texto y tasa de escalado
+    """
+    if cascade_detector is None:
+        raise HTTPException(status_code=503, detail="Modelos no disponibles")
+    
+    try:
+        output = await run_in_pool(
+            model_executor,
+            cascade_detector.predict_batch,
+            input_data.texts,
+            lower=input_data.band_lower,
+            upper=input_data.band_upper
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error en predicción en cascada: {e}")
+        raise HTTPException(status_code=500, detail=f"Error en predicción: {str(e)}")
+    
+    stats["lr_predictions"] += len(output['results'])
+    stats["bert_predictions"] += output['escalated']
+    return CascadeOutput(**output)
+
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse que lee el cuerpo de la petición mientras responde.
+    
+    StreamingResponse escucha http.disconnect en paralelo consumiendo
+    receive(), lo que se comería los trozos del cuerpo. Aquí solo se
+    escribe: una desconexión llega al generador como ClientDisconnect al
+    leer request.stream() o como error al enviar.
+    
+    on_close se llama siempre al terminar, aunque el generador no llegue a arrancar.
+    """
+    media_type = "application/x-ndjson"
+    
+    def __init__(self, content, on_close=None, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        finally:
+            if self.on_close is not None:
+                self.on_close()
+        if self.background is not None:
+            await self.background()
+
+
+def render_stream_batch(records, results, formatter):
+    """Líneas NDJSON de un lote: predicción o error por registro, en el orden de entrada."""
+    results = iter(results)
+    lines = []
+    for record in records:
+        if 'error' in record:
+            output = record
+        else:
+            output = {'line': record['line'], 'id': record['id'], **formatter(next(results))}
+        lines.append(json.dumps(output, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+async def stream_predictions(byte_chunks, predict_batch, formatter, batch_size, pool):
+    """
+    Puntúa un stream NDJSON por lotes y emite los resultados según terminan.
+    
+    Mientras el executor puntúa un lote, el event loop ya lee y parsea el
+    siguiente: como mucho hay dos lotes en memoria, sea cual sea el tamaño
+    de la entrada.
+    """
+    loop = asyncio.get_running_loop()
+    pending = None
+    try:
+        async for records in iter_ndjson_batches(byte_chunks, batch_size, STREAM_MAX_LINE_BYTES):
+            texts = [record['text'] for record in records if 'text' in record]
+            if texts:
+                future = loop.run_in_executor(pool.executor, predict_batch, texts)
+            else:
+                future = loop.create_future()
+                future.set_result([])
+            if pending is not None:
+                yield render_stream_batch(pending[0], await pending[1], formatter)
+            pending = (records, future)
+        if pending is not None:
+            yield render_stream_batch(pending[0], await pending[1], formatter)
+            pending = None
+    except Exception as e:
+        # La cabecera 200 ya se envió: el error se notifica como última línea
+        logger.error(f"Error en scoring en streaming: {e}")
+        yield (json.dumps({'error': f"Error en predicción: {str(e)}"}) + "\n").encode('utf-8')
+    finally:
+        if pending is not None:
+            pending[1].cancel()
+
+
+@app.post("/predict/stream", tags=["Predictions"])
+async def predict_stream(
+    request: Request,
+    model: str = Query("logistic_regression", pattern=r"^(logistic_regression|distilbert)$"),
+    batch_size: int = Query(STREAM_BATCH_SIZE, ge=1, le=4096)
+):
+    """
+    Scoring masivo: cuerpo NDJSON de entrada, resultados NDJSON en streaming.
+    
+    Cada línea de entrada es un string JSON o un objeto {"text": ..., "id": ...}.
+    Cada línea de salida lleva 'line' e 'id' de la entrada más la predicción
+    (mismo formato que /predict) o un campo 'error' si la línea no es válida.
+    Sin límite de textos: la memoria depende de batch_size, no de la entrada.
+    No pasa por la cache de predicciones para no desalojar las entradas
+    calientes con un backlog que no se repite.
+    
+    Args:
+        request: Petición con cuerpo application/x-ndjson
+        model: 'logistic_regression' o 'distilbert'
+        batch_size: Textos por llamada a predict_batch
+        
+    Returns:
+        NDJSONStreamingResponse: Una línea JSON por línea de entrada
+        
+    Raises:
+        HTTPException 503: Modelo no disponible
+        HTTPException 429: Executor de modelo saturado
+    """
+    if model == "distilbert":
+        if bert_detector is None:
+            raise HTTPException(status_code=503, detail="Modelo DistilBERT no disponible")
+        predict_batch, formatter = bert_detector.predict_batch, format_bert_prediction
+    else:
+        if detector is None:
+            raise HTTPException(status_code=503, detail="Modelo no disponible")
+        predict_batch, formatter = detector.predict_batch, dict
+    
+    # El stream completo ocupa un único hueco del executor de modelo
+    pool = model_executor
+    try:
+        pool.acquire()
+    except ExecutorSaturated as e:
+        raise saturated_error(e)
+    
+    return NDJSONStreamingResponse(
+        stream_predictions(request.stream(), predict_batch, formatter, batch_size, pool),
+        on_close=pool.release
+    )
+
 
 # ==================== YOUTUBE ANALYSIS ENDPOINT ====================
 
-@app.post("/analyze/video", response_model=YouTubeAnalysisOutput, tags=["YouTube Analysis"])
-async def analyze_youtube_video(input_data: YouTubeURLInput):
+async def score_comment_page(texts, mode, shed=False):
     """
-    Analiza los comentarios de un video de YouTube para detectar hate speech.
+    Puntúa una página de comentarios en el executor de modelo.
     
-    Extrae hasta 200 comentarios del video y los analiza usando DistilBERT.
-    Retorna estadísticas de toxicidad y los top 10 comentarios más tóxicos.
+    Con shed=True la página pasa por el control de admisión de DistilBERT
+    (en cascada se reserva la página entera: no se sabe cuántos textos se
+    escalarán). Si no se admite, con la política fallback se puntúa solo
+    con LR en su executor; con reject se responde 503.
+    
+    Returns:
+        tuple: (predicciones, textos escalados a DistilBERT, textos puntuados
+                con LR por saturación de DistilBERT)
+    
+    Raises:
+        HTTPException 503: DistilBERT saturado con BERT_SHED_POLICY=reject
+    """
+    if shed:
+        try:
+            load_shedder.acquire(len(texts))
+        except Overloaded as e:
+            if load_shedder.policy == "reject":
+                raise overloaded_error(e)
+            predictions = await run_in_pool(lr_executor, lr_predict_batch, texts)
+            stats["lr_predictions"] += len(texts)
+            return predictions, 0, len(texts)
+    try:
+        if mode == "cascade":
+            output = await run_in_pool(model_executor, cascade_detector.predict_batch, texts)
+            stats["lr_predictions"] += len(texts)
+            stats["bert_predictions"] += output['escalated']
+            return output['results'], output['escalated'], 0
+        predictions = await run_in_pool(model_executor, bert_predict_batch, texts)
+        stats["bert_predictions"] += len(texts)
+        return predictions, 0, 0
+    finally:
+        if shed:
+            load_shedder.release(len(texts))
+
+
+def comment_page_reader(video_id, max_comments, order="relevance"):
+    """
+    Lector de páginas de comentarios común a los dos clientes de YouTube.
+    
+    Con el cliente asíncrono (YOUTUBE_CLIENT=async) las páginas se piden en
+    el event loop; con googleapiclient, en el executor de I/O.
+    
+    Returns:
+        Corrutina sin argumentos que devuelve la siguiente página o None al acabar
+    """
+    pages = youtube_fetcher.iter_comment_pages(video_id, max_comments, order=order)
+    
+    async def next_page():
+        with metrics.stage('youtube_fetch'):
+            if hasattr(pages, '__anext__'):
+                return await anext(pages, None)
+            return await run_in_pool(io_executor, next, pages, None)
+    
+    return next_page
+
+
+async def fetch_video_title(video_id):
+    """Título del video con el cliente de YouTube activo."""
+    with metrics.stage('youtube_fetch_title'):
+        if isinstance(youtube_fetcher, AsyncYouTubeCommentFetcher):
+            return await youtube_fetcher.fetch_video_title(video_id)
+        return await run_in_pool(io_executor, youtube_fetcher.fetch_video_title, video_id)
+
+
+async def fetch_thread_replies(page):
+    """
+    Respuestas de los hilos de una página que tienen respuestas.
+    
+    Un comments.list por hilo, con como mucho REPLY_FETCH_CONCURRENCY
+    peticiones en vuelo a la vez para no agotar el executor de I/O ni
+    disparar el rate limit de la API.
+    
+    Returns:
+        list: Respuestas de todos los hilos, agrupadas por hilo en el orden de la página
+    """
+    threads = [comment for comment in page if comment.get('reply_count')]
+    if not threads:
+        return []
+    semaphore = asyncio.Semaphore(REPLY_FETCH_CONCURRENCY)
+    
+    async def fetch(thread):
+        async with semaphore:
+            if isinstance(youtube_fetcher, AsyncYouTubeCommentFetcher):
+                return await youtube_fetcher.fetch_replies(thread['comment_id'], REPLY_MAX_PER_THREAD)
+            return await run_in_pool(io_executor, youtube_fetcher.fetch_replies,
+                                     thread['comment_id'], REPLY_MAX_PER_THREAD)
+    
+    with metrics.stage('youtube_fetch_replies', len(threads)):
+        results = await asyncio.gather(*(fetch(thread) for thread in threads))
+    return [reply for replies in results for reply in replies]
+
+
+async def iter_scored_pages(video_id, max_comments, mode, fetch_page=None, include_replies=False, shed=False):
+    """
+    Descarga las páginas de comentarios y puntúa cada una mientras se pide la siguiente.
+    
+    La red (executor de I/O) y la inferencia (executor de modelo) se
+    solapan: la latencia total se acerca a max(red, CPU) en lugar de a la suma.
+    Como mucho hay dos páginas en memoria, sea cual sea el número de comentarios.
     
     Args:
-        input_data: URL del video y número máximo de comentarios
+        video_id: ID del video
+        max_comments: Número máximo de comentarios (None = todos)
+        mode: 'distilbert' o 'cascade'
+        fetch_page: Corrutina sin argumentos que devuelve (comentarios descargados,
+            comentarios a puntuar, es_la_última) o None al acabar. Por defecto,
+            las páginas de iter_comment_pages con texto.
+        include_replies: Con la fuente por defecto, añade a cada página las
+            respuestas de sus hilos; se descargan junto con la página (mientras
+            se puntúa la anterior) y se puntúan en el mismo lote.
+        shed: Aplica el control de admisión de DistilBERT a cada página
+            (ver score_comment_page)
         
+    Yields:
+        tuple: (comentarios descargados en la página, comentarios con texto,
+                predicciones alineadas, escalados a DistilBERT, puntuados con
+                LR por saturación)
+        
+    Raises:
+        ValueError: Video no encontrado o no accesible (desde el fetcher)
+        HTTPException 429: Executor de I/O saturado o cuota de YouTube agotada
+        HTTPException 503: DistilBERT saturado con BERT_SHED_POLICY=reject
+        HTTPException 500: Error inesperado al descargar comentarios
+    """
+    if fetch_page is None:
+        next_page = comment_page_reader(video_id, max_comments)
+        
+        async def fetch_page():
+            page = await next_page()
+            if page is None:
+                return None
+            comments = page + await fetch_thread_replies(page) if include_replies else page
+            return len(page), [comment for comment in comments if comment.get('text')], False
+    
+    def fetch_next_page():
+        return asyncio.ensure_future(fetch_page())
+    
+    pending = fetch_next_page()
+    try:
+        while True:
+            try:
+                page = await pending
+            except (HTTPException, ValueError):
+                raise
+            except QuotaExceeded as e:
+                raise quota_error(e)
+            except Exception as e:
+                logger.error(f"Error extrayendo comentarios: {e}")
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error al extraer comentarios: {str(e)}"
+                )
+            if page is None:
+                break
+            page_size, comments, last = page
+            # Tras la última página no se pide otra (ni se gasta cuota)
+            if not last:
+                pending = fetch_next_page()
+            
+            predictions, escalated, degraded = [], 0, 0
+            if comments:
+                predictions, escalated, degraded = await score_comment_page(
+                    [comment['text'] for comment in comments], mode, shed
+                )
+            yield page_size, comments, predictions, escalated, degraded
+            if last:
+                break
+    finally:
+        if not pending.done():
+            pending.cancel()
+
+
+def validate_video_request(url, mode):
+    """
+    Comprueba modelos y fetcher disponibles y extrae el ID del video.
+    
     Returns:
-        YouTubeAnalysisOutput: Análisis completo con estadísticas y top comentarios tóxicos
+        str: ID del video
         
     Raises:
+        HTTPException 503: Modelo o fetcher no disponible
         HTTPException 400: URL inválida
-        HTTPException 404: Video no encontrado, privado o sin comentarios accesibles
-        HTTPException 503: Modelo DistilBERT no disponible
-        HTTPException 500: Error interno durante el análisis
     """
     # Verificar que el modelo esté disponible
     if bert_detector is None:
@@ -418,54 +1362,90 @@ async def analyze_youtube_video(input_data: YouTubeURLInput):
             detail="Modelo DistilBERT no disponible"
         )
     
+    if mode == "cascade" and cascade_detector is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Cascada LR -> DistilBERT no disponible"
+        )
+    
     if youtube_fetcher is None:
         raise HTTPException(
             status_code=503,
             detail="YouTube Comment Fetcher no inicializado"
         )
     
-    try:
-        # Validar URL
-        if not youtube_fetcher.validate_url(input_data.url):
-            raise HTTPException(
-                status_code=400,
-                detail="URL de YouTube inválida. Use formato: youtube.com/watch?v=XXX o youtu.be/XXX"
-            )
+    # Validar URL
+    if not youtube_fetcher.validate_url(url):
+        raise HTTPException(
+            status_code=400,
+            detail="URL de YouTube inválida. Use formato: youtube.com/watch?v=XXX o youtu.be/XXX"
+        )
+    
+    # Extraer video ID
+    video_id = youtube_fetcher.extract_video_id(url)
+    if not video_id:
+        raise HTTPException(
+            status_code=400,
+            detail="No se pudo extraer el ID del video de la URL"
+        )
+    return video_id
+
+
+@app.post("/analyze/video", response_model=YouTubeAnalysisOutput, tags=["YouTube Analysis"])
+async def analyze_youtube_video(input_data: YouTubeURLInput):
+    """
+    Analiza los comentarios de un video de YouTube para detectar hate speech.
+    
+    Extrae hasta 200 comentarios del video y los analiza usando DistilBERT
+    (mode='distilbert') o la cascada LR -> DistilBERT (mode='cascade').
+    Retorna estadísticas de toxicidad y los top 10 comentarios más tóxicos.
+    Para recorrer todos los comentarios usar GET /analyze/video/stream.
+    
+    Args:
+        input_data: URL del video y número máximo de comentarios
         
-        # Extraer video ID
-        video_id = youtube_fetcher.extract_video_id(input_data.url)
-        if not video_id:
-            raise HTTPException(
-                status_code=400,
-                detail="No se pudo extraer el ID del video de la URL"
-            )                
-            
+    Returns:
+        YouTubeAnalysisOutput: Análisis completo con estadísticas y top comentarios tóxicos
+        
+    Raises:
+        HTTPException 400: URL inválida
+        HTTPException 404: Video no encontrado, privado o sin comentarios accesibles
+        HTTPException 503: Modelo DistilBERT no disponible
+        HTTPException 500: Error interno durante el análisis
+    """
+    video_id = validate_video_request(input_data.url, input_data.mode)
+    
+    try:
         logger.info(f"Analizando video {video_id}, max_comments={input_data.max_comments}")
 
-        # Obtener título del video
-        video_title = youtube_fetcher.fetch_video_title(video_id)
-        
-        # Extraer comentarios con timeout
+        # El título se pide en paralelo a la primera página de comentarios
+        title_task = asyncio.ensure_future(fetch_video_title(video_id))
         try:
-            comments = youtube_fetcher.fetch_comments(
-                video_id=video_id,
-                max_comments=input_data.max_comments
-            )
-        
-        except ValueError as e:
-            raise HTTPException(
-                status_code=404,
-                detail=str(e)
-            )
-        except Exception as e:
-            logger.error(f"Error extrayendo comentarios: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error al extraer comentarios: {str(e)}"
-            )
+            if input_data.mode == "cascade":
+                logger.info("Analizando comentarios en cascada LR -> DistilBERT...")
+            else:
+                logger.info("Analizando comentarios con DistilBERT...")
+            fetched = 0
+            aggregate = ToxicityAggregate(top_n=10)
+            try:
+                async for page_size, comments, predictions, escalated, degraded in iter_scored_pages(
+                    video_id, input_data.max_comments, input_data.mode,
+                    include_replies=input_data.include_replies, shed=True
+                ):
+                    fetched += page_size
+                    aggregate.update(comments, predictions, escalated, degraded)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=404,
+                    detail=str(e)
+                )
+            video_title = await title_task
+        finally:
+            if not title_task.done():
+                title_task.cancel()
             
         # Caso: video sin comentarios
-        if not comments or len(comments) == 0:
+        if fetched == 0:
             logger.warning(f"Video {video_id} no tiene comentarios disponibles")
             return YouTubeAnalysisOutput(
                 video_id=video_id,
@@ -477,11 +1457,8 @@ async def analyze_youtube_video(input_data: YouTubeURLInput):
                 top_toxic_comments=[],
                 analysis_timestamp=datetime.now().isoformat()
             )
-            
-        # Extraer solo los textos para batch prediction
-        texts = [comment['text'] for comment in comments if comment.get('text')]
         
-        if not texts:
+        if aggregate.total == 0:
             logger.warning(f"No se encontraron textos validos en los comentarios")
             return YouTubeAnalysisOutput(
                 video_id=video_id,
@@ -494,65 +1471,30 @@ async def analyze_youtube_video(input_data: YouTubeURLInput):
                 analysis_timestamp=datetime.now().isoformat()
             )
         
-        logger.info(f"Analizando {len(texts)} comentarios con DistilBERT...")
-        
-        # Prediccion en batch (mas eficiente)
-        predictions = bert_detector.predict_batch(texts)
-        
-        # Combinar predicciones con metadata de comentarios
-        analyzed_comments = []
-        toxic_count = 0
-        normal_count = 0
-        
-        for i, (comment, prediction) in enumerate(zip(comments[:len(predictions)], predictions)):
-            is_toxic = prediction['prediction'] == 'hate_speech'
-            
-            if is_toxic:
-                toxic_count += 1
-            else:
-                normal_count += 1
-            
-            analyzed_comments.append({
-                'comment_id': comment.get('comment_id', f'comment_{i}'),
-                'author': comment.get('author', 'Unknown'),
-                'text': comment.get('text', ''),
-                'prediction': prediction['prediction'],
-                'confidence': prediction['confidence'],
-                'is_toxic':  is_toxic,
-                'published_at': str(comment.get('published_at', ''))
-            })
-        # Filtrar solo tóxicos y ordenar por confidence (descendiente)
-        toxic_comments = [c for c in analyzed_comments if c['is_toxic']]
-        toxic_comments_sorted = sorted(
-            toxic_comments,
-            key=lambda x: x['confidence'],
-            reverse=True
-        )
-        
-        # Tomar top 10
-        top_10_toxic = toxic_comments_sorted[:10]
-        
-        # Calcular porcentaje de toxicidad
-        total_analyzed = len(analyzed_comments)
-        toxicity_percentage = (toxic_count / total_analyzed * 100) if total_analyzed > 0 else 0.0
+        escalation_rate = None
+        if input_data.mode == "cascade":
+            escalation_rate = aggregate.escalated / aggregate.total
+            logger.info(f"Escalados a DistilBERT: {aggregate.escalated}/{aggregate.total}")
         
         logger.info(
-            f"Análisis completado: {total_analyzed} comentarios, "
-            f"{toxic_count} tóxicos ({toxicity_percentage:.2f}%)"
+            f"Análisis completado: {aggregate.total} comentarios, "
+            f"{aggregate.toxic} tóxicos ({aggregate.toxicity_percentage:.2f}%)"
             )
-        
-        # Convertir a modelos Pydantic
-        top_toxic_models = [CommentAnalysis(**comment) for comment in top_10_toxic]
+        if aggregate.degraded:
+            logger.warning(f"DistilBERT saturado: {aggregate.degraded}/{aggregate.total} comentarios puntuados con LR")
+        if input_data.include_replies:
+            replies = aggregate.breakdown()['replies']
+            logger.info(f"Respuestas: {replies['total']}, {replies['toxic_count']} tóxicas")
         
         return YouTubeAnalysisOutput(
             video_id=video_id,
-            video_title=video_title,            
-            total_comments_analyzed=total_analyzed,            
-            toxic_count=toxic_count,
-            normal_count=normal_count,
-            toxicity_percentage=round(toxicity_percentage, 2),
-            top_toxic_comments=top_toxic_models,
-            analysis_timestamp=datetime.now().isoformat()
+            video_title=video_title,
+            **aggregate.snapshot(),
+            analysis_timestamp=datetime.now().isoformat(),
+            mode=input_data.mode,
+            escalation_rate=escalation_rate,
+            include_replies=input_data.include_replies,
+            model_used=aggregate.model_used(input_data.mode)
         )
         
     except HTTPException:
@@ -564,17 +1506,425 @@ async def analyze_youtube_video(input_data: YouTubeURLInput):
             status_code=500,
             detail=f"Error interno: {str(e)}"
         )
+
+
+def sse_event(event, data):
+    """Codifica un evento server-sent events con datos JSON."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+async def stream_video_analysis(video_id, max_comments, mode, top_n, include_replies=False):
+    """
+    Recorre las páginas de comentarios y emite el estado agregado tras cada una.
+    
+    Eventos:
+        start: {'video_id'}
+        progress: agregados actuales (campos de YouTubeAnalysisOutput) + 'comments_fetched'
+        done: igual que progress, con título, timestamp, escalation_rate y model_used
+        error: {'status_code', 'detail'}; la cabecera 200 ya se envió
+    """
+    yield sse_event("start", {'video_id': video_id, 'mode': mode})
+    
+    title_task = asyncio.ensure_future(fetch_video_title(video_id))
+    aggregate = ToxicityAggregate(top_n=top_n)
+    fetched = 0
+    pages = iter_scored_pages(video_id, max_comments, mode, include_replies=include_replies, shed=True)
+    try:
+        async for page_size, comments, predictions, escalated, degraded in pages:
+            fetched += page_size
+            aggregate.update(comments, predictions, escalated, degraded)
+            yield sse_event("progress", {
+                'video_id': video_id,
+                'video_title': title_task.result() if title_task.done() else None,
+                'comments_fetched': fetched,
+                **aggregate.snapshot()
+            })
         
-        
+        escalation_rate = None
+        if mode == "cascade" and aggregate.total:
+            escalation_rate = aggregate.escalated / aggregate.total
+        logger.info(
+            f"Análisis en streaming completado: {aggregate.total} comentarios, "
+            f"{aggregate.toxic} tóxicos ({aggregate.toxicity_percentage:.2f}%)"
+        )
+        yield sse_event("done", {
+            'video_id': video_id,
+            'video_title': await title_task,
+            'comments_fetched': fetched,
+            **aggregate.snapshot(),
+            'analysis_timestamp': datetime.now().isoformat(),
+            'mode': mode,
+            'escalation_rate': escalation_rate,
+            'include_replies': include_replies,
+            'model_used': aggregate.model_used(mode)
+        })
+    except ValueError as e:
+        yield sse_event("error", {'status_code': 404, 'detail': str(e)})
+    except HTTPException as e:
+        yield sse_event("error", {'status_code': e.status_code, 'detail': e.detail})
+    except Exception as e:
+        logger.error(f"Error inesperado en análisis en streaming: {e}")
+        yield sse_event("error", {'status_code': 500, 'detail': f"Error interno: {str(e)}"})
+    finally:
+        await pages.aclose()
+        if not title_task.done():
+            title_task.cancel()
 
 
-stats = {
-    "lr_predictions": 0,
-    "bert_predictions": 0,
-    "comparisons": 0
-}
+@app.get("/analyze/video/stream", tags=["YouTube Analysis"])
+async def analyze_youtube_video_stream(
+    url: str = Query(..., description="URL del video de Youtube"),
+    mode: str = Query("distilbert", pattern=r"^(distilbert|cascade)$"),
+    max_comments: Optional[int] = Query(None, ge=1, description="Máximo de comentarios (vacío = todos)"),
+    top_n: int = Query(10, ge=1, le=100, description="Comentarios tóxicos a devolver"),
+    include_replies: bool = Query(False, description="Analizar también las respuestas de cada hilo")
+):
+    """
+    Analiza todos los comentarios de un video y emite el progreso como server-sent events.
+    
+    Sin el límite de 200 de POST /analyze/video: cada página de 100
+    comentarios se puntúa y se reduce a contadores y a un heap con los
+    top_n más tóxicos, así la memoria no crece con el número de comentarios.
+    Tras cada página se emite un evento 'progress' con los agregados; al
+    final, 'done' (ver stream_video_analysis). GET para poder consumirlo
+    con EventSource desde el navegador.
+    
+    Raises:
+        HTTPException 400: URL inválida
+        HTTPException 503: Modelo o fetcher no disponible
+    """
+    video_id = validate_video_request(url, mode)
+    logger.info(f"Analizando video {video_id} en streaming, max_comments={max_comments}")
+    return StreamingResponse(
+        stream_video_analysis(video_id, max_comments, mode, top_n, include_replies),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def new_comment_pages(video_id, since):
+    """
+    Fuente de páginas para iter_scored_pages con solo los comentarios aún no almacenados.
+    
+    Recorre commentThreads con order=time (más nuevos primero) y para en la
+    primera página que contiene comentarios anteriores a since. Los
+    publicados justo en since se filtran por comment_id contra el almacén.
+    """
+    next_page = comment_page_reader(video_id, None, order="time")
+    
+    async def fetch_page():
+        page = await next_page()
+        if page is None:
+            return None
+        reached_stored = since is not None and any(comment['published_at'] < since for comment in page)
+        fresh = [
+            comment for comment in page
+            if comment.get('text') and (since is None or comment['published_at'] >= since)
+        ]
+        known = await run_in_pool(io_executor, comment_store.known_ids,
+                                  video_id, [comment['comment_id'] for comment in fresh])
+        return len(page), [comment for comment in fresh if comment['comment_id'] not in known], reached_stored
+    
+    return fetch_page
+
+
+@app.post("/analyze/video/incremental", response_model=IncrementalAnalysisOutput, tags=["YouTube Analysis"])
+async def analyze_youtube_video_incremental(input_data: IncrementalAnalysisInput):
+    """
+    Analiza un video reutilizando los comentarios ya puntuados del almacén local.
+    
+    La primera vez descarga y puntúa todos los comentarios. Las siguientes
+    solo pide a YouTube los publicados desde la última sincronización y solo
+    puntúa esos; si cambiaron los pesos de DistilBERT, los comentarios
+    guardados se re-puntúan desde el texto almacenado. Las estadísticas y el
+    top de tóxicos se calculan sobre todo lo almacenado del video.
+    
+    Args:
+        input_data: URL del video y número de comentarios tóxicos a devolver
+        
+    Returns:
+        IncrementalAnalysisOutput: Análisis completo más comentarios nuevos y re-puntuados
+        
+    Raises:
+        HTTPException 400: URL inválida
+        HTTPException 404: Video no encontrado, privado o sin comentarios accesibles
+        HTTPException 503: Modelo, fetcher o almacén no disponible
+        HTTPException 500: Error interno durante el análisis
+    """
+    video_id = validate_video_request(input_data.url, "distilbert")
+    if comment_store is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Almacén de comentarios desactivado (COMMENT_STORE_PATH)"
+        )
+    
+    # Una sola lectura: si DistilBERT se recarga a mitad, lo puntuado con el modelo
+    # nuevo queda con la versión vieja y se re-puntúa en la siguiente llamada
+    store_version = bert_store_version
+    try:
+        stored = await run_in_pool(io_executor, comment_store.video, video_id)
+        since = stored['newest_published_at'] if stored else None
+        logger.info(f"Análisis incremental de {video_id} desde {since or 'el principio'}")
+        
+        title_task = None
+        if not stored or not stored['title']:
+            title_task = asyncio.ensure_future(fetch_video_title(video_id))
+        try:
+            new_comments = 0
+            try:
+                # Sin control de admisión: lo almacenado debe venir de DistilBERT
+                async for _, comments, predictions, _, _ in iter_scored_pages(
+                    video_id, None, "distilbert", fetch_page=new_comment_pages(video_id, since)
+                ):
+                    if comments:
+                        await run_in_pool(io_executor, comment_store.save_comments,
+                                          video_id, comments, predictions, store_version)
+                        new_comments += len(comments)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=404,
+                    detail=str(e)
+                )
+            
+            # Comentarios puntuados con otros pesos: se re-puntúan sin volver a descargarlos
+            rescored = 0
+            while True:
+                stale = await run_in_pool(io_executor, comment_store.stale_comments,
+                                          video_id, store_version, STREAM_BATCH_SIZE)
+                if not stale:
+                    break
+                predictions = await run_in_pool(model_executor, bert_predict_batch,
+                                                [comment['text'] for comment in stale])
+                await run_in_pool(io_executor, comment_store.save_comments,
+                                  video_id, stale, predictions, store_version)
+                rescored += len(stale)
+            
+            video_title = await title_task if title_task is not None else stored['title']
+        finally:
+            if title_task is not None and not title_task.done():
+                title_task.cancel()
+        
+        await run_in_pool(io_executor, comment_store.mark_synced, video_id, video_title)
+        summary = await run_in_pool(io_executor, comment_store.aggregate, video_id, input_data.top_n)
+        
+        logger.info(
+            f"Análisis incremental completado: {new_comments} nuevos, {rescored} re-puntuados, "
+            f"{summary['total_comments_analyzed']} almacenados, {summary['toxic_count']} tóxicos"
+        )
+        
+        return IncrementalAnalysisOutput(
+            video_id=video_id,
+            video_title=video_title,
+            **summary,
+            analysis_timestamp=datetime.now().isoformat(),
+            new_comments=new_comments,
+            rescored_comments=rescored,
+            previous_sync=stored['last_sync'] if stored else None
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error inesperado en análisis incremental: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno: {str(e)}"
+        )
+
 
 @app.get("/stats", tags=["General"])
 async def get_stats():
     """Retorna estadisticas de uso de la API."""
     return stats
+
+
+@app.get("/batching/stats", tags=["General"])
+async def get_batching_stats():
+    """Retorna profundidad de cola e histogramas de tamaño de lote del micro-batching DistilBERT."""
+    if bert_batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **bert_batcher.stats()}
+
+
+@app.get("/cache/stats", tags=["General"])
+async def get_cache_stats():
+    """Retorna hits, misses, evictions y ocupación de la cache de predicciones."""
+    return prediction_cache.stats()
+
+
+@app.get("/youtube/stats", tags=["General"])
+async def get_youtube_stats():
+    """Retorna cuota disponible y latencias por llamada del cliente de YouTube (solo YOUTUBE_CLIENT=async)."""
+    if not isinstance(youtube_fetcher, AsyncYouTubeCommentFetcher):
+        return {"client": YOUTUBE_CLIENT, "enabled": False}
+    return {"client": YOUTUBE_CLIENT, "enabled": True, **youtube_fetcher.stats()}
+
+
+@app.get("/executors/stats", tags=["General"])
+async def get_executor_stats():
+    """Retorna tareas en curso, completadas y rechazadas (429) de los executors de modelo, red y LR."""
+    return {name: pool.stats() if pool is not None else None for name, pool in executor_pools()}
+
+
+@app.get("/shedding/stats", tags=["General"])
+async def get_shedding_stats():
+    """Retorna la cola de DistilBERT, la espera estimada y las peticiones degradadas a LR o rechazadas (503)."""
+    return load_shedder.stats()
+
+
+def component_metrics_lines():
+    """Predicciones, cache y executors en formato Prometheus (se añaden a las del registro)."""
+    cache = prediction_cache.stats()
+    pools = [(name, pool.stats()) for name, pool in executor_pools() if pool is not None]
+    lines = prometheus_metric(
+        "hate_speech_predictions_total", "counter", "Predicciones servidas por modelo",
+        [({"kind": kind}, count) for kind, count in stats.items()]
+    )
+    lines += prometheus_metric(
+        "hate_speech_cache_lookups_total", "counter", "Búsquedas en la cache de predicciones",
+        [({"result": "hit"}, cache['hits']), ({"result": "miss"}, cache['misses'])]
+    )
+    lines += prometheus_metric(
+        "hate_speech_cache_entries", "gauge", "Entradas en la cache de predicciones", [({}, cache['size'])]
+    )
+    lines += prometheus_metric(
+        "hate_speech_executor_pending", "gauge", "Tareas en curso o en cola por executor",
+        [({"executor": name}, pool['pending']) for name, pool in pools]
+    )
+    lines += prometheus_metric(
+        "hate_speech_executor_tasks_total", "counter", "Tareas completadas y rechazadas (429) por executor",
+        [({"executor": name, "result": result}, pool[result])
+         for name, pool in pools for result in ("completed", "rejected")]
+    )
+    shedding = load_shedder.stats()
+    lines += prometheus_metric(
+        "hate_speech_bert_queue_items", "gauge", "Textos admitidos a DistilBERT que aún no han terminado",
+        [({}, shedding['inflight'])]
+    )
+    lines += prometheus_metric(
+        "hate_speech_bert_shed_total", "counter", "Peticiones a DistilBERT no admitidas por saturación",
+        [({"result": "degraded"}, shedding['degraded']), ({"result": "rejected"}, shedding['rejected'])]
+    )
+    return lines
+
+
+@app.get("/metrics", tags=["General"])
+async def get_metrics(format: str = Query("prometheus", pattern=r"^(prometheus|json)$")):
+    """
+    Métricas de latencia por endpoint y por etapa del pipeline.
+    
+    Por defecto en formato de texto de Prometheus (para el scraper);
+    con format=json, los mismos datos con percentiles en ms para la
+    página de métricas del frontend.
+    
+    Etapas: clean_text, preprocess_text, tfidf_transform, lr_score
+    (tfidf_lr_fused en /predict con el scorer fusionado, preprocess_parallel
+    con PARALLEL_PREPROCESSING), bert_tokenize, bert_forward y las llamadas a
+    YouTube (youtube_fetch, youtube_fetch_replies, youtube_fetch_title).
+    """
+    if format == "json":
+        return {
+            **metrics.to_dict(),
+            "predictions": stats,
+            "cache": prediction_cache.stats(),
+            "executors": {name: pool.stats() if pool is not None else None for name, pool in executor_pools()},
+            "shedding": load_shedder.stats()
+        }
+    lines = metrics.render_prometheus() + component_metrics_lines()
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def check_admin_token(token):
+    """Valida la cabecera X-Admin-Token de los endpoints de administración."""
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="Endpoints de administración desactivados (ADMIN_TOKEN)")
+    # Comparación en tiempo constante; en bytes para no fallar con cabeceras no ASCII
+    if not hmac.compare_digest((token or "").encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="X-Admin-Token inválido")
+
+
+def model_reloaders():
+    """Recargadores por nombre de modelo (los de /admin/reload?model=...)."""
+    return {"lr": lr_reloader, "distilbert": bert_reloader}
+
+
+@app.post("/admin/reload", tags=["Admin"])
+async def reload_models(
+    model: str = Query("all", pattern=r"^(lr|distilbert|all)$"),
+    wait: bool = Query(False, description="Esperar a que termine la recarga (200) en lugar de responder 202"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Recarga en caliente el modelo LR, DistilBERT o ambos desde disco.
+    
+    La instancia nueva se construye y se calienta en segundo plano mientras
+    la actual sigue sirviendo; después se intercambia de forma atómica y las
+    peticiones en curso terminan con la vieja, que se libera al acabar.
+    
+    Args:
+        model: 'lr', 'distilbert' o 'all'
+        wait: Si es True, responde cuando la recarga ha terminado
+        
+    Returns:
+        dict: Estado de cada recarga (ver GET /admin/models)
+        
+    Raises:
+        HTTPException 401/403: Token incorrecto o ADMIN_TOKEN sin definir
+        HTTPException 409: Ya hay una recarga de ese modelo en marcha
+    """
+    check_admin_token(x_admin_token)
+    reloaders = [(name, reloader) for name, reloader in model_reloaders().items()
+                 if model in (name, "all") and reloader is not None]
+    if not reloaders:
+        raise HTTPException(status_code=503, detail="Modelos no disponibles")
+    busy = [name for name, reloader in reloaders if reloader.reloading]
+    if busy:
+        raise HTTPException(status_code=409, detail=f"Recarga en marcha: {', '.join(busy)}")
+    
+    async def reload_all():
+        # Una tras otra: construir dos modelos a la vez duplicaría el pico de memoria
+        return {name: await reloader.reload(reason="manual") for name, reloader in reloaders}
+    
+    if wait:
+        try:
+            return await reload_all()
+        except ReloadInProgress as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    task = asyncio.ensure_future(reload_all())
+    reload_tasks.add(task)
+    task.add_done_callback(reload_tasks.discard)
+    return JSONResponse(status_code=202, content={name: {"status": "reloading"} for name, _ in reloaders})
+
+
+@app.get("/admin/models", tags=["Admin"])
+async def get_model_reload_stats(x_admin_token: Optional[str] = Header(None)):
+    """Versión cargada, recarga en curso y resultado de la última recarga de cada modelo."""
+    check_admin_token(x_admin_token)
+    versions = {"lr": getattr(detector, "model_version", None), "distilbert": getattr(bert_detector, "model_version", None)}
+    return {
+        name: {"version": versions[name], **reloader.stats()} if reloader is not None else None
+        for name, reloader in model_reloaders().items()
+    }
+
+
+@app.get("/profiles", tags=["General"])
+async def list_profiles():
+    """Últimas peticiones perfiladas (cabecera X-Profile o PROFILE_SAMPLE_RATE), de la más reciente a la más antigua."""
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling desactivado (PROFILING_ENABLED=false)")
+    return {"directory": PROFILE_DIR, "profiles": profile_store.recent()}
+
+
+@app.get("/profiles/{profile_id}", tags=["General"])
+async def get_profile(profile_id: str):
+    """
+    Informe de una petición perfilada: etapas y, con X-Profile: cprofile, las funciones más caras.
+    
+    Raises:
+        HTTPException 404: Profiling desactivado o informe ya descartado
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling desactivado (PROFILING_ENABLED=false)")
+    report = profile_store.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"Perfil no encontrado: {profile_id}")
+    return report
@@ -0,0 +1,474 @@
+"""
+Scoring offline de un corpus completo (CSV, JSONL o Parquet).
+
+Lee el fichero en streaming, reparte los textos en chunks entre N procesos
+worker (cada uno carga su propio detector una sola vez) y escribe los
+resultados en orden, de forma incremental, en CSV o JSONL.
+
+Tras cada chunk escrito se guarda un checkpoint con las filas procesadas y
+el tamaño del fichero de salida. Si el job se interrumpe (Ctrl+C, kill,
+reinicio de la máquina), al relanzar el mismo comando se trunca la salida
+al último checkpoint y se continúa desde ahí.
+
+Uso:
+    python -m backend.batch_score comentarios.csv resultados.csv
+    python -m backend.batch_score comentarios.jsonl resultados.jsonl --model distilbert --workers 2
+    python -m backend.batch_score backlog.parquet resultados.csv --text-column body --id-column comment_id
+    python -m backend.batch_score comentarios.csv resultados.csv --restart   # ignora el checkpoint
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+INPUT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+OUTPUT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+OUTPUT_FIELDS = ['id', 'prediction', 'confidence', 'is_toxic', 'model']
+CHECKPOINT_VERSION = 1
+MODELS = ('logistic_regression', 'distilbert')
+
+_worker_detector = None
+
+
+def detect_format(path, formats):
+    """
+    Formato de un fichero según su extensión.
+
+    Raises:
+        ValueError: Si la extensión no está soportada
+    """
+    fmt = formats.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Formato no soportado: {path} (soportados: {', '.join(sorted(formats))})")
+    return fmt
+
+
+def file_fingerprint(path):
+    """Huella barata del fichero de entrada: tamaño y fecha de modificación."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _read_parquet(path):
+    """Abre un Parquet con pyarrow (dependencia opcional)."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Leer Parquet requiere pyarrow: pip install pyarrow") from e
+    return pq.ParquetFile(str(path))
+
+
+def count_rows(path, fmt):
+    """
+    Número de filas del fichero (para el progreso y la ETA).
+
+    En CSV se cuentan saltos de línea, así que un campo multilínea hace que
+    la estimación quede algo por encima.
+    """
+    if fmt == 'parquet':
+        return _read_parquet(path).metadata.num_rows
+    lines = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0) if fmt == 'csv' else lines
+
+
+def iter_rows(path, fmt, text_column='Text', id_column=None, skip=0):
+    """
+    Itera las filas del fichero sin cargarlo entero.
+
+    Args:
+        path (str | Path): Fichero de entrada
+        fmt (str): 'csv', 'jsonl' o 'parquet'
+        text_column (str): Columna/campo con el texto
+        id_column (str): Columna/campo identificador (None = número de fila)
+        skip (int): Filas iniciales a saltar (reanudación)
+
+    Yields:
+        tuple: (id, texto)
+    """
+    def row_id(record, index):
+        if id_column is None:
+            return index
+        return record.get(id_column, index)
+
+    if fmt == 'csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if text_column not in (reader.fieldnames or []):
+                raise ValueError(f"La columna '{text_column}' no existe en {path}")
+            for index, record in enumerate(reader):
+                if index >= skip:
+                    yield row_id(record, index), record[text_column] or ''
+    elif fmt == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            index = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                if index >= skip:
+                    record = json.loads(line)
+                    if isinstance(record, str):
+                        yield index, record
+                    else:
+                        yield row_id(record, index), record.get(text_column) or ''
+                index += 1
+    else:
+        columns = [text_column] + ([id_column] if id_column else [])
+        index = 0
+        for batch in _read_parquet(path).iter_batches(batch_size=10_000, columns=columns):
+            if index + batch.num_rows <= skip:
+                index += batch.num_rows
+                continue
+            records = batch.to_pydict()
+            for offset in range(batch.num_rows):
+                if index >= skip:
+                    text = records[text_column][offset] or ''
+                    yield (records[id_column][offset] if id_column else index), text
+                index += 1
+
+
+def iter_chunks(rows, chunk_size):
+    """Agrupa las filas en listas de chunk_size."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_detector(model, options=None):
+    """
+    Crea el detector indicado.
+
+    Args:
+        model (str): 'logistic_regression' o 'distilbert'
+        options (dict): model_path, backend ('torch' | 'onnx'), onnx_path, quantize, threads
+
+    Returns:
+        Detector con predict_batch
+    """
+    options = options or {}
+    if model == 'logistic_regression':
+        from backend.models.model_loader import HateSpeechDetector
+        return HateSpeechDetector()
+
+    threads = options.get('threads')
+    if options.get('backend') == 'onnx':
+        from backend.models.onnx_detector import ONNXDistilBERTDetector
+        return ONNXDistilBERTDetector(model_path=options.get('model_path'), onnx_path=options.get('onnx_path'),
+                                      num_threads=threads)
+
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    from backend.models.model_loader import DistilBERTDetector
+    return DistilBERTDetector(model_path=options.get('model_path'), quantize=options.get('quantize', False))
+
+
+def _init_worker(model, options):
+    """Carga el detector una vez por proceso worker."""
+    global _worker_detector
+    _worker_detector = load_detector(model, options)
+
+
+def _score_chunk(texts):
+    """Puntúa un chunk en el worker y devuelve solo los campos de salida."""
+    results = _worker_detector.predict_batch(texts)
+    return [
+        (r['prediction'], round(float(r['confidence']), 6), bool(r.get('is_toxic', r.get('label') == 1)))
+        for r in results
+    ]
+
+
+class ResultWriter:
+    """
+    Escritor incremental de resultados (CSV o JSONL) que se puede reanudar.
+    """
+
+    def __init__(self, path, fmt, model, include_text=False, resume_bytes=0):
+        """
+        Abre la salida; si se reanuda, la trunca al tamaño del último checkpoint.
+
+        Args:
+            path (str | Path): Fichero de salida
+            fmt (str): 'csv' o 'jsonl'
+            model (str): Nombre del modelo (columna 'model')
+            include_text (bool): Incluir el texto original en la salida
+            resume_bytes (int): Bytes válidos según el checkpoint (0 = empezar de cero)
+        """
+        self.path = Path(path)
+        self.fmt = fmt
+        self.model = model
+        self.fields = OUTPUT_FIELDS[:1] + (['text'] if include_text else []) + OUTPUT_FIELDS[1:]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if resume_bytes:
+            if not self.path.exists() or self.path.stat().st_size < resume_bytes:
+                raise RuntimeError(
+                    f"La salida {self.path} es más corta que el checkpoint ({resume_bytes} bytes); usa --restart"
+                )
+            self._file = open(self.path, 'r+b')
+            # Descarta lo escrito después del último checkpoint (chunk a medias)
+            self._file.truncate(resume_bytes)
+            self._file.seek(resume_bytes)
+        else:
+            self._file = open(self.path, 'wb')
+            if fmt == 'csv':
+                self._write_csv([dict(zip(self.fields, self.fields))])
+
+    def _write_csv(self, records):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fields, lineterminator='\n')
+        writer.writerows(records)
+        self._file.write(buffer.getvalue().encode('utf-8'))
+
+    def write(self, chunk, scores):
+        """Escribe los resultados de un chunk ((id, texto) + (predicción, confianza, tóxico))."""
+        records = []
+        for (row_id, text), (prediction, confidence, is_toxic) in zip(chunk, scores):
+            record = {'id': row_id, 'prediction': prediction, 'confidence': confidence,
+                      'is_toxic': is_toxic, 'model': self.model}
+            if 'text' in self.fields:
+                record['text'] = text
+            records.append(record)
+        if self.fmt == 'csv':
+            self._write_csv(records)
+        else:
+            self._file.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records).encode('utf-8'))
+
+    def sync(self):
+        """Vuelca a disco y retorna el tamaño actual (lo que guarda el checkpoint)."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+def read_checkpoint(path):
+    """Lee un checkpoint (None si no existe)."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_checkpoint(path, state):
+    """Escribe el checkpoint de forma atómica (fichero temporal + replace)."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    tmp_path.replace(path)
+
+
+def iter_scored_chunks(chunks, pool=None, max_in_flight=2):
+    """
+    Puntúa los chunks y los devuelve en el orden de entrada.
+
+    Con pool, mantiene hasta max_in_flight chunks enviados a los workers para
+    que ninguno quede ocioso mientras se escribe el resultado del anterior.
+
+    Yields:
+        tuple: (chunk, resultados de _score_chunk)
+    """
+    if pool is None:
+        for chunk in chunks:
+            yield chunk, _score_chunk([text for _, text in chunk])
+        return
+
+    in_flight = deque()
+    for chunk in chunks:
+        in_flight.append((chunk, pool.submit(_score_chunk, [text for _, text in chunk])))
+        if len(in_flight) >= max_in_flight:
+            done_chunk, future = in_flight.popleft()
+            yield done_chunk, future.result()
+    while in_flight:
+        done_chunk, future = in_flight.popleft()
+        yield done_chunk, future.result()
+
+
+def format_progress(done, total, scored, seconds):
+    """
+    Línea de progreso con throughput y ETA.
+
+    Args:
+        done (int): Filas procesadas en total (incluye las de ejecuciones anteriores)
+        total (int): Filas estimadas del fichero
+        scored (int): Filas puntuadas en esta ejecución
+        seconds (float): Segundos de esta ejecución
+    """
+    rate = scored / seconds if seconds > 0 else 0.0
+    if total:
+        eta = timedelta(seconds=int((total - done) / rate)) if rate > 0 and total > done else timedelta(0)
+        return f"📊 {done:,}/{total:,} ({min(done / total, 1):.1%}) | {rate:,.0f} filas/s | ETA {eta}"
+    return f"📊 {done:,} filas | {rate:,.0f} filas/s"
+
+
+def score_file(input_path, output_path, model='logistic_regression', text_column='Text', id_column=None,
+               workers=1, chunk_size=1000, checkpoint_path=None, restart=False, include_text=False,
+               model_options=None, progress=print, progress_interval=5.0):
+    """
+    Puntúa un fichero completo con checkpoints reanudables.
+
+    Args:
+        input_path (str | Path): CSV, JSONL o Parquet de entrada
+        output_path (str | Path): CSV o JSONL de salida
+        model (str): 'logistic_regression' o 'distilbert'
+        text_column (str): Columna con el texto
+        id_column (str): Columna identificadora (None = número de fila)
+        workers (int): Procesos worker (0 = en el proceso actual)
+        chunk_size (int): Filas por tarea (y por checkpoint)
+        checkpoint_path (str | Path): Fichero de checkpoint (default: <output>.checkpoint.json)
+        restart (bool): Ignorar un checkpoint existente y empezar de cero
+        include_text (bool): Incluir el texto original en la salida
+        model_options (dict): Opciones de load_detector
+        progress (callable): Recibe cada línea de progreso (None = silencio)
+        progress_interval (float): Segundos mínimos entre líneas de progreso
+
+    Returns:
+        dict: Filas puntuadas en esta ejecución, filas totales, segundos y filas/s
+    """
+    if model not in MODELS:
+        raise ValueError(f"Modelo no soportado: {model} (opciones: {', '.join(MODELS)})")
+    input_format = detect_format(input_path, INPUT_FORMATS)
+    output_format = detect_format(output_path, OUTPUT_FORMATS)
+    checkpoint_path = Path(checkpoint_path) if checkpoint_path else Path(str(output_path) + '.checkpoint.json')
+    progress = progress or (lambda message: None)
+
+    job = {
+        'version': CHECKPOINT_VERSION,
+        'input': str(Path(input_path).resolve()),
+        'input_fingerprint': file_fingerprint(input_path),
+        'model': model,
+        'text_column': text_column,
+        'id_column': id_column,
+        'include_text': include_text
+    }
+    checkpoint = None if restart else read_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        mismatched = [key for key, value in job.items() if checkpoint.get(key) != value]
+        if mismatched:
+            raise RuntimeError(
+                f"El checkpoint {checkpoint_path} corresponde a otro job ({', '.join(mismatched)}); usa --restart"
+            )
+    rows_done = checkpoint['rows_done'] if checkpoint else 0
+    output_bytes = checkpoint['output_bytes'] if checkpoint else 0
+    if rows_done:
+        progress(f"↩️  Reanudando desde la fila {rows_done:,} ({checkpoint_path})")
+
+    total = count_rows(input_path, input_format)
+    chunks = iter_chunks(iter_rows(input_path, input_format, text_column, id_column, skip=rows_done), chunk_size)
+    writer = ResultWriter(output_path, output_format, model, include_text, resume_bytes=output_bytes)
+
+    pool = None
+    if workers > 0:
+        # spawn: cada worker arranca limpio y carga su propio detector
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(model, model_options))
+    else:
+        _init_worker(model, model_options)
+
+    start = time.perf_counter()
+    last_report = start
+    scored = 0
+    try:
+        for chunk, scores in iter_scored_chunks(chunks, pool, max_in_flight=workers * 2):
+            writer.write(chunk, scores)
+            rows_done += len(chunk)
+            scored += len(chunk)
+            write_checkpoint(checkpoint_path, {
+                **job,
+                'rows_done': rows_done,
+                'output_bytes': writer.sync(),
+                'updated_at': datetime.now().isoformat()
+            })
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                progress(format_progress(rows_done, total, scored, now - start))
+                last_report = now
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    seconds = time.perf_counter() - start
+    summary = {
+        'rows_scored': scored,
+        'rows_total': rows_done,
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(scored / seconds, 1) if seconds > 0 else 0.0
+    }
+    progress(f"✅ {scored:,} filas puntuadas en {seconds:.1f} s ({summary['rows_per_second']:,} filas/s) "
+             f"-> {output_path}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='Fichero de entrada (.csv, .jsonl, .parquet)')
+    parser.add_argument('output', help='Fichero de salida (.csv, .jsonl)')
+    parser.add_argument('--model', default='logistic_regression', choices=MODELS)
+    parser.add_argument('--text-column', default='Text', help='Columna con el texto')
+    parser.add_argument('--id-column', default=None, help='Columna identificadora (default: número de fila)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Procesos worker (0 = en el proceso actual)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Filas por tarea y por checkpoint')
+    parser.add_argument('--checkpoint', default=None, help='Fichero de checkpoint (default: <output>.checkpoint.json)')
+    parser.add_argument('--restart', action='store_true', help='Ignorar el checkpoint y empezar de cero')
+    parser.add_argument('--include-text', action='store_true', help='Incluir el texto original en la salida')
+    parser.add_argument('--progress-interval', type=float, default=5.0, help='Segundos entre líneas de progreso')
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--backend', default='torch', choices=['torch', 'onnx'], help='Backend de DistilBERT')
+    parser.add_argument('--onnx-path', default=None, help='Fichero .onnx (backend onnx)')
+    parser.add_argument('--quantize', action='store_true', help='DistilBERT int8 (backend torch)')
+    args = parser.parse_args(argv)
+
+    workers = max(args.workers, 0)
+    model_options = {
+        'model_path': args.model_path,
+        'backend': args.backend,
+        'onnx_path': args.onnx_path,
+        'quantize': args.quantize,
+        # Reparte los núcleos entre workers para no sobresuscribir la CPU
+        'threads': max(1, (os.cpu_count() or 1) // max(workers, 1))
+    }
+    try:
+        score_file(args.input, args.output, model=args.model, text_column=args.text_column,
+                   id_column=args.id_column, workers=workers, chunk_size=args.chunk_size,
+                   checkpoint_path=args.checkpoint, restart=args.restart, include_text=args.include_text,
+                   model_options=model_options, progress_interval=args.progress_interval)
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrumpido: relanza el mismo comando para continuar desde el último checkpoint")
+        sys.exit(130)
+    except (ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
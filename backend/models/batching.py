@@ -0,0 +1,247 @@
+"""
+Utilidades de batching para DistilBERT.
+
+Cada petición HTTP a /predict/transformer ejecutaba un forward de tamaño 1.
+MicroBatcher encola los textos de peticiones concurrentes y los agrupa en un
+único predict_batch cuando se alcanza max_batch_size o pasan max_wait_ms
+desde el primer texto en cola. Cada llamante recibe su resultado a través de
+un future.
+
+plan_batches reparte un lote por longitud de tokens; lo usan los backends
+torch y ONNX de predict_batch.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """
+    Histograma con límites superiores fijos por bucket.
+    """
+
+    def __init__(self, bounds):
+        """
+        Args:
+            bounds (iterable): Límites superiores de cada bucket, en orden creciente
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # último bucket = +Inf
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Registra un valor."""
+        # Primer límite >= value; len(bounds) es el bucket +Inf
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def to_dict(self):
+        """Buckets como {'<=bound': count}, más count y sum."""
+        buckets = {f"<={bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {'buckets': buckets, 'count': self.total, 'sum': self.sum}
+
+
+def _power_of_two_bounds(limit):
+    """1, 2, 4, ... hasta cubrir limit."""
+    bounds, bound = [], 1
+    while bound < limit:
+        bounds.append(bound)
+        bound *= 2
+    bounds.append(bound)
+    return bounds
+
+
+def plan_batches(lengths, max_batch_size=32, max_tokens_per_batch=2048):
+    """
+    Agrupa textos por longitud en lotes acotados.
+
+    Los índices se ordenan por número de tokens y se cortan en lotes de
+    como máximo max_batch_size textos y max_tokens_per_batch tokens
+    contando el padding (textos x longitud del más largo del lote).
+
+    Args:
+        lengths (list): Número de tokens de cada texto
+        max_batch_size (int): Textos máximos por lote
+        max_tokens_per_batch (int): Tokens máximos por lote con padding
+
+    Returns:
+        list: Lista de lotes, cada uno una lista de índices originales
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    for i in order:
+        # Orden ascendente: el texto nuevo es el más largo del lote
+        padded_tokens = (len(current) + 1) * lengths[i]
+        if current and (len(current) >= max_batch_size or padded_tokens > max_tokens_per_batch):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _cancel_all(batch):
+    """Cancela los futures pendientes de un lote."""
+    for _, future in batch:
+        if not future.done():
+            future.cancel()
+
+
+class MicroBatcher:
+    """
+    Agrupa textos de peticiones concurrentes en llamadas a predict_batch.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=32, max_wait_ms=5.0, executor=None):
+        """
+        Inicializa el batcher (el bucle se arranca con start()).
+
+        Args:
+            predict_batch (callable): Lista de textos -> lista de resultados
+            max_batch_size (int): Textos máximos por lote
+            max_wait_ms (float): Espera máxima desde el primer texto en cola
+            executor (Executor): Executor para predict_batch (None = el del event loop)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size debe ser >= 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self._queue = None
+        self._task = None
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        self.batch_size_histogram = Histogram(_power_of_two_bounds(max_batch_size))
+        self.queue_depth_histogram = Histogram(_power_of_two_bounds(max(max_batch_size * 8, 256)))
+
+    @property
+    def running(self):
+        """Indica si el bucle de batching está activo."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def queue_depth(self):
+        """Textos esperando a entrar en un lote."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Arranca el bucle de batching en el event loop actual."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detiene el bucle y cancela las peticiones pendientes."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        while not self._queue.empty():
+            _cancel_all([self._queue.get_nowait()])
+
+    async def submit(self, text):
+        """
+        Encola un texto y espera su resultado.
+
+        Args:
+            text (str): Texto a predecir
+
+        Returns:
+            dict: Resultado de predict_batch para ese texto
+        """
+        if not self.running:
+            raise RuntimeError("MicroBatcher no iniciado. Llama a start() primero.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self):
+        """Espera el primer texto y añade más hasta llenar el lote o agotar la espera."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        try:
+            while len(batch) < self.max_batch_size:
+                # Primero lo que ya está en cola, sin ceder el control
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            _cancel_all(batch)
+            raise
+        return batch
+
+    async def _run(self):
+        """Bucle principal: recoge un lote, lo ejecuta y resuelve los futures."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Peticiones canceladas por el cliente mientras esperaban
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            self.queue_depth_histogram.observe(self._queue.qsize() + len(batch))
+            self.batch_size_histogram.observe(len(batch))
+            self.batches += 1
+            self.items += len(batch)
+
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_batch, texts)
+            except asyncio.CancelledError:
+                _cancel_all(batch)
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Error en lote de {len(texts)} textos: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        """
+        Estadísticas del batcher.
+
+        Returns:
+            dict: Configuración, contadores e histogramas de tamaño de lote y profundidad de cola
+        """
+        return {
+            'running': self.running,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'queue_depth': self.queue_depth,
+            'batches': self.batches,
+            'items': self.items,
+            'errors': self.errors,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'batch_size_histogram': self.batch_size_histogram.to_dict(),
+            'queue_depth_histogram': self.queue_depth_histogram.to_dict()
+        }
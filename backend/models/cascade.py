@@ -0,0 +1,168 @@
+"""
+Cascada LR -> DistilBERT.
+
+Logistic Regression puntúa todos los comentarios (microsegundos por texto) y
+solo los que caen dentro de una banda de incertidumbre de la probabilidad LR
+se envían en un único lote a DistilBERT (decenas de milisegundos por texto).
+Fuera de la banda se confía en la decisión de LR.
+"""
+
+import numpy as np
+
+DEFAULT_BAND = (0.2, 0.6)
+
+
+def validate_band(lower, upper):
+    """
+    Comprueba que la banda de incertidumbre es válida.
+
+    Args:
+        lower (float): Límite inferior de probabilidad LR
+        upper (float): Límite superior de probabilidad LR
+
+    Raises:
+        ValueError: Si no se cumple 0 <= lower <= upper <= 1
+    """
+    if not 0.0 <= lower <= upper <= 1.0:
+        raise ValueError(f"Banda de incertidumbre inválida: [{lower}, {upper}]")
+
+
+def escalation_mask(lr_probas, lower, upper):
+    """
+    Indica qué probabilidades LR caen dentro de la banda (extremos incluidos).
+
+    Args:
+        lr_probas (array-like): Probabilidades de la clase tóxica según LR
+        lower (float): Límite inferior
+        upper (float): Límite superior
+
+    Returns:
+        np.ndarray: Máscara booleana de textos a escalar
+    """
+    probas = np.asarray(lr_probas, dtype=np.float64)
+    return (probas >= lower) & (probas <= upper)
+
+
+def cascade_labels(lr_probas, bert_labels, threshold, lower, upper):
+    """
+    Etiquetas finales de la cascada a partir de predicciones ya calculadas.
+
+    Se usa en el informe offline para evaluar muchas bandas sin volver a
+    ejecutar los modelos.
+
+    Args:
+        lr_probas (array-like): Probabilidades LR de la clase tóxica
+        bert_labels (array-like): Etiquetas DistilBERT (0/1) para todos los textos
+        threshold (float): Umbral de decisión de LR
+        lower (float): Límite inferior de la banda
+        upper (float): Límite superior de la banda
+
+    Returns:
+        tuple: (etiquetas finales np.ndarray[int], máscara de escalados)
+    """
+    probas = np.asarray(lr_probas, dtype=np.float64)
+    mask = escalation_mask(probas, lower, upper)
+    labels = np.where(mask, np.asarray(bert_labels, dtype=np.int64), (probas >= threshold).astype(np.int64))
+    return labels, mask
+
+
+class CascadeDetector:
+    """
+    Combina un predict_batch de LR y otro de DistilBERT en cascada.
+    """
+
+    def __init__(self, lr_predict_batch, bert_predict_batch, lower=DEFAULT_BAND[0], upper=DEFAULT_BAND[1]):
+        """
+        Inicializa la cascada.
+
+        Args:
+            lr_predict_batch (callable): Lista de textos -> resultados de HateSpeechDetector
+            bert_predict_batch (callable): Lista de textos -> resultados de DistilBERTDetector
+            lower (float): Límite inferior de la banda de incertidumbre
+            upper (float): Límite superior de la banda de incertidumbre
+        """
+        validate_band(lower, upper)
+        self.lr_predict_batch = lr_predict_batch
+        self.bert_predict_batch = bert_predict_batch
+        self.lower = lower
+        self.upper = upper
+
+    @classmethod
+    def from_detectors(cls, lr_detector, bert_detector, lower=DEFAULT_BAND[0], upper=DEFAULT_BAND[1]):
+        """
+        Construye la cascada directamente desde los detectores.
+
+        Args:
+            lr_detector (HateSpeechDetector): Detector LR cargado
+            bert_detector (DistilBERTDetector): Detector DistilBERT cargado
+            lower (float): Límite inferior de la banda
+            upper (float): Límite superior de la banda
+
+        Returns:
+            CascadeDetector
+        """
+        return cls(lr_detector.predict_batch, bert_detector.predict_batch,
+                   lower=lower, upper=upper)
+
+    def predict_batch(self, texts, lower=None, upper=None):
+        """
+        Predice una lista de textos escalando solo los inciertos a DistilBERT.
+
+        Args:
+            texts (list): Textos a analizar
+            lower (float): Sobrescribe el límite inferior para esta llamada
+            upper (float): Sobrescribe el límite superior para esta llamada
+
+        Returns:
+            dict: {
+                'results': lista de resultados en el orden de entrada,
+                'total': número de textos,
+                'escalated': textos enviados a DistilBERT,
+                'escalation_rate': escalated / total,
+                'band': {'lower': float, 'upper': float}
+            }
+        """
+        lower = self.lower if lower is None else lower
+        upper = self.upper if upper is None else upper
+        validate_band(lower, upper)
+
+        texts = list(texts)
+        lr_results = self.lr_predict_batch(texts) if texts else []
+        lr_probas = [r['confidence'] for r in lr_results]
+        mask = escalation_mask(lr_probas, lower, upper)
+        escalated_idx = np.flatnonzero(mask).tolist()
+
+        results = [
+            {
+                'text': r['text'],
+                'prediction': r['prediction'],
+                'confidence': r['confidence'],
+                'is_toxic': r['is_toxic'],
+                'threshold_used': r['threshold_used'],
+                'model': 'logistic_regression',
+                'escalated': False,
+                'lr_probability': r['confidence']
+            }
+            for r in lr_results
+        ]
+
+        if escalated_idx:
+            bert_results = self.bert_predict_batch([texts[i] for i in escalated_idx])
+            for i, bert in zip(escalated_idx, bert_results):
+                results[i].update({
+                    'prediction': bert['prediction'],
+                    'confidence': bert['confidence'],
+                    'is_toxic': bert['label'] == 1,
+                    'threshold_used': 0.5,  # DistilBERT usa softmax, threshold implícito 0.5
+                    'model': 'distilbert',
+                    'escalated': True
+                })
+
+        total = len(texts)
+        return {
+            'results': results,
+            'total': total,
+            'escalated': len(escalated_idx),
+            'escalation_rate': round(len(escalated_idx) / total, 4) if total else 0.0,
+            'band': {'lower': lower, 'upper': upper}
+        }
@@ -0,0 +1,176 @@
+"""
+Scorer lineal fusionado TF-IDF + Logistic Regression.
+
+Para un único comentario, TfidfVectorizer.transform + predict_proba pagan
+mucha validación de sklearn por llamada. Como el modelo es lineal, el logit
+se puede calcular directamente desde los tokens:
+
+    logit = b + sum_j(tf_j * idf_j * coef_j) / ||tf * idf||
+
+Este módulo exporta idf y (idf x coef) a arrays planos de NumPy junto con el
+mapa token -> índice y replica la semántica de n-gramas, sublinear_tf, binary
+y norm del vectorizador.
+"""
+
+import math
+import re
+
+import numpy as np
+
+
+class LinearTfidfScorer:
+    """
+    Calcula la probabilidad de la clase positiva sin pasar por sklearn.
+    """
+
+    def __init__(self, vocabulary, idf, coef, intercept, token_pattern=r"(?u)\b\w\w+\b",
+                 ngram_range=(1, 1), lowercase=True, binary=False, sublinear_tf=False, norm='l2',
+                 weights=None):
+        """
+        Inicializa el scorer a partir de los parámetros exportados.
+
+        Args:
+            vocabulary (dict): Mapa token/n-grama -> índice de columna
+            idf (np.ndarray): Vector idf (unos si el vectorizador no usa idf)
+            coef (np.ndarray): Coeficientes del modelo lineal
+            intercept (float): Término independiente
+            token_pattern (str): Regex de tokenización del vectorizador
+            ngram_range (tuple): (min_n, max_n)
+            lowercase (bool): Pasar a minúsculas antes de tokenizar
+            binary (bool): tf binario
+            sublinear_tf (bool): tf = 1 + log(tf)
+            norm (str): 'l2', 'l1' o None
+            weights (np.ndarray): idf x coef precalculado (p. ej. memory-mapped);
+                si es None se calcula a partir de idf y coef
+        """
+        if norm not in ('l2', 'l1', None):
+            raise ValueError(f"Norma no soportada: {norm}")
+
+        self.vocabulary = vocabulary
+        self.idf = np.asarray(idf, dtype=np.float64)
+        if weights is None:
+            weights = self.idf * np.asarray(coef, dtype=np.float64).ravel()
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model):
+        """
+        Construye el scorer desde un TfidfVectorizer y un modelo lineal binario.
+
+        Args:
+            vectorizer (TfidfVectorizer): Vectorizador entrenado
+            model (LogisticRegression): Modelo binario entrenado
+
+        Returns:
+            LinearTfidfScorer
+
+        Raises:
+            ValueError: Si la configuración no se puede replicar fuera de sklearn
+        """
+        if vectorizer.analyzer != 'word':
+            raise ValueError(f"Analyzer no soportado: {vectorizer.analyzer}")
+        if vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+            raise ValueError("Tokenizer/preprocessor personalizados no soportados")
+        if vectorizer.strip_accents is not None or vectorizer.stop_words is not None:
+            raise ValueError("strip_accents/stop_words no soportados")
+        if model.coef_.shape[0] != 1:
+            raise ValueError("Solo se soportan modelos binarios")
+
+        n_features = len(vectorizer.vocabulary_)
+        idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(n_features)
+
+        return cls(
+            vocabulary={term: int(index) for term, index in vectorizer.vocabulary_.items()},
+            idf=idf,
+            coef=model.coef_[0],
+            intercept=model.intercept_[0],
+            token_pattern=vectorizer.token_pattern,
+            ngram_range=vectorizer.ngram_range,
+            lowercase=vectorizer.lowercase,
+            binary=vectorizer.binary,
+            sublinear_tf=vectorizer.sublinear_tf,
+            norm=vectorizer.norm
+        )
+
+    def _terms(self, text):
+        """Tokens y n-gramas del texto (misma lógica que sklearn _word_ngrams)."""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        terms = list(tokens) if min_n == 1 else []
+        n_tokens = len(tokens)
+        for n in range(max(min_n, 2), min(max_n, n_tokens) + 1):
+            for i in range(n_tokens - n + 1):
+                terms.append(' '.join(tokens[i:i + n]))
+        return terms
+
+    def decision_function(self, text):
+        """
+        Logit del texto ya preprocesado (salida de full_preprocess).
+
+        Args:
+            text (str): Texto preprocesado
+
+        Returns:
+            float: Logit de la clase positiva
+        """
+        vocabulary = self.vocabulary
+        counts = {}
+        for term in self._terms(text):
+            index = vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+
+        if not counts:
+            return self.intercept
+
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.binary:
+            tf = np.ones_like(tf)
+        elif self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+
+        dot = float(np.dot(tf, self.weights[indices]))
+        if self.norm is None:
+            return self.intercept + dot
+
+        values = tf * self.idf[indices]
+        if self.norm == 'l2':
+            norm = math.sqrt(float(np.dot(values, values)))
+        else:
+            norm = float(np.abs(values).sum())
+
+        if norm == 0.0:
+            return self.intercept
+        return self.intercept + dot / norm
+
+    def predict_proba(self, text):
+        """
+        Probabilidad de la clase positiva (equivalente a predict_proba[:, 1]).
+
+        Args:
+            text (str): Texto preprocesado
+
+        Returns:
+            float: Probabilidad entre 0 y 1
+        """
+        logit = self.decision_function(text)
+        # Sigmoide numéricamente estable
+        if logit >= 0:
+            return 1.0 / (1.0 + math.exp(-logit))
+        z = math.exp(logit)
+        return z / (1.0 + z)
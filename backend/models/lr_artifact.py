@@ -0,0 +1,242 @@
+"""
+Formato de artefacto sin pickle para el pipeline TF-IDF + Logistic Regression.
+
+Estructura del directorio:
+    metadata.json    Umbral, intercept, clases, parámetros del vectorizador y
+                     hash SHA-256 de los .pkl de origen
+    vocabulary.json  Mapa término -> índice de columna
+    idf.npy          Vector idf (float64)
+    coef.npy         Coeficientes del modelo (float64)
+    weights.npy      idf x coef precalculado para LinearTfidfScorer
+
+Los .npy se cargan con mmap_mode='r': los workers creados con fork (o que
+abren el mismo fichero) comparten las páginas en lugar de copiarlas.
+
+Uso (exportar desde los pickles actuales):
+    python -m backend.models.lr_artifact
+    python -m backend.models.lr_artifact --output /ruta/artefacto
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+DEFAULT_ARTIFACT_DIR = Path(__file__).parent / "lr_tfidf_artifact"
+
+# Parámetros del TfidfVectorizer necesarios para reconstruir transform()
+VECTORIZER_PARAMS = (
+    'lowercase', 'token_pattern', 'ngram_range', 'norm', 'use_idf',
+    'smooth_idf', 'sublinear_tf', 'binary', 'analyzer'
+)
+
+
+def file_sha256(path):
+    """
+    Calcula el SHA-256 de un fichero.
+
+    Args:
+        path (str | Path): Ruta del fichero
+
+    Returns:
+        str: Hash hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_lr_artifact(vectorizer, model, threshold, output_dir=DEFAULT_ARTIFACT_DIR, source_paths=()):
+    """
+    Exporta vectorizador y modelo al formato sin pickle.
+
+    Args:
+        vectorizer (TfidfVectorizer): Vectorizador entrenado
+        model (LogisticRegression): Modelo binario entrenado
+        threshold (float): Umbral de decisión
+        output_dir (str | Path): Directorio de salida
+        source_paths (iterable): Ficheros de origen cuyo hash se registra
+
+    Returns:
+        Path: Directorio del artefacto
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if model.coef_.shape[0] != 1:
+        raise ValueError("Solo se soportan modelos binarios")
+
+    params = vectorizer.get_params()
+    idf = np.asarray(vectorizer.idf_ if vectorizer.use_idf else np.ones(len(vectorizer.vocabulary_)),
+                     dtype=np.float64)
+    coef = np.asarray(model.coef_[0], dtype=np.float64)
+
+    np.save(output_dir / "idf.npy", idf)
+    np.save(output_dir / "coef.npy", coef)
+    np.save(output_dir / "weights.npy", idf * coef)
+
+    with open(output_dir / "vocabulary.json", 'w', encoding='utf-8') as f:
+        json.dump({term: int(index) for term, index in vectorizer.vocabulary_.items()},
+                  f, ensure_ascii=False, sort_keys=True)
+
+    metadata = {
+        'format_version': FORMAT_VERSION,
+        'threshold': float(threshold),
+        'intercept': float(model.intercept_[0]),
+        'classes': [c.item() if hasattr(c, 'item') else c for c in model.classes_],
+        'n_features': int(coef.shape[0]),
+        'vectorizer': {
+            name: list(params[name]) if isinstance(params[name], tuple) else params[name]
+            for name in VECTORIZER_PARAMS
+        },
+        'sources': {Path(p).name: file_sha256(p) for p in source_paths}
+    }
+    with open(output_dir / "metadata.json", 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+    return output_dir
+
+
+def read_metadata(artifact_dir):
+    """
+    Lee metadata.json de un artefacto.
+
+    Args:
+        artifact_dir (str | Path): Directorio del artefacto
+
+    Returns:
+        dict | None: Metadatos, o None si no existe el artefacto
+    """
+    path = Path(artifact_dir) / "metadata.json"
+    if not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def artifact_is_current(artifact_dir, source_paths):
+    """
+    Comprueba que el artefacto existe y corresponde a los pickles actuales.
+
+    Si un fichero de origen no existe (despliegue solo con artefacto) se
+    considera válido; si existe y su hash difiere, el artefacto está obsoleto.
+
+    Args:
+        artifact_dir (str | Path): Directorio del artefacto
+        source_paths (iterable): Rutas de los .pkl de origen
+
+    Returns:
+        bool: True si se puede usar el artefacto
+    """
+    metadata = read_metadata(artifact_dir)
+    if metadata is None or metadata.get('format_version') != FORMAT_VERSION:
+        return False
+
+    sources = metadata.get('sources', {})
+    for path in source_paths:
+        path = Path(path)
+        if path.exists() and sources.get(path.name) != file_sha256(path):
+            return False
+    return True
+
+
+def load_lr_artifact(artifact_dir=DEFAULT_ARTIFACT_DIR):
+    """
+    Carga el artefacto y reconstruye vectorizador, modelo y scorer sin pickle.
+
+    Args:
+        artifact_dir (str | Path): Directorio del artefacto
+
+    Returns:
+        dict: {
+            'vectorizer': TfidfVectorizer,
+            'model': LogisticRegression,
+            'scorer': LinearTfidfScorer,
+            'threshold': float,
+            'metadata': dict
+        }
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from backend.models.linear_scorer import LinearTfidfScorer
+
+    artifact_dir = Path(artifact_dir)
+    metadata = read_metadata(artifact_dir)
+    if metadata is None:
+        raise FileNotFoundError(f"No existe el artefacto: {artifact_dir}")
+
+    with open(artifact_dir / "vocabulary.json", encoding='utf-8') as f:
+        vocabulary = json.load(f)
+
+    idf = np.load(artifact_dir / "idf.npy", mmap_mode='r')
+    coef = np.load(artifact_dir / "coef.npy", mmap_mode='r')
+    weights = np.load(artifact_dir / "weights.npy", mmap_mode='r')
+
+    params = dict(metadata['vectorizer'])
+    params['ngram_range'] = tuple(params['ngram_range'])
+
+    vectorizer = TfidfVectorizer(**params)
+    vectorizer.vocabulary_ = vocabulary
+    if vectorizer.use_idf:
+        vectorizer.idf_ = idf
+
+    model = LogisticRegression()
+    model.coef_ = coef.reshape(1, -1)
+    model.intercept_ = np.array([metadata['intercept']])
+    model.classes_ = np.array(metadata['classes'])
+    model.n_features_in_ = metadata['n_features']
+
+    scorer = LinearTfidfScorer(
+        vocabulary=vocabulary,
+        idf=idf,
+        coef=coef,
+        weights=weights,
+        intercept=metadata['intercept'],
+        token_pattern=params['token_pattern'],
+        ngram_range=params['ngram_range'],
+        lowercase=params['lowercase'],
+        binary=params['binary'],
+        sublinear_tf=params['sublinear_tf'],
+        norm=params['norm']
+    )
+
+    return {
+        'vectorizer': vectorizer,
+        'model': model,
+        'scorer': scorer,
+        'threshold': metadata['threshold'],
+        'metadata': metadata
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=None, help='Pickle del modelo LR')
+    parser.add_argument('--vectorizer-path', default=None, help='Pickle del vectorizador TF-IDF')
+    parser.add_argument('--output', default=str(DEFAULT_ARTIFACT_DIR), help='Directorio de salida')
+    args = parser.parse_args()
+
+    from backend.models.model_loader import HateSpeechDetector
+
+    detector = HateSpeechDetector(
+        model_path=args.model_path,
+        vectorizer_path=args.vectorizer_path,
+        prefer_artifact=False
+    )
+    output = export_lr_artifact(
+        detector.vectorizer,
+        detector.model,
+        detector.threshold,
+        output_dir=args.output,
+        source_paths=[detector.model_path, detector.vectorizer_path]
+    )
+    print(f"✅ Artefacto exportado en {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,15 @@ Utiliza Logistic Regression con threshold optimizado (0.3) y vectorizador TF-IDF
 
 import pickle
 import os
+import time
+import uuid
 from pathlib import Path
 import numpy as np
-from backend.preprocessing.text_cleaner import full_preprocess
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+from backend.preprocessing.text_cleaner import clean_text, preprocess_text, preprocess_text_batch, load_resources
+from backend.models.linear_scorer import LinearTfidfScorer
+from backend.models.lr_artifact import DEFAULT_ARTIFACT_DIR, artifact_is_current, load_lr_artifact
+from backend.models.batching import plan_batches
+from backend.utils.metrics import NULL_METRICS
 
 
 # Clase stub para deserializar modelos antiguos
@@ -24,7 +28,9 @@ class HateSpeechDetector:
     Detector de mensajes de odio usando Logistic Regression optimizado.
     """
     
-    def __init__(self, model_path=None, vectorizer_path=None, threshold=0.3):
+    def __init__(self, model_path=None, vectorizer_path=None, threshold=0.3, parallel_preprocessor=None,
+                 tokenizer='fast', use_fast_scorer=True, artifact_path=None, prefer_artifact=True,
+                 metrics=None):
         """
         Inicializa el detector de hate speech.
         
@@ -32,10 +38,31 @@ class HateSpeechDetector:
             model_path (str): Ruta al archivo .pkl del modelo LR
             vectorizer_path (str): Ruta al archivo .pkl del vectorizador TF-IDF
             threshold (float): Umbral de decisión optimizado (default 0.3)
+            parallel_preprocessor (ParallelPreprocessor): Pool opcional para
+                preprocesar lotes grandes en varios procesos
+            tokenizer (str): Backend de tokenización del preprocesado
+                ('fast' por defecto, 'nltk' para word_tokenize)
+            use_fast_scorer (bool): Usar el scorer lineal fusionado en predict()
+                en lugar de vectorizer.transform + predict_proba
+            artifact_path (str): Directorio del artefacto sin pickle
+                (default: backend/models/lr_tfidf_artifact)
+            prefer_artifact (bool): Usar el artefacto si está al día con los .pkl
+            metrics (MetricsRegistry): Registro donde medir las etapas clean_text,
+                preprocess_text, tfidf_transform y lr_score (tfidf_lr_fused con el
+                scorer fusionado, que calcula ambas a la vez)
         """
         self.threshold = threshold
         self.model = None
         self.vectorizer = None
+        self.parallel_preprocessor = parallel_preprocessor
+        self.tokenizer = tokenizer
+        self.use_fast_scorer = use_fast_scorer
+        self.scorer = None
+        self.prefer_artifact = prefer_artifact
+        self.artifact_path = Path(artifact_path) if artifact_path else DEFAULT_ARTIFACT_DIR
+        self.model_format = None
+        self.model_version = None
+        self.metrics = metrics if metrics is not None else NULL_METRICS
         
         # Rutas por defecto
         if model_path is None:
@@ -54,49 +81,30 @@ class HateSpeechDetector:
         
     def load_models(self):
         """
-        Carga el modelo LR y el vectorizador TF-IDF desde path
+        Carga el modelo LR y el vectorizador TF-IDF.
+        
+        Usa el artefacto sin pickle (ver lr_artifact.py) si existe y corresponde
+        a los .pkl actuales; si no, deserializa los pickles.
         """
         try:
-            # Cargar modelo con unpickler personalizado para manejar clases faltantes
-            import sys
-            import types
-            
-            # Crear módulo temporal con la clase stub
-            temp_module = types.ModuleType('temp_module')
-            temp_module.LRThresholdModel = LRThresholdModel
-            sys.modules['__main__'].LRThresholdModel = LRThresholdModel
-            sys.modules['__mp_main__'] = temp_module
+            sources = [self.model_path, self.vectorizer_path]
+            if self.prefer_artifact and artifact_is_current(self.artifact_path, sources):
+                self._load_artifact()
+            else:
+                self._load_pickles()
             
-            class CustomUnpickler(pickle.Unpickler):
-                def find_class(self, module, name):
-                    if name == 'LTRhresholdModel':
-                        return LRThresholdModel
-                    return super().find_class(module, name)
+            # Recursos de preprocesamiento (NLTK se importa aquí, no al importar el módulo)
+            load_resources()
             
-            # Cargar modelo con unpickler personalizado
-            with open(self.model_path, 'rb') as f:
-               loaded = CustomUnpickler(f).load()
-               
-               # Manejar diferentes formatos de guardado
-               if isinstance(loaded, LRThresholdModel):
-                   # Modelo envuelto en clase custom
-                   self.model = loaded.model
-                   if hasattr(loaded, 'threshold'):
-                       self.threshold = loaded.threshold
-               elif isinstance(loaded, dict):
-                   # Modelo guardado como diccionario
-                   self.model = loaded.get('model', loaded)
-               else:
-                   # Modelo directo (LogisticRegression)
-                   self.model = loaded
-                   
-            print(f"✅ Modelo cargado: {self.model_path}")
-            print(f"   Tipo: {type(self.model)}")
+            # Scorer fusionado para predicciones individuales
+            if self.use_fast_scorer and self.scorer is None:
+                try:
+                    self.scorer = LinearTfidfScorer.from_sklearn(self.vectorizer, self.model)
+                except ValueError as e:
+                    print(f"⚠️  Scorer fusionado no disponible, se usará sklearn: {e}")
             
-            # Cargar vectorizador
-            with open(self.vectorizer_path, 'rb') as f:
-                self.vectorizer = pickle.load(f)
-            print(f"✅ Vectorizador cargado: {self.vectorizer_path}")
+            # Versión nueva en cada carga: invalida las predicciones cacheadas
+            self.model_version = uuid.uuid4().hex[:12]
 
         except FileNotFoundError as e:
             raise FileNotFoundError(
@@ -106,6 +114,62 @@ class HateSpeechDetector:
         except Exception as e:
             raise RuntimeError(f"Error cargando modelos: {e}") from e
     
+    def _load_artifact(self):
+        """Carga el artefacto npy/JSON (memory-mapped, sin pickle)."""
+        loaded = load_lr_artifact(self.artifact_path)
+        self.model = loaded['model']
+        self.vectorizer = loaded['vectorizer']
+        self.threshold = loaded['threshold']
+        self.scorer = loaded['scorer'] if self.use_fast_scorer else None
+        self.model_format = 'artifact'
+        print(f"✅ Modelo y vectorizador cargados (artefacto): {self.artifact_path}")
+    
+    def _load_pickles(self):
+        """Carga el modelo LR y el vectorizador desde los .pkl."""
+        # Cargar modelo con unpickler personalizado para manejar clases faltantes
+        import sys
+        import types
+        
+        # Crear módulo temporal con la clase stub
+        temp_module = types.ModuleType('temp_module')
+        temp_module.LRThresholdModel = LRThresholdModel
+        sys.modules['__main__'].LRThresholdModel = LRThresholdModel
+        sys.modules['__mp_main__'] = temp_module
+        
+        class CustomUnpickler(pickle.Unpickler):
+            def find_class(self, module, name):
+                if name == 'LTRhresholdModel':
+                    return LRThresholdModel
+                return super().find_class(module, name)
+        
+        # Cargar modelo con unpickler personalizado
+        with open(self.model_path, 'rb') as f:
+           loaded = CustomUnpickler(f).load()
+           
+           # Manejar diferentes formatos de guardado
+           if isinstance(loaded, LRThresholdModel):
+               # Modelo envuelto en clase custom
+               self.model = loaded.model
+               if hasattr(loaded, 'threshold'):
+                   self.threshold = loaded.threshold
+           elif isinstance(loaded, dict):
+               # Modelo guardado como diccionario
+               self.model = loaded.get('model', loaded)
+           else:
+               # Modelo directo (LogisticRegression)
+               self.model = loaded
+               
+        print(f"✅ Modelo cargado: {self.model_path}")
+        print(f"   Tipo: {type(self.model)}")
+        
+        # Cargar vectorizador
+        with open(self.vectorizer_path, 'rb') as f:
+            self.vectorizer = pickle.load(f)
+        print(f"✅ Vectorizador cargado: {self.vectorizer_path}")
+        
+        self.scorer = None
+        self.model_format = 'pickle'
+    
     def predict(self, text):
         """
         Predice si un texto es hate speech o no.
@@ -124,14 +188,24 @@ class HateSpeechDetector:
         if self.model is None or self.vectorizer is None:
             raise RuntimeError("Modelos no cargados. Llama a load_models() primero.")
         
-        # Preprocesar texto
-        cleaned_text = full_preprocess(text)
-        
-        # Vectorizar
-        X = self.vectorizer.transform([cleaned_text])
-        
-        # Predecir probabilidad
-        proba = self.model.predict_proba(X)[0, 1]  # Probabilidad de clase 'toxic'
+        # Preprocesar texto (mismos pasos que full_preprocess, medidos por separado)
+        with self.metrics.stage('clean_text'):
+            cleaned = clean_text(text)
+        with self.metrics.stage('preprocess_text'):
+            cleaned_text = ' '.join(preprocess_text(cleaned, tokenizer=self.tokenizer))
+        
+        if self.scorer is not None:
+            # Logit directo desde los tokens (sin validación de sklearn)
+            with self.metrics.stage('tfidf_lr_fused'):
+                proba = self.scorer.predict_proba(cleaned_text)
+        else:
+            # Vectorizar
+            with self.metrics.stage('tfidf_transform'):
+                X = self.vectorizer.transform([cleaned_text])
+            
+            # Predecir probabilidad
+            with self.metrics.stage('lr_score'):
+                proba = self.model.predict_proba(X)[0, 1]  # Probabilidad de clase 'toxic'
         
         # Determinar etiqueta basada en el umbral
         is_toxic = proba >= self.threshold
@@ -159,14 +233,28 @@ class HateSpeechDetector:
         if self.model is None or self.vectorizer is None:
             raise RuntimeError ("Modelos no cargados.")
         
-        # 1. Preprocesar todos los textos
-        processed_texts = [full_preprocess(text) for text in texts]        
+        # 1. Preprocesar todos los textos (en paralelo si el lote es grande)
+        processed_texts = None
+        if self.parallel_preprocessor is not None:
+            # clean_text y preprocess_text corren juntos en los procesos worker;
+            # None si el lote se queda en el proceso (bajo el umbral o pool roto)
+            start = time.perf_counter()
+            processed_texts = self.parallel_preprocessor.preprocess_in_pool(texts, tokenizer=self.tokenizer)
+            if processed_texts is not None:
+                self.metrics.observe_stage('preprocess_parallel', time.perf_counter() - start, len(texts))
+        if processed_texts is None:
+            with self.metrics.stage('clean_text', len(texts)):
+                cleaned_texts = [clean_text(text) for text in texts]
+            with self.metrics.stage('preprocess_text', len(texts)):
+                processed_texts = preprocess_text_batch(cleaned_texts, tokenizer=self.tokenizer)
         
         # 2. Vectorizar todos de una vez
-        X = self.vectorizer.transform(processed_texts)
+        with self.metrics.stage('tfidf_transform', len(texts)):
+            X = self.vectorizer.transform(processed_texts)
         
         # 3. Predecir todas las probabilidades
-        probas = self.model.predict_proba(X)[:,1]
+        with self.metrics.stage('lr_score', len(texts)):
+            probas = self.model.predict_proba(X)[:,1]
         
         # 4. Aplicar threshold
         predictions = probas >= self.threshold
@@ -179,7 +267,8 @@ class HateSpeechDetector:
                 'prediction': 'hate_speech' if is_toxic else 'normal',
                 'confidence': float(proba),
                 'is_toxic': bool(is_toxic),
-                'threshold_used': self.threshold
+                'threshold_used': self.threshold,
+                'model': f'logistic_regression_threshold_{self.threshold}'
             })
             
         return results
@@ -196,6 +285,9 @@ class HateSpeechDetector:
             'threshold': self.threshold,
             'vectorizer_type': 'TF-IDF',
             'vocab_size': len(self.vectorizer.vocabulary_) if self.vectorizer else 0,
+            'fast_scorer': self.scorer is not None,
+            'model_format': self.model_format,
+            'model_version': self.model_version,
             'model_loaded': self.model is not None,
             'vectorizer_loaded': self.vectorizer is not None        
         }        
@@ -205,34 +297,71 @@ class DistilBERTDetector:
     Detector de hate speech usando DistilBERT fine-tuned.
     """
 
-    def __init__(self, model_path=None):
-        """Inicializa el detector DistilBERT"""
+    def __init__(self, model_path=None, max_batch_size=32, max_tokens_per_batch=2048, quantize=None,
+                 quantized_cache_path=None, metrics=None):
+        """
+        Inicializa el detector DistilBERT.
+        
+        Args:
+            model_path (str): Carpeta del modelo fine-tuned
+            max_batch_size (int): Textos máximos por forward en predict_batch
+            max_tokens_per_batch (int): Tokens máximos (textos x longitud con padding) por forward
+            quantize (bool): Capas Linear en int8 dinámico (default: variable BERT_QUANTIZE)
+            quantized_cache_path (str): Fichero de pesos int8 cacheados
+                (default: <model_path>/model.int8.pt)
+            metrics (MetricsRegistry): Registro donde medir las etapas bert_tokenize
+                y bert_forward
+        """
         #Ruta por defecto
         if model_path is None:
             base_path = Path(__file__).parent
             model_path = base_path / "distilbert-hate-speech"
         
+        if quantize is None:
+            quantize = os.getenv("BERT_QUANTIZE", "false").lower() in ("1", "true", "yes")
+        
         self.model_path = model_path
+        self.quantize = quantize
+        self.quantized_cache_path = quantized_cache_path
         self.model = None
         self.tokenizer = None
+        self.model_version = None
         self.max_length = 128
+        self.max_batch_size = max_batch_size
+        self.max_tokens_per_batch = max(max_tokens_per_batch, self.max_length)
         self.labels = {0: "normal", 1: "hate_speech"}
+        self.last_batch_stats = None
+        self.metrics = metrics if metrics is not None else NULL_METRICS
         
         # Cargar modelo automáticamente
         self.load_model()
         
     def load_model(self):
         """Carga el modelo DistilBERT y tokenizer desde disco."""
+        # torch/transformers solo se importan al usar este backend (el ONNX no los necesita).
+        # torch primero: si transformers se registra antes en sys.modules, pickle recorre sus
+        # alias perezosos al guardar la cache int8 (p. ej. torch.per_tensor_affine) y falla
+        import torch  # noqa: F401
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        
         try:
             print(f"🤖 Cargando modelo DistilBERT desde {self.model_path}...")
             
             # Cargar tokenizer y modelo
             self.tokenizer = AutoTokenizer.from_pretrained(str(self.model_path))
-            self.model = AutoModelForSequenceClassification.from_pretrained(str(self.model_path))
+            if self.quantize:
+                from backend.models.quantization import load_or_quantize
+                self.model, from_cache = load_or_quantize(self.model_path, self.quantized_cache_path)
+                print(f"⚡ Modelo int8 {'cargado desde cache' if from_cache else 'cuantizado y guardado en cache'}")
+            else:
+                self.model = AutoModelForSequenceClassification.from_pretrained(str(self.model_path))
             
             # Modo evaluación (desactiva dropout)
             self.model.eval()
             
+            # Versión nueva en cada carga: invalida las predicciones cacheadas
+            self.model_version = uuid.uuid4().hex[:12]
+            
             print("✅ Modelo DistilBERT cargado correctamente!")
             print(f"   Parámetros: {self.model.num_parameters():,}")
             
@@ -263,18 +392,22 @@ class DistilBERTDetector:
         if self.model is None or self.tokenizer is None:
             raise RuntimeError("Modelo no cargado. Llama a load_model() primero")
         
+        import torch
+        
         # 1. Tokenizer (texto >> tensores numericos)
-        inputs = self.tokenizer(
-            text,
-            max_length=self.max_length,
-            truncation=True,
-            padding=True,
-            return_tensors="pt" # PyTorch tensors
-        )
+        with self.metrics.stage('bert_tokenize'):
+            inputs = self.tokenizer(
+                text,
+                max_length=self.max_length,
+                truncation=True,
+                padding=True,
+                return_tensors="pt" # PyTorch tensors
+            )
         
         # 2. Predecir (sin calcular gradientes = mas rapido)
         with torch.no_grad():
-            outputs = self.model(**inputs)
+            with self.metrics.stage('bert_forward'):
+                outputs = self.model(**inputs)
             logits = outputs.logits
             probs = torch.softmax(logits, dim=-1)
             
@@ -297,55 +430,91 @@ class DistilBERTDetector:
                 'hate_speech': float(prob_hate)
             }
         }
+    # Reparto por longitud compartido con el backend ONNX
+    plan_batches = staticmethod(plan_batches)
+    
     def predict_batch(self, texts):
         """
         Predice múltiples textos de una vez (más eficiente que llamar predict() varias veces).
         
+        Los textos se ordenan por longitud y se procesan en lotes con padding
+        propio, así un comentario largo no obliga a rellenar todos los demás
+        y la memoria pico queda acotada por max_tokens_per_batch.
+        
         Args:
             texts (list): Lista de strings a analizar
             
         Returns:
-            list: Lista de diccionarios con resultados
+            list: Lista de diccionarios con resultados (en el orden de entrada)
         """
         if self.model is None or self.tokenizer is None:
             raise RuntimeError("Modelo no cargado.")
         
-        # 1. Tokenizar todos los textos juntos (batch processing)
-        inputs = self.tokenizer(
+        import torch
+        
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        # 1. Tokenizar sin padding para conocer la longitud real de cada texto
+        # (el tiempo de tokenizar y de cada forward se suma y se registra una vez por llamada)
+        start = time.perf_counter()
+        encodings = self.tokenizer(
             texts,
             max_length=self.max_length,
-            truncation=True,
-            padding=True,
-            return_tensors="pt"
+            truncation=True
         )
+        lengths = [len(ids) for ids in encodings['input_ids']]
+        batches = self.plan_batches(lengths, self.max_batch_size, self.max_tokens_per_batch)
+        tokenize_seconds = time.perf_counter() - start
+        forward_seconds = 0.0
+        
+        results = [None] * len(texts)
+        padded_tokens = 0
         
-        # 2. Predecir todo el batch de una vez
+        # 2. Predecir cada lote con padding solo hasta su texto más largo
         with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            probs = torch.softmax(logits, dim=1)
-            
-            predicted_classes = torch.argmax(probs, dim=1)
-            confidences = probs[range(len(texts)), predicted_classes]
-            
-        # 3. Formatear resultados para cada texto
-        results = []
-        for i, text in enumerate(texts):
-            predicted_class = predicted_classes[i].item()
-            confidence = confidences[i].item()
-            prob_normal = probs[i][0].item()
-            prob_hate = probs[i][1].item()
-            
-            results.append({
-                'text': text,
-                'prediction': self.labels[predicted_class],
-                'confidence': float(confidence),
-                'label': int(predicted_class),
-                'probabilities': {
-                    'normal': float(prob_normal),
-                    'hate_speech': float(prob_hate)
-                }
-            })
+            for batch in batches:
+                start = time.perf_counter()
+                inputs = self.tokenizer.pad(
+                    {key: [encodings[key][i] for i in batch] for key in encodings.keys()},
+                    padding=True,
+                    return_tensors="pt"
+                )
+                padded_tokens += inputs['input_ids'].numel()
+                
+                forward_start = time.perf_counter()
+                outputs = self.model(**inputs)
+                tokenize_seconds += forward_start - start
+                forward_seconds += time.perf_counter() - forward_start
+                probs = torch.softmax(outputs.logits, dim=1)
+                predicted_classes = torch.argmax(probs, dim=1)
+                
+                # 3. Formatear resultados en su posición original
+                for row, i in enumerate(batch):
+                    predicted_class = predicted_classes[row].item()
+                    results[i] = {
+                        'text': texts[i],
+                        'prediction': self.labels[predicted_class],
+                        'confidence': float(probs[row][predicted_class].item()),
+                        'label': int(predicted_class),
+                        'probabilities': {
+                            'normal': float(probs[row][0].item()),
+                            'hate_speech': float(probs[row][1].item())
+                        }
+                    }
+        
+        self.metrics.observe_stage('bert_tokenize', tokenize_seconds, len(texts))
+        self.metrics.observe_stage('bert_forward', forward_seconds, len(texts))
+        
+        real_tokens = sum(lengths)
+        self.last_batch_stats = {
+            'texts': len(texts),
+            'batches': len(batches),
+            'real_tokens': real_tokens,
+            'padded_tokens': padded_tokens,
+            'padding_waste': round(1 - real_tokens / padded_tokens, 4) if padded_tokens else 0.0
+        }
         
         return results
     
@@ -359,9 +528,13 @@ class DistilBERTDetector:
         return {
             'model_type': 'DistilBERT-base-uncased',
             'task': 'hate_speech_detection',
+            'quantized': self.quantize,
             'num_parameters': self.model.num_parameters() if self.model else 0,
             'max_length': self.max_length,
+            'max_batch_size': self.max_batch_size,
+            'max_tokens_per_batch': self.max_tokens_per_batch,
             'labels': self.labels,
+            'model_version': self.model_version,
             'model_loaded': self.model is not None,
             'tokenizer_loaded': self.tokenizer is not None
         }       
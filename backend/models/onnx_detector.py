@@ -0,0 +1,209 @@
+"""
+Detector DistilBERT servido con ONNX Runtime.
+
+Misma interfaz que DistilBERTDetector (predict, predict_batch,
+get_model_info), pero sin importar torch ni transformers: el tokenizer se
+carga con la librería tokenizers desde tokenizer.json y el forward lo ejecuta
+una InferenceSession sobre el .onnx generado por backend.models.onnx_export.
+"""
+
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from backend.models.batching import plan_batches
+from backend.models.onnx_export import DEFAULT_MODEL_DIR, ONNX_FILENAME, read_onnx_metadata
+from backend.utils.metrics import NULL_METRICS
+
+
+def softmax(logits):
+    """Softmax numéricamente estable por filas."""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class ONNXDistilBERTDetector:
+    """
+    Detector de hate speech usando DistilBERT exportado a ONNX.
+    """
+
+    def __init__(self, model_path=None, onnx_path=None, max_batch_size=32, max_tokens_per_batch=2048,
+                 num_threads=None, metrics=None):
+        """
+        Inicializa el detector ONNX.
+
+        Args:
+            model_path (str): Carpeta del modelo (tokenizer.json)
+            onnx_path (str): Fichero .onnx (default: <model_path>/model.onnx)
+            max_batch_size (int): Textos máximos por forward en predict_batch
+            max_tokens_per_batch (int): Tokens máximos (textos x longitud con padding) por forward
+            num_threads (int): Hilos intra-op de ONNX Runtime (None = automático)
+            metrics (MetricsRegistry): Registro donde medir las etapas bert_tokenize
+                y bert_forward
+        """
+        self.model_path = Path(model_path) if model_path else DEFAULT_MODEL_DIR
+        self.onnx_path = Path(onnx_path) if onnx_path else self.model_path / ONNX_FILENAME
+        self.num_threads = num_threads
+        self.session = None
+        self.tokenizer = None
+        self.model_version = None
+        self.metadata = {}
+        self.max_length = 128
+        self.max_batch_size = max_batch_size
+        self.max_tokens_per_batch = max(max_tokens_per_batch, self.max_length)
+        self.labels = {0: "normal", 1: "hate_speech"}
+        self.last_batch_stats = None
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+
+        # Cargar modelo automáticamente
+        self.load_model()
+
+    @property
+    def model(self):
+        """Alias de la sesión para los checks de disponibilidad de la API."""
+        return self.session
+
+    def load_model(self):
+        """Carga el tokenizer y la sesión de ONNX Runtime."""
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        print(f"🤖 Cargando modelo DistilBERT (ONNX) desde {self.onnx_path}...")
+        if not self.onnx_path.exists():
+            raise FileNotFoundError(
+                f"No se encontró el modelo ONNX en: {self.onnx_path}\n"
+                f"Genéralo con: python -m backend.models.onnx_export"
+            )
+
+        try:
+            self.tokenizer = Tokenizer.from_file(str(self.model_path / "tokenizer.json"))
+            # tokenizer.json trae padding fijo a 128: el padding se hace por lote en predict_batch
+            self.tokenizer.no_padding()
+            self.tokenizer.enable_truncation(max_length=self.max_length)
+            self.pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.num_threads:
+                options.intra_op_num_threads = self.num_threads
+            self.session = ort.InferenceSession(
+                str(self.onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+            )
+            self.metadata = read_onnx_metadata(self.onnx_path)
+
+            # Versión nueva en cada carga: invalida las predicciones cacheadas
+            self.model_version = uuid.uuid4().hex[:12]
+
+            print("✅ Modelo DistilBERT (ONNX Runtime) cargado correctamente!")
+        except Exception as e:
+            raise RuntimeError(f"Error cargando modelo ONNX: {e}") from e
+
+    def _format_result(self, text, probs):
+        """Resultado con el mismo formato que DistilBERTDetector."""
+        predicted_class = int(np.argmax(probs))
+        return {
+            'text': text,
+            'prediction': self.labels[predicted_class],
+            'confidence': float(probs[predicted_class]),
+            'label': predicted_class,
+            'probabilities': {
+                'normal': float(probs[0]),
+                'hate_speech': float(probs[1])
+            }
+        }
+
+    def logits_batch(self, texts):
+        """
+        Logits de cada texto, en el orden de entrada.
+
+        Args:
+            texts (list): Textos a analizar
+
+        Returns:
+            np.ndarray: Matriz (n_textos, 2) de logits
+        """
+        if self.session is None or self.tokenizer is None:
+            raise RuntimeError("Modelo no cargado.")
+
+        with self.metrics.stage('bert_tokenize', len(texts)):
+            encodings = self.tokenizer.encode_batch(list(texts))
+            lengths = [len(encoding.ids) for encoding in encodings]
+            batches = plan_batches(lengths, self.max_batch_size, self.max_tokens_per_batch)
+
+        logits = np.zeros((len(encodings), len(self.labels)), dtype=np.float32)
+        padded_tokens = 0
+        with self.metrics.stage('bert_forward', len(encodings)):
+            for batch in batches:
+                width = max(lengths[i] for i in batch)
+                input_ids = np.full((len(batch), width), self.pad_id, dtype=np.int64)
+                attention_mask = np.zeros((len(batch), width), dtype=np.int64)
+                for row, i in enumerate(batch):
+                    input_ids[row, :lengths[i]] = encodings[i].ids
+                    attention_mask[row, :lengths[i]] = 1
+                padded_tokens += input_ids.size
+
+                outputs = self.session.run(['logits'], {'input_ids': input_ids, 'attention_mask': attention_mask})
+                logits[batch] = outputs[0]
+
+        real_tokens = sum(lengths)
+        self.last_batch_stats = {
+            'texts': len(encodings),
+            'batches': len(batches),
+            'real_tokens': real_tokens,
+            'padded_tokens': padded_tokens,
+            'padding_waste': round(1 - real_tokens / padded_tokens, 4) if padded_tokens else 0.0
+        }
+        return logits
+
+    def predict(self, text):
+        """
+        Predice si un texto contiene hate speech.
+
+        Args:
+            text (str): Texto a analizar
+
+        Returns:
+            dict: Mismo formato que DistilBERTDetector.predict
+        """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts):
+        """
+        Predice múltiples textos con padding por bucket de longitud.
+
+        Args:
+            texts (list): Lista de strings a analizar
+
+        Returns:
+            list: Lista de diccionarios con resultados (en el orden de entrada)
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        probs = softmax(self.logits_batch(texts))
+        return [self._format_result(text, row) for text, row in zip(texts, probs)]
+
+    def get_model_info(self):
+        """
+        Retorna información sobre el modelo ONNX.
+
+        Returns:
+            dict: Información del modelo
+        """
+        return {
+            'model_type': 'DistilBERT-base-uncased',
+            'task': 'hate_speech_detection',
+            'backend': 'onnxruntime',
+            'onnx_path': str(self.onnx_path),
+            'opset_version': self.metadata.get('opset_version'),
+            'num_parameters': self.metadata.get('num_parameters', 0),
+            'max_length': self.max_length,
+            'max_batch_size': self.max_batch_size,
+            'max_tokens_per_batch': self.max_tokens_per_batch,
+            'labels': self.labels,
+            'model_version': self.model_version,
+            'model_loaded': self.session is not None,
+            'tokenizer_loaded': self.tokenizer is not None
+        }
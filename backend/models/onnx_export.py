@@ -0,0 +1,114 @@
+"""
+Exporta el DistilBERT fine-tuned a ONNX para servirlo con ONNX Runtime.
+
+El grafo tiene ejes dinámicos de batch y secuencia en input_ids,
+attention_mask y logits, así el mismo fichero sirve para predict() y para
+los lotes con padding por bucket de predict_batch. Junto al .onnx se
+escribe un JSON con el número de parámetros, el opset y la huella de los
+pesos de origen.
+
+Uso:
+    python -m backend.models.onnx_export
+    python -m backend.models.onnx_export --model-path ruta/modelo --output ruta/model.onnx
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+DEFAULT_MODEL_DIR = Path(__file__).parent / "distilbert-hate-speech"
+ONNX_FILENAME = "model.onnx"
+OPSET_VERSION = 17
+
+
+def metadata_path(onnx_path):
+    """Ruta del JSON de metadatos asociado a un .onnx."""
+    onnx_path = Path(onnx_path)
+    return onnx_path.with_name(onnx_path.name + ".json")
+
+
+def read_onnx_metadata(onnx_path):
+    """
+    Lee los metadatos escritos por export_onnx.
+
+    Args:
+        onnx_path (str | Path): Fichero .onnx
+
+    Returns:
+        dict: Metadatos (vacío si no existen)
+    """
+    path = metadata_path(onnx_path)
+    if not path.exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def export_onnx(model_path=DEFAULT_MODEL_DIR, output=None, opset_version=OPSET_VERSION):
+    """
+    Exporta el checkpoint de transformers a ONNX.
+
+    Args:
+        model_path (str | Path): Carpeta del modelo fine-tuned
+        output (str | Path): Fichero .onnx destino (default: <model_path>/model.onnx)
+        opset_version (int): Opset de ONNX
+
+    Returns:
+        Path: Ruta del fichero exportado
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+    from backend.models.quantization import source_fingerprint
+
+    model_path = Path(model_path)
+    output = Path(output) if output else model_path / ONNX_FILENAME
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    model = AutoModelForSequenceClassification.from_pretrained(str(model_path))
+    model.eval()
+
+    # Entrada de ejemplo con padding para que la traza incluya la máscara de atención
+    input_ids = torch.full((2, 8), model.config.pad_token_id or 0, dtype=torch.long)
+    input_ids[:, 0] = 101
+    attention_mask = torch.tensor([[1] * 8, [1] * 4 + [0] * 4], dtype=torch.long)
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (input_ids, attention_mask),
+            str(output),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=opset_version,
+            dynamo=False
+        )
+
+    with open(metadata_path(output), 'w', encoding='utf-8') as f:
+        json.dump({
+            'opset_version': opset_version,
+            'num_parameters': model.num_parameters(),
+            'torch_version': str(torch.__version__),
+            'source_fingerprint': source_fingerprint(model_path)
+        }, f, indent=2)
+
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-path', default=str(DEFAULT_MODEL_DIR), help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--output', default=None, help='Fichero .onnx (default: <model-path>/model.onnx)')
+    parser.add_argument('--opset', type=int, default=OPSET_VERSION, help='Opset de ONNX')
+    args = parser.parse_args()
+
+    output = export_onnx(args.model_path, args.output, args.opset)
+    print(f"✅ Modelo ONNX exportado en {output}")
+
+
+if __name__ == "__main__":
+    main()
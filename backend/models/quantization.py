@@ -0,0 +1,170 @@
+"""
+Cuantización dinámica int8 de DistilBERT para servir en CPU.
+
+Las capas nn.Linear (~85% de los parámetros) pasan a pesos int8 con
+activaciones cuantizadas al vuelo; embeddings y LayerNorm siguen en fp32.
+
+Los pesos cuantizados se guardan en disco junto a la huella del checkpoint fp32
+y la versión de torch. En los siguientes arranques se reconstruye la
+arquitectura sin inicializar pesos y se cargan directamente, sin leer ni
+volver a cuantizar el modelo fp32.
+"""
+
+import logging
+from pathlib import Path
+
+import torch
+import torch.ao.nn.quantized.dynamic as nnqd
+from transformers import AutoConfig, AutoModelForSequenceClassification
+
+try:
+    from transformers.initialization import no_init_weights  # transformers >= 5
+except ImportError:
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        no_init_weights = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+QUANTIZED_FILENAME = "model.int8.pt"
+SOURCE_WEIGHTS = ("model.safetensors", "pytorch_model.bin")
+
+
+def source_fingerprint(model_path):
+    """
+    Huella de los pesos fp32 del checkpoint: nombre, tamaño y fecha de modificación.
+
+    Hashear ~260 MB en cada arranque costaría más que la propia carga desde
+    la cache; si el fichero se reemplaza o se toca, la cache se regenera.
+
+    Args:
+        model_path (str | Path): Carpeta del modelo
+
+    Returns:
+        str | None: Huella del fichero de pesos, o None si no existe
+    """
+    for name in SOURCE_WEIGHTS:
+        path = Path(model_path) / name
+        if path.exists():
+            stat = path.stat()
+            return f"{name}:{stat.st_size}:{stat.st_mtime_ns}"
+    return None
+
+
+def quantize_model(model):
+    """
+    Cuantiza dinámicamente las capas Linear de un modelo a int8.
+
+    Args:
+        model (torch.nn.Module): Modelo fp32 en modo eval
+
+    Returns:
+        torch.nn.Module: Modelo cuantizado
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _swap_linear_layers(module):
+    """Sustituye cada nn.Linear por un Linear dinámico int8 vacío (mismo resultado estructural que quantize_dynamic)."""
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear):
+            setattr(module, name, nnqd.Linear(
+                child.in_features, child.out_features,
+                bias_=child.bias is not None, dtype=torch.qint8
+            ))
+        else:
+            _swap_linear_layers(child)
+
+
+def save_quantized(model, cache_path, source):
+    """
+    Guarda los pesos cuantizados junto con los datos de validez de la cache.
+
+    Args:
+        model (torch.nn.Module): Modelo cuantizado
+        cache_path (str | Path): Fichero destino
+        source (str): Huella de los pesos fp32 de origen
+    """
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    torch.save({
+        'format_version': FORMAT_VERSION,
+        'torch_version': str(torch.__version__),
+        'source_fingerprint': source,
+        'state_dict': model.state_dict()
+    }, tmp_path)
+    tmp_path.replace(cache_path)
+
+
+def load_quantized(model_path, cache_path, source):
+    """
+    Carga el modelo cuantizado desde la cache si sigue siendo válida.
+
+    Args:
+        model_path (str | Path): Carpeta del modelo (config.json)
+        cache_path (str | Path): Fichero de pesos cuantizados
+        source (str): Huella actual de los pesos fp32
+
+    Returns:
+        torch.nn.Module | None: Modelo cuantizado, o None si la cache no existe o está obsoleta
+    """
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return None
+
+    try:
+        # mmap: los tensores fp32 (embeddings) se asignan al modelo sin copiarse
+        checkpoint = torch.load(cache_path, weights_only=True, mmap=True)
+    except Exception as e:
+        logger.warning(f"Cache int8 ilegible, se regenera: {e}")
+        return None
+    if (checkpoint.get('format_version') != FORMAT_VERSION
+            or checkpoint.get('torch_version') != str(torch.__version__)
+            or checkpoint.get('source_fingerprint') != source):
+        logger.info(f"Cache int8 obsoleta: {cache_path}")
+        return None
+
+    config = AutoConfig.from_pretrained(str(model_path))
+    if no_init_weights is not None:
+        # Los pesos se sobrescriben enseguida: no hace falta inicializarlos
+        with no_init_weights():
+            model = AutoModelForSequenceClassification.from_config(config)
+    else:
+        model = AutoModelForSequenceClassification.from_config(config)
+    _swap_linear_layers(model)
+    model.load_state_dict(checkpoint['state_dict'], assign=True)
+    model.eval()
+    return model
+
+
+def load_or_quantize(model_path, cache_path=None):
+    """
+    Retorna el modelo int8: desde la cache en disco o cuantizando el fp32 (y guardándolo).
+
+    Args:
+        model_path (str | Path): Carpeta del modelo fine-tuned
+        cache_path (str | Path): Fichero de cache (default: <model_path>/model.int8.pt)
+
+    Returns:
+        tuple: (modelo cuantizado, bool indicando si vino de la cache)
+    """
+    model_path = Path(model_path)
+    cache_path = Path(cache_path) if cache_path else model_path / QUANTIZED_FILENAME
+    source = source_fingerprint(model_path)
+
+    model = load_quantized(model_path, cache_path, source)
+    if model is not None:
+        return model, True
+
+    fp32_model = AutoModelForSequenceClassification.from_pretrained(str(model_path))
+    fp32_model.eval()
+    model = quantize_model(fp32_model)
+    try:
+        save_quantized(model, cache_path, source)
+    except OSError as e:
+        # Carpeta de solo lectura: se sirve igualmente, pero se cuantiza en cada arranque
+        logger.warning(f"No se pudo guardar la cache int8 en {cache_path}: {e}")
+    return model, False
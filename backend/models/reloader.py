@@ -0,0 +1,232 @@
+"""
+Recarga de modelos en caliente, sin reiniciar la API.
+
+ModelReloader construye la instancia nueva (HateSpeechDetector,
+DistilBERTDetector, ...) en un hilo propio, la calienta con unas
+predicciones y solo entonces la intercambia por la actual con una única
+asignación en el event loop. Mientras tanto la API sigue sirviendo con la
+instancia vieja, y las peticiones que ya la habían leído terminan con ella.
+
+Después del intercambio, la instancia vieja se sigue con una weakref: cuando
+la última petición en curso la suelta, se fuerza un gc.collect() y, con
+glibc, malloc_trim(0) para devolver al sistema la memoria liberada (sin
+esto, el heap de un proceso largo no se encoge y la RSS no baja).
+
+Opcionalmente vigila los ficheros del modelo (tamaño y mtime) y recarga al
+detectar un cambio que se mantiene estable dos sondeos seguidos, para no
+cargar un fichero a medio copiar.
+"""
+
+import asyncio
+import ctypes
+import gc
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.utils.comment_store import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_libc = None
+
+
+class ReloadInProgress(RuntimeError):
+    """Ya hay una recarga de ese modelo en marcha."""
+
+
+def rss_bytes():
+    """
+    Memoria residente del proceso.
+
+    Returns:
+        int: Bytes, o None fuera de Linux
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def release_memory():
+    """gc.collect() y malloc_trim(0) (solo glibc) para devolver al sistema el heap libre."""
+    global _libc
+    gc.collect()
+    try:
+        if _libc is None:
+            _libc = ctypes.CDLL('libc.so.6')
+        _libc.malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ModelReloader:
+    """
+    Construcción en segundo plano, calentamiento e intercambio atómico de un modelo.
+    """
+
+    def __init__(self, name, build, swap, warmup=None, watch_paths=(), release_timeout=300.0):
+        """
+        Args:
+            name (str): Nombre del modelo (logs y estado)
+            build (callable): () -> instancia nueva; se ejecuta en el hilo de recarga
+            swap (callable): (instancia nueva) -> instancia vieja; se ejecuta en el
+                event loop y solo debe reasignar las variables globales
+            warmup (callable): (instancia) -> None, en el hilo de recarga antes del intercambio
+            watch_paths (iterable): Ficheros o carpetas cuyo cambio dispara una recarga
+            release_timeout (float): Segundos a esperar a que las peticiones en curso
+                suelten la instancia vieja antes de darla por retenida
+        """
+        self.name = name
+        self.build = build
+        self.swap = swap
+        self.warmup = warmup
+        self.watch_paths = [path for path in watch_paths if path is not None]
+        self.release_timeout = release_timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'reload-{name}')
+        self._lock = asyncio.Lock()
+        self._fingerprint = self.fingerprint() if self.watch_paths else None
+        self._watch_task = None
+        self._release_task = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload = None
+
+    @property
+    def reloading(self):
+        return self._lock.locked()
+
+    def fingerprint(self):
+        """Huella (nombre, tamaño y mtime) de los ficheros vigilados."""
+        return model_fingerprint(*self.watch_paths)
+
+    def _build_and_warm(self):
+        """Construye y calienta la instancia nueva (en el hilo de recarga)."""
+        instance = self.build()
+        if self.warmup is not None:
+            self.warmup(instance)
+        return instance
+
+    async def reload(self, reason='manual'):
+        """
+        Construye, calienta e intercambia una instancia nueva.
+
+        Si build o warmup fallan, la instancia actual sigue sirviendo.
+
+        Args:
+            reason (str): Origen de la recarga ('manual', 'watch', ...)
+
+        Returns:
+            dict: Estado de la recarga (ver last_reload)
+
+        Raises:
+            ReloadInProgress: Si ya hay una recarga de este modelo en marcha
+        """
+        if self._lock.locked():
+            raise ReloadInProgress(f"Ya hay una recarga de '{self.name}' en marcha")
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            status = {'reason': reason, 'started_at': time.time(), 'rss_before': rss_bytes()}
+            start = time.perf_counter()
+            try:
+                instance = await loop.run_in_executor(self._executor, self._build_and_warm)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"❌ Recarga de {self.name} fallida, se mantiene el modelo actual: {e}")
+                self.last_reload = {**status, 'status': 'failed', 'error': str(e)}
+                return self.last_reload
+
+            old = self.swap(instance)
+            del instance
+            self.reloads += 1
+            if self.watch_paths:
+                self._fingerprint = await loop.run_in_executor(self._executor, self.fingerprint)
+            status.update({'status': 'swapped', 'build_seconds': round(time.perf_counter() - start, 3),
+                           'old_instance_released': None})
+            self.last_reload = status
+            logger.info(f"✅ {self.name} recargado en {status['build_seconds']} s ({reason})")
+
+            if old is not None:
+                self._release_task = asyncio.ensure_future(self._await_release(weakref.ref(old), status))
+                del old
+            return status
+
+    async def _await_release(self, old_ref, status):
+        """Espera a que nadie use la instancia vieja y devuelve su memoria al sistema."""
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + self.release_timeout
+        # Las peticiones en curso terminan con la instancia vieja; los ciclos
+        # de referencias (habituales en los modelos de transformers) necesitan gc
+        while old_ref() is not None and time.monotonic() < deadline:
+            await loop.run_in_executor(self._executor, gc.collect)
+            if old_ref() is not None:
+                await asyncio.sleep(0.5)
+        released = old_ref() is None
+        if released:
+            await loop.run_in_executor(self._executor, release_memory)
+        else:
+            logger.warning(f"⚠️ La instancia anterior de {self.name} sigue referenciada tras {self.release_timeout} s")
+        status.update({'old_instance_released': released, 'rss_after': rss_bytes()})
+
+    async def wait_released(self):
+        """Espera a que termine la liberación de la última instancia reemplazada."""
+        if self._release_task is not None:
+            await self._release_task
+
+    async def _watch(self, interval):
+        """Sondea los ficheros vigilados y recarga cuando cambian y se mantienen estables."""
+        loop = asyncio.get_running_loop()
+        candidate = None
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                current = await loop.run_in_executor(self._executor, self.fingerprint)
+            except OSError as e:
+                logger.warning(f"⚠️ No se pudieron leer los ficheros de {self.name}: {e}")
+                continue
+            if current == self._fingerprint:
+                candidate = None
+            elif current != candidate:
+                candidate = current  # cambio nuevo: esperar a que deje de cambiar
+            elif not self.reloading:
+                candidate = None
+                status = await self.reload(reason='watch')
+                if status['status'] == 'failed':
+                    # No reintentar hasta el siguiente cambio de ficheros
+                    self._fingerprint = current
+
+    def start_watching(self, interval=5.0):
+        """Arranca la vigilancia de ficheros en el event loop actual."""
+        if self.watch_paths and self._watch_task is None:
+            self._watch_task = asyncio.ensure_future(self._watch(interval))
+
+    async def stop(self):
+        """Detiene la vigilancia y el hilo de recarga."""
+        for task in (self._watch_task, self._release_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._watch_task = self._release_task = None
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        """
+        Estado del recargador.
+
+        Returns:
+            dict: Recargando, recargas y fallos, ficheros vigilados y la última recarga
+        """
+        return {
+            'reloading': self.reloading,
+            'watching': self._watch_task is not None and not self._watch_task.done(),
+            'watch_paths': [str(path) for path in self.watch_paths],
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_reload': self.last_reload
+        }
@@ -0,0 +1,123 @@
+"""
+Preprocesamiento paralelo con un pool de procesos persistente.
+
+El preprocesamiento NLTK es Python puro y queda limitado a un núcleo por el
+GIL. Para lotes grandes se reparte en chunks entre procesos worker; los lotes
+pequeños siguen en el proceso actual (el coste de serializar no compensa).
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from backend.preprocessing.text_cleaner import load_resources, preprocess_batch
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    """Carga los recursos NLTK una vez por worker."""
+    load_resources()
+
+
+def _ping(_):
+    """Tarea vacía para forzar el arranque de los workers."""
+    return os.getpid()
+
+
+class ParallelPreprocessor:
+    """
+    Reparte preprocess_batch entre un pool de procesos persistente.
+    """
+
+    def __init__(self, workers=None, chunk_size=1000, threshold=2000):
+        """
+        Inicializa el preprocesador paralelo (el pool se crea en start()).
+
+        Args:
+            workers (int): Número de procesos (default: núcleos disponibles)
+            chunk_size (int): Textos por tarea enviada a un worker
+            threshold (int): Tamaño mínimo de lote para usar el pool
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.threshold = threshold
+        self._executor = None
+
+    @property
+    def running(self):
+        """Indica si el pool está activo."""
+        return self._executor is not None
+
+    def start(self):
+        """Arranca el pool y espera a que todos los workers estén listos."""
+        if self._executor is not None:
+            return
+        # spawn: evita heredar hilos de torch/uvicorn del proceso padre
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker
+        )
+        pids = set(self._executor.map(_ping, range(self.workers)))
+        logger.info(f"Pool de preprocesamiento iniciado: {len(pids)} procesos")
+
+    def shutdown(self):
+        """Detiene el pool esperando a que terminen las tareas en curso."""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        logger.info("Pool de preprocesamiento detenido")
+
+    def preprocess(self, texts, tokenizer='nltk'):
+        """
+        Preprocesa una lista de textos conservando el orden.
+
+        Args:
+            texts (list): Textos originales
+            tokenizer (str): Backend de tokenización ('nltk' o 'fast')
+
+        Returns:
+            list: Strings preprocesados (igual que preprocess_batch)
+        """
+        texts = list(texts)
+        processed = self.preprocess_in_pool(texts, tokenizer=tokenizer)
+        if processed is None:
+            return preprocess_batch(texts, tokenizer=tokenizer)
+        return processed
+
+    def preprocess_in_pool(self, texts, tokenizer='nltk'):
+        """
+        Preprocesa en los procesos worker solo si el lote lo justifica.
+
+        Permite a quien llama saber si el trabajo salió del proceso (p. ej.
+        para medirlo como una etapa distinta) y hacer él mismo el modo local.
+
+        Args:
+            texts (list): Textos originales
+            tokenizer (str): Backend de tokenización ('nltk' o 'fast')
+
+        Returns:
+            list: Strings preprocesados, o None si el pool no está activo, el
+                  lote es menor que threshold o el pool se ha roto
+        """
+        texts = list(texts)
+        if self._executor is None or len(texts) < self.threshold:
+            return None
+
+        chunks = [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+        try:
+            # map() devuelve los resultados en el orden de envío
+            results = []
+            for processed in self._executor.map(partial(preprocess_batch, tokenizer=tokenizer), chunks):
+                results.extend(processed)
+            return results
+        except BrokenProcessPool as e:
+            logger.error(f"Pool de preprocesamiento roto, usando modo local: {e}")
+            self._executor = None
+            return None
@@ -1,17 +1,148 @@
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import PorterStemmer
-
-#Descargar recursos necesarios de NLTK
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
-    nltk.download('stopwords')
+from functools import lru_cache
+from pathlib import Path
+
+# NLTK se importa bajo demanda: importarlo cuesta segundos (arrastra scipy) y
+# los workers que solo sirven DistilBERT no lo necesitan. Ningún recurso se
+# descarga en tiempo de ejecución: las stopwords van incluidas en el paquete y
+# la tokenización no depende de los datos de Punkt.
+RESOURCES_DIR = Path(__file__).parent / "resources"
+STOPWORDS_PATH = RESOURCES_DIR / "english_stopwords.txt"
+
+# Tamaño máximo de la cache token -> stem (vocabulario Zipfiano: pocas
+# palabras concentran la mayoría de apariciones)
+STEM_CACHE_SIZE = 50_000
+
+# Recursos compartidos, se construyen una sola vez en el primer uso
+_stop_words = None
+_stemmer = None
+_word_tokenize = None
+
+
+def get_stop_words():
+    """
+    Retorna el conjunto de stopwords en inglés (cargado una sola vez).
+
+    La lista es una copia del corpus 'stopwords' de NLTK (english), incluida
+    en resources/ para no depender de nltk.download.
+
+    Returns:
+        frozenset: Stopwords en inglés
+    """
+    global _stop_words
+    if _stop_words is None:
+        with open(STOPWORDS_PATH, encoding='utf-8') as f:
+            _stop_words = frozenset(line.strip() for line in f if line.strip())
+    return _stop_words
+
+
+def get_stemmer():
+    """
+    Retorna la instancia compartida de PorterStemmer.
+
+    Returns:
+        PorterStemmer: Stemmer reutilizable entre llamadas
+    """
+    global _stemmer
+    if _stemmer is None:
+        from nltk.stem.porter import PorterStemmer
+        _stemmer = PorterStemmer()
+    return _stemmer
+
+
+def load_resources():
+    """
+    Carga por adelantado stopwords, stemmer y tokenizador NLTK.
+
+    Útil al arrancar un worker que va a preprocesar, para no pagar la
+    importación de NLTK en la primera petición.
+    """
+    get_stop_words()
+    get_stemmer()
+    get_tokenizer('nltk')
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_token(word):
+    """
+    Stemming de un token con cache LRU acotada.
+
+    Args:
+    word (str): Token a reducir
+
+    Returns:
+        str: Stem del token (idéntico a PorterStemmer().stem(word))
+    """
+    return get_stemmer().stem(word)
+
+def word_tokenize(text):
+    """
+    Tokenizador de NLTK (NLTKWordTokenizer) sin segmentación en frases.
+
+    clean_text elimina toda la puntuación, así que la segmentación Punkt de
+    nltk.word_tokenize nunca parte el texto: con preserve_line=True el
+    resultado es el mismo y no hacen falta los datos 'punkt'/'punkt_tab'.
+
+    Args:
+    text (str): Texto limpio
+
+    Returns:
+        list: Tokens de NLTK
+    """
+    global _word_tokenize
+    if _word_tokenize is None:
+        from nltk.tokenize import word_tokenize as nltk_word_tokenize
+        _word_tokenize = nltk_word_tokenize
+    return _word_tokenize(text, preserve_line=True)
+
+# Backends de tokenización disponibles
+TOKENIZERS = ('nltk', 'fast')
+
+# Contracciones sin apóstrofo que NLTKWordTokenizer separa en dos tokens
+# (CONTRACTIONS2 de MacIntyre). Todas se parten tras el tercer carácter.
+_SPLIT_CONTRACTIONS = frozenset({'cannot', 'gimme', 'gonna', 'gotta', 'lemme', 'wanna'})
+
+
+def fast_tokenize(text):
+    """
+    Tokenizador rápido para texto ya limpio (salida de clean_text).
+    
+    Tras clean_text solo quedan caracteres de palabra y espacios, así que
+    word_tokenize se reduce a partir por espacios y separar las contracciones
+    de _SPLIT_CONTRACTIONS. No requiere datos de Punkt.
+    
+    Args:
+    text (str): Texto limpio
+    
+    Returns:
+        list: Tokens (mismos que word_tokenize para texto limpio)
+    """
+    tokens = []
+    for token in text.split():
+        if token.lower() in _SPLIT_CONTRACTIONS:
+            tokens.append(token[:3])
+            tokens.append(token[3:])
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def get_tokenizer(tokenizer='nltk'):
+    """
+    Retorna la función de tokenización del backend indicado.
     
+    Args:
+    tokenizer (str): 'nltk' (word_tokenize) o 'fast' (fast_tokenize)
+    
+    Returns:
+        callable: Función texto -> lista de tokens
+    """
+    if tokenizer == 'nltk':
+        return word_tokenize
+    if tokenizer == 'fast':
+        return fast_tokenize
+    raise ValueError(f"Tokenizador desconocido: {tokenizer}. Opciones: {TOKENIZERS}")
+
 def clean_text(text):
     """
     Normalizacion basica del texto
@@ -30,18 +161,21 @@ def clean_text(text):
     text = text.strip()
     return text
 
-def preprocess_text(text):
+def preprocess_text(text, tokenizer='nltk'):
     """
     Tokenizacion avanzada con NLTK: stopwords + stemming
     
     Args:
     text (str): Texto limpio (despues de clean_text)
+    tokenizer (str): Backend de tokenización ('nltk' o 'fast')
     
     Returns:
         list: Tokens procesados (palabras stemmizadas sin stopwords
         
     """
 
+    tokenize = get_tokenizer(tokenizer)
+
     # Verificacion: Convertir a string y manejar casos vacios
     text = str(text).strip()
     if len(text) == 0:
@@ -49,15 +183,14 @@ def preprocess_text(text):
 
     try: 
         # 1. Tokenización
-        tokens = word_tokenize(text)
+        tokens = tokenize(text)
         
         # 2. Eliminación de stopwords
-        stop_words = set(stopwords.words('english'))
+        stop_words = get_stop_words()
         tokens = [word for word in tokens if word not in stop_words]
         
-        # 3. Stemming
-        stemmer = PorterStemmer()
-        tokens = [stemmer.stem(word) for word in tokens]
+        # 3. Stemming (cacheado)
+        tokens = [stem_token(word) for word in tokens]
         
         return tokens
 
@@ -65,12 +198,13 @@ def preprocess_text(text):
         print(f"Error procesando texto '{text[:50]}...': {e}")
         return []
 
-def full_preprocess(text):
+def full_preprocess(text, tokenizer='nltk'):
     """
     Pipeline completo de preprocesamiento de texto
     
     Args:
     text (str): Texto original
+    tokenizer (str): Backend de tokenización ('nltk' o 'fast')
     
     Returns:
         list: Tokens procesados (palabras stemmizadas sin stopwords)
@@ -80,11 +214,62 @@ def full_preprocess(text):
     cleaned = clean_text(text)
     
     # Paso 2: Tokenizacion + Stopwords + Stemming
-    tokens = preprocess_text(cleaned)
+    tokens = preprocess_text(cleaned, tokenizer=tokenizer)
     
     # Paso 3: Unir tokens en string (necesario para TF-IDF)
     return ' '.join(tokens)
 
+def preprocess_batch(texts, tokenizer='nltk'):
+    """
+    Preprocesa una lista de textos de una vez.
+    
+    Equivalente a [full_preprocess(t, tokenizer) for t in texts] pero
+    reutiliza las stopwords, el stemmer y la cache de stems para todo el lote.
+    
+    Args:
+    texts (list): Textos originales
+    tokenizer (str): Backend de tokenización ('nltk' o 'fast')
+    
+    Returns:
+        list: Strings preprocesados, en el mismo orden que la entrada
+    
+    """
+    return preprocess_text_batch([clean_text(text) for text in texts], tokenizer=tokenizer)
+
+def preprocess_text_batch(cleaned_texts, tokenizer='nltk'):
+    """
+    Segunda mitad de preprocess_batch: tokeniza, quita stopwords y stemmiza
+    textos ya limpios (salida de clean_text).
+    
+    Separada para poder medir clean_text y la tokenización como etapas distintas.
+    
+    Args:
+    cleaned_texts (list): Textos después de clean_text
+    tokenizer (str): Backend de tokenización ('nltk' o 'fast')
+    
+    Returns:
+        list: Strings preprocesados, en el mismo orden que la entrada
+    
+    """
+    tokenize = get_tokenizer(tokenizer)
+    stop_words = get_stop_words()
+    stem = stem_token
+    results = []
+    
+    for cleaned in cleaned_texts:
+        if len(cleaned) == 0:
+            results.append('')
+            continue
+        
+        try:
+            tokens = tokenize(cleaned)
+            results.append(' '.join([stem(word) for word in tokens if word not in stop_words]))
+        except Exception as e:
+            print(f"Error procesando texto '{cleaned[:50]}...': {e}")
+            results.append('')
+    
+    return results
+
 # Ejemplo de uso
 if __name__ == "__main__":
     ejemplo = "I HATE you! You're so stupid 😡 http://spam.com"
@@ -92,4 +277,5 @@ if __name__ == "__main__":
     print("Original:", ejemplo)
     print("Limpio:", clean_text(ejemplo))
     print("Tokens:", preprocess_text(clean_text(ejemplo)))
-    print("Final:", full_preprocess(ejemplo))
\ No newline at end of file
+    print("Final:", full_preprocess(ejemplo))
+    print("Final (fast):", full_preprocess(ejemplo, tokenizer='fast'))
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Arnés de equivalencia entre los backends de tokenización 'nltk' y 'fast'.
+
+Limpia cada texto con clean_text, lo tokeniza con ambos backends y reporta
+los textos cuya salida difiere. Se usa para validar el cambio de tokenizador
+sobre un corpus real antes de desplegarlo.
+
+Uso:
+    python -m backend.preprocessing.tokenizer_equivalence corpus.csv --column Text
+    python -m backend.preprocessing.tokenizer_equivalence comentarios.txt
+    python -m backend.preprocessing.tokenizer_equivalence dump.jsonl --column text
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from backend.preprocessing.text_cleaner import clean_text, fast_tokenize, word_tokenize
+
+
+def compare_tokenizers(texts, max_examples=20):
+    """
+    Compara la tokenización de NLTK y la rápida sobre una lista de textos.
+
+    Args:
+        texts (iterable): Textos originales (se limpian con clean_text)
+        max_examples (int): Número máximo de divergencias a guardar
+
+    Returns:
+        dict: {
+            'total': textos comparados,
+            'divergent': textos con tokens distintos,
+            'nltk_seconds': tiempo total de word_tokenize,
+            'fast_seconds': tiempo total de fast_tokenize,
+            'examples': [{'text', 'cleaned', 'nltk', 'fast'}, ...]
+        }
+    """
+    total = 0
+    divergent = 0
+    nltk_seconds = 0.0
+    fast_seconds = 0.0
+    examples = []
+
+    for text in texts:
+        total += 1
+        cleaned = clean_text(text)
+        if not cleaned:
+            continue
+
+        start = time.perf_counter()
+        nltk_tokens = word_tokenize(cleaned)
+        nltk_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast_tokens = fast_tokenize(cleaned)
+        fast_seconds += time.perf_counter() - start
+
+        if nltk_tokens != fast_tokens:
+            divergent += 1
+            if len(examples) < max_examples:
+                examples.append({
+                    'text': text,
+                    'cleaned': cleaned,
+                    'nltk': nltk_tokens,
+                    'fast': fast_tokens
+                })
+
+    return {
+        'total': total,
+        'divergent': divergent,
+        'nltk_seconds': nltk_seconds,
+        'fast_seconds': fast_seconds,
+        'examples': examples
+    }
+
+
+def read_corpus(path, column=None):
+    """
+    Lee textos de un fichero .csv, .jsonl o de texto plano (uno por línea).
+
+    Args:
+        path (str): Ruta al corpus
+        column (str): Columna/campo con el texto (CSV y JSONL)
+
+    Yields:
+        str: Cada texto del corpus
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    with open(path, encoding='utf-8') as f:
+        if suffix == '.csv':
+            reader = csv.DictReader(f)
+            column = column or reader.fieldnames[0]
+            for row in reader:
+                yield row.get(column) or ''
+        elif suffix in ('.jsonl', '.ndjson'):
+            column = column or 'text'
+            for line in f:
+                if line.strip():
+                    yield str(json.loads(line).get(column, ''))
+        else:
+            for line in f:
+                yield line.rstrip('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', help='Fichero .csv, .jsonl o .txt con los textos')
+    parser.add_argument('--column', default=None, help='Columna/campo del texto (CSV/JSONL)')
+    parser.add_argument('--show', type=int, default=20, help='Divergencias a mostrar')
+    args = parser.parse_args(argv)
+
+    report = compare_tokenizers(read_corpus(args.corpus, args.column), max_examples=args.show)
+
+    print(f"Textos comparados: {report['total']:,}")
+    print(f"Divergencias:      {report['divergent']:,}")
+    if report['fast_seconds'] > 0:
+        print(f"word_tokenize: {report['nltk_seconds']:.2f}s | fast_tokenize: {report['fast_seconds']:.2f}s "
+              f"({report['nltk_seconds'] / report['fast_seconds']:.0f}x)")
+
+    for example in report['examples']:
+        print("-" * 60)
+        print(f"Texto:  {example['text'][:120]!r}")
+        print(f"nltk:   {example['nltk']}")
+        print(f"fast:   {example['fast']}")
+
+    return 1 if report['divergent'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
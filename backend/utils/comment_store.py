@@ -0,0 +1,202 @@
+"""
+Almacén persistente (SQLite) de comentarios de YouTube y sus predicciones.
+
+Guarda por (video_id, comment_id) el comentario tal como lo devuelve
+YouTubeCommentFetcher junto con la predicción y la versión del modelo que
+la generó. Un re-análisis solo descarga los comentarios posteriores a la
+última sincronización (commentThreads con order=time) y solo puntúa esos;
+los agregados se recalculan con SQL sobre todo lo almacenado.
+
+La versión del modelo es una huella de los ficheros de pesos
+(model_fingerprint): estable entre reinicios y distinta si cambian los
+pesos, en cuyo caso los comentarios guardados se re-puntúan desde el texto
+almacenado, sin volver a pedirlos a YouTube.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    last_sync TEXT,
+    newest_published_at TEXT
+);
+CREATE TABLE IF NOT EXISTS comments (
+    video_id TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    author TEXT,
+    text TEXT NOT NULL,
+    published_at TEXT,
+    prediction TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    model_version TEXT NOT NULL,
+    scored_at TEXT NOT NULL,
+    PRIMARY KEY (video_id, comment_id)
+);
+CREATE INDEX IF NOT EXISTS idx_comments_toxic
+    ON comments (video_id, prediction, confidence DESC);
+CREATE INDEX IF NOT EXISTS idx_comments_version
+    ON comments (video_id, model_version);
+"""
+
+
+def model_fingerprint(*paths):
+    """
+    Huella estable de los ficheros de un modelo (nombre, tamaño y mtime).
+
+    No lee el contenido: con pesos de cientos de MB, hashearlos en cada
+    arranque costaría más que la huella aporta.
+
+    Args:
+        *paths: Ficheros o carpetas del modelo (las carpetas se recorren)
+
+    Returns:
+        str: 12 caracteres hexadecimales
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        if path is None:
+            continue
+        path = Path(path)
+        files = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            if file.exists():
+                stat = file.stat()
+                digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+class CommentStore:
+    """
+    Comentarios y predicciones por video en un fichero SQLite.
+
+    Una única conexión compartida entre hilos y protegida con un lock: las
+    llamadas llegan desde los executors de la API.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str | Path): Fichero SQLite (se crea si no existe); ':memory:' para tests
+        """
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def video(self, video_id):
+        """
+        Estado de sincronización de un video.
+
+        Returns:
+            dict | None: title, last_sync y newest_published_at, o None si nunca se sincronizó
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, last_sync, newest_published_at FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def known_ids(self, video_id, comment_ids):
+        """Subconjunto de comment_ids que ya están almacenados."""
+        comment_ids = list(comment_ids)
+        if not comment_ids:
+            return set()
+        placeholders = ",".join("?" * len(comment_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT comment_id FROM comments WHERE video_id = ? AND comment_id IN ({placeholders})",
+                (video_id, *comment_ids)
+            ).fetchall()
+        return {row['comment_id'] for row in rows}
+
+    def save_comments(self, video_id, comments, predictions, model_version):
+        """
+        Inserta o actualiza comentarios con su predicción.
+
+        Args:
+            video_id (str): ID del video
+            comments (list): Comentarios del fetcher (comment_id, author, text, published_at)
+            predictions (list): Predicciones alineadas con comments
+            model_version (str): Versión del modelo que generó las predicciones
+        """
+        scored_at = datetime.now().isoformat()
+        rows = [
+            (video_id, comment['comment_id'], comment.get('author', 'Unknown'), comment['text'],
+             str(comment.get('published_at', '')), prediction['prediction'], prediction['confidence'],
+             model_version, scored_at)
+            for comment, prediction in zip(comments, predictions)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def stale_comments(self, video_id, model_version, limit=256):
+        """
+        Comentarios puntuados con otra versión del modelo.
+
+        Returns:
+            list: Hasta limit comentarios (comment_id, author, text, published_at)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT comment_id, author, text, published_at FROM comments "
+                "WHERE video_id = ? AND model_version != ? LIMIT ?",
+                (video_id, model_version, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_synced(self, video_id, title=None):
+        """Registra la sincronización y la fecha del comentario más reciente almacenado."""
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            newest = self._conn.execute(
+                "SELECT MAX(published_at) FROM comments WHERE video_id = ?", (video_id,)
+            ).fetchone()[0]
+            self._conn.execute(
+                "INSERT INTO videos (video_id, title, last_sync, newest_published_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET title = COALESCE(excluded.title, videos.title), "
+                "last_sync = excluded.last_sync, newest_published_at = excluded.newest_published_at",
+                (video_id, title, now, newest)
+            )
+
+    def aggregate(self, video_id, top_n=10):
+        """
+        Agregados de toxicidad sobre todos los comentarios almacenados del video.
+
+        Returns:
+            dict: Mismos campos que ToxicityAggregate.snapshot()
+        """
+        with self._lock:
+            total, toxic = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(prediction = 'hate_speech'), 0) FROM comments WHERE video_id = ?",
+                (video_id,)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT comment_id, author, text, prediction, confidence, published_at FROM comments "
+                "WHERE video_id = ? AND prediction = 'hate_speech' "
+                "ORDER BY confidence DESC, published_at LIMIT ?",
+                (video_id, top_n)
+            ).fetchall()
+        return {
+            'total_comments_analyzed': total,
+            'toxic_count': toxic,
+            'normal_count': total - toxic,
+            'toxicity_percentage': round(toxic / total * 100, 2) if total else 0.0,
+            'top_toxic_comments': [{**dict(row), 'is_toxic': True} for row in rows]
+        }
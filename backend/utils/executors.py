@@ -0,0 +1,134 @@
+"""
+Executors acotados para sacar el trabajo bloqueante del event loop.
+
+La API usa dos: uno para inferencia (CPU) y otro para llamadas a la API de
+YouTube (red), de modo que una descarga lenta no ocupa los hilos de los
+modelos ni al revés. Cada executor admite como máximo max_pending tareas
+(en ejecución + en cola); por encima lanza ExecutorSaturated en lugar de
+encolar sin límite, y la API lo traduce a 429.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class ExecutorSaturated(RuntimeError):
+    """El executor ya tiene max_pending tareas admitidas."""
+
+
+class BoundedExecutor:
+    """
+    ThreadPoolExecutor con límite de tareas admitidas y contadores.
+    """
+
+    def __init__(self, name, max_workers=4, max_pending=32):
+        """
+        Inicializa el executor.
+
+        Args:
+            name (str): Nombre (prefijo de los hilos y en las estadísticas)
+            max_workers (int): Hilos del pool
+            max_pending (int): Tareas admitidas a la vez (en ejecución + en cola)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers debe ser >= 1")
+        if max_pending < max_workers:
+            raise ValueError("max_pending debe ser >= max_workers")
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_pending_seen = 0
+
+    @property
+    def pending(self):
+        """Tareas admitidas que aún no han terminado."""
+        return self._pending
+
+    def acquire(self):
+        """
+        Reserva un hueco sin ejecutar nada (liberarlo con release()).
+
+        Raises:
+            ExecutorSaturated: Si ya hay max_pending tareas admitidas
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"Executor '{self.name}' saturado ({self._pending}/{self.max_pending} tareas)"
+                )
+            self._pending += 1
+            self.max_pending_seen = max(self.max_pending_seen, self._pending)
+
+    def release(self, *_):
+        """Libera un hueco reservado con acquire()."""
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    @contextmanager
+    def slot(self):
+        """
+        Reserva un hueco durante el bloque; lanza ExecutorSaturated si no queda ninguno.
+
+        Sirve para acotar trabajo que llega al pool por otro camino
+        (p. ej. el micro-batcher, que ejecuta sus lotes en self.executor).
+        """
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) en el pool sin bloquear el event loop.
+
+        El hueco se libera cuando el hilo termina, no cuando se cancela la
+        petición que esperaba: un cliente que se desconecta no libera CPU.
+        fn ve las ContextVar del llamante, como con asyncio.to_thread.
+
+        Returns:
+            Resultado de fn
+
+        Raises:
+            ExecutorSaturated: Si ya hay max_pending tareas admitidas
+        """
+        self.acquire()
+        try:
+            context = contextvars.copy_context()
+            future = self.executor.submit(context.run, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self.release()
+            raise
+        future.add_done_callback(self.release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait=True):
+        """Detiene los hilos del pool."""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self):
+        """
+        Estadísticas del executor.
+
+        Returns:
+            dict: Configuración, tareas en curso, completadas y rechazadas
+        """
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self._pending,
+            'max_pending_seen': self.max_pending_seen,
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
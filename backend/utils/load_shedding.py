@@ -0,0 +1,156 @@
+"""
+Control de admisión para el trabajo de DistilBERT.
+
+En una ráfaga de tráfico, las peticiones a DistilBERT se acumulan en el
+executor de modelo y todas se vuelven lentas a la vez. LoadShedder lleva la
+cuenta de los textos admitidos que aún no han terminado y del coste medio
+por texto (media móvil exponencial de los forwards reales); con ellos estima
+la espera de una petición nueva. Si la cola supera max_queue textos o la
+espera estimada supera max_wait_ms, la petición no se admite:
+
+    - policy='fallback': el endpoint la puntúa con Logistic Regression y
+      marca la respuesta con el modelo usado
+    - policy='reject': el endpoint responde 503 con Retry-After
+    - policy='off': se admite todo (solo quedan los 429 de los executors)
+
+Con la cola vacía siempre se admite, aunque el lote supere max_queue, para
+que una página grande no quede excluida para siempre.
+"""
+
+import math
+import threading
+from contextlib import contextmanager
+
+SHED_POLICIES = ('fallback', 'reject', 'off')
+
+
+class Overloaded(RuntimeError):
+    """DistilBERT está saturado: la petición no se admite."""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LoadShedder:
+    """
+    Admisión por profundidad de cola y espera estimada, con contadores.
+    """
+
+    def __init__(self, policy='fallback', max_queue=256, max_wait_ms=1000, smoothing=0.2):
+        """
+        Args:
+            policy (str): 'fallback', 'reject' u 'off'
+            max_queue (int): Textos admitidos a la vez (en curso + en cola)
+            max_wait_ms (float): Espera estimada máxima para admitir una petición
+            smoothing (float): Peso de cada forward nuevo en la media móvil del coste por texto
+        """
+        if policy not in SHED_POLICIES:
+            raise ValueError(f"policy debe ser una de {SHED_POLICIES}")
+        self.policy = policy
+        self.max_queue = max_queue
+        self.max_wait = max_wait_ms / 1000
+        self.smoothing = smoothing
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._seconds_per_item = None  # sin forwards observados no se estima la espera
+        self.admitted = 0
+        self.degraded = 0
+        self.degraded_items = 0
+        self.rejected = 0
+        self.max_inflight_seen = 0
+
+    @property
+    def inflight(self):
+        """Textos admitidos que aún no han terminado."""
+        return self._inflight
+
+    def estimated_wait(self, items=0):
+        """
+        Segundos estimados hasta terminar la cola actual más `items` textos.
+
+        Returns:
+            float: Estimación, o 0.0 si aún no se ha observado ningún forward
+        """
+        if self._seconds_per_item is None:
+            return 0.0
+        return (self._inflight + items) * self._seconds_per_item
+
+    def acquire(self, items=1):
+        """
+        Admite `items` textos (liberarlos con release()).
+
+        Raises:
+            Overloaded: Si la cola o la espera estimada superan los límites
+                (se cuenta como degradada o rechazada según la política)
+        """
+        with self._lock:
+            if self.policy != 'off' and self._inflight > 0:
+                wait = self.estimated_wait(items)
+                if self._inflight + items > self.max_queue or wait > self.max_wait:
+                    if self.policy == 'reject':
+                        self.rejected += 1
+                    else:
+                        self.degraded += 1
+                        self.degraded_items += items
+                    raise Overloaded(
+                        f"DistilBERT saturado ({self._inflight} textos en cola, "
+                        f"espera estimada {wait * 1000:.0f} ms)",
+                        retry_after=max(1, math.ceil(wait))
+                    )
+            self._inflight += items
+            self.admitted += 1
+            self.max_inflight_seen = max(self.max_inflight_seen, self._inflight)
+
+    def release(self, items=1):
+        """Libera textos admitidos con acquire()."""
+        with self._lock:
+            self._inflight -= items
+
+    @contextmanager
+    def slot(self, items=1):
+        """Admite `items` textos durante el bloque; lanza Overloaded si no se admiten."""
+        self.acquire(items)
+        try:
+            yield
+        finally:
+            self.release(items)
+
+    def observe_service(self, seconds, items):
+        """
+        Registra un forward de DistilBERT (llamado desde el hilo del executor).
+
+        Args:
+            seconds (float): Duración del forward
+            items (int): Textos del lote
+        """
+        if items <= 0:
+            return
+        per_item = seconds / items
+        with self._lock:
+            if self._seconds_per_item is None:
+                self._seconds_per_item = per_item
+            else:
+                self._seconds_per_item += self.smoothing * (per_item - self._seconds_per_item)
+
+    def stats(self):
+        """
+        Estadísticas del control de admisión.
+
+        Returns:
+            dict: Configuración, cola actual, coste por texto, espera estimada y contadores
+        """
+        per_item = self._seconds_per_item
+        return {
+            'policy': self.policy,
+            'max_queue': self.max_queue,
+            'max_wait_ms': self.max_wait * 1000,
+            'inflight': self._inflight,
+            'max_inflight_seen': self.max_inflight_seen,
+            'ms_per_item': round(per_item * 1000, 3) if per_item is not None else None,
+            'estimated_wait_ms': round(self.estimated_wait() * 1000, 1),
+            'admitted': self.admitted,
+            'degraded': self.degraded,
+            'degraded_items': self.degraded_items,
+            'rejected': self.rejected
+        }
@@ -0,0 +1,335 @@
+"""
+Métricas de latencia de la API: peticiones por endpoint y etapas del pipeline.
+
+MetricsRegistry acumula, para cada endpoint, contadores por código de estado
+y un histograma de latencia, y para cada etapa (clean_text, tokenización de
+DistilBERT, llamada a YouTube, ...) un histograma de duración y el número de
+textos procesados. Se exporta en formato de texto de Prometheus y como JSON
+con percentiles estimados a partir de los buckets.
+
+Cada observación cuesta dos perf_counter y un incremento bajo lock: las
+etapas se miden por llamada (un lote entero), nunca por texto. Si la
+petición en curso se está perfilando (ver profiling.py), cada etapa se
+suma también a su desglose.
+"""
+
+import threading
+import time
+
+from backend.models.batching import Histogram
+from backend.utils.profiling import current_profile
+
+# Límites superiores en segundos: de 100 µs (etapas LR) a 30 s (videos enteros)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+def histogram_quantile(histogram, q):
+    """
+    Estima un cuantil interpolando dentro del bucket (como histogram_quantile de Prometheus).
+
+    Args:
+        histogram (Histogram): Histograma con límites en segundos
+        q (float): Cuantil entre 0 y 1
+
+    Returns:
+        float: Valor estimado, o None si el histograma está vacío
+    """
+    if histogram.total == 0:
+        return None
+    rank = q * histogram.total
+    cumulative, lower = 0, 0.0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        if count and cumulative + count >= rank:
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound
+    # Por encima del último límite no hay forma de interpolar
+    return histogram.bounds[-1]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _value(value):
+    """Enteros sin exponente (los contadores superan pronto el millón) y floats con repr."""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def prometheus_metric(name, kind, help_text, samples):
+    """
+    Líneas de texto de Prometheus para una métrica simple (counter o gauge).
+
+    Args:
+        name (str): Nombre de la métrica
+        kind (str): 'counter' o 'gauge'
+        help_text (str): Descripción (# HELP)
+        samples (list): Pares (dict de labels, valor)
+
+    Returns:
+        list: Líneas sin salto final
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    lines.extend(f'{name}{_labels(**labels)} {_value(value)}' for labels, value in samples)
+    return lines
+
+
+def _histogram_lines(name, histogram, **labels):
+    """Buckets acumulados, _sum y _count de un histograma."""
+    lines, cumulative = [], 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{_labels(**labels, le=f"{bound:g}")} {cumulative}')
+    lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {histogram.total}')
+    lines.append(f'{name}_sum{_labels(**labels)} {histogram.sum:.6f}')
+    lines.append(f'{name}_count{_labels(**labels)} {histogram.total}')
+    return lines
+
+
+def _latency_summary(histogram):
+    """count, media y p50/p95/p99 en ms para el JSON."""
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        'count': histogram.total,
+        'mean_ms': ms(histogram.sum / histogram.total) if histogram.total else None,
+        'p50_ms': ms(histogram_quantile(histogram, 0.50)),
+        'p95_ms': ms(histogram_quantile(histogram, 0.95)),
+        'p99_ms': ms(histogram_quantile(histogram, 0.99))
+    }
+
+
+class _StageTimer:
+    """Context manager que registra la duración de una etapa al salir."""
+
+    __slots__ = ('registry', 'stage', 'items', 'start')
+
+    def __init__(self, registry, stage, items):
+        self.registry = registry
+        self.stage = stage
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe_stage(self.stage, time.perf_counter() - self.start, self.items)
+        return False
+
+
+class _NullTimer:
+    """Context manager vacío para métricas desactivadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas de latencia por endpoint y por etapa, thread-safe.
+    """
+
+    def __init__(self, enabled=True, namespace="hate_speech", buckets=LATENCY_BUCKETS):
+        """
+        Args:
+            enabled (bool): Si es False, observe_* y stage() no registran nada
+                (salvo en el desglose de una petición perfilada)
+            namespace (str): Prefijo de los nombres de métrica de Prometheus
+            buckets (tuple): Límites de los histogramas, en segundos
+        """
+        self.enabled = enabled
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._requests = {}         # (method, endpoint, status) -> peticiones
+        self._request_latency = {}  # (method, endpoint) -> Histogram
+        self._stages = {}           # etapa -> [Histogram, textos procesados]
+
+    def observe_request(self, method, endpoint, status, seconds):
+        """
+        Registra una petición HTTP terminada.
+
+        Args:
+            method (str): Método HTTP
+            endpoint (str): Plantilla de la ruta (p. ej. /predict), no la URL concreta
+            status (int): Código de estado de la respuesta
+            seconds (float): Duración total, hasta el último byte de la respuesta
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (method, endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._request_latency.get((method, endpoint))
+            if histogram is None:
+                histogram = self._request_latency[(method, endpoint)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_stage(self, stage, seconds, items=1):
+        """
+        Registra una ejecución de una etapa del pipeline.
+
+        Args:
+            stage (str): Nombre de la etapa
+            seconds (float): Duración de la llamada
+            items (int): Textos (o comentarios) procesados en la llamada
+        """
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add(stage, seconds, items)
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                entry = self._stages[stage] = [Histogram(self.buckets), 0]
+            entry[0].observe(seconds)
+            entry[1] += items
+
+    def stage(self, stage, items=1):
+        """
+        Context manager que mide el bloque como una ejecución de la etapa.
+
+        Ejemplo:
+            with metrics.stage('tfidf_transform', len(texts)):
+                X = vectorizer.transform(texts)
+        """
+        if not self.enabled and current_profile.get() is None:
+            return _NULL_TIMER
+        return _StageTimer(self, stage, items)
+
+    def reset(self):
+        """Borra todas las observaciones."""
+        with self._lock:
+            self._requests.clear()
+            self._request_latency.clear()
+            self._stages.clear()
+            self.started_at = time.time()
+
+    def to_dict(self):
+        """
+        Métricas como JSON.
+
+        Returns:
+            dict: {
+                'enabled', 'uptime_seconds',
+                'endpoints': {'METHOD /ruta': {requests, errors, status, count, mean_ms, p50_ms, p95_ms, p99_ms}},
+                'stages': {etapa: {items, count, mean_ms, p50_ms, p95_ms, p99_ms}}
+            }
+        """
+        with self._lock:
+            endpoints = {}
+            for (method, endpoint), histogram in self._request_latency.items():
+                status = {
+                    str(code): count for (m, e, code), count in self._requests.items()
+                    if m == method and e == endpoint
+                }
+                endpoints[f'{method} {endpoint}'] = {
+                    'requests': histogram.total,
+                    'errors': sum(count for code, count in status.items() if int(code) >= 500),
+                    'status': status,
+                    **_latency_summary(histogram)
+                }
+            stages = {
+                stage: {'items': items, **_latency_summary(histogram)}
+                for stage, (histogram, items) in self._stages.items()
+            }
+        return {
+            'enabled': self.enabled,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'endpoints': endpoints,
+            'stages': stages
+        }
+
+    def render_prometheus(self):
+        """
+        Métricas de peticiones y etapas en formato de texto de Prometheus.
+
+        Returns:
+            list: Líneas sin salto final
+        """
+        ns = self.namespace
+        with self._lock:
+            lines = prometheus_metric(
+                f'{ns}_http_requests_total', 'counter', 'Peticiones HTTP por endpoint y código de estado',
+                [({'method': method, 'endpoint': endpoint, 'status': status}, count)
+                 for (method, endpoint, status), count in sorted(self._requests.items())]
+            )
+            name = f'{ns}_http_request_duration_seconds'
+            lines += [f'# HELP {name} Latencia de las peticiones HTTP por endpoint',
+                      f'# TYPE {name} histogram']
+            for (method, endpoint), histogram in sorted(self._request_latency.items()):
+                lines += _histogram_lines(name, histogram, method=method, endpoint=endpoint)
+
+            name = f'{ns}_stage_duration_seconds'
+            lines += [f'# HELP {name} Duración de cada etapa del pipeline por llamada',
+                      f'# TYPE {name} histogram']
+            for stage, (histogram, _) in sorted(self._stages.items()):
+                lines += _histogram_lines(name, histogram, stage=stage)
+
+            lines += prometheus_metric(
+                f'{ns}_stage_items_total', 'counter', 'Textos procesados por etapa',
+                [({'stage': stage}, items) for stage, (_, items) in sorted(self._stages.items())]
+            )
+        return lines
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que registra cada petición HTTP en un MetricsRegistry.
+
+    La etiqueta endpoint es la plantilla de la ruta resuelta por el router
+    (scope['route']); las peticiones sin ruta se agrupan en 'unmatched' para
+    que URLs arbitrarias no creen series nuevas. En respuestas en streaming
+    (SSE, NDJSON) la duración llega hasta el final del stream.
+    """
+
+    def __init__(self, app, registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # si la app lanza una excepción no llega a enviar http.response.start
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', None) or 'unmatched'
+            self.registry.observe_request(scope['method'], endpoint, status, time.perf_counter() - start)
+
+
+# Para detectores creados sin registro de métricas
+NULL_METRICS = MetricsRegistry(enabled=False)
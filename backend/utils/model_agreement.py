@@ -0,0 +1,131 @@
+"""
+Acuerdo entre Logistic Regression y DistilBERT sobre un lote de textos.
+
+Las predicciones de ambos modelos se pasan a arrays de numpy y las métricas
+agregadas (tasa de acuerdo, matriz de confusión entre modelos, kappa de
+Cohen, distribución de la diferencia de confianza y conjunto de
+desacuerdos) se calculan con operaciones vectorizadas, sin recorrer el
+lote en Python más que para construir la respuesta por texto.
+
+La diferencia de confianza se mide en la misma escala para ambos modelos,
+la probabilidad de hate speech: |P_LR(tóxico) - P_DistilBERT(tóxico)|. La
+'confidence' de LR ya es esa probabilidad, pero la de DistilBERT es la de la
+clase que predice, así que compararlas directamente daría ~1 cuando ambos
+coinciden en que un comentario es normal.
+"""
+
+import numpy as np
+
+# Límites del histograma de diferencias de confianza (la última barra incluye el 1.0)
+CONFIDENCE_DIFF_BINS = np.linspace(0.0, 1.0, 11)
+
+
+def _distribution(values):
+    """Media, desviación, percentiles, máximo e histograma de un array en [0, 1]."""
+    counts, _ = np.histogram(values, bins=CONFIDENCE_DIFF_BINS)
+    p50, p90, p95 = np.percentile(values, [50, 90, 95])
+    return {
+        'mean': round(float(values.mean()), 4),
+        'std': round(float(values.std()), 4),
+        'p50': round(float(p50), 4),
+        'p90': round(float(p90), 4),
+        'p95': round(float(p95), 4),
+        'max': round(float(values.max()), 4),
+        'histogram': {
+            'bins': [round(float(bound), 2) for bound in CONFIDENCE_DIFF_BINS],
+            'counts': counts.tolist()
+        }
+    }
+
+
+def cohen_kappa(a, b):
+    """
+    Kappa de Cohen entre dos clasificaciones binarias.
+
+    Args:
+        a (np.ndarray): Predicciones booleanas del primer modelo
+        b (np.ndarray): Predicciones booleanas del segundo modelo
+
+    Returns:
+        float: Acuerdo corregido por azar, o None si ambos predicen siempre
+               la misma clase (el acuerdo esperado por azar es 1)
+    """
+    observed = float(np.mean(a == b))
+    pa, pb = float(a.mean()), float(b.mean())
+    expected = pa * pb + (1 - pa) * (1 - pb)
+    if expected >= 1.0:
+        return None
+    return (observed - expected) / (1 - expected)
+
+
+def compare_predictions(lr_results, bert_results):
+    """
+    Compara las predicciones de ambos modelos texto a texto y en conjunto.
+
+    Args:
+        lr_results (list): Resultados de HateSpeechDetector.predict_batch
+        bert_results (list): Resultados de DistilBERTDetector.predict_batch, alineados
+
+    Returns:
+        tuple: (resultados por texto, resumen) donde el resumen es {
+            'total', 'agreements', 'disagreements', 'agreement_rate', 'cohen_kappa',
+            'confusion': {both_toxic, both_normal, lr_only_toxic, bert_only_toxic},
+            'confidence_diff': {mean, std, p50, p90, p95, max, histogram} de
+                |P_LR(tóxico) - P_DistilBERT(tóxico)|,
+            'disagreement_indices': índices en los que discrepan, de mayor a
+                menor diferencia de confianza
+        }
+    """
+    if len(lr_results) != len(bert_results):
+        raise ValueError("Las predicciones de ambos modelos deben estar alineadas")
+    n = len(lr_results)
+    if n == 0:
+        raise ValueError("No hay predicciones que comparar")
+
+    lr_toxic = np.fromiter((r['is_toxic'] for r in lr_results), dtype=bool, count=n)
+    bert_toxic = np.fromiter((r['label'] == 1 for r in bert_results), dtype=bool, count=n)
+    lr_confidence = np.fromiter((r['confidence'] for r in lr_results), dtype=np.float64, count=n)
+    bert_toxic_proba = np.fromiter((r['probabilities']['hate_speech'] for r in bert_results),
+                                   dtype=np.float64, count=n)
+
+    agree = lr_toxic == bert_toxic
+    confidence_diff = np.abs(lr_confidence - bert_toxic_proba)
+    disagreements = np.flatnonzero(~agree)
+    # Desacuerdos más marcados primero (orden estable a igual diferencia)
+    disagreements = disagreements[np.argsort(-confidence_diff[disagreements], kind='stable')]
+
+    items = [
+        {
+            'text': lr['text'],
+            'logistic_regression': {
+                'prediction': lr['prediction'],
+                'confidence': lr['confidence'],
+                'is_toxic': lr['is_toxic']
+            },
+            'distilbert': {
+                'prediction': bert['prediction'],
+                'confidence': bert['confidence'],
+                'probabilities': bert['probabilities']
+            },
+            'agreement': bool(agreed),
+            'confidence_diff': float(diff)
+        }
+        for lr, bert, agreed, diff in zip(lr_results, bert_results, agree, confidence_diff)
+    ]
+    kappa = cohen_kappa(lr_toxic, bert_toxic)
+    summary = {
+        'total': n,
+        'agreements': int(agree.sum()),
+        'disagreements': len(disagreements),
+        'agreement_rate': round(float(agree.mean()), 4),
+        'cohen_kappa': round(kappa, 4) if kappa is not None else None,
+        'confusion': {
+            'both_toxic': int(np.count_nonzero(lr_toxic & bert_toxic)),
+            'both_normal': int(np.count_nonzero(~lr_toxic & ~bert_toxic)),
+            'lr_only_toxic': int(np.count_nonzero(lr_toxic & ~bert_toxic)),
+            'bert_only_toxic': int(np.count_nonzero(~lr_toxic & bert_toxic))
+        },
+        'confidence_diff': _distribution(confidence_diff),
+        'disagreement_indices': disagreements.tolist()
+    }
+    return items, summary
@@ -0,0 +1,103 @@
+"""
+Lectura incremental de NDJSON para el scoring masivo en streaming.
+
+El cuerpo de la petición llega en trozos de bytes arbitrarios; aquí se
+cortan en líneas y se agrupan en lotes de tamaño fijo, sin tener nunca en
+memoria más que el lote actual y la línea a medio recibir.
+
+Cada línea puede ser un string JSON ("texto") o un objeto con "text" y,
+opcionalmente, "id". Las líneas vacías se ignoran; las inválidas generan un
+registro de error en su posición en lugar de abortar el stream.
+"""
+
+import json
+
+DEFAULT_MAX_LINE_BYTES = 64 * 1024
+
+
+def parse_line(line, line_no):
+    """
+    Convierte una línea NDJSON en un registro.
+
+    Args:
+        line (bytes): Línea sin el salto final
+        line_no (int): Número de línea (desde 1)
+
+    Returns:
+        dict: {'line', 'id', 'text'} o {'line', 'id', 'error'}
+    """
+    try:
+        value = json.loads(line)
+    except ValueError as e:
+        return {'line': line_no, 'id': None, 'error': f"JSON inválido: {e}"}
+
+    if isinstance(value, str):
+        return {'line': line_no, 'id': None, 'text': value}
+    if isinstance(value, dict) and isinstance(value.get('text'), str):
+        return {'line': line_no, 'id': value.get('id'), 'text': value['text']}
+    return {'line': line_no, 'id': value.get('id') if isinstance(value, dict) else None,
+            'error': "Cada línea debe ser un string o un objeto con campo 'text'"}
+
+
+async def iter_ndjson_batches(byte_chunks, batch_size=256, max_line_bytes=DEFAULT_MAX_LINE_BYTES):
+    """
+    Agrupa en lotes los registros de un stream NDJSON.
+
+    Args:
+        byte_chunks: Iterable asíncrono de bytes (p. ej. request.stream())
+        batch_size (int): Registros por lote
+        max_line_bytes (int): Longitud máxima de una línea; las más largas se descartan con error
+
+    Yields:
+        list: Registros (ver parse_line) en el orden de entrada
+    """
+    buffer = bytearray()
+    batch = []
+    line_no = 0
+    oversized = False  # descartando el resto de una línea demasiado larga
+
+    def add(line):
+        nonlocal line_no
+        line_no += 1
+        if line.strip():
+            batch.append(parse_line(bytes(line), line_no))
+
+    def add_oversized():
+        nonlocal line_no
+        line_no += 1
+        batch.append({'line': line_no, 'id': None,
+                      'error': f"Línea de más de {max_line_bytes} bytes"})
+
+    async for data in byte_chunks:
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            if oversized:
+                oversized = False
+            elif len(buffer) + (end - start) > max_line_bytes:
+                add_oversized()
+            else:
+                buffer += data[start:end]
+                add(buffer)
+            buffer.clear()
+            start = end + 1
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if not oversized:
+            buffer += data[start:]
+            if len(buffer) > max_line_bytes:
+                add_oversized()
+                buffer.clear()
+                oversized = True
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if buffer and not oversized:
+        add(buffer)
+    if batch:
+        yield batch
@@ -0,0 +1,265 @@
+"""
+Cache de predicciones compartida por los endpoints de la API.
+
+Las claves son (model_id, model_version, sha256(texto normalizado)). Cada
+recarga de un detector genera un model_version nuevo; quien intercambia el
+detector llama a invalidate(model_id, nueva_versión). Las peticiones que aún
+usan una versión distinta de la actual (p. ej. las que terminan con el
+detector anterior tras una recarga) calculan sin pasar por la cache.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Cache LRU con TTL y contadores de hits/misses/evictions.
+    """
+
+    def __init__(self, max_size=10000, ttl_seconds=3600, clock=time.monotonic):
+        """
+        Inicializa la cache.
+
+        Args:
+            max_size (int): Número máximo de entradas (0 desactiva la cache)
+            ttl_seconds (float): Segundos de validez de cada entrada (None = sin TTL)
+            clock (callable): Reloj monotónico (inyectable para tests)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.bypasses = 0
+
+    @property
+    def enabled(self):
+        """Indica si la cache está activa."""
+        return self.max_size > 0
+
+    @staticmethod
+    def normalize_text(text):
+        """
+        Normaliza el texto para la clave: espacios colapsados y sin bordes.
+
+        Ambos modelos tokenizan por espacios, así que la normalización no
+        cambia la predicción.
+        """
+        return ' '.join(str(text).split())
+
+    @classmethod
+    def text_hash(cls, text):
+        """SHA-256 del texto normalizado."""
+        return hashlib.sha256(cls.normalize_text(text).encode('utf-8')).hexdigest()
+
+    def _check_version(self, model_id, model_version):
+        """
+        Indica si la versión es la actual del modelo (la primera vista pasa a serlo).
+
+        Returns:
+            bool: False si la cache no debe usarse para esta versión
+        """
+        current = self._versions.setdefault(model_id, model_version)
+        return current == model_version
+
+    def _get(self, key, now):
+        """Busca una entrada (con el lock adquirido)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if self.ttl_seconds is not None and now - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value, now):
+        """Inserta una entrada y aplica el límite de tamaño (con el lock adquirido)."""
+        self._entries[key] = (now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _strip(result):
+        """Guarda el resultado sin el texto original (se reinyecta en cada hit)."""
+        return {k: v for k, v in result.items() if k != 'text'}
+
+    def get_or_compute(self, model_id, model_version, text, compute):
+        """
+        Retorna la predicción cacheada o la calcula con compute(text).
+
+        Args:
+            model_id (str): Identificador del modelo
+            model_version (str): Versión del modelo cargado
+            text (str): Texto a predecir
+            compute (callable): Función texto -> dict de resultado
+
+        Returns:
+            dict: Resultado con 'text' igual al texto recibido
+        """
+        if not self.enabled:
+            return compute(text)
+
+        key, cached = self._lookup(model_id, model_version, text)
+        if cached is not None:
+            return cached
+        result = compute(text)
+        if key is None:
+            return result
+        self._store(model_id, model_version, key, result)
+        return result
+
+    async def get_or_compute_async(self, model_id, model_version, text, compute):
+        """
+        Igual que get_or_compute, pero compute es una corrutina (p. ej. MicroBatcher.submit).
+
+        Returns:
+            dict: Resultado con 'text' igual al texto recibido
+        """
+        if not self.enabled:
+            return await compute(text)
+
+        key, cached = self._lookup(model_id, model_version, text)
+        if cached is not None:
+            return cached
+        result = await compute(text)
+        if key is None:
+            return result
+        self._store(model_id, model_version, key, result)
+        return result
+
+    def _lookup(self, model_id, model_version, text):
+        """Retorna (clave, resultado cacheado o None) y actualiza hits/misses; clave None si la versión no es la actual."""
+        key = (model_id, model_version, self.text_hash(text))
+        with self._lock:
+            if not self._check_version(model_id, model_version):
+                self.bypasses += 1
+                return None, None
+            cached = self._get(key, self._clock())
+            if cached is not None:
+                self.hits += 1
+                return key, {**cached, 'text': text}
+            self.misses += 1
+        return key, None
+
+    def _store(self, model_id, model_version, key, result):
+        """Guarda un resultado recién calculado."""
+        with self._lock:
+            if self._check_version(model_id, model_version):
+                self._put(key, self._strip(result), self._clock())
+
+    def get_or_compute_batch(self, model_id, model_version, texts, compute_batch):
+        """
+        Versión por lotes: solo los misses (sin duplicados) llegan a compute_batch.
+
+        Args:
+            model_id (str): Identificador del modelo
+            model_version (str): Versión del modelo cargado
+            texts (list): Textos a predecir
+            compute_batch (callable): Función lista de textos -> lista de resultados
+
+        Returns:
+            list: Resultados en el mismo orden que texts
+        """
+        texts = list(texts)
+        if not self.enabled:
+            return compute_batch(texts)
+
+        keys = [(model_id, model_version, self.text_hash(text)) for text in texts]
+        results = [None] * len(texts)
+        pending = OrderedDict()  # clave -> posiciones que esperan ese resultado
+
+        with self._lock:
+            current = self._check_version(model_id, model_version)
+            if not current:
+                self.bypasses += len(texts)
+            else:
+                now = self._clock()
+                for i, (key, text) in enumerate(zip(keys, texts)):
+                    cached = self._get(key, now)
+                    if cached is not None:
+                        self.hits += 1
+                        results[i] = {**cached, 'text': text}
+                    else:
+                        self.misses += 1
+                        pending.setdefault(key, []).append(i)
+        if not current:
+            return compute_batch(texts)
+
+        if pending:
+            miss_texts = [texts[positions[0]] for positions in pending.values()]
+            computed = compute_batch(miss_texts)
+
+            with self._lock:
+                # El detector puede haberse intercambiado durante el cálculo
+                current = self._check_version(model_id, model_version)
+                now = self._clock()
+                for (key, positions), result in zip(pending.items(), computed):
+                    stored = self._strip(result)
+                    if current:
+                        self._put(key, stored, now)
+                    for i in positions:
+                        results[i] = {**stored, 'text': texts[i]}
+
+        return results
+
+    def invalidate(self, model_id=None, model_version=None):
+        """
+        Elimina las entradas de un modelo (o todas).
+
+        Args:
+            model_id (str): Modelo a invalidar; None para vaciar la cache
+            model_version (str): Nueva versión actual del modelo (tras una recarga);
+                None para adoptar la primera que se use
+        """
+        with self._lock:
+            if model_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._versions.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == model_id]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+                if model_version is None:
+                    self._versions.pop(model_id, None)
+                else:
+                    self._versions[model_id] = model_version
+            self.invalidations += removed
+
+    def stats(self):
+        """
+        Contadores y ocupación de la cache.
+
+        Returns:
+            dict: Estadísticas de uso
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'bypasses': self.bypasses
+            }
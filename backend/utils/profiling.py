@@ -0,0 +1,284 @@
+"""
+Profiling por petición: desglose de tiempos por etapa y, opcionalmente, cProfile.
+
+Una petición con la cabecera X-Profile (timings o cprofile) a un endpoint
+perfilable recibe en la respuesta una cabecera Server-Timing con la
+duración de cada etapa (las mismas que /metrics: clean_text,
+preprocess_text, tfidf_transform, lr_score, bert_tokenize, bert_forward,
+youtube_fetch, ...) y un X-Profile-Id con el que recuperar el informe
+completo. Con cprofile, el informe incluye además las funciones más caras
+del trabajo ejecutado en los executors.
+
+En el event loop solo se calcula la cabecera y se guarda en memoria un
+resumen de etapas; el informe completo (resumen de cProfile) y la escritura
+en disco se hacen en un hilo, al terminar la petición.
+
+El perfil activo viaja en una ContextVar: MetricsRegistry le pasa cada
+etapa que observa, también desde los hilos de los executors (BoundedExecutor
+copia el contexto al hilo, como asyncio.to_thread).
+"""
+
+import asyncio
+import cProfile
+import contextvars
+import io
+import json
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_MODES = ('timings', 'cprofile')
+
+current_profile = contextvars.ContextVar('current_profile', default=None)
+
+
+class RequestProfile:
+    """
+    Etapas medidas durante una petición concreta.
+    """
+
+    def __init__(self, endpoint, mode='timings', sampled=False):
+        """
+        Args:
+            endpoint (str): Ruta de la petición
+            mode (str): 'timings' o 'cprofile'
+            sampled (bool): Perfilada por PROFILE_SAMPLE_RATE, no por la cabecera
+        """
+        self.id = uuid.uuid4().hex[:12]
+        self.endpoint = endpoint
+        self.mode = mode
+        self.sampled = sampled
+        self.created_at = datetime.now().isoformat(timespec='seconds')
+        self.stages = {}  # etapa -> [llamadas, segundos, textos]
+        self._lock = threading.Lock()
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else None
+        self._profiler_lock = threading.Lock()
+        self.profiled_calls = 0
+        self.unprofiled_calls = 0
+
+    def add(self, stage, seconds, items=1):
+        """Suma una ejecución de una etapa (llamado por MetricsRegistry.observe_stage)."""
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = [0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += items
+
+    def run_profiled(self, fn, *args, **kwargs):
+        """
+        Ejecuta fn bajo el cProfile de la petición.
+
+        cProfile solo mide el hilo en el que se activa y un Profile no puede
+        estar activo en dos hilos a la vez: si otra llamada de la misma
+        petición ya se está perfilando (p. ej. título y comentarios en
+        paralelo), esta se ejecuta sin perfilar y se cuenta en unprofiled_calls.
+        """
+        if self.profiler is None:
+            return fn(*args, **kwargs)
+        if not self._profiler_lock.acquire(blocking=False):
+            self.unprofiled_calls += 1
+            return fn(*args, **kwargs)
+        try:
+            self.profiled_calls += 1
+            self.profiler.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.profiler.disable()
+        finally:
+            self._profiler_lock.release()
+
+    def server_timing(self, total_seconds):
+        """
+        Valor de la cabecera Server-Timing (duraciones en ms).
+
+        Las etapas de /analyze/video se solapan (la descarga de una página
+        corre mientras se puntúa la anterior): su suma puede superar total.
+        """
+        with self._lock:
+            stages = list(self.stages.items())
+        parts = [f'total;dur={total_seconds * 1000:.2f}']
+        parts += [f'{stage};dur={seconds * 1000:.2f}' for stage, (_, seconds, _) in stages]
+        return ', '.join(parts)
+
+    def summary(self, total_seconds):
+        """
+        Informe sin el resumen de cProfile (barato: se construye en el event loop).
+
+        Returns:
+            dict: id, endpoint, modo, total y etapas en ms
+        """
+        with self._lock:
+            stages = {
+                stage: {'calls': calls, 'total_ms': round(seconds * 1000, 3), 'items': items}
+                for stage, (calls, seconds, items) in self.stages.items()
+            }
+        return {
+            'id': self.id,
+            'endpoint': self.endpoint,
+            'mode': self.mode,
+            'sampled': self.sampled,
+            'created_at': self.created_at,
+            'total_ms': round(total_seconds * 1000, 3),
+            'stages': stages
+        }
+
+    def report(self, total_seconds, top=25):
+        """
+        Informe completo de la petición.
+
+        Args:
+            total_seconds (float): Duración de la petición hasta enviar las cabeceras
+            top (int): Funciones a incluir del resumen de cProfile
+
+        Returns:
+            dict: El resumen (ver summary) y, con cprofile, las `top` funciones
+                  por tiempo acumulado
+        """
+        report = self.summary(total_seconds)
+        if self.profiler is not None:
+            report['cprofile'] = {
+                'profiled_calls': self.profiled_calls,
+                'unprofiled_calls': self.unprofiled_calls,
+                'top_cumulative': self.cprofile_summary(top)
+            }
+        return report
+
+    def cprofile_summary(self, top=25):
+        """Líneas de pstats con las `top` funciones de mayor tiempo acumulado."""
+        if not self.profiled_calls:
+            return []
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+        lines = [line.rstrip() for line in stream.getvalue().splitlines()]
+        # Desde la cabecera de columnas (ncalls tottime ...) en adelante
+        start = next((i for i, line in enumerate(lines) if line.lstrip().startswith('ncalls')), 0)
+        return [line for line in lines[start:] if line.strip()]
+
+
+class ProfileStore:
+    """
+    Últimos informes de profiling en memoria y, opcionalmente, en disco.
+    """
+
+    def __init__(self, max_entries=100, directory=None):
+        """
+        Args:
+            max_entries (int): Informes a conservar en memoria (los más recientes)
+            directory (str): Carpeta donde escribir <id>.json (y <id>.prof con
+                cprofile, para snakeviz o pstats); None = solo memoria
+        """
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, report):
+        """Guarda un informe en memoria (sustituye al anterior con el mismo id)."""
+        with self._lock:
+            self._reports[report['id']] = report
+            while len(self._reports) > self.max_entries:
+                self._reports.popitem(last=False)
+
+    def save(self, profile, report):
+        """Guarda el informe de una petición perfilada en memoria y, si hay carpeta, en disco."""
+        self.add(report)
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = self.directory / f"{report['created_at'].replace(':', '')}-{profile.id}"
+        stem.with_suffix('.json').write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        if profile.profiled_calls:
+            profile.profiler.dump_stats(str(stem.with_suffix('.prof')))
+
+    def get(self, profile_id):
+        with self._lock:
+            return self._reports.get(profile_id)
+
+    def recent(self):
+        """Resumen de los informes en memoria, del más reciente al más antiguo."""
+        with self._lock:
+            reports = list(self._reports.values())
+        return [
+            {key: report[key] for key in ('id', 'endpoint', 'mode', 'sampled', 'created_at', 'total_ms')}
+            for report in reversed(reports)
+        ]
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila las peticiones que lo piden (cabecera X-Profile)
+    o una fracción aleatoria (sample_rate, solo timings) de los endpoints indicados.
+
+    La duración total llega hasta que el endpoint envía las cabeceras de la
+    respuesta, así que solo tiene sentido en respuestas que no son streaming.
+    """
+
+    def __init__(self, app, store, paths, enabled=True, sample_rate=0.0):
+        """
+        Args:
+            app: Aplicación ASGI
+            store (ProfileStore): Dónde guardar los informes
+            paths (iterable): Rutas exactas perfilables
+            enabled (bool): Sin esto, X-Profile se ignora
+            sample_rate (float): Fracción de peticiones sin cabecera que se perfilan
+        """
+        self.app = app
+        self.store = store
+        self.paths = frozenset(paths)
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+    def _mode(self, scope):
+        """Modo pedido en X-Profile, el de muestreo o None."""
+        for name, value in scope['headers']:
+            if name == b'x-profile':
+                mode = value.decode('latin-1').strip().lower()
+                return (mode, False) if mode in PROFILE_MODES else (None, False)
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'timings', True
+        return None, False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.enabled or scope['path'] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        mode, sampled = self._mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope['path'], mode, sampled)
+        start = time.perf_counter()
+        total = None
+
+        async def send_with_timing(message):
+            nonlocal total
+            if message['type'] == 'http.response.start':
+                total = time.perf_counter() - start
+                # Solo lo barato antes de las cabeceras: cProfile y disco van después, en un hilo
+                self.store.add(profile.summary(total))
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', profile.server_timing(total).encode('latin-1')))
+                headers.append((b'x-profile-id', profile.id.encode('latin-1')))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+        if total is not None and (profile.profiler is not None or self.store.directory is not None):
+            await asyncio.to_thread(self.finish, profile, total)
+
+    def finish(self, profile, total_seconds):
+        """Construye el informe completo y lo guarda (en un hilo, fuera del event loop)."""
+        self.store.save(profile, profile.report(total_seconds))
@@ -0,0 +1,128 @@
+"""
+Agregados incrementales del análisis de comentarios de un video.
+
+Para recorrer todos los comentarios de un video (decenas de miles) sin
+guardarlos, cada página puntuada se reduce a contadores y a un min-heap de
+tamaño fijo con los N comentarios tóxicos de mayor confianza. La memoria
+es O(top_n), independiente del número de comentarios.
+"""
+
+import heapq
+
+
+class ToxicityAggregate:
+    """
+    Contadores de toxicidad y top-N de comentarios tóxicos, actualizados por páginas.
+    """
+
+    def __init__(self, top_n=10):
+        """
+        Args:
+            top_n (int): Comentarios tóxicos a conservar (los de mayor confianza)
+        """
+        self.top_n = top_n
+        self.total = 0
+        self.toxic = 0
+        self.reply_total = 0
+        self.reply_toxic = 0
+        self.escalated = 0
+        self.degraded = 0
+        # (confianza, -orden, comentario): la raíz es el peor del top; a igual
+        # confianza se conserva el que llegó antes, igual que un sort estable
+        self._heap = []
+
+    def update(self, comments, predictions, escalated=0, degraded=0):
+        """
+        Añade una página de comentarios puntuados.
+
+        Args:
+            comments (list): Comentarios del fetcher (comment_id, author, text, published_at;
+                is_reply y parent_id en las respuestas)
+            predictions (list): Predicciones alineadas con comments
+            escalated (int): Comentarios de la página escalados a DistilBERT (modo cascada)
+            degraded (int): Comentarios de la página puntuados con LR por saturación de DistilBERT
+        """
+        for comment, prediction in zip(comments, predictions):
+            index = self.total
+            self.total += 1
+            is_reply = comment.get('is_reply', False)
+            self.reply_total += is_reply
+            if prediction['prediction'] != 'hate_speech':
+                continue
+            self.toxic += 1
+            self.reply_toxic += is_reply
+            if self.top_n <= 0:
+                continue
+            key = (prediction['confidence'], -index)
+            if len(self._heap) < self.top_n:
+                heapq.heappush(self._heap, (*key, self._analyzed(comment, prediction, index)))
+            elif key > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, (*key, self._analyzed(comment, prediction, index)))
+        self.escalated += escalated
+        self.degraded += degraded
+
+    @staticmethod
+    def _analyzed(comment, prediction, index):
+        """Comentario con su predicción, en el formato de CommentAnalysis."""
+        return {
+            'comment_id': comment.get('comment_id', f'comment_{index}'),
+            'author': comment.get('author', 'Unknown'),
+            'text': comment.get('text', ''),
+            'prediction': prediction['prediction'],
+            'confidence': prediction['confidence'],
+            'is_toxic': True,
+            'published_at': str(comment.get('published_at', '')),
+            'is_reply': comment.get('is_reply', False),
+            'parent_id': comment.get('parent_id')
+        }
+
+    @property
+    def normal(self):
+        return self.total - self.toxic
+
+    @property
+    def toxicity_percentage(self):
+        return self.toxic / self.total * 100 if self.total else 0.0
+
+    @staticmethod
+    def _breakdown(total, toxic):
+        return {
+            'total': total,
+            'toxic_count': toxic,
+            'toxicity_percentage': round(toxic / total * 100, 2) if total else 0.0
+        }
+
+    def breakdown(self):
+        """Toxicidad por separado de comentarios principales y respuestas."""
+        return {
+            'top_level': self._breakdown(self.total - self.reply_total, self.toxic - self.reply_toxic),
+            'replies': self._breakdown(self.reply_total, self.reply_toxic)
+        }
+
+    def model_used(self, mode):
+        """Modelo que puntuó los comentarios: mode, 'logistic_regression' si todos se degradaron o 'mixed'."""
+        if not self.degraded:
+            return mode
+        return 'logistic_regression' if self.degraded == self.total else 'mixed'
+
+    def top_toxic(self):
+        """Top-N de comentarios tóxicos ordenados por confianza (descendente)."""
+        return [entry[2] for entry in sorted(self._heap, reverse=True)]
+
+    def snapshot(self):
+        """
+        Estado actual con los campos de YouTubeAnalysisOutput.
+
+        Returns:
+            dict: total_comments_analyzed, toxic_count, normal_count,
+                  toxicity_percentage, top_toxic_comments, breakdown y degraded_comments
+        """
+        return {
+            'total_comments_analyzed': self.total,
+            'toxic_count': self.toxic,
+            'normal_count': self.normal,
+            'toxicity_percentage': round(self.toxicity_percentage, 2),
+            'top_toxic_comments': self.top_toxic(),
+            'breakdown': self.breakdown(),
+            'degraded_comments': self.degraded
+        }
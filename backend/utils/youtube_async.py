@@ -0,0 +1,380 @@
+"""
+Cliente asíncrono de la YouTube Data API v3 sobre httpx.
+
+Alternativa a YouTubeCommentFetcher (googleapiclient + httplib2) con la misma
+interfaz, pero con corrutinas:
+    - un pool de conexiones keep-alive compartido por todas las peticiones
+      concurrentes, sin hilos
+    - reintentos con backoff exponencial (y jitter) ante 429, 5xx y errores
+      de red, respetando Retry-After
+    - un token bucket de unidades de cuota: la cuota diaria se repone de forma
+      continua y, si una llamada tendría que esperar demasiado, se rechaza con
+      QuotaExceeded en lugar de gastar la cuota del día
+    - latencia por llamada (p50/p95/máx) y contadores de reintentos y errores
+
+Coste en cuota de la API: commentThreads.list, comments.list y videos.list = 1 unidad.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from backend.utils.youtube_scraper import YouTubeCommentFetcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_ENDPOINT = "https://www.googleapis.com"
+DEFAULT_DAILY_QUOTA = 10_000
+RETRY_STATUS = {429, 500, 502, 503, 504}
+RETRY_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'backendError'}
+QUOTA_COST = {'commentThreads': 1, 'comments': 1, 'videos': 1}
+
+
+class QuotaExceeded(RuntimeError):
+    """No quedan unidades de cuota (local o de la API) para la llamada."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaBucket:
+    """
+    Token bucket de unidades de cuota.
+
+    Empieza lleno con `capacity` unidades y repone `per_day` unidades cada
+    24 h de forma continua. acquire() espera a que haya unidades, salvo que la
+    espera supere max_wait segundos: entonces lanza QuotaExceeded.
+    """
+
+    def __init__(self, per_day=DEFAULT_DAILY_QUOTA, capacity=None, max_wait=5.0,
+                 clock=time.monotonic, sleep=asyncio.sleep):
+        """
+        Args:
+            per_day (int): Unidades repuestas por día
+            capacity (int): Máximo acumulable (default: per_day)
+            max_wait (float): Espera máxima en segundos antes de rechazar
+            clock: Reloj monotónico (inyectable en tests)
+            sleep: Corrutina de espera (inyectable en tests)
+        """
+        self.per_day = per_day
+        self.capacity = capacity if capacity is not None else per_day
+        self.rate = per_day / 86_400
+        self.max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self.used = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self):
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, units=1):
+        """
+        Reserva unidades de cuota, esperando a la reposición si hace falta.
+
+        La reserva se hace de inmediato (el saldo puede quedar negativo) y la
+        espera después, así que las llamadas concurrentes no hacen cola detrás
+        de la que espera: cada una calcula su espera a partir del saldo ya
+        reservado.
+
+        Raises:
+            QuotaExceeded: Si la espera necesaria supera max_wait
+        """
+        self._refill()
+        missing = units - self._tokens
+        wait = 0.0
+        if missing > 0:
+            wait = missing / self.rate if self.rate > 0 else float('inf')
+            if wait > self.max_wait:
+                self.rejected += 1
+                raise QuotaExceeded(
+                    f"Cuota de YouTube agotada: faltan {missing:.1f} unidades", retry_after=wait
+                )
+        self._tokens -= units
+        self.used += units
+        if wait > 0:
+            try:
+                await self._sleep(wait)
+            except asyncio.CancelledError:
+                # La llamada no se hará: devolver la reserva
+                self._tokens += units
+                self.used -= units
+                raise
+
+    def stats(self):
+        return {
+            'per_day': self.per_day,
+            'available': round(max(self.available, 0.0), 1),
+            'used': self.used,
+            'rejected': self.rejected
+        }
+
+
+class LatencyRecorder:
+    """Latencias recientes y contadores por tipo de llamada."""
+
+    def __init__(self, window=1024):
+        self.window = window
+        self._latencies = {}
+        self._counters = {}
+
+    def _counter(self, name):
+        return self._counters.setdefault(name, {'calls': 0, 'retries': 0, 'errors': 0})
+
+    def record(self, name, seconds):
+        self._latencies.setdefault(name, deque(maxlen=self.window)).append(seconds)
+        self._counter(name)['calls'] += 1
+
+    def count(self, name, field):
+        self._counter(name)[field] += 1
+
+    def stats(self):
+        """Por llamada: calls, retries, errors y p50/p95/máx en ms de las últimas `window`."""
+        result = {}
+        for name, counters in self._counters.items():
+            latencies = np.array(self._latencies.get(name, ())) * 1000
+            result[name] = {
+                **counters,
+                'p50_ms': round(float(np.percentile(latencies, 50)), 2) if latencies.size else None,
+                'p95_ms': round(float(np.percentile(latencies, 95)), 2) if latencies.size else None,
+                'max_ms': round(float(latencies.max()), 2) if latencies.size else None
+            }
+        return result
+
+
+class AsyncYouTubeCommentFetcher:
+    """Extrae comentarios de YouTube con un cliente httpx asíncrono y con cuota."""
+
+    extract_video_id = staticmethod(YouTubeCommentFetcher.extract_video_id)
+    validate_url = staticmethod(YouTubeCommentFetcher.validate_url)
+    _parse_comment = staticmethod(YouTubeCommentFetcher._parse_comment)
+    _parse_reply = staticmethod(YouTubeCommentFetcher._parse_reply)
+
+    def __init__(self, api_key=None, api_endpoint=None, max_connections=20, timeout=10.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0, quota=None, transport=None):
+        """
+        Args:
+            api_key (str): API key (default: variable YOUTUBE_API_KEY)
+            api_endpoint (str): URL base (default: YOUTUBE_API_ENDPOINT o googleapis.com)
+            max_connections (int): Conexiones simultáneas del pool
+            timeout (float): Timeout por petición en segundos
+            max_retries (int): Reintentos ante 429, 5xx o errores de red
+            backoff_base (float): Primer backoff en segundos (se duplica en cada reintento)
+            backoff_max (float): Backoff máximo en segundos
+            quota (QuotaBucket): Limitador de cuota (default: 10.000 unidades/día)
+            transport: Transporte httpx alternativo (tests)
+        """
+        self.api_key = api_key or os.getenv('YOUTUBE_API_KEY')
+        self.api_endpoint = (api_endpoint or os.getenv('YOUTUBE_API_ENDPOINT') or DEFAULT_API_ENDPOINT).rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.quota = quota or QuotaBucket()
+        self.latency = LatencyRecorder()
+        self.client = httpx.AsyncClient(
+            base_url=f"{self.api_endpoint}/youtube/v3",
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            transport=transport
+        )
+        if not self.api_key:
+            logger.warning("YOUTUBE_API_KEY no configurada. El servicio no funcionará.")
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def _backoff(self, attempt, response=None):
+        """Segundos de espera antes del reintento `attempt` (desde 0)."""
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return min(float(response.headers['Retry-After']), self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    @staticmethod
+    def _error_reason(response):
+        try:
+            errors = response.json()['error']['errors']
+            return errors[0]['reason'] if errors else 'unknown'
+        except (ValueError, KeyError, IndexError, TypeError):
+            return 'unknown'
+
+    async def _get(self, resource, params):
+        """
+        GET a la API con cuota, reintentos y registro de latencia.
+
+        Returns:
+            httpx.Response: Respuesta final (2xx o error no reintentable)
+
+        Raises:
+            QuotaExceeded: Sin cuota local o la API respondió quotaExceeded
+            httpx.TransportError: Error de red tras agotar los reintentos
+        """
+        params = {**params, 'key': self.api_key}
+        for attempt in range(self.max_retries + 1):
+            await self.quota.acquire(QUOTA_COST[resource])
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(f"/{resource}", params=params)
+            except httpx.TransportError as e:
+                self.latency.record(resource, time.perf_counter() - start)
+                if attempt == self.max_retries:
+                    self.latency.count(resource, 'errors')
+                    raise
+                logger.warning(f"Error de red en {resource} ({e!r}), reintentando")
+                self.latency.count(resource, 'retries')
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            self.latency.record(resource, time.perf_counter() - start)
+
+            if response.is_success:
+                return response
+            reason = self._error_reason(response)
+            if reason in ('quotaExceeded', 'dailyLimitExceeded'):
+                self.latency.count(resource, 'errors')
+                raise QuotaExceeded("Cuota diaria de la YouTube API agotada")
+            retryable = response.status_code in RETRY_STATUS or reason in RETRY_REASONS
+            if not retryable or attempt == self.max_retries:
+                self.latency.count(resource, 'errors')
+                return response
+            logger.warning(f"YouTube API {response.status_code} ({reason}) en {resource}, reintentando")
+            self.latency.count(resource, 'retries')
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    async def iter_comment_pages(self, video_id: str, max_comments: Optional[int] = 200,
+                                 order: str = "relevance") -> AsyncIterator[List[Dict]]:
+        """
+        Itera las páginas de commentThreads.list (ver YouTubeCommentFetcher.iter_comment_pages).
+
+        Raises:
+            ValueError: Si no hay API key configurada o video no disponible
+            QuotaExceeded: Sin cuota para la siguiente página
+        """
+        if not self.api_key:
+            raise ValueError("YOUTUBE_API_KEY no configurada. Configura la variable de entorno.")
+
+        fetched = 0
+        page_token = None
+        while max_comments is None or fetched < max_comments:
+            remaining = 100 if max_comments is None else max_comments - fetched
+            params = {
+                'part': 'snippet',
+                'videoId': video_id,
+                'maxResults': min(remaining, 100),  # API permite máximo 100 por request
+                'order': order,
+                'textFormat': 'plainText'
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            response = await self._get('commentThreads', params)
+
+            if not response.is_success:
+                error_reason = self._error_reason(response)
+                if error_reason == 'videoNotFound':
+                    raise ValueError("Video no encontrado")
+                elif error_reason == 'commentsDisabled':
+                    logger.warning(f"Comentarios deshabilitados para el video {video_id}")
+                    return
+                elif error_reason == 'forbidden':
+                    raise ValueError("Video privado o restringido")
+                else:
+                    logger.error(f"Error de YouTube API: {response.status_code} {error_reason}")
+                    raise ValueError(f"Error al acceder al video: {error_reason}")
+
+            data = response.json()
+            page = [self._parse_comment(item) for item in data.get('items', [])]
+            page = page[:remaining]
+            fetched += len(page)
+            if page:
+                yield page
+
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                break
+
+    async def fetch_comments(self, video_id: str, max_comments: int = 200) -> List[Dict]:
+        """
+        Extrae comentarios de un video (todas las páginas hasta max_comments).
+
+        Returns:
+            Lista de diccionarios con comment_id, author, text y published_at
+        """
+        logger.info(f"Extrayendo hasta {max_comments} comentarios del video {video_id}")
+        comments = []
+        async for page in self.iter_comment_pages(video_id, max_comments):
+            comments.extend(page)
+        logger.info(f"Extraídos {len(comments)} comentarios del video {video_id}")
+        return comments
+
+    async def fetch_replies(self, parent_id: str, max_replies: Optional[int] = 100) -> List[Dict]:
+        """
+        Extrae las respuestas de un hilo (ver YouTubeCommentFetcher.fetch_replies).
+
+        Raises:
+            ValueError: Si no hay API key configurada
+            QuotaExceeded: Sin cuota para la siguiente página
+        """
+        if not self.api_key:
+            raise ValueError("YOUTUBE_API_KEY no configurada. Configura la variable de entorno.")
+
+        replies = []
+        page_token = None
+        while max_replies is None or len(replies) < max_replies:
+            remaining = 100 if max_replies is None else max_replies - len(replies)
+            params = {
+                'part': 'snippet',
+                'parentId': parent_id,
+                'maxResults': min(remaining, 100),
+                'textFormat': 'plainText'
+            }
+            if page_token:
+                params['pageToken'] = page_token
+            response = await self._get('comments', params)
+            if not response.is_success:
+                logger.warning(f"No se pudieron obtener las respuestas de {parent_id}: "
+                               f"{response.status_code} {self._error_reason(response)}")
+                break
+
+            data = response.json()
+            replies.extend(self._parse_reply(item) for item in data.get('items', [])[:remaining])
+            page_token = data.get('nextPageToken')
+            if not page_token:
+                break
+        return replies
+
+    async def fetch_video_title(self, video_id: str) -> str:
+        """
+        Obtiene el título de un video; ante cualquier error devuelve "Video <id>".
+        """
+        if not self.api_key:
+            logger.warning("No se puede obtener titulo: YOUTUBE_API_KEY no configurada")
+            return f"Video {video_id}"
+        try:
+            response = await self._get('videos', {'part': 'snippet', 'id': video_id})
+            items = response.json().get('items') if response.is_success else None
+            if items:
+                return items[0]['snippet']['title']
+            logger.warning(f"No se encontró informacion del video {video_id}")
+        except Exception as e:
+            logger.error(f"Error obteniendo titulo del video {video_id}: {e}")
+        return f"Video {video_id}"
+
+    def stats(self):
+        """Cuota y latencias por tipo de llamada."""
+        return {'quota': self.quota.stats(), 'calls': self.latency.stats()}
@@ -4,10 +4,12 @@ Utilidad para extraer comentarios de YouTube usando YouTube Data API v3.
 
 import re
 import os
-from typing import List, Dict, Optional
+import threading
+from typing import Iterator, List, Dict, Optional
 import logging
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +19,16 @@ class YouTubeCommentFetcher:
     def __init__(self):
         """Inicializa el cliente de YouTube Data API."""
         self.api_key = os.getenv('YOUTUBE_API_KEY')
+        # Endpoint alternativo (p. ej. un stub local para benchmarks y tests)
+        self.api_endpoint = os.getenv('YOUTUBE_API_ENDPOINT') or None
+        self.youtube = None
+        self._thread_local = threading.local()
         if not self.api_key:
             logger.warning("YOUTUBE_API_KEY no configurada. El servicio no funcionará.")
         else:
             try:
-                self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+                client_options = {'api_endpoint': self.api_endpoint} if self.api_endpoint else None
+                self.youtube = build('youtube', 'v3', developerKey=self.api_key, client_options=client_options)
                 logger.info("YouTube Data API inicializada correctamente")
             except Exception as e:
                 logger.error(f"Error al inicializar YouTube API: {str(e)}")
@@ -55,74 +62,91 @@ class YouTubeCommentFetcher:
         """Valida si una URL es de Youtube."""
         return YouTubeCommentFetcher.extract_video_id(url) is not None
     
-    def fetch_comments(self, video_id: str, max_comments: int = 200) -> List[Dict]:
+    @staticmethod
+    def _parse_comment(item: Dict) -> Dict:
+        """Convierte un commentThread de la API en el diccionario de comentario."""
+        snippet = item['snippet']['topLevelComment']['snippet']
+        return {
+            'comment_id': item['snippet']['topLevelComment']['id'],
+            'author': snippet.get('authorDisplayName', 'Unknown'),
+            'text': snippet.get('textDisplay', ''),
+            'published_at': snippet.get('publishedAt', ''),
+            'reply_count': item['snippet'].get('totalReplyCount', 0)
+        }
+    
+    @staticmethod
+    def _parse_reply(item: Dict) -> Dict:
+        """Convierte una respuesta de comments().list en el diccionario de comentario."""
+        snippet = item['snippet']
+        return {
+            'comment_id': item['id'],
+            'author': snippet.get('authorDisplayName', 'Unknown'),
+            'text': snippet.get('textDisplay', ''),
+            'published_at': snippet.get('publishedAt', ''),
+            'parent_id': snippet.get('parentId'),
+            'is_reply': True
+        }
+    
+    def _execute(self, request):
         """
-        Extrae comentarios de un video de YouTube usando YouTube Data API v3.
+        Ejecuta una request de la API con un cliente HTTP propio del hilo.
+        
+        httplib2 no es thread-safe: el título y las páginas de comentarios se
+        piden desde hilos distintos a la vez.
+        """
+        http = getattr(self._thread_local, 'http', None)
+        if http is None:
+            http = self._thread_local.http = build_http()
+        return request.execute(http=http)
+    
+    def iter_comment_pages(self, video_id: str, max_comments: Optional[int] = 200,
+                           order: str = "relevance") -> Iterator[List[Dict]]:
+        """
+        Itera las páginas de commentThreads().list sin esperar a tenerlas todas.
+        
+        Cada página se pide al avanzar el iterador, así quien consume puede
+        procesar una página mientras se descarga la siguiente.
         
         Args:
             video_id: ID del video de YouTube
-            max_comments: Número máximo de comentarios a extraer (1-200, default: 200)
+            max_comments: Número máximo de comentarios a extraer (default: 200; None = todos)
+            order: 'relevance' (más relevantes primero) o 'time' (más nuevos primero)
             
-        Returns:
-            Lista de diccionarios con los comentarios
+        Yields:
+            Lista de diccionarios con los comentarios de cada página
             
         Raises:
             ValueError: Si no hay API key configurada o video no disponible
-            HttpError: Si hay error en la API de YouTube
         """
         if not self.api_key or not self.youtube:
             raise ValueError("YOUTUBE_API_KEY no configurada. Configura la variable de entorno.")
         
         try:
-            logger.info(f"Extrayendo hasta {max_comments} comentarios del video {video_id}")
-            
-            # Llamada a la API para obtener comentarios
-            request = self.youtube.commentThreads().list(
-                part="snippet",
-                videoId=video_id,
-                maxResults=min(max_comments, 100),  # API permite máximo 100 por request
-                order="relevance",  # Comentarios más relevantes primero
-                textFormat="plainText"
-            )
-            
-            response = request.execute()
-            comments = []
-            
-            # Procesar comentarios de la respuesta
-            for item in response.get('items', []):
-                snippet = item['snippet']['topLevelComment']['snippet']
-                comments.append({
-                    'comment_id': item['snippet']['topLevelComment']['id'],
-                    'author': snippet.get('authorDisplayName', 'Unknown'),
-                    'text': snippet.get('textDisplay', ''),
-                    'published_at': snippet.get('publishedAt', '')
-                })
-            
-            # Si necesitamos más comentarios y hay más páginas disponibles
-            while len(comments) < max_comments and 'nextPageToken' in response:
-                request = self.youtube.commentThreads().list(
+            fetched = 0
+            page_token = None
+            while max_comments is None or fetched < max_comments:
+                remaining = 100 if max_comments is None else max_comments - fetched
+                params = dict(
                     part="snippet",
                     videoId=video_id,
-                    maxResults=min(max_comments - len(comments), 100),
-                    pageToken=response['nextPageToken'],
-                    order="relevance",
+                    maxResults=min(remaining, 100),  # API permite máximo 100 por request
+                    order=order,
                     textFormat="plainText"
                 )
-                response = request.execute()
+                if page_token:
+                    params['pageToken'] = page_token
+                response = self._execute(self.youtube.commentThreads().list(**params))
                 
-                for item in response.get('items', []):
-                    if len(comments) >= max_comments:
-                        break
-                    snippet = item['snippet']['topLevelComment']['snippet']
-                    comments.append({
-                        'comment_id': item['snippet']['topLevelComment']['id'],
-                        'author': snippet.get('authorDisplayName', 'Unknown'),
-                        'text': snippet.get('textDisplay', ''),
-                        'published_at': snippet.get('publishedAt', '')
-                    })
-            
-            logger.info(f"Extraídos {len(comments)} comentarios del video {video_id}")
-            return comments
+                page = [self._parse_comment(item) for item in response.get('items', [])]
+                page = page[:remaining]
+                fetched += len(page)
+                if page:
+                    yield page
+                
+                # Si necesitamos más comentarios y hay más páginas disponibles
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
             
         except HttpError as e:
             error_reason = e.error_details[0]['reason'] if e.error_details else 'unknown'
@@ -131,7 +155,7 @@ class YouTubeCommentFetcher:
                 raise ValueError("Video no encontrado")
             elif error_reason == 'commentsDisabled':
                 logger.warning(f"Comentarios deshabilitados para el video {video_id}")
-                return []
+                return
             elif error_reason == 'forbidden':
                 raise ValueError("Video privado o restringido")
             else:
@@ -141,7 +165,70 @@ class YouTubeCommentFetcher:
         except Exception as e:
             logger.error(f"Error inesperado extrayendo comentarios: {str(e)}")
             raise
+    
+    def fetch_comments(self, video_id: str, max_comments: int = 200) -> List[Dict]:
+        """
+        Extrae comentarios de un video de YouTube usando YouTube Data API v3.
+        
+        Args:
+            video_id: ID del video de YouTube
+            max_comments: Número máximo de comentarios a extraer (1-200, default: 200)
+            
+        Returns:
+            Lista de diccionarios con los comentarios
+            
+        Raises:
+            ValueError: Si no hay API key configurada o video no disponible
+            HttpError: Si hay error en la API de YouTube
+        """
+        logger.info(f"Extrayendo hasta {max_comments} comentarios del video {video_id}")
+        comments = []
+        for page in self.iter_comment_pages(video_id, max_comments):
+            comments.extend(page)
+        logger.info(f"Extraídos {len(comments)} comentarios del video {video_id}")
+        return comments
+        
+    def fetch_replies(self, parent_id: str, max_replies: Optional[int] = 100) -> List[Dict]:
+        """
+        Extrae las respuestas de un hilo con comments().list(parentId=...).
+        
+        commentThreads solo trae el comentario principal (y como mucho 5
+        respuestas con part=replies); el hilo completo requiere esta llamada.
         
+        Args:
+            parent_id: comment_id del comentario principal del hilo
+            max_replies: Número máximo de respuestas (None = todas)
+            
+        Returns:
+            Lista de respuestas (mismo formato que fetch_comments más parent_id
+            e is_reply). Si el hilo ya no existe o la API falla, las obtenidas hasta entonces.
+        """
+        if not self.api_key or not self.youtube:
+            raise ValueError("YOUTUBE_API_KEY no configurada. Configura la variable de entorno.")
+        
+        replies = []
+        page_token = None
+        try:
+            while max_replies is None or len(replies) < max_replies:
+                remaining = 100 if max_replies is None else max_replies - len(replies)
+                params = dict(
+                    part="snippet",
+                    parentId=parent_id,
+                    maxResults=min(remaining, 100),
+                    textFormat="plainText"
+                )
+                if page_token:
+                    params['pageToken'] = page_token
+                response = self._execute(self.youtube.comments().list(**params))
+                replies.extend(self._parse_reply(item) for item in response.get('items', [])[:remaining])
+                
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+        except HttpError as e:
+            logger.warning(f"No se pudieron obtener las respuestas de {parent_id}: {str(e)}")
+        return replies
+    
     def fetch_video_title(self, video_id: str) -> str:
         """
         Obtiene el título de un video de YouTube.
@@ -162,7 +249,7 @@ class YouTubeCommentFetcher:
                 id=video_id
             )
             
-            response = request.execute()
+            response = self._execute(request)
             
             if response.get('items'):
                 return response['items'][0]['snippet']['title']
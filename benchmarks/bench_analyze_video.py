@@ -0,0 +1,119 @@
+"""
+Latencia de /analyze/video: descarga y scoring secuenciales frente a pipeline.
+
+Levanta el stub local de la YouTube API (benchmarks.youtube_stub) con una
+latencia por página configurable y mide, para cada latencia:
+    - secuencial: título, luego todas las páginas, luego un predict_batch
+      (el flujo anterior del endpoint)
+    - pipeline: el endpoint actual, que pide el título en paralelo y puntúa
+      cada página mientras descarga la siguiente
+
+La cache de predicciones se desactiva para que todas las repeticiones
+ejecuten el modelo.
+
+Uso:
+    python -m benchmarks.bench_analyze_video
+    python -m benchmarks.bench_analyze_video --page-latency-ms 100 300 1000 --max-comments 200
+    python -m benchmarks.bench_analyze_video --quantize
+    python -m benchmarks.bench_analyze_video --random-weights   # sin pesos entrenados (Git LFS)
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import numpy as np
+
+from backend.api import main as api
+from backend.utils.executors import BoundedExecutor
+from backend.utils.prediction_cache import PredictionCache
+from backend.utils.youtube_scraper import YouTubeCommentFetcher
+from benchmarks.synthetic import random_weight_distilbert
+from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+VIDEO_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+async def sequential_analysis(max_comments):
+    """Flujo anterior: título, todas las páginas y después un único predict_batch."""
+    await api.run_in_pool(api.io_executor, api.youtube_fetcher.fetch_video_title, VIDEO_ID)
+    comments = await api.run_in_pool(api.io_executor, api.youtube_fetcher.fetch_comments,
+                                     VIDEO_ID, max_comments)
+    texts = [comment['text'] for comment in comments if comment.get('text')]
+    return await api.run_in_pool(api.model_executor, api.bert_predict_batch, texts)
+
+
+async def pipelined_analysis(client, max_comments):
+    """Endpoint actual."""
+    response = await client.post("/analyze/video", json={"url": VIDEO_URL, "max_comments": max_comments})
+    response.raise_for_status()
+    return response.json()
+
+
+async def time_runs(run, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await run()
+        latencies.append(time.perf_counter() - start)
+    return float(np.median(latencies))
+
+
+async def run(args):
+    model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+    from backend.models.model_loader import DistilBERTDetector
+    api.bert_detector = DistilBERTDetector(model_path=model_path, quantize=args.quantize)
+    api.prediction_cache = PredictionCache(max_size=0)
+    api.model_executor = BoundedExecutor("model", api.MODEL_EXECUTOR_WORKERS, api.MODEL_EXECUTOR_MAX_PENDING)
+    api.io_executor = BoundedExecutor("io", api.IO_EXECUTOR_WORKERS, api.IO_EXECUTOR_MAX_PENDING)
+
+    # Tiempo de CPU puro, para ver cuánto de la latencia de red se esconde
+    texts = YouTubeStub(args.max_comments).texts
+    api.bert_detector.predict_batch(texts[:16])  # warm-up
+    start = time.perf_counter()
+    api.bert_detector.predict_batch(texts)
+    cpu_seconds = time.perf_counter() - start
+
+    pages = -(-args.max_comments // 100)
+    print(f"Comentarios: {args.max_comments} ({pages} páginas) | scoring puro: {cpu_seconds * 1e3:.0f} ms")
+    print(f"{'ms/página':>10}{'red total ms':>14}{'secuencial ms':>15}{'pipeline ms':>13}{'ahorro':>9}")
+
+    os.environ['YOUTUBE_API_KEY'] = 'stub'
+    for latency in args.page_latency_ms:
+        stub = YouTubeStub(args.max_comments, page_latency_ms=latency, title_latency_ms=args.title_latency_ms)
+        server, url = start_stub_server(stub)
+        os.environ['YOUTUBE_API_ENDPOINT'] = url
+        api.youtube_fetcher = YouTubeCommentFetcher()
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench",
+                                         timeout=None) as client:
+                sequential = await time_runs(lambda: sequential_analysis(args.max_comments), args.repeats)
+                pipelined = await time_runs(lambda: pipelined_analysis(client, args.max_comments), args.repeats)
+        finally:
+            server.shutdown()
+        network = pages * latency + args.title_latency_ms
+        print(f"{latency:>10.0f}{network:>14.0f}{sequential * 1e3:>15.0f}{pipelined * 1e3:>13.0f}"
+              f"{1 - pipelined / sequential:>9.1%}")
+
+    api.model_executor.shutdown()
+    api.io_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-latency-ms', type=float, nargs='+', default=[50, 200, 500, 1000])
+    parser.add_argument('--title-latency-ms', type=float, default=150)
+    parser.add_argument('--max-comments', type=int, default=200, help='Máximo del endpoint: 200')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--quantize', action='store_true', help='DistilBERT int8 (scoring más rápido)')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Padding desperdiciado y tiempo de DistilBERT.predict_batch con y sin buckets.
+
+Compara el comportamiento anterior (un único tensor con padding=True sobre
+toda la lista) con el lote ordenado por longitud y troceado por
+max_batch_size / max_tokens_per_batch, sobre comentarios sintéticos con
+longitud lognormal (muchos cortos, cola larga hasta 128 tokens).
+
+Uso:
+    python -m benchmarks.bench_bert_batching --n 512
+    python -m benchmarks.bench_bert_batching --random-weights   # sin pesos entrenados (Git LFS)
+"""
+
+import argparse
+import time
+
+import torch
+
+from backend.models.model_loader import DistilBERTDetector
+from benchmarks.synthetic import generate_comments, random_weight_distilbert
+
+CONFIGS = ((32, 4096), (32, 2048), (16, 2048), (64, 4096))
+
+
+def legacy_predict_batch(detector, texts):
+    """predict_batch anterior: todo el lote con padding a su texto más largo."""
+    inputs = detector.tokenizer(texts, max_length=detector.max_length, truncation=True,
+                                padding=True, return_tensors="pt")
+    with torch.no_grad():
+        probs = torch.softmax(detector.model(**inputs).logits, dim=1)
+    real = int(inputs['attention_mask'].sum())
+    padded = inputs['input_ids'].numel()
+    return probs[:, 1], {'batches': 1, 'real_tokens': real, 'padded_tokens': padded,
+                         'padding_waste': 1 - real / padded, 'peak_tokens': padded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=512, help='Número de comentarios')
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    args = parser.parse_args()
+
+    model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+    detector = DistilBERTDetector(model_path=model_path)
+    texts = generate_comments(args.n)
+    detector.predict_batch(texts[:16])  # warm-up
+
+    print(f"Comentarios: {len(texts)}")
+    print(f"{'modo':<28}{'lotes':>6}{'tokens reales':>15}{'con padding':>13}{'desperdicio':>13}"
+          f"{'tokens/forward':>16}{'tiempo s':>10}")
+
+    start = time.perf_counter()
+    legacy_probas, stats = legacy_predict_batch(detector, texts)
+    seconds = time.perf_counter() - start
+    print(f"{'padding=True (anterior)':<28}{stats['batches']:>6}{stats['real_tokens']:>15,}"
+          f"{stats['padded_tokens']:>13,}{stats['padding_waste']:>13.1%}{stats['peak_tokens']:>16,}{seconds:>10.2f}")
+
+    for max_batch_size, max_tokens in CONFIGS:
+        detector.max_batch_size = max_batch_size
+        detector.max_tokens_per_batch = max_tokens
+        start = time.perf_counter()
+        results = detector.predict_batch(texts)
+        seconds = time.perf_counter() - start
+        stats = detector.last_batch_stats
+        max_diff = max(abs(r['probabilities']['hate_speech'] - p) for r, p in zip(results, legacy_probas.tolist()))
+        name = f"buckets ({max_batch_size}, {max_tokens})"
+        print(f"{name:<28}{stats['batches']:>6}{stats['real_tokens']:>15,}{stats['padded_tokens']:>13,}"
+              f"{stats['padding_waste']:>13.1%}{max_tokens:>16,}{seconds:>10.2f}   (dif. máx {max_diff:.1e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Informe offline de la cascada LR -> DistilBERT: accuracy vs throughput.
+
+Ejecuta LR y DistilBERT una sola vez sobre un corpus etiquetado y, para
+cada ancho de banda centrado en el umbral de LR, calcula la tasa de escalado,
+accuracy, F1 y el throughput estimado:
+
+    tiempo_cascada = tiempo_LR(todos) + escalados * tiempo_BERT_por_texto
+
+Uso:
+    python -m benchmarks.bench_cascade --data data/raw/youtoxic_english_1000.csv
+    python -m benchmarks.bench_cascade --data corpus.csv --text-column Text \\
+        --label-column IsToxic --widths 0 0.1 0.2 0.4 0.6 1.0
+"""
+
+import argparse
+import csv
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score, f1_score
+
+from backend.models.cascade import cascade_labels
+from backend.models.model_loader import HateSpeechDetector, DistilBERTDetector
+
+DEFAULT_WIDTHS = (0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.6, 1.0)
+
+
+def read_labelled_csv(path, text_column, label_column):
+    """Lee textos y etiquetas (True/False, 1/0) de un CSV."""
+    texts, labels = [], []
+    with open(path, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            texts.append(row[text_column] or '')
+            labels.append(1 if str(row[label_column]).strip().lower() in ('1', 'true', 'yes') else 0)
+    return texts, np.array(labels)
+
+
+def timed_predict(predict_batch, texts, batch_size):
+    """Predice en lotes y retorna (resultados, segundos)."""
+    results = []
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        results.extend(predict_batch(texts[i:i + batch_size]))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='data/raw/youtoxic_english_1000.csv', help='CSV etiquetado')
+    parser.add_argument('--text-column', default='Text', help='Columna con el comentario')
+    parser.add_argument('--label-column', default='IsToxic', help='Columna con la etiqueta')
+    parser.add_argument('--widths', type=float, nargs='+', default=DEFAULT_WIDTHS,
+                        help='Anchos de banda centrados en el umbral de LR')
+    parser.add_argument('--center', type=float, default=None, help='Centro de la banda (default: umbral LR)')
+    parser.add_argument('--batch-size', type=int, default=32, help='Tamaño de lote de DistilBERT')
+    args = parser.parse_args()
+
+    texts, labels = read_labelled_csv(args.data, args.text_column, args.label_column)
+    lr = HateSpeechDetector()
+    bert = DistilBERTDetector()
+    center = lr.threshold if args.center is None else args.center
+
+    lr_results, lr_seconds = timed_predict(lr.predict_batch, texts, len(texts))
+    bert_results, bert_seconds = timed_predict(bert.predict_batch, texts, args.batch_size)
+
+    n = len(texts)
+    lr_probas = np.array([r['confidence'] for r in lr_results])
+    lr_labels = (lr_probas >= lr.threshold).astype(int)
+    bert_labels = np.array([r['label'] for r in bert_results])
+    bert_per_text = bert_seconds / n
+
+    print(f"Comentarios: {n:,} | LR: {lr_seconds * 1e3:.1f} ms total | "
+          f"DistilBERT: {bert_per_text * 1e3:.2f} ms/comentario (lotes de {args.batch_size})")
+    print(f"{'modo':<22}{'escalado':>10}{'accuracy':>10}{'F1':>8}{'coment/s':>12}")
+    print(f"{'LR':<22}{0:>9.1%}{accuracy_score(labels, lr_labels):>10.3f}"
+          f"{f1_score(labels, lr_labels):>8.3f}{n / lr_seconds:>12,.0f}")
+    print(f"{'DistilBERT':<22}{1:>9.1%}{accuracy_score(labels, bert_labels):>10.3f}"
+          f"{f1_score(labels, bert_labels):>8.3f}{n / bert_seconds:>12,.0f}")
+
+    for width in args.widths:
+        lower = max(0.0, center - width / 2)
+        upper = min(1.0, center + width / 2)
+        predicted, mask = cascade_labels(lr_probas, bert_labels, lr.threshold, lower, upper)
+        escalated = int(mask.sum())
+        seconds = lr_seconds + escalated * bert_per_text
+        name = f"cascada [{lower:.2f}, {upper:.2f}]"
+        print(f"{name:<22}{escalated / n:>9.1%}{accuracy_score(labels, predicted):>10.3f}"
+              f"{f1_score(labels, predicted):>8.3f}{n / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Reporte del coste de importación (arranque en frío) de los módulos del backend.
+
+Ejecuta cada importación en un proceso nuevo con `python -X importtime` y
+muestra la mediana del tiempo total y los paquetes más costosos.
+
+Uso:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --repo /ruta/a/otro/checkout --runs 5
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_MODULES = ["backend.preprocessing.text_cleaner", "backend.api.main"]
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S+)")
+
+
+def measure_import(module, repo, runs=3):
+    """
+    Mide la importación de un módulo en procesos independientes.
+
+    Args:
+        module (str): Módulo a importar
+        repo (Path): Directorio raíz desde el que se importa
+        runs (int): Repeticiones
+
+    Returns:
+        dict: {'median_seconds': float, 'top': [(paquete, segundos), ...]}
+    """
+    totals = []
+    top = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=repo, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Error importando {module}:\n{proc.stderr[-2000:]}")
+
+        total = 0.0
+        by_package = {}
+        for match in IMPORTTIME_RE.finditer(proc.stderr):
+            self_seconds = int(match.group(1)) / 1e6
+            name = match.group(3)
+            if name == module:
+                total = int(match.group(2)) / 1e6
+            # Tiempo propio agregado por paquete de primer nivel
+            package = name.split('.')[0]
+            by_package[package] = by_package.get(package, 0.0) + self_seconds
+
+        totals.append(total)
+        top = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:10]
+
+    return {'median_seconds': statistics.median(totals), 'top': top}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repo', default=str(Path(__file__).resolve().parent.parent),
+                        help='Checkout del repositorio a medir')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    args = parser.parse_args()
+
+    print(f"Repositorio: {args.repo}")
+    for module in args.modules:
+        result = measure_import(module, args.repo, runs=args.runs)
+        print(f"\n{module}: {result['median_seconds']:.3f}s (mediana de {args.runs})")
+        for name, secs in result['top']:
+            print(f"  {secs:8.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
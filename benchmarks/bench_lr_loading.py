@@ -0,0 +1,93 @@
+"""
+Arranque en frío y memoria por worker del modelo LR: pickle vs artefacto npy.
+
+Lanza N workers (spawn) por formato que cargan HateSpeechDetector a la vez y
+reportan tiempo de carga, incremento de RSS y, tras cargar todos, su PSS y
+memoria privada (/proc/self/smaps_rollup). Las páginas memory-mapped del
+artefacto se comparten entre workers y solo cuentan una vez en el PSS total.
+
+Uso:
+    python -m benchmarks.bench_lr_loading --workers 4
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import time
+
+
+def read_memory_kb():
+    """Rss, Pss y memoria privada del proceso actual en kB."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return {
+        'rss': values.get('Rss', 0),
+        'pss': values.get('Pss', 0),
+        'private': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+    }
+
+
+def worker(prefer_artifact, barrier, results):
+    """Carga el detector, espera al resto de workers y reporta memoria."""
+    from backend.models.model_loader import HateSpeechDetector
+    from backend.preprocessing.text_cleaner import load_resources
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.linear_model  # noqa: F401
+
+    # Excluir del tiempo medido las importaciones comunes a ambos formatos
+    load_resources()
+
+    before = read_memory_kb()
+    start = time.perf_counter()
+    detector = HateSpeechDetector(prefer_artifact=prefer_artifact)
+    detector.predict("warm up the scorer")
+    load_seconds = time.perf_counter() - start
+    after = read_memory_kb()
+
+    barrier.wait()
+    shared = read_memory_kb()
+    results.put({
+        'format': detector.model_format,
+        'load_seconds': load_seconds,
+        'rss_delta_kb': after['rss'] - before['rss'],
+        'private_delta_kb': after['private'] - before['private'],
+        'pss_kb': shared['pss']
+    })
+    barrier.wait()
+
+
+def run(prefer_artifact, n_workers):
+    """Lanza los workers de un formato y agrega sus resultados."""
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(prefer_artifact, barrier, results))
+                 for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    for prefer_artifact in (False, True):
+        collected = run(prefer_artifact, args.workers)
+        print(f"\nFormato: {collected[0]['format']} ({args.workers} workers)")
+        print(f"  Carga (mediana):            {statistics.median(r['load_seconds'] for r in collected) * 1000:8.1f} ms")
+        print(f"  ΔRSS por worker (mediana):  {statistics.median(r['rss_delta_kb'] for r in collected):8.0f} kB")
+        print(f"  ΔPrivada por worker:        {statistics.median(r['private_delta_kb'] for r in collected):8.0f} kB")
+        print(f"  PSS por worker (mediana):   {statistics.median(r['pss_kb'] for r in collected):8.0f} kB")
+
+
+if __name__ == "__main__":
+    main()
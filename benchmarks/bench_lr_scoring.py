@@ -0,0 +1,62 @@
+"""
+Microbenchmark de scoring LR por comentario: sklearn vs scorer fusionado.
+
+Mide la latencia de transform + predict_proba frente a
+LinearTfidfScorer.predict_proba sobre textos ya preprocesados, y comprueba
+la diferencia máxima entre ambas probabilidades.
+
+Uso:
+    python -m benchmarks.bench_lr_scoring --n 20000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from backend.models.model_loader import HateSpeechDetector
+from backend.preprocessing.text_cleaner import preprocess_batch
+from benchmarks.synthetic import generate_comments
+
+
+def percentiles(latencies):
+    """p50/p99 en microsegundos."""
+    values = np.array(latencies) * 1e6
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=20_000, help='Número de comentarios')
+    args = parser.parse_args()
+
+    detector = HateSpeechDetector()
+    scorer = detector.scorer
+    texts = preprocess_batch(generate_comments(args.n), tokenizer='fast')
+
+    sklearn_latencies, fused_latencies = [], []
+    sklearn_probas, fused_probas = [], []
+    for text in texts:
+        start = time.perf_counter()
+        proba = detector.model.predict_proba(detector.vectorizer.transform([text]))[0, 1]
+        sklearn_latencies.append(time.perf_counter() - start)
+        sklearn_probas.append(proba)
+
+        start = time.perf_counter()
+        proba = scorer.predict_proba(text)
+        fused_latencies.append(time.perf_counter() - start)
+        fused_probas.append(proba)
+
+    max_diff = np.max(np.abs(np.array(sklearn_probas) - np.array(fused_probas)))
+    sk_p50, sk_p99 = percentiles(sklearn_latencies)
+    fu_p50, fu_p99 = percentiles(fused_latencies)
+
+    print(f"Comentarios: {len(texts):,}")
+    print(f"sklearn (transform + predict_proba): p50 {sk_p50:8.1f}µs  p99 {sk_p99:8.1f}µs")
+    print(f"scorer fusionado:                    p50 {fu_p50:8.1f}µs  p99 {fu_p99:8.1f}µs")
+    print(f"Speedup p50: {sk_p50 / fu_p50:.0f}x")
+    print(f"Diferencia máxima de probabilidad: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
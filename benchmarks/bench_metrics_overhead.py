@@ -0,0 +1,118 @@
+"""
+Coste de la instrumentación de /metrics sobre la latencia de las peticiones.
+
+Dos medidas:
+    - coste unitario: ns por stage() (entrar y salir) y por observe_request()
+      con el registro activo, multiplicado por las observaciones que genera
+      cada endpoint y comparado con su latencia media
+    - A/B: las mismas peticiones a /predict, /predict/batch (y
+      /predict/transformer con --bert) con las métricas activas y
+      desactivadas, en rondas alternas para repartir el ruido
+
+La cache de predicciones se desactiva para que todas las peticiones
+ejecuten el modelo.
+
+Uso:
+    python -m benchmarks.bench_metrics_overhead
+    python -m benchmarks.bench_metrics_overhead --requests 200 --rounds 10
+    python -m benchmarks.bench_metrics_overhead --bert --random-weights   # sin pesos entrenados (Git LFS)
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+import numpy as np
+
+from backend.api import main as api
+from backend.models.model_loader import HateSpeechDetector
+from backend.utils.executors import BoundedExecutor
+from backend.utils.metrics import MetricsRegistry
+from backend.utils.prediction_cache import PredictionCache
+from benchmarks.synthetic import generate_comments, random_weight_distilbert
+
+
+def unit_costs(iterations=200_000):
+    """
+    Coste medio de una observación con el registro activo.
+
+    Returns:
+        tuple: (ns por stage(), ns por observe_request())
+    """
+    registry = MetricsRegistry()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with registry.stage('bench'):
+            pass
+    stage_ns = (time.perf_counter() - start) / iterations * 1e9
+    start = time.perf_counter()
+    for _ in range(iterations):
+        registry.observe_request('POST', '/predict', 200, 0.001)
+    request_ns = (time.perf_counter() - start) / iterations * 1e9
+    return stage_ns, request_ns
+
+
+async def time_requests(client, path, bodies):
+    """Latencias de peticiones secuenciales, en segundos."""
+    latencies = []
+    for body in bodies:
+        start = time.perf_counter()
+        response = await client.post(path, json=body)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run(args):
+    api.detector = HateSpeechDetector(metrics=api.metrics)
+    api.prediction_cache = PredictionCache(max_size=0)
+    api.model_executor = BoundedExecutor("model", api.MODEL_EXECUTOR_WORKERS, api.MODEL_EXECUTOR_MAX_PENDING)
+    texts = generate_comments(args.requests * 100)
+
+    # endpoint -> (cuerpos de cada petición, etapas medidas por petición)
+    endpoints = {
+        '/predict': ([{'text': text} for text in texts[:args.requests]], 3),
+        '/predict/batch': ([{'texts': texts[i * 100:(i + 1) * 100]} for i in range(args.requests)], 4)
+    }
+    if args.bert:
+        from backend.models.model_loader import DistilBERTDetector
+        model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+        api.bert_detector = DistilBERTDetector(model_path=model_path, metrics=api.metrics)
+        endpoints['/predict/transformer'] = ([{'text': text} for text in texts[:args.requests]], 2)
+
+    stage_ns, request_ns = unit_costs()
+    print(f"Coste unitario: stage() {stage_ns:.0f} ns | observe_request() {request_ns:.0f} ns")
+    print(f"{'endpoint':>22}{'sin ms':>9}{'con ms':>9}{'A/B':>8}{'estimado':>10}")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench",
+                                 timeout=None) as client:
+        for path, (bodies, stages) in endpoints.items():
+            await time_requests(client, path, bodies[:10])  # warm-up
+            latencies = {False: [], True: []}
+            for round_index in range(args.rounds):
+                # Alternar el orden para que la deriva térmica no favorezca a ninguno
+                for enabled in ((False, True) if round_index % 2 == 0 else (True, False)):
+                    api.metrics.enabled = enabled
+                    latencies[enabled] += await time_requests(client, path, bodies)
+            off, on = np.median(latencies[False]), np.median(latencies[True])
+            estimated = (stages * stage_ns + request_ns) * 1e-9 / off
+            print(f"{path:>22}{off * 1e3:>9.3f}{on * 1e3:>9.3f}{on / off - 1:>8.2%}{estimated:>10.3%}")
+
+    api.metrics.enabled = True
+    api.model_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100, help='Peticiones por ronda y endpoint')
+    parser.add_argument('--rounds', type=int, default=6, help='Rondas (cada una con y sin métricas)')
+    parser.add_argument('--bert', action='store_true', help='Medir también /predict/transformer')
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Prueba de carga del micro-batching de DistilBERT.
+
+Simula N clientes concurrentes que envían comentarios uno a uno y compara:
+    - sin batching: un predict() por petición (forward de tamaño 1)
+    - con MicroBatcher: las peticiones concurrentes se agrupan en predict_batch
+
+Reporta throughput, latencia p50/p99 y tamaño medio de lote por nivel de
+concurrencia.
+
+Uso:
+    python -m benchmarks.bench_microbatch
+    python -m benchmarks.bench_microbatch --clients 1 8 32 128 --requests 512
+    python -m benchmarks.bench_microbatch --random-weights   # sin pesos entrenados (Git LFS)
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from backend.models.batching import MicroBatcher
+from backend.models.model_loader import DistilBERTDetector
+from benchmarks.synthetic import generate_comments, random_weight_distilbert
+
+
+async def run_clients(predict, texts, clients):
+    """
+    Lanza `clients` tareas que consumen los textos de una cola compartida.
+
+    Returns:
+        tuple: (segundos totales, lista de latencias por petición)
+    """
+    queue = asyncio.Queue()
+    for text in texts:
+        queue.put_nowait(text)
+    latencies = []
+
+    async def client():
+        while not queue.empty():
+            text = queue.get_nowait()
+            start = time.perf_counter()
+            await predict(text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+async def bench_level(detector, texts, clients, max_batch_size, max_wait_ms):
+    """Mide un nivel de concurrencia con y sin batching."""
+    loop = asyncio.get_running_loop()
+    # Un solo hilo de inferencia en ambos casos: torch ya paraleliza dentro del forward
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    async def unbatched(text):
+        return await loop.run_in_executor(executor, detector.predict, text)
+
+    base_seconds, base_latencies = await run_clients(unbatched, texts, clients)
+
+    batcher = MicroBatcher(detector.predict_batch, max_batch_size=max_batch_size,
+                           max_wait_ms=max_wait_ms, executor=executor)
+    await batcher.start()
+    batch_seconds, batch_latencies = await run_clients(batcher.submit, texts, clients)
+    stats = batcher.stats()
+    await batcher.stop()
+    executor.shutdown()
+
+    return {
+        'base': (len(texts) / base_seconds, np.percentile(base_latencies, 50), np.percentile(base_latencies, 99)),
+        'batch': (len(texts) / batch_seconds, np.percentile(batch_latencies, 50), np.percentile(batch_latencies, 99)),
+        'mean_batch_size': stats['mean_batch_size']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32, 128], help='Niveles de concurrencia')
+    parser.add_argument('--requests', type=int, default=256, help='Peticiones por nivel')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    args = parser.parse_args()
+
+    model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+    detector = DistilBERTDetector(model_path=model_path)
+    texts = generate_comments(args.requests)
+    detector.predict_batch(texts[:8])  # warm-up
+
+    print(f"Peticiones por nivel: {args.requests} | max_batch_size={args.max_batch_size} "
+          f"max_wait_ms={args.max_wait_ms}")
+    print(f"{'clientes':>9} | {'sin batching (req/s  p50  p99 ms)':>36} | "
+          f"{'micro-batching (req/s  p50  p99 ms)':>38} | lote medio")
+    for clients in args.clients:
+        result = asyncio.run(bench_level(detector, texts, clients, args.max_batch_size, args.max_wait_ms))
+        base_rps, base_p50, base_p99 = result['base']
+        batch_rps, batch_p50, batch_p99 = result['batch']
+        print(f"{clients:>9} | {base_rps:>14.1f} {base_p50 * 1e3:>9.1f} {base_p99 * 1e3:>9.1f} | "
+              f"{batch_rps:>16.1f} {batch_p50 * 1e3:>9.1f} {batch_p99 * 1e3:>9.1f} | "
+              f"{result['mean_batch_size']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+DistilBERT con ONNX Runtime frente al forward eager de torch.
+
+Exporta el checkpoint a un .onnx temporal y mide, para varios tamaños de
+lote, la latencia de predict_batch de ambos backends sobre los mismos
+comentarios sintéticos, junto con la diferencia máxima de probabilidad.
+
+Uso:
+    python -m benchmarks.bench_onnx
+    python -m benchmarks.bench_onnx --batch-sizes 1 8 32 64 --repeats 20
+    python -m benchmarks.bench_onnx --random-weights   # sin pesos entrenados (Git LFS)
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend.models.model_loader import DistilBERTDetector
+from backend.models.onnx_detector import ONNXDistilBERTDetector
+from backend.models.onnx_export import DEFAULT_MODEL_DIR, export_onnx
+from benchmarks.synthetic import generate_comments, random_weight_distilbert
+
+
+def time_batches(predict_batch, texts, batch_size, repeats):
+    """Latencias (s) de predict_batch sobre lotes consecutivos de batch_size textos."""
+    latencies = []
+    for i in range(repeats):
+        start_index = (i * batch_size) % len(texts)
+        batch = (texts[start_index:] + texts)[:batch_size]
+        start = time.perf_counter()
+        predict_batch(batch)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--repeats', type=int, default=10, help='Lotes medidos por tamaño')
+    parser.add_argument('--n', type=int, default=512, help='Comentarios sintéticos')
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    args = parser.parse_args()
+
+    model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+    model_path = Path(model_path) if model_path else DEFAULT_MODEL_DIR
+    texts = generate_comments(args.n)
+
+    start = time.perf_counter()
+    onnx_path = export_onnx(model_path, Path(tempfile.mkdtemp(prefix="distilbert-onnx-")) / "model.onnx")
+    print(f"Exportación ONNX: {time.perf_counter() - start:.1f} s")
+
+    max_batch = max(args.batch_sizes)
+    backends = {
+        'torch': DistilBERTDetector(model_path=model_path, quantize=False, max_batch_size=max_batch),
+        'onnxruntime': ONNXDistilBERTDetector(model_path=model_path, onnx_path=onnx_path, max_batch_size=max_batch)
+    }
+
+    sample = texts[:64]
+    probas = {name: np.array([r['probabilities']['hate_speech'] for r in detector.predict_batch(sample)])
+              for name, detector in backends.items()}  # también sirve de warm-up
+    max_diff = np.max(np.abs(probas['torch'] - probas['onnxruntime']))
+
+    print(f"{'lote':>6}{'backend':>14}{'p50 ms':>10}{'p99 ms':>10}{'ms/texto':>10}{'textos/s':>10}")
+    for batch_size in args.batch_sizes:
+        for name, detector in backends.items():
+            latencies = np.array(time_batches(detector.predict_batch, texts, batch_size, args.repeats))
+            p50 = np.percentile(latencies, 50) * 1e3
+            print(f"{batch_size:>6}{name:>14}{p50:>10.1f}{np.percentile(latencies, 99) * 1e3:>10.1f}"
+                  f"{p50 / batch_size:>10.2f}{batch_size / np.median(latencies):>10.1f}")
+    print(f"Diferencia máxima de probabilidad torch vs ONNX: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
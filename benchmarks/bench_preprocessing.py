@@ -0,0 +1,68 @@
+"""
+Benchmark de preprocesamiento: full_preprocess original vs preprocess_batch
+(con tokenizador NLTK y con el tokenizador rápido).
+
+Uso:
+    python -m benchmarks.bench_preprocessing --n 100000
+"""
+
+import argparse
+import time
+
+from nltk.corpus import stopwords
+from nltk.stem import PorterStemmer
+from nltk.tokenize import word_tokenize
+
+from backend.preprocessing.text_cleaner import clean_text, preprocess_batch, stem_token
+from benchmarks.synthetic import generate_comments
+
+
+def legacy_full_preprocess(text):
+    """Réplica del pipeline original (recursos reconstruidos en cada llamada)."""
+    text = clean_text(text)
+    if len(text) == 0:
+        return ''
+    tokens = word_tokenize(text)
+    stop_words = set(stopwords.words('english'))
+    tokens = [word for word in tokens if word not in stop_words]
+    stemmer = PorterStemmer()
+    return ' '.join(stemmer.stem(word) for word in tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--n', type=int, default=100_000, help='Número de comentarios sintéticos')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    comments = generate_comments(args.n, seed=args.seed)
+    print(f"Comentarios sintéticos: {len(comments):,}")
+
+    start = time.perf_counter()
+    before = [legacy_full_preprocess(text) for text in comments]
+    legacy_time = time.perf_counter() - start
+
+    stem_token.cache_clear()
+    start = time.perf_counter()
+    after = preprocess_batch(comments)
+    batch_time = time.perf_counter() - start
+
+    cache = stem_token.cache_info()
+
+    start = time.perf_counter()
+    after_fast = preprocess_batch(comments, tokenizer='fast')
+    fast_time = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(before, after) if a != b)
+    mismatches_fast = sum(1 for a, b in zip(before, after_fast) if a != b)
+
+    print(f"Antes  (full_preprocess original): {len(comments) / legacy_time:>10,.0f} comentarios/s ({legacy_time:.2f}s)")
+    print(f"Después (preprocess_batch):         {len(comments) / batch_time:>10,.0f} comentarios/s ({batch_time:.2f}s)")
+    print(f"Después (preprocess_batch fast):    {len(comments) / fast_time:>10,.0f} comentarios/s ({fast_time:.2f}s)")
+    print(f"Speedup: {legacy_time / batch_time:.1f}x (nltk), {legacy_time / fast_time:.1f}x (fast)")
+    print(f"Cache de stems: {cache.hits:,} hits, {cache.misses:,} misses, {cache.currsize:,} entradas")
+    print(f"Salidas distintas: {mismatches} (nltk), {mismatches_fast} (fast)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Throughput sostenido y memoria de /predict/stream.
+
+Llama directamente a la app ASGI (sin servidor ni cliente HTTP) con un
+cuerpo NDJSON que se genera de forma perezosa en trozos de 64 KB, y
+descarta la respuesta según llega. Así el RSS medido es el del endpoint:
+si la memoria está acotada, el pico no crece con el número de comentarios.
+
+Reporta comentarios/s, tiempo hasta la primera línea de respuesta y RSS
+(inicio y pico) para cada tamaño de entrada.
+
+Uso:
+    python -m benchmarks.bench_stream
+    python -m benchmarks.bench_stream --sizes 10000 100000 1000000 --batch-size 512
+    python -m benchmarks.bench_stream --model distilbert --sizes 2000 --random-weights
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from backend.api import main as api
+from backend.utils.executors import BoundedExecutor
+from benchmarks.eval_quantized import read_rss_kb
+from benchmarks.synthetic import generate_comments, random_weight_distilbert
+
+BODY_CHUNK_BYTES = 64 * 1024
+
+
+def ndjson_body(n, pool):
+    """Cuerpo NDJSON de n comentarios en trozos de ~64 KB, generado sobre la marcha."""
+    buffer = []
+    size = 0
+    for i in range(n):
+        line = json.dumps({'id': i, 'text': pool[i % len(pool)]}).encode('utf-8') + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= BODY_CHUNK_BYTES:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+async def stream_once(n, pool, model, batch_size):
+    """
+    Envía n comentarios a /predict/stream y consume la respuesta.
+
+    Returns:
+        dict: Segundos totales, primera línea, líneas recibidas y pico de RSS
+    """
+    body = ndjson_body(n, pool)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0', 'spec_version': '2.4'}, 'http_version': '1.1',
+        'method': 'POST', 'scheme': 'http', 'path': '/predict/stream', 'raw_path': b'/predict/stream',
+        'root_path': '', 'query_string': f'model={model}&batch_size={batch_size}'.encode(),
+        'headers': [(b'content-type', b'application/x-ndjson')],
+        'client': ('127.0.0.1', 0), 'server': ('bench', 80)
+    }
+    report = {'lines': 0, 'first_line': None, 'status': None, 'rss_peak_kb': 0}
+    start = time.perf_counter()
+
+    async def receive():
+        chunk = next(body, None)
+        if chunk is None:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        return {'type': 'http.request', 'body': chunk, 'more_body': True}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            report['status'] = message['status']
+        elif message['type'] == 'http.response.body' and message.get('body'):
+            if report['first_line'] is None:
+                report['first_line'] = time.perf_counter() - start
+            report['lines'] += message['body'].count(b"\n")
+            report['rss_peak_kb'] = max(report['rss_peak_kb'], read_rss_kb()[0])
+
+    await api.app(scope, receive, send)
+    report['seconds'] = time.perf_counter() - start
+    return report
+
+
+async def run(args):
+    pool = generate_comments(10_000)
+    if args.model == 'distilbert':
+        from backend.models.model_loader import DistilBERTDetector
+        model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+        api.bert_detector = DistilBERTDetector(model_path=model_path)
+    else:
+        from backend.models.model_loader import HateSpeechDetector
+        api.detector = HateSpeechDetector()
+    api.model_executor = BoundedExecutor("model", api.MODEL_EXECUTOR_WORKERS, api.MODEL_EXECUTOR_MAX_PENDING)
+
+    await stream_once(min(args.batch_size * 2, 1000), pool, args.model, args.batch_size)  # warm-up
+
+    print(f"Modelo: {args.model} | batch_size: {args.batch_size}")
+    print(f"{'comentarios':>12}{'segundos':>10}{'coment/s':>10}{'1ª línea ms':>13}{'RSS inicio MB':>15}{'RSS pico MB':>13}")
+    for n in args.sizes:
+        rss_start = read_rss_kb()[0]
+        report = await stream_once(n, pool, args.model, args.batch_size)
+        assert report['status'] == 200 and report['lines'] == n, report
+        print(f"{n:>12,}{report['seconds']:>10.2f}{n / report['seconds']:>10.0f}"
+              f"{report['first_line'] * 1e3:>13.1f}{rss_start / 1024:>15.0f}{report['rss_peak_kb'] / 1024:>13.0f}")
+
+    api.model_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='logistic_regression', choices=['logistic_regression', 'distilbert'])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--batch-size', type=int, default=api.STREAM_BATCH_SIZE)
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
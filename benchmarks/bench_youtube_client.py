@@ -0,0 +1,117 @@
+"""
+Cliente de YouTube: googleapiclient en el executor de I/O frente a httpx asíncrono.
+
+Contra el stub local (benchmarks.youtube_stub), lanza N análisis
+concurrentes que piden título + comentarios como /analyze/video y mide el
+tiempo total y la latencia por análisis (p50/p95) para cada concurrencia:
+    - discovery: YouTubeCommentFetcher en un BoundedExecutor de
+      IO_EXECUTOR_WORKERS hilos (lo que hace la API por defecto)
+    - async: AsyncYouTubeCommentFetcher con un pool de conexiones
+
+Con el executor, la concurrencia real está limitada a los hilos del pool (y
+por encima de max_pending la API respondería 429); el cliente asíncrono solo
+está limitado por las conexiones del pool.
+
+Uso:
+    python -m benchmarks.bench_youtube_client
+    python -m benchmarks.bench_youtube_client --concurrency 1 8 32 64 --page-latency-ms 100
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from backend.utils.executors import BoundedExecutor
+from backend.utils.youtube_async import AsyncYouTubeCommentFetcher, QuotaBucket
+from backend.utils.youtube_scraper import YouTubeCommentFetcher
+from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+async def discovery_analysis(fetcher, pool, max_comments):
+    """Título y comentarios con googleapiclient en hilos del executor."""
+    await asyncio.gather(
+        pool.run(fetcher.fetch_video_title, VIDEO_ID),
+        pool.run(fetcher.fetch_comments, VIDEO_ID, max_comments)
+    )
+
+
+async def async_analysis(fetcher, max_comments):
+    """Título y comentarios con el cliente httpx."""
+    await asyncio.gather(
+        fetcher.fetch_video_title(VIDEO_ID),
+        fetcher.fetch_comments(VIDEO_ID, max_comments)
+    )
+
+
+async def measure(analysis, concurrency):
+    """
+    Lanza `concurrency` análisis a la vez.
+
+    Returns:
+        tuple: (segundos totales, latencias por análisis en segundos)
+    """
+    async def timed():
+        start = time.perf_counter()
+        await analysis()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies
+
+
+async def run(args):
+    stub = YouTubeStub(args.max_comments, page_latency_ms=args.page_latency_ms,
+                       title_latency_ms=args.page_latency_ms)
+    server, url = start_stub_server(stub)
+    os.environ['YOUTUBE_API_KEY'] = 'stub'
+    os.environ['YOUTUBE_API_ENDPOINT'] = url
+
+    discovery = YouTubeCommentFetcher()
+    # max_pending alto: aquí se mide la cola del executor, no los 429
+    pool = BoundedExecutor("io", args.io_workers, max_pending=10_000)
+    client = AsyncYouTubeCommentFetcher(max_connections=args.max_connections,
+                                        quota=QuotaBucket(per_day=10_000_000))
+
+    pages = -(-args.max_comments // 100)
+    print(f"Stub: {args.max_comments} comentarios ({pages} páginas), {args.page_latency_ms:.0f} ms por llamada")
+    print(f"Executor: {args.io_workers} hilos | pool httpx: {args.max_connections} conexiones")
+    print(f"{'concurrencia':>12}{'cliente':>11}{'total s':>9}{'análisis/s':>12}{'p50 ms':>9}{'p95 ms':>9}")
+    try:
+        await async_analysis(client, args.max_comments)  # warm-up de conexiones
+        for concurrency in args.concurrency:
+            for name, analysis in (
+                ('discovery', lambda: discovery_analysis(discovery, pool, args.max_comments)),
+                ('async', lambda: async_analysis(client, args.max_comments))
+            ):
+                total, latencies = await measure(analysis, concurrency)
+                latencies = np.array(latencies) * 1000
+                print(f"{concurrency:>12}{name:>11}{total:>9.2f}{concurrency / total:>12.1f}"
+                      f"{np.percentile(latencies, 50):>9.0f}{np.percentile(latencies, 95):>9.0f}")
+        calls = client.stats()['calls']
+        print("Latencia por llamada (async): " + ", ".join(
+            f"{name} p50 {s['p50_ms']} ms / p95 {s['p95_ms']} ms" for name, s in calls.items()
+        ))
+    finally:
+        await client.aclose()
+        pool.shutdown()
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--page-latency-ms', type=float, default=100)
+    parser.add_argument('--max-comments', type=int, default=200)
+    parser.add_argument('--io-workers', type=int, default=int(os.getenv("IO_EXECUTOR_WORKERS", "8")))
+    parser.add_argument('--max-connections', type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Evaluación de DistilBERT int8 (cuantización dinámica) frente a fp32.
+
+Cada variante se carga en un proceso nuevo para medir su memoria de forma
+aislada. Reporta:
+    - acuerdo de etiquetas int8 vs fp32 y diferencia máxima de probabilidad
+    - F1 de cada variante y su delta (si se pasa un CSV etiquetado)
+    - latencia por comentario (p50/p99) y throughput de predict_batch
+    - RSS sirviendo comentarios individuales y pico de RSS (incluye predict_batch)
+
+Uso:
+    python -m benchmarks.eval_quantized --data data/raw/youtoxic_english_1000.csv
+    python -m benchmarks.eval_quantized --n 500                  # comentarios sintéticos, sin F1
+    python -m benchmarks.eval_quantized --random-weights --n 200 # sin pesos entrenados (Git LFS)
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import generate_comments, random_weight_distilbert
+
+
+def read_rss_kb():
+    """(RSS actual, pico de RSS) del proceso en kB según /proc/self/status."""
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('VmRSS:', 'VmHWM:')):
+                key, value = line.split(':')
+                values[key] = int(value.split()[0])
+    return values.get('VmRSS', 0), values.get('VmHWM', 0)
+
+
+def run_variant(quantize, model_path, cache_path, texts, latency_samples):
+    """Carga una variante y mide calidad, latencia y memoria (se ejecuta en un proceso aparte)."""
+    from backend.models.model_loader import DistilBERTDetector
+
+    start = time.perf_counter()
+    detector = DistilBERTDetector(model_path=model_path, quantize=quantize, quantized_cache_path=cache_path)
+    load_seconds = time.perf_counter() - start
+
+    detector.predict_batch(texts[:8])  # warm-up
+
+    latencies = []
+    for text in texts[:latency_samples]:
+        start = time.perf_counter()
+        detector.predict(text)
+        latencies.append(time.perf_counter() - start)
+    # Tras el warm-up: safetensors se mapea de forma perezosa y no cuenta hasta el primer forward
+    rss_serving, _ = read_rss_kb()
+
+    start = time.perf_counter()
+    results = detector.predict_batch(texts)
+    batch_seconds = time.perf_counter() - start
+    _, rss_peak = read_rss_kb()
+
+    return {
+        'labels': [r['label'] for r in results],
+        'probas': [r['probabilities']['hate_speech'] for r in results],
+        'load_seconds': load_seconds,
+        'p50_ms': float(np.percentile(latencies, 50) * 1e3),
+        'p99_ms': float(np.percentile(latencies, 99) * 1e3),
+        'batch_throughput': len(texts) / batch_seconds,
+        'rss_serving_mb': rss_serving / 1024,
+        'rss_peak_mb': rss_peak / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=None, help='CSV etiquetado (si no, comentarios sintéticos)')
+    parser.add_argument('--text-column', default='Text')
+    parser.add_argument('--label-column', default='IsToxic')
+    parser.add_argument('--n', type=int, default=500, help='Comentarios sintéticos si no hay --data')
+    parser.add_argument('--latency-samples', type=int, default=100, help='Comentarios para medir latencia individual')
+    parser.add_argument('--model-path', default=None, help='Carpeta del modelo DistilBERT')
+    parser.add_argument('--random-weights', action='store_true',
+                        help='Usar pesos aleatorios con la arquitectura real (mide solo rendimiento)')
+    args = parser.parse_args()
+
+    labels = None
+    if args.data:
+        from benchmarks.bench_cascade import read_labelled_csv
+        texts, labels = read_labelled_csv(args.data, args.text_column, args.label_column)
+    else:
+        texts = generate_comments(args.n)
+
+    model_path = random_weight_distilbert(args.model_path) if args.random_weights else args.model_path
+    cache_path = Path(tempfile.mkdtemp(prefix="distilbert-int8-")) / "model.int8.pt"
+
+    context = multiprocessing.get_context("spawn")
+    reports = {}
+    # int8 dos veces: la primera cuantiza y guarda la cache, la segunda carga desde disco
+    for name, quantize in (('fp32', False), ('int8 (cuantiza)', True), ('int8 (cache)', True)):
+        with context.Pool(1) as pool:
+            reports[name] = pool.apply(run_variant, (quantize, model_path, cache_path, texts, args.latency_samples))
+
+    fp32, int8 = reports['fp32'], reports['int8 (cache)']
+    agreement = np.mean(np.array(fp32['labels']) == np.array(int8['labels']))
+    max_diff = np.max(np.abs(np.array(fp32['probas']) - np.array(int8['probas'])))
+
+    print(f"Comentarios: {len(texts):,}")
+    print(f"{'variante':<18}{'carga s':>9}{'p50 ms':>9}{'p99 ms':>9}{'lote c/s':>10}{'RSS MB':>9}{'pico MB':>9}")
+    for name, report in reports.items():
+        print(f"{name:<18}{report['load_seconds']:>9.2f}{report['p50_ms']:>9.1f}{report['p99_ms']:>9.1f}"
+              f"{report['batch_throughput']:>10.1f}{report['rss_serving_mb']:>9.0f}{report['rss_peak_mb']:>9.0f}")
+    print(f"Acuerdo int8 vs fp32: {agreement:.2%} | diferencia máxima de probabilidad: {max_diff:.4f}")
+
+    if labels is not None:
+        from sklearn.metrics import f1_score
+        f1_fp32 = f1_score(labels, fp32['labels'])
+        f1_int8 = f1_score(labels, int8['labels'])
+        print(f"F1 fp32: {f1_fp32:.4f} | F1 int8: {f1_int8:.4f} | delta: {f1_int8 - f1_fp32:+.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Generador de comentarios sintéticos para los benchmarks.
+
+Los comentarios de YouTube siguen una distribución de Zipf: unas pocas
+palabras concentran la mayoría de apariciones. El generador reproduce esa
+forma mezclando vocabulario real con palabras aleatorias de cola larga,
+mayúsculas, puntuación, números, emojis y URLs.
+"""
+
+import random
+import string
+
+COMMON_WORDS = (
+    "the you i to and a is it this of that in video so for my your are not "
+    "love like just hate great people what be on have all no but with they "
+    "stupid idiot die go kill trash worthless thanks amazing song music "
+    "really good bad best worst ever watch watching watched funny lol omg "
+    "why who would should could never always everyone nobody disgusting "
+    "beautiful awesome terrible shut up dumb ugly fake real channel subscribe "
+    "comments commenting running runs runner happy sad angry racist women men"
+).split()
+
+DECORATIONS = ["!", "!!!", "?", "...", ",", " 😡", " 😂", " ❤️", " 2024", " 100%"]
+
+
+def _long_tail_words(rng, n):
+    """Palabras pseudoaleatorias para la cola larga del vocabulario."""
+    words = []
+    for _ in range(n):
+        length = rng.randint(3, 10)
+        words.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return words
+
+
+def generate_comments(n, seed=42, vocab_size=20_000):
+    """
+    Genera comentarios sintéticos con vocabulario Zipfiano.
+
+    Args:
+        n (int): Número de comentarios
+        seed (int): Semilla para reproducibilidad
+        vocab_size (int): Tamaño del vocabulario total
+
+    Returns:
+        list: Lista de strings
+    """
+    rng = random.Random(seed)
+    vocab = COMMON_WORDS + _long_tail_words(rng, vocab_size - len(COMMON_WORDS))
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(vocab) + 1):
+        total += 1.0 / rank
+        cum_weights.append(total)
+
+    comments = []
+    for _ in range(n):
+        length = max(1, int(rng.lognormvariate(2.3, 0.7)))
+        words = rng.choices(vocab, cum_weights=cum_weights, k=length)
+        words = [w.upper() if rng.random() < 0.05 else w for w in words]
+        text = ' '.join(words)
+        if rng.random() < 0.5:
+            text += rng.choice(DECORATIONS)
+        if rng.random() < 0.03:
+            text += " http://spam.example.com/" + str(rng.randint(0, 999))
+        comments.append(text)
+    return comments
+
+
+def random_weight_distilbert(model_path=None, output_dir=None):
+    """
+    Crea una copia del modelo DistilBERT con pesos aleatorios.
+
+    Tiene la misma arquitectura y tokenizer que el modelo real, así que sirve
+    para medir latencia y memoria cuando los pesos entrenados no están
+    disponibles (p. ej. checkout sin Git LFS). Las predicciones no tienen
+    sentido.
+
+    Args:
+        model_path (str | Path): Carpeta del modelo real (config + tokenizer)
+        output_dir (str | Path): Carpeta destino (default: directorio temporal)
+
+    Returns:
+        Path: Carpeta utilizable como DistilBERTDetector(model_path=...)
+    """
+    import shutil
+    import tempfile
+    from pathlib import Path
+
+    import torch
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    model_path = Path(model_path or Path(__file__).parent.parent / "backend" / "models" / "distilbert-hate-speech")
+    output_dir = Path(output_dir or tempfile.mkdtemp(prefix="distilbert-random-"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    torch.manual_seed(0)
+    model = AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(str(model_path)))
+    model.save_pretrained(str(output_dir))
+    for name in ("tokenizer.json", "tokenizer_config.json", "special_tokens_map.json", "vocab.txt"):
+        if (model_path / name).exists():
+            shutil.copy(model_path / name, output_dir / name)
+    return output_dir
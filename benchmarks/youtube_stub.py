@@ -0,0 +1,222 @@
+"""
+Stub local de la YouTube Data API v3 para benchmarks y tests.
+
+Sirve /youtube/v3/commentThreads (paginado con nextPageToken),
+/youtube/v3/comments (respuestas de un hilo, con parentId) y
+/youtube/v3/videos con comentarios sintéticos y una latencia configurable
+por página, de modo que se puede medir el endpoint /analyze/video sin red
+ni cuota. El fetcher se apunta al stub con YOUTUBE_API_ENDPOINT.
+
+fail_next() encola respuestas de error con el formato de la API de Google
+(429, 5xx, videoNotFound...) para probar reintentos y el mapeo de errores.
+
+Uso:
+    python -m benchmarks.youtube_stub --port 8765 --page-latency-ms 300
+    YOUTUBE_API_KEY=stub YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765 uvicorn backend.api.main:app
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import generate_comments
+
+# Fecha del primer comentario; cada comentario siguiente es un segundo posterior
+FIRST_COMMENT_AT = datetime(2024, 1, 1)
+
+
+class YouTubeStub:
+    """
+    Estado del stub: comentarios por video, latencias y contadores de peticiones.
+    """
+
+    def __init__(self, total_comments=500, page_latency_ms=200.0, title_latency_ms=100.0, seed=42,
+                 reply_every=0, replies_per_thread=3):
+        """
+        Args:
+            total_comments (int): Comentarios disponibles por video
+            page_latency_ms (float): Latencia de cada página de commentThreads y de comments
+            title_latency_ms (float): Latencia de videos().list
+            seed (int): Semilla de los comentarios sintéticos
+            reply_every (int): Uno de cada reply_every hilos tiene respuestas (0 = ninguno)
+            replies_per_thread (int): Respuestas de cada hilo con respuestas
+        """
+        self.texts = generate_comments(total_comments, seed=seed)
+        self.reply_texts = generate_comments(max(replies_per_thread, 1) * 50, seed=seed + 1)
+        self.reply_every = reply_every
+        self.replies_per_thread = replies_per_thread
+        self.page_latency = page_latency_ms / 1000
+        self.title_latency = title_latency_ms / 1000
+        self.requests = {'commentThreads': 0, 'comments': 0, 'videos': 0}
+        # Peticiones simultáneas por recurso (actual y máximo observado)
+        self.in_flight = dict.fromkeys(self.requests, 0)
+        self.max_in_flight = dict.fromkeys(self.requests, 0)
+        self._failures = []
+        self._lock = threading.Lock()
+
+    def fail_next(self, status, count=1, reason='backendError'):
+        """Las próximas `count` peticiones responden con el error `status` y `reason`."""
+        with self._lock:
+            self._failures.extend([(status, reason)] * count)
+
+    def pop_failure(self):
+        """Siguiente error encolado o None."""
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def add_comments(self, texts):
+        """Publica comentarios nuevos (posteriores a todos los existentes)."""
+        with self._lock:
+            self.texts = self.texts + list(texts)
+
+    def reply_count(self, i):
+        """Respuestas del hilo i."""
+        return self.replies_per_thread if self.reply_every and i % self.reply_every == 0 else 0
+
+    def comment_threads(self, params):
+        """
+        Respuesta de commentThreads().list para un pageToken (offset) y maxResults.
+        
+        Con order=time los comentarios van del más nuevo al más antiguo, como en la API.
+        """
+        offset = int(params.get('pageToken', '0') or 0)
+        max_results = min(int(params.get('maxResults', '20')), 100)
+        video_id = params.get('videoId', 'video')
+        total = len(self.texts)
+        newest_first = params.get('order') == 'time'
+        items = []
+        for position in range(offset, min(offset + max_results, total)):
+            i = total - 1 - position if newest_first else position
+            items.append({
+                'id': f'{video_id}-{i}',
+                'snippet': {'totalReplyCount': self.reply_count(i), 'topLevelComment': {'id': f'{video_id}-{i}', 'snippet': {
+                    'authorDisplayName': f'user{i}',
+                    'textDisplay': self.texts[i],
+                    'publishedAt': (FIRST_COMMENT_AT + timedelta(seconds=i)).strftime('%Y-%m-%dT%H:%M:%SZ')
+                }}}
+            })
+        response = {'items': items}
+        if offset + max_results < total:
+            response['nextPageToken'] = str(offset + max_results)
+        return response
+
+    def comments(self, params):
+        """Respuesta de comments().list(parentId=...) paginada con pageToken (offset)."""
+        parent_id = params.get('parentId', '')
+        i = int(parent_id.rsplit('-', 1)[-1]) if parent_id.rsplit('-', 1)[-1].isdigit() else -1
+        total = self.reply_count(i) if i >= 0 else 0
+        offset = int(params.get('pageToken', '0') or 0)
+        max_results = min(int(params.get('maxResults', '20')), 100)
+        items = []
+        for r in range(offset, min(offset + max_results, total)):
+            items.append({
+                'id': f'{parent_id}.r{r}',
+                'snippet': {
+                    'parentId': parent_id,
+                    'authorDisplayName': f'replier{r}',
+                    'textDisplay': self.reply_texts[(i * self.replies_per_thread + r) % len(self.reply_texts)],
+                    'publishedAt': (FIRST_COMMENT_AT + timedelta(seconds=i, milliseconds=r + 1)).strftime(
+                        '%Y-%m-%dT%H:%M:%S.%fZ')
+                }
+            })
+        response = {'items': items}
+        if offset + max_results < total:
+            response['nextPageToken'] = str(offset + max_results)
+        return response
+
+    def videos(self, params):
+        """Respuesta de videos().list."""
+        return {'items': [{'snippet': {'title': f"Stub video {params.get('id', '')}"}}]}
+
+
+def _make_handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, como la API real: los clientes reutilizan conexiones
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            resource = url.path.rstrip('/').rsplit('/', 1)[-1]
+            if resource == 'commentThreads':
+                latency, body = stub.page_latency, stub.comment_threads(params)
+            elif resource == 'comments':
+                latency, body = stub.page_latency, stub.comments(params)
+            elif resource == 'videos':
+                latency, body = stub.title_latency, stub.videos(params)
+            else:
+                self.send_error(404)
+                return
+            with stub._lock:
+                stub.requests[resource] += 1
+                stub.in_flight[resource] += 1
+                stub.max_in_flight[resource] = max(stub.max_in_flight[resource], stub.in_flight[resource])
+            time.sleep(latency)
+            with stub._lock:
+                stub.in_flight[resource] -= 1
+            status = 200
+            failure = stub.pop_failure()
+            if failure is not None:
+                status, reason = failure
+                body = {'error': {'code': status, 'message': reason,
+                                  'errors': [{'reason': reason, 'message': reason}]}}
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            if status == 429:
+                self.send_header('Retry-After', '0')
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # El backlog por defecto (5) descarta conexiones bajo concurrencia y el
+    # cliente las reintenta al cabo de 1 s: mediría el stub, no el cliente
+    request_queue_size = 1024
+
+
+def start_stub_server(stub, host='127.0.0.1', port=0):
+    """
+    Arranca el stub en un hilo daemon.
+
+    Returns:
+        tuple: (servidor, URL base para YOUTUBE_API_ENDPOINT)
+    """
+    server = _StubServer((host, port), _make_handler(stub))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--comments', type=int, default=500, help='Comentarios por video')
+    parser.add_argument('--page-latency-ms', type=float, default=200.0)
+    parser.add_argument('--title-latency-ms', type=float, default=100.0)
+    parser.add_argument('--reply-every', type=int, default=0, help='Uno de cada N hilos tiene respuestas')
+    parser.add_argument('--replies-per-thread', type=int, default=3)
+    args = parser.parse_args()
+
+    stub = YouTubeStub(args.comments, args.page_latency_ms, args.title_latency_ms,
+                       reply_every=args.reply_every, replies_per_thread=args.replies_per_thread)
+    server, url = start_stub_server(stub, port=args.port)
+    print(f"🧪 Stub de YouTube API en {url} (página: {args.page_latency_ms} ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import confetti from 'canvas-confetti' 
 import api from '../services/api'
 
@@ -15,6 +15,57 @@ function VideoAnalyzer() {
   const [loading, setLoading] = useState(false)
   const [result, setResult] = useState(null)
   const [error, setError] = useState(null)
+  const [analyzeAll, setAnalyzeAll] = useState(false)
+  const [includeReplies, setIncludeReplies] = useState(false)
+  const stopStreamRef = useRef(null)
+
+  // Cerrar el stream si el componente se desmonta a mitad de análisis
+  useEffect(() => () => stopStreamRef.current?.(), [])
+
+  const celebrateIfClean = (response) => {
+    // Confetti si NO hay comentarios tóxicos
+    if (response.toxic_count === 0) {
+      confetti({
+        particleCount: 150,
+        spread: 90,
+        origin: { y: 0.6 },
+        startVelocity: 45,
+        decay: 0.91,
+        scalar: 1.2,
+        ticks: 200,
+        colors: ['#10b981', '#34d399', '#6ee7b7', '#a7f3d0']
+      });
+    }
+  }
+
+  // Todos los comentarios: los resultados se actualizan con cada página recibida
+  const analyzeAllComments = () => {
+    stopStreamRef.current = api.streamVideoAnalysis(url, { includeReplies }, {
+      onProgress: (progress) => setResult((prev) => ({
+        ...progress,
+        video_title: progress.video_title || prev?.video_title || 'Analizando...',
+        in_progress: true
+      })),
+      onDone: (final) => {
+        stopStreamRef.current = null
+        setResult(final)
+        setLoading(false)
+        celebrateIfClean(final)
+      },
+      onError: (detail) => {
+        stopStreamRef.current = null
+        setError(detail)
+        setLoading(false)
+      }
+    })
+  }
+
+  const stopStream = () => {
+    stopStreamRef.current?.()
+    stopStreamRef.current = null
+    setResult((prev) => prev && { ...prev, in_progress: false, stopped: true })
+    setLoading(false)
+  }
 
   const handleAnalyze = async (e) => {
     e.preventDefault()
@@ -22,23 +73,15 @@ function VideoAnalyzer() {
     setError(null)
     setResult(null)
 
+    if (analyzeAll) {
+      analyzeAllComments()
+      return
+    }
+
     try {
-      const response = await api.analyzeVideo(url, maxComments)
+      const response = await api.analyzeVideo(url, maxComments, includeReplies)
       setResult(response)
-      
-      // Confetti si NO hay comentarios tóxicos
-      if (response.toxic_count === 0) {
-        confetti({
-          particleCount: 150,
-          spread: 90,
-          origin: { y: 0.6 },
-          startVelocity: 45,
-          decay: 0.91,
-          scalar: 1.2,
-          ticks: 200,
-          colors: ['#10b981', '#34d399', '#6ee7b7', '#a7f3d0']
-        });
-      }
+      celebrateIfClean(response)
       
     } catch (err) {
       setError(err.response?.data?.detail || 'Error al analizar el video')
@@ -98,12 +141,31 @@ function VideoAnalyzer() {
             max="200"
             value={maxComments}
             onChange={(e) => setMaxComments(Number(e.target.value))}
+            disabled={analyzeAll}
             className="w-full h-2 bg-gray-700 rounded-lg appearance-none cursor-pointer accent-purple-600"
           />
           <div className="flex justify-between text-xs text-gray-500 mt-1">
             <span>10</span>
             <span>200</span>
           </div>
+          <label className="flex items-center gap-2 mt-3 text-sm text-gray-300 cursor-pointer">
+            <input
+              type="checkbox"
+              checked={analyzeAll}
+              onChange={(e) => setAnalyzeAll(e.target.checked)}
+              className="accent-purple-600"
+            />
+            Analizar todos los comentarios (resultados en vivo)
+          </label>
+          <label className="flex items-center gap-2 mt-2 text-sm text-gray-300 cursor-pointer">
+            <input
+              type="checkbox"
+              checked={includeReplies}
+              onChange={(e) => setIncludeReplies(e.target.checked)}
+              className="accent-purple-600"
+            />
+            Incluir respuestas de cada hilo
+          </label>
         </div>
 
         <button
@@ -117,12 +179,23 @@ function VideoAnalyzer() {
                 <circle className="opacity-25" cx="12" cy="12" r="10" stroke="currentColor" strokeWidth="4"></circle>
                 <path className="opacity-75" fill="currentColor" d="M4 12a8 8 0 018-8V0C5.373 0 0 5.373 0 12h4zm2 5.291A7.962 7.962 0 014 12H0c0 3.042 1.135 5.824 3 7.938l3-2.647z"></path>
               </svg>
-              Analizando comentarios...
+              {result?.in_progress
+                ? `Analizando... ${result.total_comments_analyzed.toLocaleString('es-ES')} comentarios`
+                : 'Analizando comentarios...'}
             </span>
           ) : (
             '🔍 Analizar Video'
           )}
         </button>
+        {loading && analyzeAll && (
+          <button
+            type="button"
+            onClick={stopStream}
+            className="w-full bg-gray-700 hover:bg-gray-600 text-gray-200 font-semibold py-2 px-6 rounded-lg transition-colors"
+          >
+            ⏹ Detener análisis
+          </button>
+        )}
       </form>
 
       {error && (
@@ -136,6 +209,11 @@ function VideoAnalyzer() {
           <div className="text-center">
             <h2 className="text-2xl font-bold text-white mb-2">📊 Resultados del Análisis</h2>
             <h3 className="text-lg text-gray-300">{result.video_title}</h3>
+            {(result.in_progress || result.stopped) && (
+              <p className="text-sm text-purple-300 mt-1">
+                {result.in_progress ? '⏳ Resultados parciales, el análisis continúa' : '⏹ Análisis detenido: resultados parciales'}
+              </p>
+            )}
           </div>
 
           <div className="grid grid-cols-2 md:grid-cols-4 gap-4">
@@ -157,6 +235,31 @@ function VideoAnalyzer() {
             </div>
           </div>
 
+          {/* Comentarios puntuados con LR porque DistilBERT estaba saturado */}
+          {result.degraded_comments > 0 && (
+            <div className="bg-yellow-900/40 border border-yellow-700 rounded-lg p-3 text-sm text-yellow-200">
+              ⚠️ Servidor saturado: {result.degraded_comments} de {result.total_comments_analyzed} comentarios
+              se analizaron con Logistic Regression en lugar de DistilBERT.
+            </div>
+          )}
+
+          {/* Toxicidad de comentarios principales frente a respuestas */}
+          {result.include_replies && result.breakdown && (
+            <div className="grid grid-cols-2 gap-4">
+              {[['top_level', '💬 Comentarios principales'], ['replies', '↩️ Respuestas']].map(([key, label]) => (
+                <div key={key} className="bg-gray-700 rounded-lg p-4 text-center">
+                  <div className="text-sm text-gray-400 mb-1">{label}</div>
+                  <div className="text-2xl font-bold text-white">
+                    {result.breakdown[key].toxicity_percentage.toFixed(1)}%
+                  </div>
+                  <div className="text-xs text-gray-400 mt-1">
+                    {result.breakdown[key].toxic_count} tóxicos de {result.breakdown[key].total}
+                  </div>
+                </div>
+              ))}
+            </div>
+          )}
+
           {/* Barra de progreso de toxicidad */}
           <div className="bg-gray-700 rounded-full h-6 overflow-hidden">
             <div 
@@ -197,6 +300,9 @@ function VideoAnalyzer() {
                             #{index + 1}
                           </span>
                           <span className="text-gray-300 font-medium">{comment.author}</span>
+                          {comment.is_reply && (
+                            <span className="text-xs text-gray-400 bg-gray-800 px-2 py-0.5 rounded-full">↩️ respuesta</span>
+                          )}
                         </div>
                         <span className="text-red-400 text-sm font-semibold bg-red-900 bg-opacity-50 px-3 py-1 rounded-full">
                           {(comment.confidence * 100).toFixed(1)}% confianza
@@ -3,6 +3,7 @@ import api from '../services/api'
 
 function ModelMetrics() {
   const [health, setHealth] = useState(null)
+  const [latency, setLatency] = useState(null)
   const [loading, setLoading] = useState(true)
 
   useEffect(() => {
@@ -19,6 +20,22 @@ function ModelMetrics() {
     fetchHealth()
   }, [])
 
+  // Latencias medidas por la API (/metrics), refrescadas cada 10 s
+  useEffect(() => {
+    const fetchLatency = async () => {
+      try {
+        setLatency(await api.getMetrics())
+      } catch (err) {
+        console.error('Error fetching metrics:', err)
+      }
+    }
+    fetchLatency()
+    const interval = setInterval(fetchLatency, 10000)
+    return () => clearInterval(interval)
+  }, [])
+
+  const formatMs = (value) => (value === null || value === undefined ? '—' : `${value.toFixed(1)} ms`)
+
   // Métricas reales de DistilBERT (del README)
   const distilbertMetrics = {
     test_accuracy: 88.33,
@@ -83,6 +100,64 @@ function ModelMetrics() {
         </div>
       )}
 
+      {/* Latencias en producción */}
+      {latency && latency.enabled && (
+        <div className="bg-gray-800 rounded-xl p-6 overflow-x-auto">
+          <h2 className="text-2xl font-bold text-white mb-2">⏱️ Latencias en vivo</h2>
+          <p className="text-gray-400 text-sm mb-6">
+            Desde el arranque de la API ({Math.round(latency.uptime_seconds / 60)} min) · percentiles estimados por histograma
+          </p>
+          <div className="grid lg:grid-cols-2 gap-6">
+            <table className="w-full text-left text-sm">
+              <thead>
+                <tr className="border-b border-gray-700 text-gray-400">
+                  <th className="pb-2">Endpoint</th>
+                  <th className="pb-2 text-right">Peticiones</th>
+                  <th className="pb-2 text-right">Errores</th>
+                  <th className="pb-2 text-right">p50</th>
+                  <th className="pb-2 text-right">p95</th>
+                </tr>
+              </thead>
+              <tbody className="text-white">
+                {Object.entries(latency.endpoints)
+                  .sort(([, a], [, b]) => b.requests - a.requests)
+                  .map(([endpoint, m]) => (
+                    <tr key={endpoint} className="border-b border-gray-700">
+                      <td className="py-2 font-mono text-xs">{endpoint}</td>
+                      <td className="text-right">{m.requests}</td>
+                      <td className={`text-right ${m.errors ? 'text-red-400' : ''}`}>{m.errors}</td>
+                      <td className="text-right">{formatMs(m.p50_ms)}</td>
+                      <td className="text-right">{formatMs(m.p95_ms)}</td>
+                    </tr>
+                  ))}
+              </tbody>
+            </table>
+            <table className="w-full text-left text-sm">
+              <thead>
+                <tr className="border-b border-gray-700 text-gray-400">
+                  <th className="pb-2">Etapa</th>
+                  <th className="pb-2 text-right">Textos</th>
+                  <th className="pb-2 text-right">Media</th>
+                  <th className="pb-2 text-right">p50</th>
+                  <th className="pb-2 text-right">p95</th>
+                </tr>
+              </thead>
+              <tbody className="text-white">
+                {Object.entries(latency.stages).map(([stage, m]) => (
+                  <tr key={stage} className="border-b border-gray-700">
+                    <td className="py-2 font-mono text-xs">{stage}</td>
+                    <td className="text-right">{m.items}</td>
+                    <td className="text-right">{formatMs(m.mean_ms)}</td>
+                    <td className="text-right">{formatMs(m.p50_ms)}</td>
+                    <td className="text-right">{formatMs(m.p95_ms)}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        </div>
+      )}
+
       {/* Comparación DistilBERT vs LR */}
       <div className="grid md:grid-cols-2 gap-6">
         {/* DistilBERT */}
@@ -3,14 +3,35 @@ import axios from 'axios'
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8001'
 
 const api = {
-  analyzeVideo: async (url, maxComments = 50) => {
+  analyzeVideo: async (url, maxComments = 50, includeReplies = false) => {
     const response = await axios.post(`${API_BASE_URL}/analyze/video`, {
       url,
-      max_comments: maxComments
+      max_comments: maxComments,
+      include_replies: includeReplies
     })
     return response.data
   },
 
+  // Análisis de todos los comentarios por server-sent events.
+  // Devuelve una función para cerrar el stream.
+  streamVideoAnalysis: (url, { maxComments = null, topN = 10, mode = 'distilbert', includeReplies = false } = {}, handlers = {}) => {
+    const params = new URLSearchParams({ url, top_n: topN, mode, include_replies: includeReplies })
+    if (maxComments) params.set('max_comments', maxComments)
+    const source = new EventSource(`${API_BASE_URL}/analyze/video/stream?${params}`)
+
+    source.addEventListener('progress', (e) => handlers.onProgress?.(JSON.parse(e.data)))
+    source.addEventListener('done', (e) => {
+      source.close()
+      handlers.onDone?.(JSON.parse(e.data))
+    })
+    source.addEventListener('error', (e) => {
+      source.close()
+      // Evento 'error' del servidor (con datos) o fallo de conexión de EventSource
+      handlers.onError?.(e.data ? JSON.parse(e.data).detail : 'Conexión interrumpida con el servidor')
+    })
+    return () => source.close()
+  },
+
   predictText: async (text) => {
     const response = await axios.post(`${API_BASE_URL}/predict/transformer`, {
       text
@@ -19,7 +40,7 @@ const api = {
   },
 
   getMetrics: async () => {
-    const response = await axios.get(`${API_BASE_URL}/metrics`)
+    const response = await axios.get(`${API_BASE_URL}/metrics`, { params: { format: 'json' } })
     return response.data
   },
 
@@ -103,7 +103,23 @@ class TestPredictionEndpoints:
         assert "comparison" in data
         assert "agreement" in data["comparison"]
         assert "recommended_model" in data["comparison"]
-    
+
+    def test_predict_compare_batch_endpoint(self, test_client):
+        """Debe comparar ambos modelos por texto y resumir el acuerdo y los tiempos del lote."""
+        texts = [f"comparison text {i}" for i in range(150)] + ["You are an idiot"]
+        response = test_client.post("/predict/compare/batch", json={"texts": texts})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(texts)
+        assert [r["text"] for r in data["results"]] == texts
+        summary = data["summary"]
+        assert summary["agreements"] + summary["disagreements"] == len(texts)
+        assert len(summary["disagreement_indices"]) == summary["disagreements"]
+        timing = data["timing"]
+        assert timing["sum_ms"] == pytest.approx(timing["lr_ms"] + timing["bert_ms"], abs=0.02)
+        assert timing["wall_ms"] > 0
+
     def test_predict_batch_endpoint(self, test_client):
         """Debe predecir múltiples textos."""
         response = test_client.post(
@@ -170,4 +186,452 @@ class TestCORS:
         response = test_client.options("/predict")
         
         # TestClient no siempre muestra headers CORS, pero no debe fallar
-        assert response.status_code in [200, 405]
\ No newline at end of file
+        assert response.status_code in [200, 405]
+
+class TestPredictionCacheEndpoint:
+    """Tests para la cache de predicciones."""
+
+    def test_cache_stats_endpoint(self, test_client):
+        """Una predicción repetida debe contar como hit."""
+        before = test_client.get("/cache/stats").json()
+        test_client.post("/predict", json={"text": "cache endpoint test"})
+        test_client.post("/predict", json={"text": "cache  endpoint test"})
+        after = test_client.get("/cache/stats").json()
+
+        assert after["enabled"] is True
+        assert after["hits"] >= before["hits"] + 1
+
+
+class TestMetricsEndpoint:
+    """Tests para las métricas de latencia (/metrics)."""
+
+    def test_metrics_prometheus_and_json(self, test_client):
+        """Cuenta las peticiones por plantilla de ruta y mide las etapas del modelo LR."""
+        test_client.post("/predict/batch", json={"texts": ["metrics stage test", "you idiot metrics"]})
+        test_client.get("/no/existe/123")
+
+        response = test_client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'endpoint="/predict/batch",status="200"' in text
+        assert 'endpoint="unmatched",status="404"' in text
+        assert "/no/existe/123" not in text
+        assert 'hate_speech_stage_duration_seconds_count{stage="tfidf_transform"}' in text
+
+        data = test_client.get("/metrics", params={"format": "json"}).json()
+        assert data["endpoints"]["POST /predict/batch"]["requests"] >= 1
+        assert data["endpoints"]["POST /predict/batch"]["p95_ms"] is not None
+        assert data["stages"]["lr_score"]["items"] >= 1
+        assert data["predictions"]["lr_predictions"] >= 2
+
+    def test_metrics_invalid_format(self, test_client):
+        """Un formato desconocido debe retornar 422."""
+        assert test_client.get("/metrics", params={"format": "xml"}).status_code == 422
+
+    def test_profiling_disabled_by_default(self, test_client):
+        """Sin PROFILING_ENABLED, X-Profile se ignora y /profiles retorna 404."""
+        response = test_client.post("/predict", json={"text": "profile me"}, headers={"X-Profile": "timings"})
+        assert response.status_code == 200
+        assert "server-timing" not in response.headers
+        assert test_client.get("/profiles").status_code == 404
+
+
+class TestCascadeEndpoint:
+    """Tests para el endpoint de cascada."""
+
+    def test_predict_cascade_endpoint(self, test_client, sample_texts):
+        """Debe retornar el modelo usado y la tasa de escalado."""
+        texts = sample_texts["toxic"][:2] + sample_texts["normal"][:2]
+        response = test_client.post("/predict/cascade", json={"texts": texts})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(texts)
+        assert 0.0 <= data["escalation_rate"] <= 1.0
+        for result in data["results"]:
+            assert result["model"] in ["logistic_regression", "distilbert"]
+            assert result["escalated"] == (result["model"] == "distilbert")
+
+    def test_predict_cascade_invalid_band(self, test_client):
+        """Una banda invertida debe retornar 422."""
+        response = test_client.post(
+            "/predict/cascade",
+            json={"texts": ["hello"], "band_lower": 0.8, "band_upper": 0.2}
+        )
+        assert response.status_code == 422
+
+
+class TestMicroBatchingEndpoint:
+    """Tests para el micro-batching de DistilBERT."""
+
+    def test_batching_stats_endpoint(self, test_client):
+        """Debe exponer profundidad de cola e histograma de tamaño de lote."""
+        test_client.post("/predict/transformer", json={"text": "micro batching stats test"})
+        response = test_client.get("/batching/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        if data["enabled"]:
+            assert data["items"] >= 1
+            assert "batch_size_histogram" in data
+            assert "queue_depth_histogram" in data
+
+
+class TestExecutorsEndpoint:
+    """Tests para los executors de modelo y red."""
+
+    def test_executor_stats_endpoint(self, test_client):
+        """Debe exponer los contadores de ambos executors."""
+        test_client.post("/predict", json={"text": "executor stats test"})
+        response = test_client.get("/executors/stats")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["model"]["completed"] >= 1
+        assert "rejected" in data["io"]
+
+    def test_saturated_executor_returns_429(self, test_client, monkeypatch):
+        """Con el executor de modelo lleno, las predicciones devuelven 429 y /health sigue respondiendo."""
+        from backend.api import main
+        from backend.utils.executors import BoundedExecutor
+
+        saturated = BoundedExecutor("saturated", max_workers=1, max_pending=1)
+        monkeypatch.setattr(main, "model_executor", saturated)
+        try:
+            with saturated.slot():
+                response = test_client.post("/predict", json={"text": "hello"})
+                assert response.status_code == 429
+                assert "Retry-After" in response.headers
+                assert test_client.get("/health").status_code == 200
+        finally:
+            saturated.shutdown()
+        assert saturated.stats()["rejected"] == 1
+
+
+class TestLoadShedding:
+    """Tests del control de admisión de DistilBERT."""
+
+    def test_transformer_falls_back_to_lr(self, test_client, monkeypatch):
+        """Con DistilBERT saturado, /predict/transformer responde con LR y lo marca."""
+        from backend.api import main
+        from backend.utils.load_shedding import LoadShedder
+
+        shedder = LoadShedder(policy="fallback", max_queue=1)
+        monkeypatch.setattr(main, "load_shedder", shedder)
+        with shedder.slot():
+            response = test_client.post("/predict/transformer", json={"text": "shed me"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["degraded"] is True
+        assert data["model"].startswith("logistic_regression")
+        assert test_client.get("/shedding/stats").json()["degraded"] == 1
+
+        response = test_client.post("/predict/transformer", json={"text": "shed me"})
+        assert response.json()["degraded"] is False
+
+    def test_transformer_reject_policy(self, test_client, monkeypatch):
+        """Con la política reject, la petición no admitida recibe 503 con Retry-After."""
+        from backend.api import main
+        from backend.utils.load_shedding import LoadShedder
+
+        shedder = LoadShedder(policy="reject", max_queue=1)
+        monkeypatch.setattr(main, "load_shedder", shedder)
+        with shedder.slot():
+            response = test_client.post("/predict/transformer", json={"text": "reject me"})
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        assert shedder.rejected == 1
+
+    def test_analyze_video_degrades_pages(self, test_client, monkeypatch):
+        """Las páginas no admitidas se puntúan con LR y se cuentan en degraded_comments."""
+        from backend.api import main
+        from backend.utils.load_shedding import LoadShedder
+        from backend.utils.youtube_scraper import YouTubeCommentFetcher
+        from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+        stub = YouTubeStub(total_comments=150)
+        server, url = start_stub_server(stub)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+        monkeypatch.setattr(main, "youtube_fetcher", YouTubeCommentFetcher())
+        shedder = LoadShedder(policy="fallback", max_queue=1)
+        monkeypatch.setattr(main, "load_shedder", shedder)
+        try:
+            with shedder.slot():
+                response = test_client.post(
+                    "/analyze/video",
+                    json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "max_comments": 150}
+                )
+        finally:
+            server.shutdown()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_comments_analyzed"] == 150
+        assert data["degraded_comments"] == 150
+        assert data["model_used"] == "logistic_regression"
+
+
+class TestAdminReload:
+    """Tests de la recarga de modelos en caliente."""
+
+    def test_reload_lr_swaps_instance(self, test_client, monkeypatch):
+        """Con wait=true, la recarga intercambia el detector y /predict sigue respondiendo."""
+        from backend.api import main
+
+        monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+        old = main.detector
+        response = test_client.post("/admin/reload?model=lr&wait=true", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert response.json()["lr"]["status"] == "swapped"
+        assert main.detector is not old
+        assert main.detector.model_version != old.model_version  # invalida la caché de predicciones
+
+        assert test_client.post("/predict", json={"text": "after reload"}).status_code == 200
+        stats = test_client.get("/admin/models", headers={"X-Admin-Token": "secret"}).json()
+        assert stats["lr"]["reloads"] >= 1
+
+    def test_admin_token_required(self, test_client, monkeypatch):
+        """Sin ADMIN_TOKEN la administración está desactivada; con token incorrecto, 401."""
+        from backend.api import main
+
+        monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+        assert test_client.post("/admin/reload").status_code == 403
+        monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+        assert test_client.post("/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 401
+        assert test_client.get("/admin/models").status_code == 401
+        assert test_client.get("/admin/models", headers={"X-Admin-Token": "sécret".encode("latin-1")}).status_code == 401
+
+
+class TestStreamingEndpoint:
+    """Tests para el scoring masivo en streaming."""
+
+    def test_predict_stream_ndjson(self, test_client):
+        """Debe puntuar más de 100 textos y devolver una línea por entrada, en orden."""
+        import json
+        lines = [json.dumps({"id": i, "text": f"comment number {i}"}) for i in range(250)]
+        lines.insert(3, "not json")
+        response = test_client.post(
+            "/predict/stream?batch_size=64",
+            content="\n".join(lines).encode(),
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert len(results) == 251
+        assert "error" in results[3]
+        valid = [r for r in results if "error" not in r]
+        assert [r["id"] for r in valid] == list(range(250))
+        assert all(r["prediction"] in ["hate_speech", "normal"] for r in valid)
+
+    def test_predict_stream_releases_executor_slot(self, test_client):
+        """Al terminar el stream, el executor de modelo no debe quedar ocupado."""
+        test_client.post("/predict/stream", content=b'"hello"\n"world"\n')
+        assert test_client.get("/executors/stats").json()["model"]["pending"] == 0
+
+    def test_predict_stream_invalid_model(self, test_client):
+        """Un modelo desconocido debe retornar 422."""
+        response = test_client.post("/predict/stream?model=unknown", content=b'"hello"\n')
+        assert response.status_code == 422
+
+
+class TestAnalyzeVideoPipeline:
+    """Tests para /analyze/video contra el stub local de la YouTube API."""
+
+    def test_analyze_video_with_stub(self, test_client, monkeypatch):
+        """Las páginas se descargan y puntúan en orden hasta max_comments."""
+        from backend.api import main
+        from backend.utils.youtube_scraper import YouTubeCommentFetcher
+        from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+        stub = YouTubeStub(total_comments=250, page_latency_ms=10, title_latency_ms=10)
+        server, url = start_stub_server(stub)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+        monkeypatch.setattr(main, "youtube_fetcher", YouTubeCommentFetcher())
+        try:
+            response = test_client.post(
+                "/analyze/video",
+                json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "max_comments": 150}
+            )
+        finally:
+            server.shutdown()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["video_title"] == "Stub video dQw4w9WgXcQ"
+        assert data["total_comments_analyzed"] == 150
+        assert data["toxic_count"] + data["normal_count"] == 150
+        assert stub.requests["commentThreads"] == 2
+
+    def test_analyze_video_with_async_client(self, test_client, monkeypatch):
+        """Con el cliente httpx (YOUTUBE_CLIENT=async) el resultado es el mismo y se reintentan los 503."""
+        from backend.api import main
+        from backend.utils.youtube_async import AsyncYouTubeCommentFetcher
+        from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+        stub = YouTubeStub(total_comments=250, page_latency_ms=10, title_latency_ms=10)
+        server, url = start_stub_server(stub)
+        stub.fail_next(503)
+        monkeypatch.setattr(main, "youtube_fetcher",
+                            AsyncYouTubeCommentFetcher(api_key="stub", api_endpoint=url, backoff_base=0.01))
+        try:
+            response = test_client.post(
+                "/analyze/video",
+                json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "max_comments": 150}
+            )
+            youtube_stats = test_client.get("/youtube/stats").json()
+        finally:
+            server.shutdown()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["video_title"] == "Stub video dQw4w9WgXcQ"
+        assert data["total_comments_analyzed"] == 150
+        assert youtube_stats["enabled"] is True
+        retries = sum(call["retries"] for call in youtube_stats["calls"].values())
+        assert retries == 1
+        assert youtube_stats["quota"]["used"] == 4
+
+    @pytest.mark.parametrize("client", ["discovery", "async"])
+    def test_analyze_video_with_replies(self, test_client, monkeypatch, client):
+        """include_replies puntúa las respuestas con un límite de peticiones simultáneas y las desglosa."""
+        from backend.api import main
+        from backend.utils.youtube_async import AsyncYouTubeCommentFetcher
+        from backend.utils.youtube_scraper import YouTubeCommentFetcher
+        from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+        stub = YouTubeStub(total_comments=120, page_latency_ms=20, title_latency_ms=0,
+                           reply_every=4, replies_per_thread=3)
+        server, url = start_stub_server(stub)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+        monkeypatch.setattr(main, "REPLY_FETCH_CONCURRENCY", 3)
+        fetcher = AsyncYouTubeCommentFetcher() if client == "async" else YouTubeCommentFetcher()
+        monkeypatch.setattr(main, "youtube_fetcher", fetcher)
+        try:
+            response = test_client.post(
+                "/analyze/video",
+                json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "max_comments": 120,
+                      "include_replies": True}
+            )
+        finally:
+            server.shutdown()
+
+        assert response.status_code == 200
+        data = response.json()
+        # 30 de los 120 hilos tienen 3 respuestas cada uno
+        assert stub.requests["comments"] == 30
+        assert stub.max_in_flight["comments"] <= 3
+        assert data["include_replies"] is True
+        assert data["breakdown"]["top_level"]["total"] == 120
+        assert data["breakdown"]["replies"]["total"] == 90
+        assert data["total_comments_analyzed"] == 210
+        assert data["toxic_count"] == (data["breakdown"]["top_level"]["toxic_count"]
+                                       + data["breakdown"]["replies"]["toxic_count"])
+
+    def test_analyze_video_stream_all_comments(self, test_client, monkeypatch):
+        """Sin max_comments se recorren todas las páginas con un evento progress por página."""
+        import json
+        from backend.api import main
+        from backend.utils.youtube_scraper import YouTubeCommentFetcher
+        from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+        stub = YouTubeStub(total_comments=250, page_latency_ms=0, title_latency_ms=0)
+        server, url = start_stub_server(stub)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+        monkeypatch.setattr(main, "youtube_fetcher", YouTubeCommentFetcher())
+        try:
+            response = test_client.get(
+                "/analyze/video/stream",
+                params={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "top_n": 5}
+            )
+        finally:
+            server.shutdown()
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            name, data = block.split("\n")
+            events.append((name[len("event: "):], json.loads(data[len("data: "):])))
+        assert [name for name, _ in events] == ["start", "progress", "progress", "progress", "done"]
+        assert [data["total_comments_analyzed"] for _, data in events[1:4]] == [100, 200, 250]
+        done = events[-1][1]
+        assert done["video_title"] == "Stub video dQw4w9WgXcQ"
+        assert done["toxic_count"] + done["normal_count"] == 250
+        assert len(done["top_toxic_comments"]) <= 5
+        confidences = [c["confidence"] for c in done["top_toxic_comments"]]
+        assert confidences == sorted(confidences, reverse=True)
+
+    def test_analyze_video_stream_invalid_url(self, test_client):
+        """Una URL inválida se rechaza antes de abrir el stream."""
+        response = test_client.get("/analyze/video/stream", params={"url": "https://example.com/video"})
+        assert response.status_code in [400, 503]
+
+
+class TestIncrementalAnalysis:
+    """Tests para /analyze/video/incremental contra el stub local de la YouTube API."""
+
+    def test_only_new_comments_are_fetched_and_scored(self, test_client, monkeypatch, tmp_path):
+        """El segundo análisis solo descarga y puntúa los comentarios publicados desde el primero."""
+        from backend.api import main
+        from backend.utils.comment_store import CommentStore
+        from backend.utils.youtube_scraper import YouTubeCommentFetcher
+        from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+        stub = YouTubeStub(total_comments=250, page_latency_ms=0, title_latency_ms=0)
+        server, url = start_stub_server(stub)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+        monkeypatch.setattr(main, "youtube_fetcher", YouTubeCommentFetcher())
+        store = CommentStore(tmp_path / "comments.sqlite3")
+        monkeypatch.setattr(main, "comment_store", store)
+        monkeypatch.setattr(main, "bert_store_version", "v1")
+        body = {"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+        try:
+            first = test_client.post("/analyze/video/incremental", json=body).json()
+            requests_after_first = stub.requests["commentThreads"]
+
+            stub.add_comments([f"new comment {i}" for i in range(30)])
+            second = test_client.post("/analyze/video/incremental", json=body).json()
+            requests_after_second = stub.requests["commentThreads"]
+
+            # Pesos nuevos: todo lo almacenado se re-puntúa sin volver a descargarlo
+            monkeypatch.setattr(main, "bert_store_version", "v2")
+            third = test_client.post("/analyze/video/incremental", json=body).json()
+        finally:
+            server.shutdown()
+            store.close()
+
+        assert first["new_comments"] == 250
+        assert first["total_comments_analyzed"] == 250
+        assert first["previous_sync"] is None
+        assert requests_after_first == 3
+
+        assert second["new_comments"] == 30
+        assert second["rescored_comments"] == 0
+        assert second["total_comments_analyzed"] == 280
+        assert second["previous_sync"] is not None
+        # Una sola página: los 30 nuevos y los primeros ya almacenados
+        assert requests_after_second == requests_after_first + 1
+        # El título se reutiliza del almacén
+        assert stub.requests["videos"] == 1
+
+        assert third["new_comments"] == 0
+        assert third["rescored_comments"] == 280
+        assert third["toxic_count"] + third["normal_count"] == 280
+
+    def test_incremental_store_disabled(self, test_client, monkeypatch):
+        """Sin almacén configurado retorna 503."""
+        from backend.api import main
+        monkeypatch.setattr(main, "comment_store", None)
+        response = test_client.post(
+            "/analyze/video/incremental",
+            json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+        )
+        assert response.status_code == 503
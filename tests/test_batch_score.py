@@ -0,0 +1,103 @@
+"""
+Tests para el scoring offline de corpus (python -m backend.batch_score).
+"""
+
+import csv
+import json
+
+import pytest
+
+from backend.batch_score import count_rows, format_progress, score_file
+
+
+@pytest.fixture
+def comments_csv(tmp_path, sample_texts):
+    """CSV con 34 comentarios, columna de id y un texto con comas y saltos de línea."""
+    texts = (sample_texts["toxic"] + sample_texts["normal"]) * 4 + ["Hello, world\nsecond line", "ok"]
+    path = tmp_path / "comments.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["CommentId", "Text"])
+        for i, text in enumerate(texts):
+            writer.writerow([f"c{i}", text])
+    return path, texts
+
+
+def read_output_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class TestBatchScore:
+    """Tests del CLI de scoring con checkpoints."""
+
+    def test_scores_in_order(self, comments_csv, tmp_path, lr_detector):
+        """La salida conserva el orden y coincide con predict_batch del detector."""
+        path, texts = comments_csv
+        output = tmp_path / "scores.csv"
+        summary = score_file(path, output, id_column="CommentId", workers=0, chunk_size=8, progress=None)
+
+        rows = read_output_csv(output)
+        expected = lr_detector.predict_batch(texts)
+        assert summary["rows_scored"] == len(texts)
+        assert [r["id"] for r in rows] == [f"c{i}" for i in range(len(texts))]
+        for row, result in zip(rows, expected):
+            assert row["prediction"] == result["prediction"]
+            assert float(row["confidence"]) == pytest.approx(result["confidence"], abs=1e-6)
+
+    def test_resume_after_interruption(self, comments_csv, tmp_path):
+        """Un job interrumpido continúa desde el checkpoint sin duplicar ni perder filas."""
+        path, texts = comments_csv
+        reference = tmp_path / "reference.jsonl"
+        score_file(path, reference, workers=0, chunk_size=8, progress=None)
+
+        output = tmp_path / "scores.jsonl"
+
+        def interrupt(message):
+            if message.startswith("📊"):
+                raise KeyboardInterrupt
+
+        with pytest.raises(KeyboardInterrupt):
+            score_file(path, output, workers=0, chunk_size=8, progress=interrupt, progress_interval=0)
+        checkpoint = json.loads((tmp_path / "scores.jsonl.checkpoint.json").read_text())
+        assert checkpoint["rows_done"] == 8
+
+        # Simula un chunk escrito a medias antes del kill
+        with open(output, "ab") as f:
+            f.write(b'{"id": 8, "predic')
+
+        summary = score_file(path, output, workers=0, chunk_size=8, progress=None)
+        assert summary["rows_scored"] == len(texts) - 8
+        assert output.read_text() == reference.read_text()
+
+    def test_checkpoint_from_other_job_rejected(self, comments_csv, tmp_path):
+        """Un checkpoint de otra configuración no se reutiliza salvo con restart."""
+        path, texts = comments_csv
+        output = tmp_path / "scores.csv"
+        score_file(path, output, workers=0, chunk_size=8, progress=None)
+
+        with pytest.raises(RuntimeError):
+            score_file(path, output, id_column="CommentId", workers=0, chunk_size=8, progress=None)
+        summary = score_file(path, output, id_column="CommentId", workers=0, chunk_size=8,
+                             restart=True, progress=None)
+        assert summary["rows_scored"] == len(texts)
+
+    def test_jsonl_with_worker_processes(self, tmp_path, sample_texts):
+        """Con procesos worker, cada uno carga su detector y el orden se mantiene."""
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        path = tmp_path / "comments.jsonl"
+        path.write_text("".join(json.dumps({"id": i * 10, "Text": t}) + "\n" for i, t in enumerate(texts)))
+        output = tmp_path / "scores.jsonl"
+
+        summary = score_file(path, output, id_column="id", workers=2, chunk_size=3, progress=None)
+
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert summary["rows_scored"] == len(texts)
+        assert [r["id"] for r in rows] == [i * 10 for i in range(len(texts))]
+
+    def test_progress_and_row_count(self, comments_csv):
+        """El conteo de filas alimenta la ETA del progreso."""
+        path, texts = comments_csv
+        assert count_rows(path, "csv") >= len(texts)
+        line = format_progress(50, 100, 50, 10.0)
+        assert "50.0%" in line and "ETA 0:00:10" in line
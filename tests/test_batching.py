@@ -0,0 +1,121 @@
+"""
+Tests para el micro-batching de DistilBERT.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from backend.models.batching import Histogram, MicroBatcher
+
+
+class RecordingPredictor:
+    """predict_batch falso que registra el tamaño de cada lote."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("fallo de inferencia")
+        return [{'text': t, 'length': len(t)} for t in texts]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestMicroBatcher:
+    """Tests del agrupador de peticiones."""
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Peticiones concurrentes deben compartir un único predict_batch."""
+        predictor = RecordingPredictor()
+
+        async def scenario():
+            batcher = MicroBatcher(predictor, max_batch_size=32, max_wait_ms=50)
+            await batcher.start()
+            texts = [f"text {i}" for i in range(10)]
+            results = await asyncio.gather(*(batcher.submit(t) for t in texts))
+            await batcher.stop()
+            return texts, results
+
+        texts, results = run(scenario())
+        assert [r['text'] for r in results] == texts
+        assert len(predictor.batches) == 1
+        assert sorted(predictor.batches[0]) == sorted(texts)
+
+    def test_max_batch_size_respected(self):
+        """Ningún lote supera max_batch_size."""
+        predictor = RecordingPredictor()
+
+        async def scenario():
+            batcher = MicroBatcher(predictor, max_batch_size=4, max_wait_ms=20)
+            await batcher.start()
+            await asyncio.gather(*(batcher.submit(str(i)) for i in range(10)))
+            stats = batcher.stats()
+            await batcher.stop()
+            return stats
+
+        stats = run(scenario())
+        assert max(len(b) for b in predictor.batches) <= 4
+        assert sum(len(b) for b in predictor.batches) == 10
+        assert stats['items'] == 10
+        assert stats['batch_size_histogram']['count'] == stats['batches']
+
+    def test_max_wait_flushes_partial_batch(self):
+        """Un único texto se procesa tras max_wait sin esperar a llenar el lote."""
+        predictor = RecordingPredictor()
+
+        async def scenario():
+            batcher = MicroBatcher(predictor, max_batch_size=64, max_wait_ms=5)
+            await batcher.start()
+            result = await asyncio.wait_for(batcher.submit("solo"), timeout=2)
+            await batcher.stop()
+            return result
+
+        assert run(scenario())['text'] == "solo"
+        assert predictor.batches == [["solo"]]
+
+    def test_errors_propagate_to_callers(self):
+        """Si predict_batch falla, todos los llamantes del lote reciben la excepción."""
+        predictor = RecordingPredictor(fail=True)
+
+        async def scenario():
+            batcher = MicroBatcher(predictor, max_batch_size=8, max_wait_ms=20)
+            await batcher.start()
+            results = await asyncio.gather(*(batcher.submit(str(i)) for i in range(3)),
+                                           return_exceptions=True)
+            stats = batcher.stats()
+            await batcher.stop()
+            return results, stats
+
+        results, stats = run(scenario())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert stats['errors'] == 1
+
+    def test_submit_requires_start(self):
+        """submit sin start() es un error."""
+        batcher = MicroBatcher(RecordingPredictor())
+        with pytest.raises(RuntimeError):
+            run(batcher.submit("x"))
+
+
+class TestHistogram:
+    """Tests del histograma de buckets fijos."""
+
+    def test_buckets(self):
+        """Cada valor cae en el primer bucket cuyo límite lo cubre."""
+        histogram = Histogram([1, 2, 4])
+        for value in [1, 2, 3, 4, 9]:
+            histogram.observe(value)
+
+        data = histogram.to_dict()
+        assert data['buckets'] == {'<=1': 1, '<=2': 1, '<=4': 2, '+Inf': 1}
+        assert data['count'] == 5
+        assert data['sum'] == 19
@@ -0,0 +1,112 @@
+"""
+Tests para la cascada LR -> DistilBERT.
+"""
+
+import numpy as np
+import pytest
+
+from backend.models.cascade import CascadeDetector, cascade_labels, escalation_mask
+
+
+LR_PROBAS = {'clear normal': 0.05, 'unsure low': 0.25, 'unsure high': 0.55, 'clear toxic': 0.9}
+
+
+def fake_lr_batch(texts):
+    results = []
+    for text in texts:
+        proba = LR_PROBAS[text]
+        results.append({
+            'text': text,
+            'prediction': 'hate_speech' if proba >= 0.3 else 'normal',
+            'confidence': proba,
+            'is_toxic': proba >= 0.3,
+            'threshold_used': 0.3
+        })
+    return results
+
+
+class FakeBertBatch:
+    """predict_batch de DistilBERT falso que marca todo como tóxico."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [{'text': t, 'prediction': 'hate_speech', 'confidence': 0.8, 'label': 1,
+                 'probabilities': {'normal': 0.2, 'hate_speech': 0.8}} for t in texts]
+
+
+class TestCascadeDetector:
+    """Tests del detector en cascada."""
+
+    def test_only_band_is_escalated(self):
+        """Solo los textos dentro de la banda llegan a DistilBERT, en un único lote."""
+        bert = FakeBertBatch()
+        cascade = CascadeDetector(fake_lr_batch, bert, lower=0.2, upper=0.6)
+        output = cascade.predict_batch(list(LR_PROBAS))
+
+        assert bert.calls == [['unsure low', 'unsure high']]
+        assert output['escalated'] == 2
+        assert output['escalation_rate'] == 0.5
+        assert [r['model'] for r in output['results']] == [
+            'logistic_regression', 'distilbert', 'distilbert', 'logistic_regression'
+        ]
+
+    def test_results_keep_order_and_lr_probability(self):
+        """Los resultados conservan el orden y la probabilidad LR original."""
+        cascade = CascadeDetector(fake_lr_batch, FakeBertBatch(), lower=0.2, upper=0.6)
+        texts = ['clear toxic', 'unsure low', 'clear normal']
+        results = cascade.predict_batch(texts)['results']
+
+        assert [r['text'] for r in results] == texts
+        assert results[1]['lr_probability'] == 0.25
+        assert results[1]['is_toxic'] is True
+        assert results[2]['is_toxic'] is False
+
+    def test_empty_band_never_calls_bert(self):
+        """Con una banda vacía DistilBERT no se ejecuta."""
+        bert = FakeBertBatch()
+        cascade = CascadeDetector(fake_lr_batch, bert, lower=0.0, upper=0.0)
+        output = cascade.predict_batch(list(LR_PROBAS))
+
+        assert bert.calls == []
+        assert output['escalation_rate'] == 0.0
+
+    def test_band_override_per_call(self):
+        """La banda se puede sobrescribir en cada llamada."""
+        bert = FakeBertBatch()
+        cascade = CascadeDetector(fake_lr_batch, bert, lower=0.2, upper=0.6)
+        output = cascade.predict_batch(list(LR_PROBAS), lower=0.0, upper=1.0)
+
+        assert output['escalated'] == 4
+        assert output['band'] == {'lower': 0.0, 'upper': 1.0}
+
+    def test_invalid_band(self):
+        """Una banda invertida o fuera de [0, 1] es un error."""
+        with pytest.raises(ValueError):
+            CascadeDetector(fake_lr_batch, FakeBertBatch(), lower=0.7, upper=0.2)
+        cascade = CascadeDetector(fake_lr_batch, FakeBertBatch())
+        with pytest.raises(ValueError):
+            cascade.predict_batch(['clear normal'], upper=1.5)
+
+
+class TestCascadeLabels:
+    """Tests de la simulación offline."""
+
+    def test_mask_includes_edges(self):
+        """Los extremos de la banda se escalan."""
+        mask = escalation_mask([0.1, 0.2, 0.4, 0.6, 0.7], 0.2, 0.6)
+        assert mask.tolist() == [False, True, True, True, False]
+
+    def test_cascade_labels_match_detector(self):
+        """La simulación coincide con la cascada real."""
+        texts = list(LR_PROBAS)
+        cascade = CascadeDetector(fake_lr_batch, FakeBertBatch(), lower=0.2, upper=0.6)
+        online = [int(r['is_toxic']) for r in cascade.predict_batch(texts)['results']]
+
+        offline, mask = cascade_labels(
+            [LR_PROBAS[t] for t in texts], np.ones(len(texts)), threshold=0.3, lower=0.2, upper=0.6
+        )
+        assert offline.tolist() == online
+        assert int(mask.sum()) == 2
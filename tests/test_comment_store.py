@@ -0,0 +1,92 @@
+"""
+Tests para el almacén SQLite de comentarios puntuados.
+"""
+
+import os
+
+import pytest
+
+from backend.utils.comment_store import CommentStore, model_fingerprint
+
+
+def make_comments(start, n):
+    return [{'comment_id': f'c{i}', 'author': f'user{i}', 'text': f'text {i}',
+             'published_at': f'2024-01-01T00:00:{i:02d}Z'} for i in range(start, start + n)]
+
+
+def make_predictions(confidences):
+    """Confianza None = normal."""
+    return [{'prediction': 'normal', 'confidence': 0.9} if c is None
+            else {'prediction': 'hate_speech', 'confidence': c} for c in confidences]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CommentStore(tmp_path / "comments.sqlite3")
+    yield store
+    store.close()
+
+
+class TestCommentStore:
+    """Tests de guardado, sincronización y agregados."""
+
+    def test_aggregate_over_stored_comments(self, store):
+        """Los agregados cubren todos los comentarios guardados del video."""
+        store.save_comments("v1", make_comments(0, 4), make_predictions([0.7, None, 0.95, None]), "m1")
+        store.save_comments("v1", make_comments(4, 2), make_predictions([0.8, None]), "m1")
+        store.save_comments("v2", make_comments(0, 1), make_predictions([0.99]), "m1")
+
+        summary = store.aggregate("v1", top_n=2)
+        assert summary['total_comments_analyzed'] == 6
+        assert summary['toxic_count'] == 3
+        assert summary['normal_count'] == 3
+        assert summary['toxicity_percentage'] == 50.0
+        assert [c['comment_id'] for c in summary['top_toxic_comments']] == ['c2', 'c4']
+
+    def test_sync_state_and_known_ids(self, store):
+        """mark_synced guarda la fecha del comentario más nuevo; known_ids filtra los guardados."""
+        assert store.video("v1") is None
+        store.save_comments("v1", make_comments(0, 3), make_predictions([None] * 3), "m1")
+        store.mark_synced("v1", "Title")
+
+        state = store.video("v1")
+        assert state['title'] == "Title"
+        assert state['newest_published_at'] == '2024-01-01T00:00:02Z'
+        assert store.known_ids("v1", ['c1', 'c2', 'c9']) == {'c1', 'c2'}
+
+        # Sin título nuevo se conserva el anterior
+        store.mark_synced("v1")
+        assert store.video("v1")['title'] == "Title"
+
+    def test_stale_comments_and_rescore(self, store):
+        """Los comentarios de otra versión del modelo se re-puntúan en sitio."""
+        store.save_comments("v1", make_comments(0, 3), make_predictions([None] * 3), "old")
+        stale = store.stale_comments("v1", "new")
+        assert len(stale) == 3
+
+        store.save_comments("v1", stale, make_predictions([0.9] * 3), "new")
+        assert store.stale_comments("v1", "new") == []
+        assert store.aggregate("v1")['toxic_count'] == 3
+        assert store.aggregate("v1")['total_comments_analyzed'] == 3
+
+    def test_persists_across_connections(self, tmp_path):
+        """Los datos sobreviven a cerrar y reabrir el fichero."""
+        path = tmp_path / "comments.sqlite3"
+        store = CommentStore(path)
+        store.save_comments("v1", make_comments(0, 2), make_predictions([0.9, None]), "m1")
+        store.close()
+
+        reopened = CommentStore(path)
+        assert reopened.aggregate("v1")['total_comments_analyzed'] == 2
+        reopened.close()
+
+    def test_model_fingerprint_tracks_weights(self, tmp_path):
+        """La huella es estable y cambia si cambian los pesos."""
+        weights = tmp_path / "model.safetensors"
+        weights.write_bytes(b"weights")
+        first = model_fingerprint(weights)
+        assert model_fingerprint(weights) == first
+
+        weights.write_bytes(b"new weights")
+        os.utime(weights, ns=(1, 1))
+        assert model_fingerprint(weights) != first
@@ -0,0 +1,123 @@
+"""
+Tests para los executors acotados de la API.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from backend.utils.executors import BoundedExecutor, ExecutorSaturated
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestBoundedExecutor:
+    """Tests del executor con límite de tareas admitidas."""
+
+    def test_runs_off_event_loop(self):
+        """Una llamada bloqueante no debe congelar el event loop."""
+        pool = BoundedExecutor("test", max_workers=1, max_pending=2)
+        ticks = []
+
+        async def heartbeat():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def scenario():
+            result, _ = await asyncio.gather(pool.run(time.sleep, 0.2), heartbeat())
+            return result
+
+        try:
+            assert run(scenario()) is None
+        finally:
+            pool.shutdown()
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.18
+
+    def test_saturated_rejects(self):
+        """Con max_pending tareas admitidas, la siguiente se rechaza sin encolarse."""
+        pool = BoundedExecutor("test", max_workers=1, max_pending=2)
+        release = threading.Event()
+
+        async def scenario():
+            first = asyncio.ensure_future(pool.run(release.wait))
+            second = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.01)
+            with pytest.raises(ExecutorSaturated):
+                await pool.run(release.wait)
+            release.set()
+            await asyncio.gather(first, second)
+
+        try:
+            run(scenario())
+        finally:
+            pool.shutdown()
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+        assert stats["pending"] == 0
+        assert stats["max_pending_seen"] == 2
+
+    def test_slot_released_when_thread_finishes(self):
+        """Cancelar la espera no libera el hueco hasta que el hilo termina."""
+        pool = BoundedExecutor("test", max_workers=1, max_pending=1)
+        release = threading.Event()
+
+        async def scenario():
+            task = asyncio.ensure_future(pool.run(release.wait))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.sleep(0.01)
+            assert pool.pending == 1
+            release.set()
+            for _ in range(100):
+                if pool.pending == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert pool.pending == 0
+
+        try:
+            run(scenario())
+        finally:
+            pool.shutdown()
+
+    def test_errors_propagate_and_release(self):
+        """Las excepciones llegan al llamante y el hueco queda libre."""
+        pool = BoundedExecutor("test", max_workers=1, max_pending=1)
+
+        def fail():
+            raise ValueError("fallo")
+
+        try:
+            with pytest.raises(ValueError):
+                run(pool.run(fail))
+            with pool.slot():
+                assert pool.pending == 1
+        finally:
+            pool.shutdown()
+        assert pool.pending == 0
+
+    def test_context_propagates_to_thread(self):
+        """fn ve las ContextVar del llamante (como asyncio.to_thread)."""
+        request_id = contextvars.ContextVar("request_id", default=None)
+        pool = BoundedExecutor("test", max_workers=1, max_pending=1)
+
+        async def scenario():
+            request_id.set("req-1")
+            return await pool.run(request_id.get)
+
+        try:
+            assert run(scenario()) == "req-1"
+        finally:
+            pool.shutdown()
+
+    def test_invalid_limits(self):
+        """max_pending no puede ser menor que el número de hilos."""
+        with pytest.raises(ValueError):
+            BoundedExecutor("test", max_workers=4, max_pending=2)
@@ -0,0 +1,109 @@
+"""
+Tests para el control de admisión de DistilBERT.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from backend.utils.executors import BoundedExecutor
+from backend.utils.load_shedding import LoadShedder, Overloaded
+
+
+class TestLoadShedder:
+    """Tests de admisión por cola y por espera estimada."""
+
+    def test_queue_limit_and_counters(self):
+        """Por encima de max_queue se degrada (fallback) o se rechaza (reject) y se cuenta."""
+        shedder = LoadShedder(policy="fallback", max_queue=3)
+        shedder.acquire(2)
+        with pytest.raises(Overloaded):
+            shedder.acquire(2)
+        shedder.acquire(1)
+        assert shedder.stats()["degraded"] == 1 and shedder.stats()["degraded_items"] == 2
+        shedder.release(3)
+        assert shedder.inflight == 0
+
+        rejecting = LoadShedder(policy="reject", max_queue=1)
+        with rejecting.slot():
+            with pytest.raises(Overloaded):
+                rejecting.acquire()
+        assert rejecting.rejected == 1 and rejecting.degraded == 0
+
+    def test_estimated_wait(self):
+        """La espera estimada es la cola por el coste medio por texto de los forwards observados."""
+        shedder = LoadShedder(max_queue=1000, max_wait_ms=100, smoothing=0.5)
+        assert shedder.estimated_wait(10) == 0.0
+        shedder.observe_service(0.04, 4)   # 10 ms/texto
+        shedder.observe_service(0.12, 4)   # 30 ms/texto -> media 20 ms
+        assert shedder.estimated_wait(5) == pytest.approx(0.1)
+
+        shedder.acquire(4)  # 80 ms en cola
+        with pytest.raises(Overloaded) as excinfo:
+            shedder.acquire(2)  # 120 ms > 100 ms
+        assert excinfo.value.retry_after == 1
+        shedder.acquire(1)  # 100 ms: se admite
+
+    def test_idle_always_admits(self):
+        """Con la cola vacía se admite aunque el lote supere max_queue; con policy='off', siempre."""
+        shedder = LoadShedder(max_queue=10)
+        with shedder.slot(50):
+            with pytest.raises(Overloaded):
+                shedder.acquire(1)
+        off = LoadShedder(policy="off", max_queue=1)
+        with off.slot(5), off.slot(5):
+            assert off.inflight == 10
+
+
+class TestSyntheticOverload:
+    """Ráfaga de peticiones contra un modelo lento: p99 con y sin control de admisión."""
+
+    SERVICE_SECONDS = 0.01  # forward "DistilBERT" por petición
+    REQUESTS = 100
+
+    async def burst(self, shedder):
+        """Lanza REQUESTS peticiones a la vez; retorna latencias y peticiones degradadas."""
+        bert_pool = BoundedExecutor("bert", max_workers=1, max_pending=self.REQUESTS)
+        lr_pool = BoundedExecutor("lr", max_workers=1, max_pending=self.REQUESTS)
+
+        def slow_bert():
+            start = time.perf_counter()
+            time.sleep(self.SERVICE_SECONDS)
+            shedder.observe_service(time.perf_counter() - start, 1)
+            return "distilbert"
+
+        async def request():
+            start = time.perf_counter()
+            try:
+                with shedder.slot():
+                    model = await bert_pool.run(slow_bert)
+            except Overloaded:
+                model = await lr_pool.run(lambda: "logistic_regression")
+            return time.perf_counter() - start, model
+
+        try:
+            # Un forward previo para que haya coste observado, como en un servidor ya caliente
+            await bert_pool.run(slow_bert)
+            results = await asyncio.gather(*(request() for _ in range(self.REQUESTS)))
+        finally:
+            bert_pool.shutdown()
+            lr_pool.shutdown()
+        latencies = np.array([latency for latency, _ in results])
+        degraded = sum(model == "logistic_regression" for _, model in results)
+        return float(np.percentile(latencies, 99)), degraded
+
+    def test_p99_stays_bounded(self):
+        """Con fallback, p99 queda cerca de max_wait; sin control crece con la ráfaga entera."""
+        p99_off, degraded_off = asyncio.run(self.burst(LoadShedder(policy="off")))
+        shedder = LoadShedder(policy="fallback", max_queue=1000, max_wait_ms=100)
+        p99_shed, degraded = asyncio.run(self.burst(shedder))
+
+        assert degraded_off == 0
+        assert p99_off >= self.REQUESTS * self.SERVICE_SECONDS * 0.9
+        assert 0 < degraded < self.REQUESTS
+        assert shedder.stats()["degraded"] == degraded
+        # Espera máxima admitida + un forward + margen para el scheduler
+        assert p99_shed < 0.1 + self.SERVICE_SECONDS + 0.15
+        assert p99_shed < p99_off / 3
@@ -0,0 +1,106 @@
+"""
+Tests para el registro de métricas de latencia por endpoint y por etapa.
+"""
+
+import pytest
+
+from backend.models.batching import Histogram
+from backend.preprocessing.parallel import ParallelPreprocessor
+from backend.preprocessing.text_cleaner import clean_text, preprocess_batch, preprocess_text_batch
+from backend.utils.metrics import NULL_METRICS, MetricsRegistry, histogram_quantile
+
+
+class TestMetricsRegistry:
+    """Tests de observaciones, exportación y desactivación."""
+
+    def test_quantile_interpolates_within_bucket(self):
+        """El cuantil se interpola linealmente dentro del bucket que lo contiene."""
+        histogram = Histogram([0.01, 0.02, 0.04])
+        for value in [0.005] * 50 + [0.015] * 50:
+            histogram.observe(value)
+        assert histogram_quantile(histogram, 0.5) == pytest.approx(0.01)
+        assert histogram_quantile(histogram, 0.75) == pytest.approx(0.015)
+        assert histogram_quantile(Histogram([1]), 0.5) is None
+
+    def test_prometheus_text(self):
+        """Buckets acumulados con +Inf, _sum/_count y contadores por código de estado."""
+        registry = MetricsRegistry(buckets=(0.01, 0.1))
+        registry.observe_request("POST", "/predict", 200, 0.005)
+        registry.observe_request("POST", "/predict", 200, 0.05)
+        registry.observe_request("POST", "/predict", 500, 1.0)
+        registry.observe_stage("tfidf_transform", 0.002, items=100)
+
+        lines = registry.render_prometheus()
+        assert 'hate_speech_http_requests_total{method="POST",endpoint="/predict",status="200"} 2' in lines
+        assert 'hate_speech_http_requests_total{method="POST",endpoint="/predict",status="500"} 1' in lines
+        labels = 'method="POST",endpoint="/predict"'
+        assert f'hate_speech_http_request_duration_seconds_bucket{{{labels},le="0.01"}} 1' in lines
+        assert f'hate_speech_http_request_duration_seconds_bucket{{{labels},le="0.1"}} 2' in lines
+        assert f'hate_speech_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+        assert f'hate_speech_http_request_duration_seconds_count{{{labels}}} 3' in lines
+        assert 'hate_speech_stage_items_total{stage="tfidf_transform"} 100' in lines
+
+        endpoint = registry.to_dict()["endpoints"]["POST /predict"]
+        assert endpoint["requests"] == 3
+        assert endpoint["errors"] == 1
+        assert endpoint["status"] == {"200": 2, "500": 1}
+
+    def test_disabled_records_nothing(self):
+        """Con enabled=False, stage() y observe_* no registran nada."""
+        registry = MetricsRegistry(enabled=False)
+        with registry.stage("clean_text"):
+            pass
+        registry.observe_request("GET", "/health", 200, 0.001)
+        snapshot = registry.to_dict()
+        assert snapshot["endpoints"] == {} and snapshot["stages"] == {}
+
+
+class TestDetectorStages:
+    """Tests de las etapas medidas por el detector LR."""
+
+    def test_preprocess_text_batch_matches_preprocess_batch(self, sample_texts):
+        """Limpiar y luego tokenizar por separado da el mismo resultado que preprocess_batch."""
+        texts = sample_texts["toxic"] + sample_texts["normal"] + sample_texts["edge_cases"]
+        cleaned = [clean_text(text) for text in texts]
+        assert preprocess_text_batch(cleaned, tokenizer="fast") == preprocess_batch(texts, tokenizer="fast")
+
+    def test_lr_stages(self, lr_detector, sample_texts):
+        """predict_batch mide cada etapa una vez por lote; predict usa el scorer fusionado."""
+        registry = MetricsRegistry()
+        lr_detector.metrics = registry
+        try:
+            texts = sample_texts["toxic"] + sample_texts["normal"]
+            lr_detector.predict_batch(texts)
+            lr_detector.predict(texts[0])
+        finally:
+            lr_detector.metrics = NULL_METRICS
+
+        stages = registry.to_dict()["stages"]
+        for stage in ("tfidf_transform", "lr_score"):
+            assert stages[stage]["count"] == 1
+            assert stages[stage]["items"] == len(texts)
+        assert stages["clean_text"]["count"] == 2
+        assert stages["clean_text"]["items"] == len(texts) + 1
+        if lr_detector.scorer is not None:
+            assert stages["tfidf_lr_fused"]["items"] == 1
+
+    def test_parallel_stage_only_when_pool_is_used(self, lr_detector, sample_texts):
+        """Con pool, los lotes bajo el umbral siguen midiéndose como clean_text/preprocess_text."""
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        pool = ParallelPreprocessor(workers=1, chunk_size=2, threshold=len(texts))
+        registry = MetricsRegistry()
+        lr_detector.metrics, lr_detector.parallel_preprocessor = registry, pool
+        try:
+            lr_detector.predict_batch(texts)            # pool sin arrancar: en el proceso
+            pool.start()
+            lr_detector.predict_batch(texts[:-1])       # bajo el umbral: en el proceso
+            lr_detector.predict_batch(texts)            # en el pool
+        finally:
+            pool.shutdown()
+            lr_detector.metrics, lr_detector.parallel_preprocessor = NULL_METRICS, None
+
+        stages = registry.to_dict()["stages"]
+        assert stages["clean_text"]["count"] == 2
+        assert stages["preprocess_text"]["items"] == 2 * len(texts) - 1
+        assert stages["preprocess_parallel"]["count"] == 1
+        assert stages["preprocess_parallel"]["items"] == len(texts)
@@ -0,0 +1,74 @@
+"""
+Tests para las métricas de acuerdo entre LR y DistilBERT.
+"""
+
+import numpy as np
+import pytest
+
+from backend.utils.model_agreement import cohen_kappa, compare_predictions
+
+
+def make_results(rows):
+    """
+    Resultados LR y DistilBERT a partir de (lr_toxic, lr_proba, bert_toxic, bert_proba).
+
+    Como en los detectores reales, 'confidence' es P(tóxico) en LR y la
+    probabilidad de la clase predicha en DistilBERT.
+    """
+    lr_results, bert_results = [], []
+    for i, (lr_toxic, lr_proba, bert_toxic, bert_proba) in enumerate(rows):
+        lr_results.append({'text': f'text {i}', 'prediction': 'hate_speech' if lr_toxic else 'normal',
+                           'confidence': lr_proba, 'is_toxic': lr_toxic})
+        bert_results.append({'text': f'text {i}', 'prediction': 'hate_speech' if bert_toxic else 'normal',
+                             'confidence': bert_proba if bert_toxic else 1 - bert_proba,
+                             'label': int(bert_toxic),
+                             'probabilities': {'normal': 1 - bert_proba, 'hate_speech': bert_proba}})
+    return lr_results, bert_results
+
+
+class TestComparePredictions:
+    """Tests del resumen vectorizado y de los resultados por texto."""
+
+    def test_summary(self):
+        """Tasa de acuerdo, matriz de confusión y desacuerdos ordenados por diferencia de confianza."""
+        items, summary = compare_predictions(*make_results([
+            (True, 0.9, True, 0.8),     # ambos tóxicos
+            (False, 0.2, False, 0.1),   # ambos normales
+            (True, 0.6, False, 0.1),    # solo LR, diferencia 0.5
+            (False, 0.1, True, 0.95),   # solo BERT, diferencia 0.85
+        ]))
+
+        assert summary['total'] == 4
+        assert summary['agreements'] == 2 and summary['disagreements'] == 2
+        assert summary['agreement_rate'] == 0.5
+        assert summary['confusion'] == {'both_toxic': 1, 'both_normal': 1, 'lr_only_toxic': 1, 'bert_only_toxic': 1}
+        assert summary['disagreement_indices'] == [3, 2]
+        assert summary['confidence_diff']['max'] == pytest.approx(0.85)
+        assert sum(summary['confidence_diff']['histogram']['counts']) == 4
+        assert items[2]['agreement'] is False
+        assert items[2]['confidence_diff'] == pytest.approx(0.5)
+        assert items[0]['distilbert']['probabilities']['hate_speech'] == 0.8
+
+    def test_agreement_on_normal_has_small_diff(self):
+        """Si ambos modelos ven un comentario limpio, la diferencia es pequeña aunque BERT tenga confianza 0.99."""
+        items, summary = compare_predictions(*make_results([(False, 0.02, False, 0.01)]))
+
+        assert items[0]['distilbert']['confidence'] == pytest.approx(0.99)
+        assert items[0]['confidence_diff'] == pytest.approx(0.01)
+        assert summary['confidence_diff']['max'] == pytest.approx(0.01)
+        assert summary['confidence_diff']['histogram']['counts'][0] == 1
+
+    def test_cohen_kappa(self):
+        """Kappa 1 con acuerdo total, 0 con acuerdo por azar y None si no hay variación."""
+        a = np.array([True, False, True, False])
+        assert cohen_kappa(a, a) == pytest.approx(1.0)
+        assert cohen_kappa(a, np.array([True, True, False, False])) == pytest.approx(0.0)
+        assert cohen_kappa(np.ones(3, dtype=bool), np.ones(3, dtype=bool)) is None
+
+    def test_misaligned_results(self):
+        """Listas de distinta longitud o vacías se rechazan."""
+        lr_results, bert_results = make_results([(True, 0.9, True, 0.8)])
+        with pytest.raises(ValueError):
+            compare_predictions(lr_results, bert_results * 2)
+        with pytest.raises(ValueError):
+            compare_predictions([], [])
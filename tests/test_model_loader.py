@@ -111,6 +111,52 @@ class TestDistilBERTDetector:
         
         assert "prediction" in result
         assert isinstance(result["confidence"], float)
+    
+    def test_bucketed_batch_matches_single(self, bert_detector, sample_texts):
+        """predict_batch por buckets debe conservar el orden y coincidir con predict()."""
+        texts = ["word " * 150, "ok"] + sample_texts["toxic"] + sample_texts["normal"]
+        bert_detector.max_batch_size = 3
+        try:
+            results = bert_detector.predict_batch(texts)
+        finally:
+            bert_detector.max_batch_size = 32
+        
+        assert [r["text"] for r in results] == texts
+        assert bert_detector.last_batch_stats["batches"] >= 3
+        for text, result in zip(texts, results):
+            single = bert_detector.predict(text)
+            assert result["prediction"] == single["prediction"]
+            assert abs(result["confidence"] - single["confidence"]) < 1e-4
+
+
+class TestBatchPlanning:
+    """Tests para el reparto en buckets de DistilBERTDetector.predict_batch."""
+    
+    def test_sorted_by_length_and_complete(self):
+        """Cada índice aparece una vez y los lotes van de cortos a largos."""
+        from backend.models.model_loader import DistilBERTDetector
+        lengths = [50, 3, 128, 7, 7, 20, 3]
+        batches = DistilBERTDetector.plan_batches(lengths, max_batch_size=3, max_tokens_per_batch=4096)
+        
+        flat = [i for batch in batches for i in batch]
+        assert sorted(flat) == list(range(len(lengths)))
+        assert [lengths[i] for i in flat] == sorted(lengths)
+        assert all(len(batch) <= 3 for batch in batches)
+    
+    def test_token_budget_respected(self):
+        """Textos x longitud máxima del lote no supera max_tokens_per_batch."""
+        from backend.models.model_loader import DistilBERTDetector
+        lengths = [10] * 20 + [100] * 5
+        batches = DistilBERTDetector.plan_batches(lengths, max_batch_size=32, max_tokens_per_batch=200)
+        
+        for batch in batches:
+            assert len(batch) * max(lengths[i] for i in batch) <= 200
+    
+    def test_oversized_text_gets_own_batch(self):
+        """Un texto que supera el presupuesto por sí solo va en su propio lote."""
+        from backend.models.model_loader import DistilBERTDetector
+        batches = DistilBERTDetector.plan_batches([5, 300], max_batch_size=32, max_tokens_per_batch=100)
+        assert batches == [[0], [1]]
 
 
 class TestModelComparison:
@@ -150,4 +196,234 @@ class TestModelComparison:
         # BERT debería tener confianzas más consistentemente altas
         import statistics
         bert_mean = statistics.mean(confidences_bert)
-        assert bert_mean > 0.7  # Generalmente >90% según tus tests
\ No newline at end of file
+        assert bert_mean > 0.7  # Generalmente >90% según tus tests
+
+class TestLinearTfidfScorer:
+    """Tests para el scorer lineal fusionado (TF-IDF + LR sin sklearn)."""
+    
+    def test_scorer_built_on_load(self, lr_detector):
+        """El detector debe construir el scorer al cargar los modelos."""
+        assert lr_detector.scorer is not None
+        assert len(lr_detector.scorer.vocabulary) == len(lr_detector.vectorizer.vocabulary_)
+    
+    def test_matches_sklearn_predict_proba(self, lr_detector, sample_texts):
+        """Debe coincidir con predict_proba con tolerancia 1e-9."""
+        from backend.preprocessing.text_cleaner import full_preprocess
+        
+        texts = sample_texts["toxic"] + sample_texts["normal"] + sample_texts["edge_cases"]
+        for text in texts:
+            processed = full_preprocess(text, tokenizer="fast")
+            expected = lr_detector.model.predict_proba(lr_detector.vectorizer.transform([processed]))[0, 1]
+            assert abs(lr_detector.scorer.predict_proba(processed) - expected) < 1e-9
+    
+    def test_predict_matches_batch(self, lr_detector, sample_texts):
+        """predict() (scorer) y predict_batch() (sklearn) deben coincidir."""
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        batch = lr_detector.predict_batch(texts)
+        for text, batch_result in zip(texts, batch):
+            single = lr_detector.predict(text)
+            assert abs(single["confidence"] - batch_result["confidence"]) < 1e-9
+            assert single["is_toxic"] == batch_result["is_toxic"]
+    
+    @pytest.mark.parametrize("params", [
+        {"ngram_range": (1, 2), "sublinear_tf": True, "norm": "l2"},
+        {"ngram_range": (2, 3), "sublinear_tf": False, "norm": "l1"},
+        {"ngram_range": (1, 1), "binary": True, "norm": None},
+        {"ngram_range": (1, 2), "use_idf": False, "norm": "l2"},
+    ])
+    def test_vectorizer_semantics(self, params):
+        """Debe replicar n-gramas, sublinear_tf, binary y norm de sklearn."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from backend.models.linear_scorer import LinearTfidfScorer
+        
+        docs = [
+            "hate hate you stupid idiot", "love this video so much", "you stupid stupid troll",
+            "great great content thanks", "go away idiot troll", "thanks for sharing love it",
+        ]
+        labels = [1, 0, 1, 0, 1, 0]
+        vectorizer = TfidfVectorizer(**params).fit(docs)
+        model = LogisticRegression().fit(vectorizer.transform(docs), labels)
+        scorer = LinearTfidfScorer.from_sklearn(vectorizer, model)
+        
+        for doc in docs + ["stupid stupid stupid love", "unknown words only", ""]:
+            expected = model.predict_proba(vectorizer.transform([doc]))[0, 1]
+            assert abs(scorer.predict_proba(doc) - expected) < 1e-9
+
+
+class TestLRArtifact:
+    """Tests para el artefacto sin pickle del pipeline TF-IDF + LR."""
+    
+    def test_default_loader_prefers_artifact(self, lr_detector):
+        """Con el artefacto al día, el detector no debe deserializar pickles."""
+        assert lr_detector.model_format == "artifact"
+        assert lr_detector.threshold == 0.3
+    
+    def test_artifact_arrays_are_memory_mapped(self, lr_detector):
+        """Los arrays deben cargarse con mmap para compartir páginas."""
+        import numpy as np
+        
+        assert isinstance(lr_detector.vectorizer.idf_, np.memmap)
+        assert isinstance(lr_detector.model.coef_.base, np.memmap)
+    
+    def test_artifact_matches_pickle(self, lr_detector, sample_texts):
+        """Las predicciones deben coincidir con las del formato pickle."""
+        from backend.models.model_loader import HateSpeechDetector
+        
+        pickle_detector = HateSpeechDetector(prefer_artifact=False)
+        assert pickle_detector.model_format == "pickle"
+        
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        for a, b in zip(lr_detector.predict_batch(texts), pickle_detector.predict_batch(texts)):
+            assert abs(a["confidence"] - b["confidence"]) < 1e-12
+        for text in texts:
+            assert abs(lr_detector.predict(text)["confidence"] - pickle_detector.predict(text)["confidence"]) < 1e-12
+    
+    def test_export_and_stale_fallback(self, lr_detector, tmp_path):
+        """Un artefacto exportado de otros pickles debe ignorarse."""
+        from backend.models.lr_artifact import export_lr_artifact, artifact_is_current
+        from backend.models.model_loader import HateSpeechDetector
+        
+        fake_source = tmp_path / "other_model.pkl"
+        fake_source.write_bytes(b"not the real model")
+        artifact_dir = export_lr_artifact(
+            lr_detector.vectorizer, lr_detector.model, lr_detector.threshold,
+            output_dir=tmp_path / "artifact", source_paths=[fake_source]
+        )
+        assert artifact_is_current(artifact_dir, [fake_source])
+        
+        fake_source.write_bytes(b"retrained model")
+        assert not artifact_is_current(artifact_dir, [fake_source])
+        
+        # El artefacto no corresponde a los .pkl por defecto: fallback a pickle
+        detector = HateSpeechDetector(artifact_path=artifact_dir)
+        assert detector.model_format == "pickle"
+        assert abs(detector.predict("I hate you")["confidence"] - lr_detector.predict("I hate you")["confidence"]) < 1e-12
+
+
+@pytest.fixture(scope="module")
+def tiny_distilbert(tmp_path_factory):
+    """DistilBERT diminuto con pesos aleatorios y el tokenizer real (no requiere Git LFS)."""
+    import shutil
+    from pathlib import Path
+    import torch
+    from transformers import DistilBertConfig, DistilBertForSequenceClassification
+    
+    source = Path(__file__).parent.parent / "backend" / "models" / "distilbert-hate-speech"
+    model_dir = tmp_path_factory.mktemp("tiny-distilbert")
+    torch.manual_seed(0)
+    config = DistilBertConfig(dim=32, hidden_dim=64, n_layers=2, n_heads=2, num_labels=2)
+    DistilBertForSequenceClassification(config).save_pretrained(str(model_dir))
+    for name in ("tokenizer.json", "tokenizer_config.json", "special_tokens_map.json", "vocab.txt"):
+        shutil.copy(source / name, model_dir / name)
+    return model_dir
+
+
+class TestQuantizedDistilBERT:
+    """Tests para la variante int8 de DistilBERTDetector."""
+    
+    def test_quantized_weights_cached_on_disk(self, tiny_distilbert, tmp_path, sample_texts):
+        """La primera carga cuantiza y guarda; la segunda carga desde disco con el mismo resultado."""
+        from backend.models.model_loader import DistilBERTDetector
+        from backend.models.quantization import load_or_quantize
+        cache_path = tmp_path / "model.int8.pt"
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        
+        first = DistilBERTDetector(model_path=tiny_distilbert, quantize=True, quantized_cache_path=cache_path)
+        assert cache_path.exists()
+        assert first.get_model_info()["quantized"] is True
+        
+        _, from_cache = load_or_quantize(tiny_distilbert, cache_path)
+        assert from_cache
+        
+        second = DistilBERTDetector(model_path=tiny_distilbert, quantize=True, quantized_cache_path=cache_path)
+        for a, b in zip(first.predict_batch(texts), second.predict_batch(texts)):
+            assert a["probabilities"]["hate_speech"] == pytest.approx(b["probabilities"]["hate_speech"], abs=1e-6)
+    
+    def test_quantized_close_to_fp32(self, tiny_distilbert, tmp_path, sample_texts):
+        """Las probabilidades int8 deben estar cerca de las fp32."""
+        from backend.models.model_loader import DistilBERTDetector
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        fp32 = DistilBERTDetector(model_path=tiny_distilbert, quantize=False)
+        int8 = DistilBERTDetector(model_path=tiny_distilbert, quantize=True,
+                                  quantized_cache_path=tmp_path / "model.int8.pt")
+        
+        for a, b in zip(fp32.predict_batch(texts), int8.predict_batch(texts)):
+            assert abs(a["probabilities"]["hate_speech"] - b["probabilities"]["hate_speech"]) < 0.05
+    
+    def test_stale_cache_is_rebuilt(self, tiny_distilbert, tmp_path):
+        """Si cambian los pesos fp32, la cache int8 se regenera."""
+        import os
+        from backend.models.quantization import load_or_quantize
+        cache_path = tmp_path / "model.int8.pt"
+        load_or_quantize(tiny_distilbert, cache_path)
+        
+        weights = tiny_distilbert / "model.safetensors"
+        stat = weights.stat()
+        os.utime(weights, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        _, from_cache = load_or_quantize(tiny_distilbert, cache_path)
+        assert not from_cache
+    
+    def test_env_selects_quantized(self, tiny_distilbert, tmp_path, monkeypatch):
+        """BERT_QUANTIZE activa la variante int8 si no se indica en el constructor."""
+        from backend.models.model_loader import DistilBERTDetector
+        monkeypatch.setenv("BERT_QUANTIZE", "true")
+        detector = DistilBERTDetector(model_path=tiny_distilbert, quantized_cache_path=tmp_path / "q.pt")
+        assert detector.quantize is True
+
+
+class TestONNXDistilBERT:
+    """Tests para el backend ONNX Runtime de DistilBERT."""
+    
+    @pytest.fixture(scope="class")
+    def onnx_path(self, tiny_distilbert):
+        """Exporta el modelo diminuto a ONNX una vez por clase."""
+        from backend.models.onnx_export import export_onnx
+        return export_onnx(tiny_distilbert)
+    
+    def test_logits_match_torch(self, tiny_distilbert, onnx_path, sample_texts):
+        """Los logits de ONNX Runtime coinciden con el forward de torch, con y sin padding."""
+        import numpy
+        import torch
+        from backend.models.model_loader import DistilBERTDetector
+        from backend.models.onnx_detector import ONNXDistilBERTDetector
+        texts = sample_texts["toxic"] + sample_texts["normal"] + ["word " * 200]
+        
+        torch_detector = DistilBERTDetector(model_path=tiny_distilbert, quantize=False)
+        onnx_detector = ONNXDistilBERTDetector(model_path=tiny_distilbert, onnx_path=onnx_path, max_batch_size=4)
+        
+        inputs = torch_detector.tokenizer(texts, max_length=128, truncation=True, padding=True, return_tensors="pt")
+        with torch.no_grad():
+            expected = torch_detector.model(**inputs).logits.numpy()
+        
+        numpy.testing.assert_allclose(onnx_detector.logits_batch(texts), expected, atol=1e-4)
+        assert onnx_detector.last_batch_stats["batches"] >= 3
+    
+    def test_same_surface_as_torch(self, tiny_distilbert, onnx_path, sample_texts):
+        """predict/predict_batch devuelven el mismo formato y resultados en el orden de entrada."""
+        from backend.models.model_loader import DistilBERTDetector
+        from backend.models.onnx_detector import ONNXDistilBERTDetector
+        texts = sample_texts["toxic"] + sample_texts["normal"]
+        
+        torch_detector = DistilBERTDetector(model_path=tiny_distilbert, quantize=False)
+        onnx_detector = ONNXDistilBERTDetector(model_path=tiny_distilbert, onnx_path=onnx_path)
+        
+        for text, a, b in zip(texts, torch_detector.predict_batch(texts), onnx_detector.predict_batch(texts)):
+            assert b["text"] == text
+            assert set(a) == set(b)
+            assert a["label"] == b["label"]
+            assert a["probabilities"]["hate_speech"] == pytest.approx(b["probabilities"]["hate_speech"], abs=1e-5)
+        
+        single = onnx_detector.predict(texts[0])
+        assert single["confidence"] == pytest.approx(onnx_detector.predict_batch(texts)[0]["confidence"], abs=1e-6)
+        
+        info = onnx_detector.get_model_info()
+        assert info["backend"] == "onnxruntime"
+        assert info["num_parameters"] == torch_detector.get_model_info()["num_parameters"]
+    
+    def test_missing_onnx_file(self, tiny_distilbert, tmp_path):
+        """Sin exportar el modelo, el detector falla con un mensaje claro."""
+        from backend.models.onnx_detector import ONNXDistilBERTDetector
+        with pytest.raises(FileNotFoundError):
+            ONNXDistilBERTDetector(model_path=tiny_distilbert, onnx_path=tmp_path / "missing.onnx")
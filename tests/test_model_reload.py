@@ -0,0 +1,175 @@
+"""
+Tests para la recarga de modelos en caliente.
+"""
+
+import asyncio
+import gc
+import threading
+import time
+
+import pytest
+
+from backend.models.reloader import ModelReloader, ReloadInProgress, release_memory, rss_bytes
+
+
+class Model:
+    """Modelo de juguete: solo una versión."""
+
+    def __init__(self, version):
+        self.version = version
+        self.warm = False
+
+
+def make_reloader(holder, build=None, **kwargs):
+    """Recargador que intercambia holder['model'] y numera las versiones."""
+    versions = iter(range(1, 100))
+
+    def swap(new):
+        old, holder['model'] = holder['model'], new
+        return old
+
+    def warmup(instance):
+        instance.warm = True
+
+    return ModelReloader("toy", build or (lambda: Model(next(versions))), swap, warmup=warmup,
+                         release_timeout=5, **kwargs)
+
+
+class TestModelReloader:
+    """Tests de construcción, intercambio, liberación y vigilancia de ficheros."""
+
+    def test_swap_after_warmup_and_release(self):
+        """La instancia nueva llega caliente; la vieja se libera cuando la suelta la última petición."""
+        async def scenario():
+            holder = {'model': Model(0)}
+            reloader = make_reloader(holder)
+            in_flight = holder['model']  # una petición que ya leyó el global
+
+            status = await reloader.reload()
+            assert holder['model'].version == 1 and holder['model'].warm
+            assert in_flight.version == 0
+            assert status['status'] == 'swapped' and status['old_instance_released'] is None
+
+            del in_flight
+            await reloader.wait_released()
+            assert status['old_instance_released'] is True
+            await reloader.stop()
+
+        asyncio.run(scenario())
+
+    def test_failed_build_keeps_current(self):
+        """Si la construcción falla, el modelo actual sigue sirviendo."""
+        async def scenario():
+            holder = {'model': Model(0)}
+
+            def broken():
+                raise FileNotFoundError("lr_threshold_optimized.pkl")
+
+            reloader = make_reloader(holder, build=broken)
+            status = await reloader.reload()
+            assert status['status'] == 'failed' and 'lr_threshold_optimized' in status['error']
+            assert holder['model'].version == 0
+            assert reloader.stats()['failures'] == 1
+            await reloader.stop()
+
+        asyncio.run(scenario())
+
+    def test_concurrent_reload_rejected(self):
+        """Una segunda recarga mientras se construye la primera lanza ReloadInProgress."""
+        async def scenario():
+            holder = {'model': Model(0)}
+            building = threading.Event()
+            release = threading.Event()
+
+            def slow_build():
+                building.set()
+                release.wait(5)
+                return Model(1)
+
+            reloader = make_reloader(holder, build=slow_build)
+            first = asyncio.ensure_future(reloader.reload())
+            await asyncio.get_running_loop().run_in_executor(None, building.wait, 5)
+            assert reloader.reloading
+            with pytest.raises(ReloadInProgress):
+                await reloader.reload()
+            assert holder['model'].version == 0  # sigue sirviendo mientras tanto
+            release.set()
+            await first
+            assert holder['model'].version == 1
+            await reloader.stop()
+
+        asyncio.run(scenario())
+
+    def test_watch_reloads_when_files_change(self, tmp_path):
+        """Al cambiar un fichero vigilado (y mantenerse estable) se recarga una sola vez."""
+        weights = tmp_path / "lr_threshold_optimized.pkl"
+        weights.write_bytes(b"v1")
+
+        async def scenario():
+            holder = {'model': Model(0)}
+            reloader = make_reloader(holder, watch_paths=[weights])
+            reloader.start_watching(interval=0.05)
+            weights.write_bytes(b"retrained v2")
+            deadline = time.monotonic() + 5
+            while reloader.reloads == 0 and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.3)  # sin más cambios no debe volver a recargar
+            assert reloader.reloads == 1
+            assert reloader.last_reload['reason'] == 'watch'
+            await reloader.stop()
+
+        asyncio.run(scenario())
+
+
+@pytest.fixture(scope="module")
+def random_distilbert(tmp_path_factory):
+    """DistilBERT con pesos aleatorios y la arquitectura real (sin depender de Git LFS)."""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from benchmarks.synthetic import random_weight_distilbert
+    try:
+        return random_weight_distilbert(output_dir=tmp_path_factory.mktemp("distilbert"))
+    except Exception as e:
+        pytest.skip(f"No se pudo crear el modelo DistilBERT: {e}")
+
+
+class TestReloadMemory:
+    """La memoria de la instancia reemplazada vuelve al sistema (RSS)."""
+
+    RELOADS = 3
+
+    def test_rss_returns_to_baseline_after_reloads(self, random_distilbert):
+        """Tras varias recargas, la RSS no crece en proporción a los modelos reemplazados."""
+        from backend.models.model_loader import DistilBERTDetector
+
+        if rss_bytes() is None:
+            pytest.skip("RSS solo disponible en Linux")
+
+        def build():
+            return DistilBERTDetector(model_path=random_distilbert)
+
+        async def scenario():
+            holder = {'model': build()}
+            holder['model'].predict_batch(["warm up", "the allocator"])
+            model_bytes = sum(p.numel() * p.element_size() for p in holder['model'].model.parameters())
+
+            def swap(new):
+                old, holder['model'] = holder['model'], new
+                return old
+
+            reloader = ModelReloader("distilbert", build, swap,
+                                     warmup=lambda m: m.predict_batch(["warm up", "the allocator"]))
+            release_memory()
+            baseline = rss_bytes()
+            for _ in range(self.RELOADS):
+                status = await reloader.reload()
+                await reloader.wait_released()
+                assert status['old_instance_released'] is True
+            await reloader.stop()
+            release_memory()
+            return rss_bytes() - baseline, model_bytes
+
+        growth, model_bytes = asyncio.run(scenario())
+        gc.collect()
+        # Sin liberar, cada recarga dejaría otra copia de los pesos (~260 MB)
+        assert growth < 0.5 * model_bytes, f"RSS +{growth / 1e6:.0f} MB tras {self.RELOADS} recargas"
@@ -0,0 +1,80 @@
+"""
+Tests para la lectura incremental de NDJSON.
+"""
+
+import asyncio
+
+from backend.utils.ndjson import iter_ndjson_batches, parse_line
+
+
+def collect(chunks, **kwargs):
+    """Ejecuta iter_ndjson_batches sobre una lista de trozos de bytes."""
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def scenario():
+        return [batch async for batch in iter_ndjson_batches(stream(), **kwargs)]
+
+    return asyncio.run(scenario())
+
+
+class TestParseLine:
+    """Tests del parseo de una línea."""
+
+    def test_string_and_object_lines(self):
+        """Acepta strings JSON y objetos con 'text' e 'id' opcional."""
+        assert parse_line(b'"hola"', 1) == {'line': 1, 'id': None, 'text': 'hola'}
+        assert parse_line(b'{"id": "c7", "text": "hola"}', 2) == {'line': 2, 'id': 'c7', 'text': 'hola'}
+
+    def test_invalid_lines_become_errors(self):
+        """JSON inválido o sin 'text' produce un registro de error."""
+        assert 'error' in parse_line(b'{"text": ', 1)
+        assert 'error' in parse_line(b'{"id": 3}', 2)
+        assert parse_line(b'{"id": 3}', 2)['id'] == 3
+        assert 'error' in parse_line(b'42', 3)
+
+
+class TestNDJSONBatches:
+    """Tests de la agrupación en lotes."""
+
+    def test_lines_split_across_chunks(self):
+        """Las líneas cortadas entre trozos se reconstruyen, también la última sin salto."""
+        body = b'"uno"\n{"id": 2, "text": "dos"}\n\n"tres"'
+        chunks = [body[i:i + 3] for i in range(0, len(body), 3)]
+        batches = collect(chunks, batch_size=10)
+
+        records = [r for batch in batches for r in batch]
+        assert [r['text'] for r in records] == ['uno', 'dos', 'tres']
+        assert [r['line'] for r in records] == [1, 2, 4]
+        assert records[1]['id'] == 2
+
+    def test_fixed_size_batches(self):
+        """Los registros se agrupan en lotes de batch_size, en orden."""
+        body = b''.join(f'"t{i}"\n'.encode() for i in range(25))
+        batches = collect([body], batch_size=10)
+
+        assert [len(b) for b in batches] == [10, 10, 5]
+        assert batches[2][-1]['text'] == 't24'
+
+    def test_oversized_line_is_skipped(self):
+        """Una línea demasiado larga genera un error y no bloquea las siguientes."""
+        long_line = b'"' + b'x' * 100 + b'"\n'
+        chunks = [b'"a"\n', long_line[:40], long_line[40:], b'"b"\n']
+        records = [r for batch in collect(chunks, batch_size=10, max_line_bytes=32) for r in batch]
+
+        assert records[0]['text'] == 'a'
+        assert 'error' in records[1]
+        assert records[2] == {'line': 3, 'id': None, 'text': 'b'}
+
+    def test_oversized_line_in_single_chunk(self):
+        """El límite no depende de cómo se trocee el cuerpo: una línea larga entera en un trozo también se descarta."""
+        long_line = b'"' + b'x' * 50 + b'"\n'
+        whole = [r for batch in collect([b'"a"\n' + long_line + b'"b"\n'], batch_size=10, max_line_bytes=10)
+                 for r in batch]
+        split = [r for batch in collect([b'"a"\n' + long_line[:20], long_line[20:] + b'"b"\n'],
+                                        batch_size=10, max_line_bytes=10) for r in batch]
+
+        assert whole == split
+        assert whole[1] == {'line': 2, 'id': None, 'error': "Línea de más de 10 bytes"}
+        assert whole[2] == {'line': 3, 'id': None, 'text': 'b'}
@@ -0,0 +1,191 @@
+"""
+Tests para la cache de predicciones.
+"""
+
+import pytest
+
+from backend.utils.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    """Reloj manual para controlar el TTL."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fake_predict(text):
+    return {'text': text, 'prediction': 'normal', 'confidence': 0.9, 'length': len(text)}
+
+
+class CountingBatch:
+    """predict_batch falso que registra los textos recibidos."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [fake_predict(t) for t in texts]
+
+
+class TestPredictionCache:
+    """Tests de la cache LRU con TTL."""
+
+    def test_hit_returns_same_result(self):
+        """La segunda consulta debe venir de la cache."""
+        cache = PredictionCache(max_size=10)
+        calls = []
+
+        def compute(text):
+            calls.append(text)
+            return fake_predict(text)
+
+        first = cache.get_or_compute('lr', 'v1', 'hello world', compute)
+        second = cache.get_or_compute('lr', 'v1', 'hello world', compute)
+
+        assert first == second
+        assert len(calls) == 1
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_whitespace_normalized_key(self):
+        """Textos que solo difieren en espacios comparten entrada, pero conservan su texto."""
+        cache = PredictionCache(max_size=10)
+        cache.get_or_compute('lr', 'v1', 'hello world', fake_predict)
+        result = cache.get_or_compute('lr', 'v1', '  hello   world ', fake_predict)
+
+        assert cache.stats()['hits'] == 1
+        assert result['text'] == '  hello   world '
+
+    def test_models_do_not_share_entries(self):
+        """El mismo texto con otro modelo es un miss."""
+        cache = PredictionCache(max_size=10)
+        cache.get_or_compute('lr', 'v1', 'hello', fake_predict)
+        cache.get_or_compute('bert', 'v1', 'hello', fake_predict)
+
+        assert cache.stats()['misses'] == 2
+
+    def test_lru_eviction(self):
+        """Al superar max_size se expulsa la entrada menos usada."""
+        cache = PredictionCache(max_size=2)
+        cache.get_or_compute('lr', 'v1', 'a', fake_predict)
+        cache.get_or_compute('lr', 'v1', 'b', fake_predict)
+        cache.get_or_compute('lr', 'v1', 'a', fake_predict)  # 'a' pasa a ser reciente
+        cache.get_or_compute('lr', 'v1', 'c', fake_predict)  # expulsa 'b'
+
+        stats = cache.stats()
+        assert stats['size'] == 2
+        assert stats['evictions'] == 1
+
+        cache.get_or_compute('lr', 'v1', 'a', fake_predict)
+        assert cache.stats()['hits'] == 2
+        cache.get_or_compute('lr', 'v1', 'b', fake_predict)
+        assert cache.stats()['misses'] == 4
+
+    def test_ttl_expiration(self):
+        """Las entradas caducan pasado el TTL."""
+        clock = FakeClock()
+        cache = PredictionCache(max_size=10, ttl_seconds=60, clock=clock)
+        cache.get_or_compute('lr', 'v1', 'hello', fake_predict)
+
+        clock.now = 59
+        cache.get_or_compute('lr', 'v1', 'hello', fake_predict)
+        assert cache.stats()['hits'] == 1
+
+        clock.now = 200
+        cache.get_or_compute('lr', 'v1', 'hello', fake_predict)
+        stats = cache.stats()
+        assert stats['expirations'] == 1
+        assert stats['misses'] == 2
+
+    def test_invalidate_with_new_version(self):
+        """invalidate(model_id, versión) descarta las entradas del modelo y fija la versión actual."""
+        cache = PredictionCache(max_size=10)
+        cache.get_or_compute('lr', 'v1', 'a', fake_predict)
+        cache.get_or_compute('lr', 'v1', 'b', fake_predict)
+        cache.get_or_compute('bert', 'v1', 'a', fake_predict)
+
+        cache.invalidate('lr', 'v2')
+        cache.get_or_compute('lr', 'v2', 'a', fake_predict)
+
+        stats = cache.stats()
+        assert stats['invalidations'] == 2
+        assert stats['size'] == 2  # 'a' de bert + 'a' de lr v2
+
+    def test_stale_version_bypasses_cache(self):
+        """Las peticiones que terminan con el detector anterior no vacían la cache del nuevo."""
+        cache = PredictionCache(max_size=10)
+        cache.get_or_compute('lr', 'v1', 'a', fake_predict)
+        cache.invalidate('lr', 'v2')
+
+        for _ in range(3):
+            cache.get_or_compute('lr', 'v2', 'a', fake_predict)
+            cache.get_or_compute('lr', 'v1', 'a', fake_predict)  # petición en curso con v1
+            cache.get_or_compute_batch('lr', 'v1', ['a', 'b'], CountingBatch())
+            cache.get_or_compute_batch('lr', 'v2', ['a', 'b'], CountingBatch())
+
+        stats = cache.stats()
+        assert stats['size'] == 2  # 'a' y 'b' de v2
+        assert stats['invalidations'] == 1
+        assert stats['bypasses'] == 9
+        assert stats['hits'] == 7  # las 9 consultas de v2 salvo el primer 'a' y el primer 'b'
+
+    def test_disabled_cache(self):
+        """Con max_size=0 siempre se calcula."""
+        cache = PredictionCache(max_size=0)
+        batch = CountingBatch()
+        cache.get_or_compute_batch('lr', 'v1', ['a', 'a'], batch)
+
+        assert not cache.enabled
+        assert batch.calls == [['a', 'a']]
+        assert cache.stats()['size'] == 0
+
+
+class TestPredictionCacheBatch:
+    """Tests de la versión por lotes."""
+
+    def test_only_misses_are_computed(self):
+        """Solo los textos no cacheados llegan a predict_batch."""
+        cache = PredictionCache(max_size=10)
+        batch = CountingBatch()
+        cache.get_or_compute_batch('lr', 'v1', ['a', 'b'], batch)
+        results = cache.get_or_compute_batch('lr', 'v1', ['b', 'c', 'a', 'd'], batch)
+
+        assert batch.calls == [['a', 'b'], ['c', 'd']]
+        assert [r['text'] for r in results] == ['b', 'c', 'a', 'd']
+
+    def test_duplicates_computed_once(self):
+        """Los duplicados dentro del lote se calculan una sola vez."""
+        cache = PredictionCache(max_size=10)
+        batch = CountingBatch()
+        results = cache.get_or_compute_batch('lr', 'v1', ['x', 'y', 'x ', 'x'], batch)
+
+        assert batch.calls == [['x', 'y']]
+        assert [r['text'] for r in results] == ['x', 'y', 'x ', 'x']
+        assert all(r['prediction'] == 'normal' for r in results)
+
+    def test_fully_cached_batch_skips_compute(self):
+        """Un lote completamente cacheado no llama a predict_batch."""
+        cache = PredictionCache(max_size=10)
+        batch = CountingBatch()
+        cache.get_or_compute_batch('lr', 'v1', ['a', 'b'], batch)
+        cache.get_or_compute_batch('lr', 'v1', ['b', 'a'], batch)
+
+        assert len(batch.calls) == 1
+        assert cache.stats()['hit_rate'] == pytest.approx(0.5)
+
+    def test_invalidate(self):
+        """invalidate vacía un modelo o toda la cache."""
+        cache = PredictionCache(max_size=10)
+        cache.get_or_compute_batch('lr', 'v1', ['a', 'b'], CountingBatch())
+        cache.get_or_compute_batch('bert', 'v1', ['a'], CountingBatch())
+
+        cache.invalidate('lr')
+        assert cache.stats()['size'] == 1
+        cache.invalidate()
+        assert cache.stats()['size'] == 0
+        assert cache.stats()['invalidations'] == 3
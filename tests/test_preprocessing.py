@@ -2,8 +2,16 @@
 Tests para el módulo de preprocesamiento de texto.
 """
 
+import subprocess
+import sys
+
 import pytest
-from backend.preprocessing.text_cleaner import clean_text, preprocess_text, full_preprocess
+from backend.preprocessing.text_cleaner import (
+    clean_text, preprocess_text, full_preprocess, preprocess_batch, stem_token, fast_tokenize,
+    get_stop_words, STOPWORDS_PATH
+)
+from backend.preprocessing.tokenizer_equivalence import compare_tokenizers
+from backend.preprocessing.parallel import ParallelPreprocessor
 
 class TestCleanText:
     """Tests para la función clean_text."""
@@ -155,4 +163,119 @@ class TestFullPreprocess:
         
         # Debe contener stems de las palabras clave
         assert len(result) > 0
-        assert result == result.lower()
\ No newline at end of file
+        assert result == result.lower()
+
+
+class TestPreprocessBatch:
+    """Tests para el preprocesamiento por lotes."""
+    
+    def test_matches_full_preprocess(self, sample_texts):
+        """Debe producir exactamente la misma salida que full_preprocess."""
+        texts = sample_texts["toxic"] + sample_texts["normal"] + sample_texts["edge_cases"]
+        assert preprocess_batch(texts) == [full_preprocess(t) for t in texts]
+    
+    def test_preserves_order_and_length(self):
+        """Debe retornar un resultado por texto en el mismo orden."""
+        texts = ["running fast", "", "I HATE you!!!", "http://spam.com"]
+        result = preprocess_batch(texts)
+        assert len(result) == 4
+        assert result[1] == ""
+        assert result[3] == ""
+        assert result[0] == full_preprocess("running fast")
+    
+    def test_empty_batch(self):
+        """Debe manejar una lista vacía."""
+        assert preprocess_batch([]) == []
+    
+    def test_stem_cache_is_bounded(self):
+        """La cache de stems debe tener tamaño máximo."""
+        preprocess_batch(["running runs runner"] * 10)
+        info = stem_token.cache_info()
+        assert info.maxsize is not None
+        assert info.hits > 0
+
+
+class TestParallelPreprocessor:
+    """Tests para el preprocesamiento en pool de procesos."""
+    
+    @pytest.fixture(scope="class")
+    def pool(self):
+        """Pool pequeño con umbral bajo para forzar el modo paralelo."""
+        preprocessor = ParallelPreprocessor(workers=2, chunk_size=3, threshold=5)
+        preprocessor.start()
+        yield preprocessor
+        preprocessor.shutdown()
+    
+    def test_large_batch_matches_sequential(self, pool, sample_texts):
+        """Debe producir la misma salida y orden que preprocess_batch."""
+        texts = (sample_texts["toxic"] + sample_texts["normal"] + sample_texts["edge_cases"]) * 3
+        assert pool.preprocess(texts) == preprocess_batch(texts)
+    
+    def test_small_batch_stays_in_process(self, pool):
+        """Los lotes bajo el umbral no deben usar el pool."""
+        texts = ["I HATE you!", "great video"]
+        assert pool.preprocess(texts) == preprocess_batch(texts)
+    
+    def test_not_started_falls_back(self):
+        """Sin start() debe funcionar en el proceso actual."""
+        preprocessor = ParallelPreprocessor(workers=2, threshold=1)
+        assert not preprocessor.running
+        assert preprocessor.preprocess(["running runs"]) == preprocess_batch(["running runs"])
+    
+    def test_shutdown_is_idempotent(self):
+        """Debe poder detenerse varias veces sin error."""
+        preprocessor = ParallelPreprocessor(workers=1)
+        preprocessor.start()
+        assert preprocessor.running
+        preprocessor.shutdown()
+        preprocessor.shutdown()
+        assert not preprocessor.running
+
+
+class TestFastTokenizer:
+    """Tests para el backend de tokenización rápido."""
+    
+    def test_splits_contractions_like_nltk(self):
+        """Debe separar las contracciones sin apóstrofo igual que NLTK."""
+        assert fast_tokenize("i cannot go gonna wanna") == ["i", "can", "not", "go", "gon", "na", "wan", "na"]
+    
+    def test_equivalent_to_nltk(self, sample_texts):
+        """No debe haber divergencias con word_tokenize en texto limpio."""
+        texts = sample_texts["toxic"] + sample_texts["normal"] + sample_texts["edge_cases"] + [
+            "You CANNOT be serious, gimme a break!!!",
+            "lemme\tsee\nthat   gotta_go naïve café",
+            "wannabe cannotx ЯНДЕКС 東京 ✨",
+        ]
+        report = compare_tokenizers(texts)
+        assert report["total"] == len(texts)
+        assert report["divergent"] == 0, report["examples"]
+    
+    def test_full_preprocess_backends_match(self, sample_texts):
+        """full_preprocess debe dar el mismo resultado con ambos backends."""
+        for text in sample_texts["toxic"] + sample_texts["normal"]:
+            assert full_preprocess(text, tokenizer="fast") == full_preprocess(text, tokenizer="nltk")
+    
+    def test_unknown_tokenizer_raises(self):
+        """Debe rechazar backends desconocidos."""
+        with pytest.raises(ValueError):
+            preprocess_batch(["hello"], tokenizer="spacy")
+
+
+class TestLazyResources:
+    """Tests para la carga perezosa y sin descargas de recursos NLTK."""
+    
+    def test_import_does_not_load_nltk(self):
+        """Importar el módulo no debe importar NLTK ni descargar nada."""
+        code = (
+            "import sys; import backend.preprocessing.text_cleaner; "
+            "sys.exit(1 if 'nltk' in sys.modules else 0)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+        assert result.returncode == 0
+    
+    def test_vendored_stopwords(self):
+        """Las stopwords deben leerse del fichero incluido en el paquete."""
+        assert STOPWORDS_PATH.exists()
+        stop_words = get_stop_words()
+        assert {"the", "is", "on", "you", "not"} <= stop_words
+        assert "hate" not in stop_words
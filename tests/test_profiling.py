@@ -0,0 +1,152 @@
+"""
+Tests para el profiling por petición (cabecera X-Profile).
+"""
+
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.utils.executors import BoundedExecutor
+from backend.utils.metrics import MetricsRegistry
+from backend.utils.profiling import ProfileStore, ProfilingMiddleware, RequestProfile, current_profile
+
+
+def score_batch(registry, texts):
+    """Trabajo de ejemplo con dos etapas, como predict_batch."""
+    with registry.stage("clean_text", len(texts)):
+        cleaned = [text.lower() for text in texts]
+    with registry.stage("lr_score", len(texts)):
+        return sum(len(text) for text in cleaned)
+
+
+def make_app(store, sample_rate=0.0):
+    """App mínima: /work puntúa en un executor con un registro de métricas desactivado."""
+    registry = MetricsRegistry(enabled=False)
+    pool = BoundedExecutor("test", max_workers=1, max_pending=4)
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, paths=["/work"], sample_rate=sample_rate)
+
+    async def run_profiled(fn, *args):
+        profile = current_profile.get()
+        if profile is not None and profile.profiler is not None:
+            fn, args = profile.run_profiled, (fn, *args)
+        return await pool.run(fn, *args)
+
+    @app.post("/work")
+    async def work():
+        return {"total": await run_profiled(score_batch, registry, ["Hola", "Mundo"])}
+
+    @app.post("/other")
+    async def other():
+        return {"total": await run_profiled(score_batch, registry, ["Hola"])}
+
+    return app, pool
+
+
+@pytest.fixture
+def profiled_app():
+    store = ProfileStore(max_entries=10)
+    app, pool = make_app(store)
+    with TestClient(app) as client:
+        yield client, store
+    pool.shutdown()
+
+
+class TestProfilingMiddleware:
+    """Tests del desglose por etapa y de cProfile en los hilos del executor."""
+
+    def test_timings_header(self, profiled_app):
+        """Con X-Profile: timings, Server-Timing lleva las etapas medidas en el hilo del executor."""
+        client, store = profiled_app
+        response = client.post("/work", headers={"X-Profile": "timings"})
+
+        assert response.status_code == 200
+        timing = response.headers["server-timing"]
+        assert timing.startswith("total;dur=")
+        assert "clean_text;dur=" in timing and "lr_score;dur=" in timing
+        report = store.get(response.headers["x-profile-id"])
+        assert report["stages"]["clean_text"]["calls"] == 1
+        assert report["stages"]["clean_text"]["items"] == 2
+        assert "cprofile" not in report
+
+    def test_cprofile_summary(self, profiled_app):
+        """Con cprofile, el informe incluye las funciones ejecutadas en el executor."""
+        client, store = profiled_app
+        response = client.post("/work", headers={"X-Profile": "cprofile"})
+
+        report = store.get(response.headers["x-profile-id"])
+        assert report["cprofile"]["profiled_calls"] == 1
+        assert any("score_batch" in line for line in report["cprofile"]["top_cumulative"])
+
+    def test_not_profiled(self, profiled_app):
+        """Sin cabecera, con un modo desconocido o fuera de las rutas perfilables no se añade nada."""
+        client, store = profiled_app
+        assert "server-timing" not in client.post("/work").headers
+        assert "server-timing" not in client.post("/work", headers={"X-Profile": "flamegraph"}).headers
+        assert "server-timing" not in client.post("/other", headers={"X-Profile": "timings"}).headers
+        assert store.recent() == []
+
+    def test_sampling(self):
+        """Con sample_rate=1 se perfila toda petición (solo timings) y se marca como muestreada."""
+        store = ProfileStore()
+        app, pool = make_app(store, sample_rate=1.0)
+        try:
+            with TestClient(app) as client:
+                response = client.post("/work")
+        finally:
+            pool.shutdown()
+        report = store.get(response.headers["x-profile-id"])
+        assert report["sampled"] is True and report["mode"] == "timings"
+
+
+    def test_report_and_files_built_off_the_event_loop(self, tmp_path):
+        """Antes de las cabeceras solo se guarda el resumen; cProfile y disco se hacen en otro hilo."""
+        saved_from = []
+
+        class RecordingStore(ProfileStore):
+            def save(self, profile, report):
+                saved_from.append(threading.get_ident())
+                super().save(profile, report)
+
+        store = RecordingStore(directory=tmp_path)
+        app, pool = make_app(store)
+
+        @app.get("/loop-thread")
+        async def loop_thread():
+            return {"ident": threading.get_ident()}
+
+        try:
+            with TestClient(app) as client:
+                loop_ident = client.get("/loop-thread").json()["ident"]
+                response = client.post("/work", headers={"X-Profile": "cprofile"})
+        finally:
+            pool.shutdown()
+
+        profile_id = response.headers["x-profile-id"]
+        assert len(saved_from) == 1 and saved_from[0] != loop_ident
+        assert store.get(profile_id)["cprofile"]["profiled_calls"] == 1
+        assert len(list(tmp_path.glob(f"*{profile_id}.json"))) == 1
+        assert len(list(tmp_path.glob(f"*{profile_id}.prof"))) == 1
+
+
+class TestProfileStore:
+    """Tests del almacén de informes."""
+
+    def test_evicts_oldest_and_writes_files(self, tmp_path):
+        """Conserva los max_entries más recientes y escribe .json (y .prof con cprofile) en disco."""
+        store = ProfileStore(max_entries=2, directory=tmp_path)
+        profiles = [RequestProfile("/predict", mode="cprofile") for _ in range(3)]
+        for profile in profiles:
+            profile.run_profiled(sum, range(10))
+            store.save(profile, profile.report(0.001))
+
+        assert store.get(profiles[0].id) is None
+        assert [entry["id"] for entry in store.recent()] == [profiles[2].id, profiles[1].id]
+        written = sorted(path.name for path in tmp_path.iterdir())
+        assert len([name for name in written if name.endswith(".json")]) == 3
+        assert len([name for name in written if name.endswith(".prof")]) == 3
+        report = json.loads(next(tmp_path.glob(f"*{profiles[2].id}.json")).read_text())
+        assert report["endpoint"] == "/predict"
@@ -0,0 +1,84 @@
+"""
+Tests para los agregados incrementales del análisis de videos.
+"""
+
+import random
+
+from backend.utils.toxicity_aggregate import ToxicityAggregate
+
+
+def make_page(start, confidences):
+    """Página de comentarios y predicciones; confianza None = normal."""
+    comments, predictions = [], []
+    for offset, confidence in enumerate(confidences):
+        i = start + offset
+        comments.append({'comment_id': f'c{i}', 'author': f'user{i}', 'text': f'text {i}',
+                         'published_at': '2024-01-01T00:00:00Z'})
+        if confidence is None:
+            predictions.append({'prediction': 'normal', 'confidence': 0.9})
+        else:
+            predictions.append({'prediction': 'hate_speech', 'confidence': confidence})
+    return comments, predictions
+
+
+class TestToxicityAggregate:
+    """Tests de contadores y top-N por páginas."""
+
+    def test_counters_across_pages(self):
+        """Los contadores acumulan todas las páginas."""
+        aggregate = ToxicityAggregate(top_n=3)
+        aggregate.update(*make_page(0, [0.7, None, None, 0.9]))
+        aggregate.update(*make_page(4, [None, 0.6]), escalated=2)
+
+        snapshot = aggregate.snapshot()
+        assert snapshot['total_comments_analyzed'] == 6
+        assert snapshot['toxic_count'] == 3
+        assert snapshot['normal_count'] == 3
+        assert snapshot['toxicity_percentage'] == 50.0
+        assert aggregate.escalated == 2
+
+    def test_degraded_pages(self):
+        """model_used refleja si alguna página se puntuó con LR por saturación."""
+        aggregate = ToxicityAggregate()
+        aggregate.update(*make_page(0, [0.7, None]))
+        assert aggregate.model_used('distilbert') == 'distilbert'
+        aggregate.update(*make_page(2, [None, None]), degraded=2)
+        assert aggregate.snapshot()['degraded_comments'] == 2
+        assert aggregate.model_used('distilbert') == 'mixed'
+        assert ToxicityAggregate().model_used('cascade') == 'cascade'
+
+    def test_top_n_matches_full_sort(self):
+        """El heap debe dar el mismo top-N que ordenar todos los tóxicos (con empates estables)."""
+        rng = random.Random(0)
+        confidences = [rng.choice([None, round(rng.random(), 2)]) for _ in range(2000)]
+        aggregate = ToxicityAggregate(top_n=10)
+        for start in range(0, len(confidences), 100):
+            aggregate.update(*make_page(start, confidences[start:start + 100]))
+
+        toxic = [(c, f'c{i}') for i, c in enumerate(confidences) if c is not None]
+        expected = [comment_id for _, comment_id in sorted(toxic, key=lambda x: x[0], reverse=True)[:10]]
+        top = aggregate.top_toxic()
+        assert [c['comment_id'] for c in top] == expected
+        assert len(aggregate._heap) == 10
+
+    def test_empty(self):
+        """Sin comentarios, porcentaje 0 y top vacío."""
+        snapshot = ToxicityAggregate().snapshot()
+        assert snapshot['total_comments_analyzed'] == 0
+        assert snapshot['toxicity_percentage'] == 0.0
+        assert snapshot['top_toxic_comments'] == []
+
+    def test_breakdown_top_level_and_replies(self):
+        """La toxicidad de respuestas y comentarios principales se cuenta por separado."""
+        aggregate = ToxicityAggregate(top_n=5)
+        comments, predictions = make_page(0, [0.9, None, None, 0.8])
+        for comment in comments[2:]:
+            comment.update(is_reply=True, parent_id='c0')
+        aggregate.update(comments, predictions)
+
+        breakdown = aggregate.snapshot()['breakdown']
+        assert breakdown['top_level'] == {'total': 2, 'toxic_count': 1, 'toxicity_percentage': 50.0}
+        assert breakdown['replies'] == {'total': 2, 'toxic_count': 1, 'toxicity_percentage': 50.0}
+        top = aggregate.top_toxic()
+        assert [c['is_reply'] for c in top] == [False, True]
+        assert top[1]['parent_id'] == 'c0'
@@ -0,0 +1,162 @@
+"""
+Tests para el cliente asíncrono de la YouTube API contra el stub local.
+"""
+
+import asyncio
+
+import pytest
+
+from backend.utils.youtube_async import AsyncYouTubeCommentFetcher, QuotaBucket, QuotaExceeded
+from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def youtube_stub():
+    """Stub de la API con 250 comentarios por video y sin latencia."""
+    stub = YouTubeStub(total_comments=250, page_latency_ms=0, title_latency_ms=0)
+    server, url = start_stub_server(stub)
+    yield stub, url
+    server.shutdown()
+
+
+def make_fetcher(url, **kwargs):
+    return AsyncYouTubeCommentFetcher(api_key="stub", api_endpoint=url, backoff_base=0.01, **kwargs)
+
+
+class FakeClock:
+    """Reloj manual; sleep avanza el reloj en lugar de esperar."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestAsyncYouTubeCommentFetcher:
+    """Tests de paginación, reintentos y mapeo de errores."""
+
+    def test_comments_and_title(self, youtube_stub):
+        """Mismo resultado que el cliente síncrono: páginas de 100 hasta max_comments."""
+        stub, url = youtube_stub
+
+        async def scenario():
+            fetcher = make_fetcher(url)
+            try:
+                comments, title = await asyncio.gather(
+                    fetcher.fetch_comments(VIDEO_ID, max_comments=150),
+                    fetcher.fetch_video_title(VIDEO_ID)
+                )
+                return comments, title, fetcher.stats()
+            finally:
+                await fetcher.aclose()
+
+        comments, title, stats = run(scenario())
+        assert len(comments) == 150
+        assert comments[0]["comment_id"] == f"{VIDEO_ID}-0"
+        assert title == f"Stub video {VIDEO_ID}"
+        assert stub.requests["commentThreads"] == 2
+        assert stats["quota"]["used"] == 3
+        assert stats["calls"]["commentThreads"]["calls"] == 2
+        assert stats["calls"]["commentThreads"]["p95_ms"] is not None
+
+    def test_retries_on_5xx_and_429(self, youtube_stub):
+        """Los 503 y 429 se reintentan con backoff y la llamada acaba bien."""
+        stub, url = youtube_stub
+        stub.fail_next(503, reason="backendError")
+        stub.fail_next(429, reason="rateLimitExceeded")
+
+        async def scenario():
+            fetcher = make_fetcher(url)
+            try:
+                return await fetcher.fetch_comments(VIDEO_ID, max_comments=50), fetcher.stats()
+            finally:
+                await fetcher.aclose()
+
+        comments, stats = run(scenario())
+        assert len(comments) == 50
+        assert stats["calls"]["commentThreads"]["retries"] == 2
+        assert stats["calls"]["commentThreads"]["errors"] == 0
+
+    def test_error_mapping(self, youtube_stub):
+        """videoNotFound -> ValueError; commentsDisabled -> sin comentarios; quotaExceeded -> QuotaExceeded."""
+        stub, url = youtube_stub
+
+        async def scenario():
+            fetcher = make_fetcher(url)
+            try:
+                stub.fail_next(404, reason="videoNotFound")
+                with pytest.raises(ValueError, match="no encontrado"):
+                    await fetcher.fetch_comments(VIDEO_ID)
+
+                stub.fail_next(403, reason="commentsDisabled")
+                assert await fetcher.fetch_comments(VIDEO_ID) == []
+
+                stub.fail_next(403, reason="quotaExceeded")
+                with pytest.raises(QuotaExceeded):
+                    await fetcher.fetch_comments(VIDEO_ID)
+            finally:
+                await fetcher.aclose()
+
+        run(scenario())
+
+
+class TestQuotaBucket:
+    """Tests del token bucket de cuota."""
+
+    def test_waits_for_refill_then_rejects(self):
+        """Espera a la reposición si cabe en max_wait; si no, rechaza sin gastar."""
+        clock = FakeClock()
+        # 86400 unidades/día = 1 unidad por segundo
+        bucket = QuotaBucket(per_day=86_400, capacity=2, max_wait=1.5, clock=clock, sleep=clock.sleep)
+
+        async def scenario():
+            await bucket.acquire()
+            await bucket.acquire()
+            await bucket.acquire()  # espera 1 s a que se reponga una unidad
+            assert clock.now == pytest.approx(1.0)
+            with pytest.raises(QuotaExceeded) as excinfo:
+                await bucket.acquire(3)
+            assert excinfo.value.retry_after == pytest.approx(3.0)
+
+        run(scenario())
+        assert bucket.used == 3
+        assert bucket.rejected == 1
+
+    def test_waiter_does_not_block_other_callers(self):
+        """Mientras una llamada espera la reposición, las demás reservan o se rechazan sin hacer cola."""
+        clock = FakeClock()
+        gate = asyncio.Event()
+        waits = []
+
+        async def blocking_sleep(seconds):
+            waits.append(seconds)
+            await gate.wait()
+
+        bucket = QuotaBucket(per_day=86_400, capacity=1, max_wait=2.5, clock=clock, sleep=blocking_sleep)
+
+        async def scenario():
+            await bucket.acquire()
+            first = asyncio.ensure_future(bucket.acquire())  # espera 1 s
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(bucket.acquire())  # detrás de la reserva anterior: 2 s
+            await asyncio.sleep(0)
+            with pytest.raises(QuotaExceeded) as excinfo:
+                await asyncio.wait_for(bucket.acquire(), timeout=1)  # 3 s > max_wait
+            assert excinfo.value.retry_after == pytest.approx(3.0)
+            assert waits == [pytest.approx(1.0), pytest.approx(2.0)]
+            gate.set()
+            await asyncio.gather(first, second)
+
+        run(scenario())
+        assert bucket.used == 3
+        assert bucket.rejected == 1
@@ -0,0 +1,90 @@
+"""
+Tests para YouTubeCommentFetcher contra el stub local de la YouTube API.
+"""
+
+import pytest
+
+from backend.utils.youtube_scraper import YouTubeCommentFetcher
+from benchmarks.youtube_stub import YouTubeStub, start_stub_server
+
+
+@pytest.fixture(scope="module")
+def youtube_stub():
+    """Stub de la API con 250 comentarios por video y sin latencia."""
+    stub = YouTubeStub(total_comments=250, page_latency_ms=0, title_latency_ms=0)
+    server, url = start_stub_server(stub)
+    yield stub, url
+    server.shutdown()
+
+
+@pytest.fixture
+def stub_fetcher(youtube_stub, monkeypatch):
+    """Fetcher apuntando al stub."""
+    _, url = youtube_stub
+    monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+    monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+    return YouTubeCommentFetcher()
+
+
+class TestYouTubeCommentFetcher:
+    """Tests de la paginación de comentarios."""
+
+    def test_pages_are_yielded_incrementally(self, stub_fetcher, youtube_stub):
+        """Cada página se pide al avanzar el iterador, no todas de golpe."""
+        stub, _ = youtube_stub
+        before = stub.requests["commentThreads"]
+        pages = stub_fetcher.iter_comment_pages("dQw4w9WgXcQ", max_comments=200)
+
+        first = next(pages)
+        assert len(first) == 100
+        assert stub.requests["commentThreads"] == before + 1
+
+        rest = list(pages)
+        assert [len(page) for page in rest] == [100]
+        assert stub.requests["commentThreads"] == before + 2
+
+    def test_fetch_comments_respects_max(self, stub_fetcher):
+        """fetch_comments concatena las páginas hasta max_comments."""
+        comments = stub_fetcher.fetch_comments("dQw4w9WgXcQ", max_comments=150)
+
+        assert len(comments) == 150
+        assert comments[0]["comment_id"] == "dQw4w9WgXcQ-0"
+        assert comments[-1]["comment_id"] == "dQw4w9WgXcQ-149"
+        assert {"comment_id", "author", "text", "published_at"} <= set(comments[0])
+
+    def test_video_title(self, stub_fetcher):
+        """El título se obtiene de videos().list."""
+        assert stub_fetcher.fetch_video_title("dQw4w9WgXcQ") == "Stub video dQw4w9WgXcQ"
+
+    def test_missing_api_key(self, monkeypatch):
+        """Sin API key, pedir comentarios lanza ValueError."""
+        monkeypatch.delenv("YOUTUBE_API_KEY", raising=False)
+        fetcher = YouTubeCommentFetcher()
+        with pytest.raises(ValueError):
+            next(fetcher.iter_comment_pages("dQw4w9WgXcQ"))
+
+    def test_unbounded_pages(self, stub_fetcher):
+        """Con max_comments=None se recorren todas las páginas."""
+        pages = list(stub_fetcher.iter_comment_pages("dQw4w9WgXcQ", max_comments=None))
+
+        assert [len(page) for page in pages] == [100, 100, 50]
+
+    def test_fetch_replies(self, monkeypatch):
+        """Las respuestas de un hilo se piden con comments().list(parentId) y se marcan como respuesta."""
+        stub = YouTubeStub(total_comments=20, page_latency_ms=0, title_latency_ms=0,
+                           reply_every=5, replies_per_thread=130)
+        server, url = start_stub_server(stub)
+        monkeypatch.setenv("YOUTUBE_API_KEY", "stub")
+        monkeypatch.setenv("YOUTUBE_API_ENDPOINT", url)
+        try:
+            fetcher = YouTubeCommentFetcher()
+            threads = fetcher.fetch_comments("dQw4w9WgXcQ", max_comments=20)
+            replies = fetcher.fetch_replies("dQw4w9WgXcQ-5", max_replies=None)
+            capped = fetcher.fetch_replies("dQw4w9WgXcQ-5", max_replies=10)
+        finally:
+            server.shutdown()
+
+        assert [t["reply_count"] for t in threads[:6]] == [130, 0, 0, 0, 0, 130]
+        assert len(replies) == 130  # dos páginas
+        assert all(r["is_reply"] and r["parent_id"] == "dQw4w9WgXcQ-5" for r in replies)
+        assert len(capped) == 10